@@ -1,55 +1,152 @@
 """
 원본 SVG에서 path 크기 분포 분석
+- 모든 path의 폭, 높이, 넓이, 종횡비, 최소 치수를 numpy 배열로 한 번에 계산
+- 분포는 np.histogram / np.percentile로 계산
+- 결과를 JSON / CSV로 저장하여 기준값 변화를 추적할 수 있음
 """
 
+import argparse
+import csv
+import json
 import re
 
-def parse_path_commands(d):
-    numbers = re.findall(r'-?\d+\.?\d*', d)
-    coords = [float(n) for n in numbers]
-    return coords
+import numpy as np
 
-def get_path_dimensions(d):
-    coords = parse_path_commands(d)
-    if len(coords) < 2:
-        return (0, 0)
+from svg_geometry import bboxes_from_numbers, path_number_arrays
 
-    x_coords = coords[0::2]
-    y_coords = coords[1::2]
 
-    if not x_coords or not y_coords:
-        return (0, 0)
+# d 앞에 공백을 요구해 d 뒤에 오는 id="path1" 같은 속성 값을 d로 잡지 않게 함
+PATH_D_RE = re.compile(r'<path[^>]*?\sd="([^"]+)"[^>]*/>')
 
-    width = max(x_coords) - min(x_coords)
-    height = max(y_coords) - min(y_coords)
-    return (width, height)
+# 최소 치수 분포 구간 (기존 콘솔 출력과 동일)
+MIN_DIM_BINS = [0, 0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 1.5, 2.0, np.inf]
+PERCENTILES = [0, 1, 5, 25, 50, 75, 95, 99, 100]
 
-# 원본 SVG 읽기
-with open("output.svg", 'r', encoding='utf-8') as f:
-    content = f.read()
 
-paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', content)
+def areas_from_numbers(nums, counts):
+    """path별 다각형 넓이 (shoelace, 절대값) - 모든 path를 한 번에 계산"""
+    pairs = counts // 2
+    # 각 path의 숫자 개수를 짝수로 맞춤 (남는 숫자는 버림)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    local = np.arange(len(nums)) - np.repeat(starts, counts)
+    keep = local < np.repeat(pairs * 2, counts)
+    xy = nums[keep].reshape(-1, 2)
+    ids = np.repeat(np.arange(len(counts)), pairs)
+    if len(xy) == 0:
+        return np.zeros(len(counts))
+    pair_starts = np.concatenate([[0], np.cumsum(pairs)[:-1]])
+    nxt = np.arange(len(xy)) + 1
+    last = (pair_starts + pairs - 1)[pairs > 0]
+    nxt[last] = pair_starts[pairs > 0]
+    cross = xy[:, 0] * xy[nxt, 1] - xy[nxt, 0] * xy[:, 1]
+    return np.abs(0.5 * np.bincount(ids, weights=cross, minlength=len(counts)))
 
-# 크기별로 분류
-sizes = []
-for path_d in paths:
-    width, height = get_path_dimensions(path_d)
-    min_dim = min(width, height)
-    sizes.append((min_dim, width, height, path_d[:50]))
 
-# 정렬
-sizes.sort(key=lambda x: x[0])
+def compute_metrics(ds):
+    """path별 크기 지표 배열 계산 (숫자 파싱은 한 번만 수행)"""
+    nums, counts = path_number_arrays(ds)
+    bboxes = bboxes_from_numbers(nums, counts)
+    width = bboxes[:, 2] - bboxes[:, 0]
+    height = bboxes[:, 3] - bboxes[:, 1]
+    min_dim = np.minimum(width, height)
+    max_dim = np.maximum(width, height)
+    aspect = np.divide(max_dim, min_dim, out=np.full(len(ds), np.inf), where=min_dim > 0)
+    return {
+        "width": width,
+        "height": height,
+        "area": areas_from_numbers(nums, counts),
+        "aspect_ratio": aspect,
+        "min_dim": min_dim,
+    }
 
-print(f"총 path 개수: {len(sizes)}")
-print("\n=== 가장 얇은 path들 (상위 30개) ===")
-for i, (min_dim, w, h, d) in enumerate(sizes[:30]):
-    print(f"{i+1:3}. min={min_dim:.4f}, 폭={w:.4f}, 높이={h:.4f} | {d}...")
 
-print("\n=== 크기 분포 ===")
-ranges = [0, 0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 1.5, 2.0]
-for i in range(len(ranges)-1):
-    count = sum(1 for s in sizes if ranges[i] <= s[0] < ranges[i+1])
-    print(f"{ranges[i]:.2f} ~ {ranges[i+1]:.2f}: {count}개")
-count = sum(1 for s in sizes if s[0] >= 2.0)
-print(f"2.0 이상: {count}개")
+def summarize(values, bins):
+    finite = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    summary = {
+        "count": int(values.size),
+        "infinite": int(values.size - finite.size),
+        "mean": float(finite.mean()) if finite.size else None,
+        "percentiles": {},
+        "histogram": {
+            "edges": [float(e) if np.isfinite(e) else None for e in edges],
+            "counts": [int(c) for c in counts],
+        },
+    }
+    if finite.size:
+        summary["percentiles"] = {str(p): float(v) for p, v in zip(PERCENTILES, np.percentile(finite, PERCENTILES))}
+    return summary
 
+
+def analyze_paths(input_file, output_json=None, output_csv=None, bins=20, top=30):
+    """
+    SVG의 path 크기 분포 분석
+
+    Args:
+        input_file: 분석할 SVG
+        output_json: 지표별 분포 JSON (None이면 생략)
+        output_csv: 지표별 백분위수 CSV (None이면 생략)
+        bins: 최소 치수 외 지표의 히스토그램 구간 수
+        top: 콘솔에 출력할 가장 얇은 path 개수
+    """
+    with open(input_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    paths = PATH_D_RE.findall(content)
+    metrics = compute_metrics(paths)
+
+    report = {"input": input_file, "paths": len(paths), "metrics": {}}
+    for name, values in metrics.items():
+        if name == "min_dim":
+            metric_bins = MIN_DIM_BINS
+        else:
+            finite = values[np.isfinite(values)]
+            hi = float(finite.max()) if finite.size else 1.0
+            metric_bins = np.linspace(0.0, hi if hi > 0 else 1.0, bins + 1)
+        report["metrics"][name] = summarize(values, metric_bins)
+
+    min_dim = metrics["min_dim"]
+    print(f"총 path 개수: {len(paths)}")
+    print(f"\n=== 가장 얇은 path들 (상위 {top}개) ===")
+    order = np.argsort(min_dim, kind="stable")[:top]
+    for i, k in enumerate(order):
+        print(f"{i+1:3}. min={min_dim[k]:.4f}, 폭={metrics['width'][k]:.4f}, "
+              f"높이={metrics['height'][k]:.4f} | {paths[k][:50]}...")
+
+    print("\n=== 크기 분포 ===")
+    counts = report["metrics"]["min_dim"]["histogram"]["counts"]
+    for i in range(len(MIN_DIM_BINS) - 2):
+        print(f"{MIN_DIM_BINS[i]:.2f} ~ {MIN_DIM_BINS[i+1]:.2f}: {counts[i]}개")
+    print(f"{MIN_DIM_BINS[-2]:.1f} 이상: {counts[-1]}개")
+
+    if output_json:
+        with open(output_json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nJSON 저장: {output_json}")
+
+    if output_csv:
+        with open(output_csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["metric", "count", "infinite", "mean"] + [f"p{p}" for p in PERCENTILES])
+            for name, s in report["metrics"].items():
+                writer.writerow([name, s["count"], s["infinite"], s["mean"]] +
+                                [s["percentiles"].get(str(p)) for p in PERCENTILES])
+        print(f"CSV 저장: {output_csv}")
+
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="output.svg")
+    p.add_argument("--json", default=None)
+    p.add_argument("--csv", default=None)
+    p.add_argument("--bins", type=int, default=20)
+    p.add_argument("--top", type=int, default=30)
+    args = p.parse_args()
+
+    analyze_paths(args.svg, output_json=args.json, output_csv=args.csv, bins=args.bins, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+여러 보드 일괄 처리 (이어서 실행 가능)
+- assets/<보드>/processed/ 형태의 폴더에서 보드와 레이어(*_Cu.gbr)를 찾아 (보드, 레이어) 단위 작업으로 나눔
+  보드 폴더에 *Edge_Cuts.gbr가 있으면 외곽선으로 사용
+- 작업은 프로세스 풀에서 실행 (worker 수 = CPU 수, --worker_memory_mb를 주면 사용 가능한 메모리로도 제한)
+  - 레이어마다 emi_watch와 같은 단계 순서 (gerber → invert → filter-thin / extract-enclosed → remove-enclosed → cut)
+  - 한 작업이 실패해도 나머지는 계속 실행
+  - worker 프로세스가 죽으면 그때 실행 중이던 작업만 worker 1개 풀에서 하나씩 다시 실행,
+    아직 시작하지 않은 작업은 같은 크기의 새 풀에서 이어서 실행
+- 끝난 작업은 바로 manifest(batch_manifest.jsonl)에 한 줄씩 추가 → 다시 실행하면 성공한 작업은 건너뜀
+  (원본 / 외곽선 파일 내용이나 옵션이 바뀐 작업, 실패한 작업은 다시 실행)
+- 전체 결과 리포트: batch_report.json (작업별 상태 / 단계별 시간, 단계별 합계)
+
+사용 예:
+    python batch_runner.py assets --out_dir batch_out
+    python batch_runner.py /archive/boards --workers 8 --worker_memory_mb 2048
+    python batch_runner.py assets --force          # manifest를 무시하고 모두 다시 실행
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import memory_budget
+from emi_watch import DEFAULT_PATTERNS, STAGES, STATE_FILE, Watcher, file_hash, layer_name
+
+
+BOARD_SUBDIR = "processed"
+OUTLINE_PATTERN = "*Edge_Cuts.gbr"
+MANIFEST_FILE = "batch_manifest.jsonl"
+REPORT_FILE = "batch_report.json"
+
+
+def discover(root, patterns=DEFAULT_PATTERNS, board_subdir=BOARD_SUBDIR):
+    """
+    보드 / 레이어 찾기
+
+    Returns:
+        작업 목록 [{"board", "layer", "source", "outline"}] - 보드 이름은 root 기준 상대 경로
+    """
+    units = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if os.path.basename(dirpath) != board_subdir:
+            continue
+        board = os.path.relpath(os.path.dirname(dirpath), root)
+        outlines = sorted(f for f in filenames if fnmatch.fnmatch(f, OUTLINE_PATTERN))
+        outline = os.path.join(dirpath, outlines[0]) if outlines else None
+        for name in sorted(filenames):
+            if any(fnmatch.fnmatch(name, p) for p in patterns):
+                units.append({"board": board, "layer": layer_name(name), "source": os.path.join(dirpath, name),
+                              "outline": outline})
+    return units
+
+
+def unit_key(unit, options):
+    """원본 / 외곽선 내용 + 옵션 hash (manifest의 key와 같으면 다시 실행할 필요 없음)"""
+    h = hashlib.sha1()
+    h.update(file_hash(unit["source"]).encode())
+    if unit["outline"]:
+        h.update(file_hash(unit["outline"]).encode())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def load_manifest(path):
+    """(보드, 레이어) → 마지막 기록 (중간에 끊겨 마지막 줄이 깨져 있으면 그 줄은 무시)"""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[(record["board"], record["layer"])] = record
+    return records
+
+
+def append_manifest(path, record):
+    """한 줄 추가 후 바로 디스크에 씀 (프로세스가 중간에 끊겨도 끝난 작업은 남음)"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_unit(unit, out_dir, options, memory_mb=None, force=False):
+    """worker에서 작업 하나 실행 → 기록 (단계별 시간, 실패한 단계와 오류)"""
+    if memory_mb:
+        memory_budget.set_budget(memory_mb, "tile")
+    memory_budget.reset_rss_peak()
+    start = time.perf_counter()
+    board_dir = os.path.join(out_dir, unit["board"])
+    watcher = Watcher(board_dir, dict(options, outline=unit["outline"]),
+                      state_file=os.path.join(unit["layer"], STATE_FILE))
+    if force:
+        watcher.state = {}
+    results = watcher.run_layer(unit["source"])
+    errors = [(stage, error) for stage, _, error in results if error]
+    return {
+        "status": "failed" if errors else "ok",
+        "failed_stage": errors[0][0] if errors else None,
+        "error": errors[0][1] if errors else None,
+        "seconds": round(time.perf_counter() - start, 4),
+        "stages": {stage: None if seconds is None else round(seconds, 4) for stage, seconds, _ in results},
+        "pid": os.getpid(),
+        "peak_rss_mb": round(memory_budget.peak_rss_bytes() / memory_budget.MB, 1),
+    }
+
+
+def pool_size(workers=None, worker_memory_mb=None, n_units=1):
+    """worker 수: 지정값 또는 CPU 수, 작업 수 이하, worker_memory_mb를 주면 사용 가능한 메모리 / worker_memory_mb 이하"""
+    n = workers or os.cpu_count() or 1
+    if worker_memory_mb and not workers:
+        available = memory_budget.system_available_bytes()
+        if available is not None:
+            n = min(n, max(1, int(available // (worker_memory_mb * memory_budget.MB))))
+    return max(1, min(n, n_units))
+
+
+def run_pool(units, out_dir, options, workers, memory_mb, force, on_done):
+    """
+    작업들을 풀에서 실행, 끝날 때마다 on_done(unit, 결과)
+    - 풀에 넘기는 작업은 worker 수만큼만 → worker가 죽어 풀이 깨져도 결과를 잃는 작업은 그때 실행 중이던 것들뿐
+    - 풀이 깨지면 아직 넘기지 않은 작업은 같은 크기의 새 풀에서 이어서 실행
+    Returns:
+        풀이 깨질 때 실행 중이던(결과를 못 받은) 작업 목록
+    """
+    queue = list(reversed(units))
+    suspects = []
+
+    def finish(future, unit):
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            suspects.append(unit)
+            return False
+        except Exception as e:
+            result = {"status": "failed", "error": f"{type(e).__name__}: {e}", "stages": {}}
+        on_done(unit, result)
+        return True
+
+    while queue:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            running = {}
+            broken = False
+            while (queue or running) and not broken:
+                while queue and len(running) < workers:
+                    unit = queue.pop()
+                    try:
+                        running[pool.submit(run_unit, unit, out_dir, options, memory_mb, force)] = unit
+                    except BrokenProcessPool:
+                        suspects.append(unit)
+                        broken = True
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    broken |= not finish(future, running.pop(future))
+            # 깨진 풀에서 함께 실행 중이던 작업 (이미 끝났으면 결과 기록)
+            for future, unit in running.items():
+                finish(future, unit)
+    return suspects
+
+
+def build_report(units, records, wall_seconds, workers):
+    """작업별 마지막 기록과 단계별 합계"""
+    stage_totals = defaultdict(lambda: {"runs": 0, "skipped": 0, "seconds": 0.0})
+    counts = defaultdict(int)
+    rows = []
+    for unit in units:
+        record = records.get((unit["board"], unit["layer"]))
+        if record is None:
+            counts["not_run"] += 1
+            continue
+        counts[record["status"]] += 1
+        for stage, seconds in (record.get("stages") or {}).items():
+            total = stage_totals[stage]
+            if seconds is None:
+                total["skipped"] += 1
+            else:
+                total["runs"] += 1
+                total["seconds"] += seconds
+        rows.append(record)
+    order = [s[0] for s in STAGES]
+    return {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "wall_seconds": round(wall_seconds, 3),
+        "workers": workers,
+        "units": len(units),
+        "counts": dict(counts),
+        "unit_seconds": round(sum(r.get("seconds") or 0.0 for r in rows), 3),
+        "stages": {s: dict(stage_totals[s], seconds=round(stage_totals[s]["seconds"], 3))
+                   for s in order if s in stage_totals},
+        "failures": [{k: r.get(k) for k in ("board", "layer", "failed_stage", "error")}
+                     for r in rows if r["status"] != "ok"],
+        "results": rows,
+    }
+
+
+def batch_run(root, out_dir="batch_out", patterns=DEFAULT_PATTERNS, workers=None, worker_memory_mb=None,
+              force=False, **options):
+    """
+    Args:
+        root: 보드 폴더들이 있는 최상위 폴더 (assets)
+        out_dir: 출력 폴더 (out_dir/<보드>/<레이어>/...), manifest와 리포트 위치
+        patterns: 레이어 원본 파일 이름 패턴
+        workers: worker 수 (None이면 CPU 수, worker_memory_mb로 제한)
+        worker_memory_mb: worker 하나의 메모리 예산 (MB) - 각 worker에 memory_budget 예산(tile)으로도 적용
+        force: manifest와 단계별 기록을 무시하고 모두 다시 실행
+        options: 단계 옵션 (background_color, precision, min_dimension, outline_origin)
+    Returns:
+        리포트 dict
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    units = discover(root, patterns)
+    records = load_manifest(manifest_path)
+
+    pending = []
+    for unit in units:
+        unit["key"] = unit_key(unit, options)
+        done = records.get((unit["board"], unit["layer"]))
+        if force or done is None or done["status"] != "ok" or done.get("key") != unit["key"]:
+            pending.append(unit)
+    print(f"보드 {len({u['board'] for u in units})}개, 레이어 {len(units)}개 "
+          f"(이미 끝남 {len(units) - len(pending)}개, 실행 {len(pending)}개)")
+
+    workers = pool_size(workers, worker_memory_mb, len(pending))
+    finished = [0]
+    start = time.perf_counter()
+
+    def on_done(unit, result):
+        record = dict({k: unit[k] for k in ("board", "layer", "source", "key")}, **result,
+                      finished=time.strftime("%Y-%m-%d %H:%M:%S"))
+        append_manifest(manifest_path, record)
+        records[(unit["board"], unit["layer"])] = record
+        finished[0] += 1
+        line = f"[{finished[0]}/{len(pending)}] {unit['board']}/{unit['layer']}: {record['status']} ({record.get('seconds', 0):.3f}초)"
+        if record.get("error"):
+            line += f" - {record.get('failed_stage') or ''} {record['error']}"
+        print(line, flush=True)
+
+    if pending:
+        broken = run_pool(pending, out_dir, options, workers, worker_memory_mb, force, on_done)
+        # 풀이 깨질 때 실행 중이던 작업 중 어느 것이 원인인지 모름 → 하나씩 따로 실행해서 원인 작업만 실패로 기록
+        for unit in broken:
+            if run_pool([unit], out_dir, options, 1, worker_memory_mb, force, on_done):
+                on_done(unit, {"status": "crashed", "error": "worker 프로세스가 비정상 종료됨", "stages": {}})
+
+    report = build_report(units, records, time.perf_counter() - start, workers)
+    with open(os.path.join(out_dir, REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"완료! ({report['wall_seconds']:.3f}초, worker {workers}개)")
+    print("- 결과: " + ", ".join(f"{k} {v}개" for k, v in sorted(report["counts"].items())))
+    for stage, total in report["stages"].items():
+        print(f"- {stage}: {total['runs']}회 {total['seconds']:.3f}초 (건너뜀 {total['skipped']}회)")
+    for failure in report["failures"]:
+        print(f"- 실패: {failure['board']}/{failure['layer']} {failure['failed_stage'] or ''} {failure['error']}")
+    print(f"- 리포트: {os.path.join(out_dir, REPORT_FILE)}")
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("root", nargs="?", default="assets", help="보드 폴더들이 있는 폴더 (기본: assets)")
+    p.add_argument("--out_dir", default="batch_out")
+    p.add_argument("--pattern", action="append", default=None, help=f"레이어 파일 이름 패턴 (기본: {DEFAULT_PATTERNS[0]})")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--worker_memory_mb", type=float, default=None)
+    p.add_argument("--force", action="store_true", help="manifest를 무시하고 모두 다시 실행")
+    p.add_argument("--background_color", default=None)
+    p.add_argument("--precision", type=int, default=None)
+    p.add_argument("--min_dimension", type=float, default=None)
+    p.add_argument("--outline_origin", type=float, nargs=2, default=None, metavar=("X", "Y"),
+                   help="구리 SVG 왼쪽 아래에 해당하는 Gerber 좌표 (mm) - 모든 보드에 같은 값 적용")
+    args = p.parse_args()
+
+    report = batch_run(args.root, args.out_dir, tuple(args.pattern or DEFAULT_PATTERNS), args.workers,
+                       args.worker_memory_mb, args.force, background_color=args.background_color,
+                       precision=args.precision, min_dimension=args.min_dimension,
+                       outline_origin=args.outline_origin)
+    raise SystemExit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+파이프라인 단계별 벤치마크 스크립트
+- synthetic_board로 도형 10³ ~ 10⁶개 합성 보드를 만들고 단계마다 시간 / 최대 메모리 측정
+- 단계마다 새 프로세스(spawn)에서 실행 → 앞 단계의 메모리가 섞이지 않은 최대 RSS
+- 시간: 같은 프로세스에서 repeat번 실행한 최솟값 / 중앙값, 메모리: tracemalloc 최대치 + 최대 RSS
+- 결과를 JSON으로 저장하고, --compare로 이전 결과(다른 commit)와 비교
+
+단계 (앞 단계 출력이 다음 단계 입력):
+invert_svg → filter_thin_paths → extract_enclosed_from_inverted → remove_enclosed_from_inverted
+→ mask_enclosed (cairosvg 필요) → split_svg_objects → build_mask
+→ pour_drc (합성 보드와 remove_enclosed 결과 사이 clearance 정밀 검사)
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import memory_budget
+from synthetic_board import generate_board
+
+
+# (단계 이름, 모듈, 함수, 위치 인자로 넘길 파일 키, 키워드 인자)
+STAGES = [
+    ("invert_svg", "invert_svg", "invert_svg", ("board", "inverted"), {"background_color": "#288f28"}),
+    ("filter_thin_paths", "filter_thin_paths", "filter_thin_paths", ("inverted", "filtered"), {}),
+    ("extract_enclosed_from_inverted", "extract_enclosed", "extract_enclosed_from_inverted",
+     ("inverted", "enclosed"), {"background_color": "#288f28"}),
+    ("remove_enclosed_from_inverted", "remove_enclosed", "remove_enclosed_from_inverted",
+     ("inverted", "enclosed", "removed"), {"background_color": "#288f28"}),
+    ("mask_enclosed", "remove_enclosed_raster", "mask_enclosed", ("inverted", "enclosed", "raster_png"), {"scale": None}),
+    ("split_svg_objects", "cut_svg", "split_svg_objects", ("removed", "cut"), {}),
+    ("build_mask", "test", "build_mask", ("board", "mask_png"), {"width": None}),
+    ("pour_drc", "pour_drc", "pour_clearance_drc", ("board", "removed", "drc_json"), {}),
+]
+STAGE_NAMES = [s[0] for s in STAGES]
+
+
+def stage_files(work_dir, n_shapes):
+    """보드 크기별 단계 입출력 파일 경로"""
+    names = {
+        "board": "board.svg",
+        "inverted": "inverted.svg",
+        "filtered": "filtered.svg",
+        "enclosed": "enclosed.svg",
+        "removed": "removed.svg",
+        "raster_png": "raster.png",
+        "cut": "cut.svg",
+        "mask_png": "mask.png",
+        "drc_json": "pour_drc.json",
+    }
+    folder = os.path.join(work_dir, str(n_shapes))
+    os.makedirs(folder, exist_ok=True)
+    return {k: os.path.join(folder, v) for k, v in names.items()}
+
+
+def peak_rss_mb():
+    """
+    이 프로세스의 최대 RSS (MB)
+    - Linux ru_maxrss는 부모 프로세스의 최대값을 물려받으므로 VmHWM(memory_budget.peak_rss_bytes)을 사용
+    """
+    return memory_budget.peak_rss_bytes() / memory_budget.MB
+
+
+def run_stage(module_name, func_name, args, kwargs, repeat, trace_memory):
+    """
+    단계 하나 실행 (벤치마크 자식 프로세스에서 호출)
+    - 단계 함수의 진행 출력은 버림
+    """
+    result = {"status": "ok"}
+    try:
+        func = getattr(importlib.import_module(module_name), func_name)
+    except (ImportError, OSError) as e:
+        return {"status": "skipped", "error": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+    result["rss_baseline_mb"] = round(peak_rss_mb(), 1)
+
+    times = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func(*args, **kwargs)
+                times.append(time.perf_counter() - start)
+            result["rss_peak_mb"] = round(peak_rss_mb(), 1)
+            if trace_memory:
+                tracemalloc.start()
+                func(*args, **kwargs)
+                result["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+                tracemalloc.stop()
+    except Exception as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    result["seconds_min"] = round(min(times), 4)
+    result["seconds_median"] = round(statistics.median(times), 4)
+    return result
+
+
+def benchmark_size(n_shapes, work_dir, stages, repeat=3, trace_memory=True, scale=10, seed=0):
+    """도형 수 하나에 대해 보드를 만들고 단계별로 측정"""
+    files = stage_files(work_dir, n_shapes)
+    start = time.perf_counter()
+    info = generate_board(n_shapes, files["board"], seed=seed)
+    print(f"\n[도형 {n_shapes}개] 보드 {info['width']} x {info['height']} mm "
+          f"(생성 {time.perf_counter() - start:.2f}s, {os.path.getsize(files['board'])} bytes)")
+
+    rows = []
+    ctx = get_context("spawn")
+    for name, module_name, func_name, keys, kwargs in STAGES:
+        if name not in stages:
+            continue
+        kwargs = dict(kwargs)
+        if "scale" in kwargs:
+            kwargs["scale"] = scale
+        if "width" in kwargs:
+            kwargs["width"] = max(1, int(round(info["width"] * scale)))
+        args = [files[k] for k in keys]
+        inputs, output = args[:-1], args[-1]
+
+        row = {"shapes": n_shapes, "stage": name}
+        missing = [f for f in inputs if not os.path.exists(f)]
+        if missing:
+            row.update(status="skipped", error=f"입력 없음: {', '.join(missing)}")
+        else:
+            if os.path.exists(output):
+                os.remove(output)
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                row.update(pool.submit(run_stage, module_name, func_name, args, kwargs, repeat, trace_memory).result())
+            if row["status"] == "ok" and os.path.exists(output):
+                row["input_bytes"] = sum(os.path.getsize(f) for f in inputs)
+                row["output_bytes"] = os.path.getsize(output)
+        rows.append(row)
+
+        if row["status"] == "ok":
+            mem = f", tracemalloc {row['tracemalloc_peak_mb']}MB" if "tracemalloc_peak_mb" in row else ""
+            print(f"- {name}: {row['seconds_min']:.3f}s (RSS {row['rss_peak_mb']}MB{mem})")
+        else:
+            print(f"- {name}: {row['status']} ({row['error']})")
+    return rows
+
+
+def git_commit():
+    """현재 commit (git이 없으면 None)"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current, baseline):
+    """(도형 수, 단계)별 시간 / 메모리 비율 출력 (1보다 작으면 빨라짐 / 줄어듦)"""
+    base = {(r["shapes"], r["stage"]): r for r in baseline["results"] if r.get("status") == "ok"}
+    print(f"\n비교 기준: {baseline.get('commit')} ({baseline.get('created')})")
+    print(f"{'도형':>9}  {'단계':<32}{'시간(s)':>10}{'기준(s)':>10}{'비율':>8}{'RSS 비율':>10}")
+    for r in current["results"]:
+        b = base.get((r["shapes"], r["stage"]))
+        if r.get("status") != "ok" or b is None:
+            continue
+        ratio = r["seconds_min"] / b["seconds_min"] if b["seconds_min"] else float("nan")
+        rss = r["rss_peak_mb"] / b["rss_peak_mb"] if b.get("rss_peak_mb") else float("nan")
+        print(f"{r['shapes']:>9}  {r['stage']:<32}{r['seconds_min']:>10.3f}{b['seconds_min']:>10.3f}{ratio:>8.2f}{rss:>10.2f}")
+
+
+def benchmark_pipeline(sizes=(1000, 10000, 100000), output_json="benchmark_pipeline.json", work_dir="benchmark_work",
+                       stages=None, repeat=3, trace_memory=True, scale=10, seed=0, baseline_json=None):
+    """
+    Args:
+        sizes: 합성 보드의 도형 수 목록
+        output_json: 결과 JSON
+        work_dir: 합성 보드 / 단계 출력 폴더
+        stages: 측정할 단계 이름 목록 (None이면 전체)
+        repeat: 단계별 반복 횟수 (시간은 최솟값 / 중앙값)
+        trace_memory: tracemalloc 최대치도 측정 (단계를 한 번 더 실행)
+        scale: mask_enclosed / build_mask의 mm당 픽셀 수
+        seed: 합성 보드 seed
+        baseline_json: 비교할 이전 결과 JSON (None이면 비교 안 함)
+    """
+    stages = STAGE_NAMES if stages is None else stages
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "scale": scale,
+        "seed": seed,
+        "results": [],
+    }
+    for n in sizes:
+        report["results"].extend(benchmark_size(n, work_dir, stages, repeat, trace_memory, scale, seed))
+
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n완료! 결과: {output_json}")
+
+    if baseline_json:
+        with open(baseline_json, "r", encoding="utf-8") as f:
+            compare_results(report, json.load(f))
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.add_argument("--json", default="benchmark_pipeline.json")
+    p.add_argument("--work_dir", default="benchmark_work")
+    p.add_argument("--stages", nargs="+", choices=STAGE_NAMES, default=None)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--no_tracemalloc", action="store_true")
+    p.add_argument("--scale", type=float, default=10)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = p.parse_args()
+
+    benchmark_pipeline(
+        sizes=args.sizes,
+        output_json=args.json,
+        work_dir=args.work_dir,
+        stages=args.stages,
+        repeat=args.repeat,
+        trace_memory=not args.no_tracemalloc,
+        scale=args.scale,
+        seed=args.seed,
+        baseline_json=args.compare,
+    )
+
+
+if __name__ == "__main__":
+    main()
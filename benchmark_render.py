@@ -0,0 +1,111 @@
+"""
+반전 마스크 렌더링 시간 비교 스크립트 (cairosvg)
+- 도형마다 path 하나인 기존 출력과 compound path로 묶은 출력을 각각 렌더링
+- 출력별 파일 크기, path 개수, 렌더링 시간(중앙값), 기존 출력과 다른 픽셀 수를 비교
+- cairosvg(및 cairo 라이브러리)가 설치되어 있어야 함
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+
+import numpy as np
+
+from invert_svg import invert_svg
+
+
+def render_png(svg_file, scale, cairosvg):
+    """SVG를 PNG 바이트로 렌더링하고 걸린 시간 반환"""
+    start = time.perf_counter()
+    png = cairosvg.svg2png(url=svg_file, scale=scale)
+    return png, time.perf_counter() - start
+
+
+def png_alpha(png):
+    from PIL import Image
+    return np.asarray(Image.open(io.BytesIO(png)).convert("RGBA"))[..., 3] > 127
+
+
+def benchmark_render(input_file, out_dir=".", compound_counts=(1, 4, 16, 64), repeat=5, scale=10, output_json=None):
+    """
+    Args:
+        input_file: 원본 SVG (output.svg)
+        out_dir: 반전 SVG를 저장할 폴더
+        compound_counts: 비교할 compound path 최대 개수들
+        repeat: 출력마다 렌더링 반복 횟수
+        scale: cairosvg 렌더링 배율
+        output_json: 결과 JSON 경로 (None이면 저장 안 함)
+    """
+    try:
+        import cairosvg
+    except (ImportError, OSError) as e:
+        print(f"cairosvg를 불러올 수 없습니다: {e}")
+        return None
+
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    variants = [("elements", None)] + [(f"compound_{n}", n) for n in compound_counts]
+
+    results = []
+    reference = None
+    for name, count in variants:
+        svg_file = os.path.join(out_dir, f"{stem}_inverted_{name}.svg")
+        invert_svg(input_file, svg_file, background_color="#288f28", compound_paths=count)
+
+        # 첫 렌더링은 캐시 준비 시간이 섞이므로 제외
+        png, _ = render_png(svg_file, scale, cairosvg)
+        times = [render_png(svg_file, scale, cairosvg)[1] for _ in range(repeat)]
+
+        alpha = png_alpha(png)
+        if reference is None:
+            reference = alpha
+        diff = int(np.count_nonzero(alpha != reference)) if alpha.shape == reference.shape else -1
+
+        with open(svg_file, "r", encoding="utf-8") as f:
+            paths = f.read().count("<path")
+        results.append({
+            "variant": name,
+            "file": svg_file,
+            "bytes": os.path.getsize(svg_file),
+            "paths": paths,
+            "render_median": round(float(np.median(times)), 4),
+            "render_min": round(float(np.min(times)), 4),
+            "diff_pixels": diff,
+        })
+
+    print()
+    print(f"{'출력':<14}{'크기(bytes)':>14}{'path':>8}{'렌더링(s)':>12}{'다른 픽셀':>12}")
+    for r in results:
+        print(f"{r['variant']:<14}{r['bytes']:>14}{r['paths']:>8}{r['render_median']:>12.4f}{r['diff_pixels']:>12}")
+
+    if output_json:
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump({"input": input_file, "scale": scale, "repeat": repeat, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"- 결과: {output_json}")
+    return results
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="output.svg")
+    p.add_argument("--out_dir", default=".")
+    p.add_argument("--compound", type=int, nargs="*", default=[1, 4, 16, 64])
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--scale", type=float, default=10)
+    p.add_argument("--json", default=None)
+    args = p.parse_args()
+
+    benchmark_render(
+        args.svg,
+        out_dir=args.out_dir,
+        compound_counts=args.compound,
+        repeat=args.repeat,
+        scale=args.scale,
+        output_json=args.json,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+보드 외곽선(Gerber 외곽 레이어, 예: .GML / Edge_Cuts) 모듈
+- Gerber의 D02(이동) / D01(그리기) 선분과 G02/G03 호를 읽어서 끝점끼리 이어 닫힌 링으로 만듦
+- 드릴 좌표와 같은 방식(excellon.drills_to_svg)으로 SVG 좌표계(y 아래 방향, 보드 원점 기준)로 변환
+- 가장 넓은 링이 보드 외곽, 나머지는 보드 안의 구멍(cutout) → even-odd 규칙으로 안/밖 판단
+- 도형 bbox가 외곽선 밖에 완전히 있는지 한 번에 검사하는 prefilter 포함
+
+반전 / 둘러싸인 영역 / 래스터 단계에서 viewBox 사각형 대신 이 외곽선을 보드 경계로 사용
+"""
+
+import argparse
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from excellon import INCH, drills_to_svg
+from svg_geometry import points_in_ring, ring_areas, path_bboxes
+from svg_writer import format_number, open_svg_text
+
+
+FS_RE = re.compile(r"FS([LT])?[AI]?X(\d)(\d)Y(\d)(\d)")
+WORD_RE = re.compile(r"([GXYIJD])([-+]?[0-9.]+)")
+
+# 호를 선분으로 나눌 때 한 선분의 최대 각도 (라디안)
+ARC_STEP = np.radians(5.0)
+
+
+def _arc_points(start, end, center, clockwise, full_circle=False):
+    """시작점에서 끝점까지의 호를 선분 점들로 변환 (시작점 제외)"""
+    a0 = np.arctan2(start[1] - center[1], start[0] - center[0])
+    a1 = np.arctan2(end[1] - center[1], end[0] - center[0])
+    if clockwise:
+        sweep = -((a0 - a1) % (2 * np.pi))
+        if sweep == 0.0 and full_circle:
+            sweep = -2 * np.pi
+    else:
+        sweep = (a1 - a0) % (2 * np.pi)
+        if sweep == 0.0 and full_circle:
+            sweep = 2 * np.pi
+    n = max(1, int(np.ceil(abs(sweep) / ARC_STEP)))
+    r = np.hypot(start[0] - center[0], start[1] - center[1])
+    angles = a0 + sweep * np.arange(1, n + 1) / n
+    pts = np.stack([center[0] + r * np.cos(angles), center[1] + r * np.sin(angles)], axis=1)
+    pts[-1] = end
+    return [tuple(p) for p in pts.tolist()]
+
+
+def read_gerber_polylines(path):
+    """
+    Gerber 파일의 그리기 명령을 폴리라인 목록으로 읽기 (단위: mm, Gerber 좌표계)
+    - D02로 이동할 때마다 새 폴리라인 시작, D01은 현재 폴리라인에 점 추가
+    - G02 / G03 호는 선분으로 나눔 (G75: I/J가 부호 있는 중심 오프셋, G74: 부호 없는 오프셋)
+    - 좌표 형식은 %FS...% (선행 0 생략 / 후행 0 생략 모두 지원), 단위는 %MOIN% / %MOMM%
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read()
+
+    unit = INCH
+    x_int, x_dec, y_int, y_dec = 2, 5, 2, 5
+    trailing = False
+    interp = "G01"
+    multi_quadrant = True
+    d_code = "D02"
+    x = y = 0.0
+    polylines = []
+    current = None
+
+    def value(s, n_int, n_dec):
+        if "." in s:
+            return float(s) * unit
+        if trailing:
+            sign = -1 if s.startswith("-") else 1
+            digits = s.lstrip("+-").ljust(n_int + n_dec, "0")
+            return sign * int(digits) / 10 ** n_dec * unit
+        return int(s) / 10 ** n_dec * unit
+
+    for block in re.split(r"[*\r\n]+", content):
+        block = block.strip().strip("%")
+        if not block:
+            continue
+        if block.startswith("MOIN"):
+            unit = INCH
+            continue
+        if block.startswith("MOMM"):
+            unit = 1.0
+            continue
+        m = FS_RE.search(block)
+        if m and block.startswith("FS"):
+            trailing = m.group(1) == "T"
+            x_int, x_dec, y_int, y_dec = (int(g) for g in m.groups()[1:])
+            continue
+        if block[0] not in "GXYIJD" or block.startswith(("G04", "AD", "AM")):
+            continue
+
+        words = dict(WORD_RE.findall(block))
+        g = words.get("G")
+        if g is not None:
+            g = f"G{int(float(g)):02d}"
+            if g in ("G01", "G02", "G03"):
+                interp = g
+            elif g == "G74":
+                multi_quadrant = False
+            elif g == "G75":
+                multi_quadrant = True
+        d = words.get("D")
+        if d is not None:
+            d = f"D{int(float(d)):02d}"
+            if d not in ("D01", "D02", "D03"):
+                # 조리개 선택 (D10 이상)
+                continue
+            d_code = d
+        if "X" not in words and "Y" not in words:
+            continue
+
+        nx = value(words["X"], x_int, x_dec) if "X" in words else x
+        ny = value(words["Y"], y_int, y_dec) if "Y" in words else y
+
+        if d_code == "D02" or current is None:
+            current = [(nx, ny)]
+            polylines.append(current)
+        elif d_code == "D01":
+            if interp == "G01":
+                current.append((nx, ny))
+            else:
+                i = value(words.get("I", "0"), x_int, x_dec)
+                j = value(words.get("J", "0"), y_int, y_dec)
+                if multi_quadrant:
+                    center = (x + i, y + j)
+                else:
+                    # 부호 없는 오프셋: 시작점/끝점까지 반지름이 가장 비슷한 중심 선택
+                    options = [(x + sx * i, y + sy * j) for sx in (1, -1) for sy in (1, -1)]
+                    center = min(options, key=lambda c: abs(np.hypot(x - c[0], y - c[1]) - np.hypot(nx - c[0], ny - c[1])))
+                full = multi_quadrant and (nx, ny) == (x, y)
+                current.extend(_arc_points((x, y), (nx, ny), center, interp == "G02", full))
+        x, y = nx, ny
+
+    return [np.array(p, dtype=np.float64) for p in polylines if len(p) >= 2]
+
+
+def chain_polylines(polylines, tol=1e-3):
+    """
+    끝점이 tol 이내로 같은 폴리라인들을 이어 닫힌 링으로 만듦
+    (EDA 도구는 외곽선을 선분마다 따로 D02/D01로 출력하는 경우가 많음)
+
+    Returns:
+        rings: 닫힌 링 목록 (마지막 점 = 시작점은 제거)
+        open_count: 닫히지 않은 폴리라인 묶음 개수
+    """
+    def key(p):
+        return (int(round(p[0] / tol)), int(round(p[1] / tol)))
+
+    ends = defaultdict(list)
+    for i, p in enumerate(polylines):
+        ends[key(p[0])].append(i)
+        ends[key(p[-1])].append(i)
+
+    used = [False] * len(polylines)
+    rings = []
+    open_count = 0
+    for i in range(len(polylines)):
+        if used[i]:
+            continue
+        used[i] = True
+        chain = [polylines[i]]
+        start = key(polylines[i][0])
+        end = key(polylines[i][-1])
+        while end != start:
+            nxt = next((j for j in ends[end] if not used[j]), None)
+            if nxt is None:
+                break
+            used[nxt] = True
+            p = polylines[nxt]
+            if key(p[0]) != end:
+                p = p[::-1]
+            chain.append(p[1:])
+            end = key(p[-1])
+        ring = np.concatenate(chain)
+        if end == start and len(ring) >= 4:
+            rings.append(ring[:-1])
+        else:
+            open_count += 1
+    return rings, open_count
+
+
+def load_board_outline(path, origin=None, board_height=None, tol=1e-3):
+    """
+    Gerber 외곽 레이어를 SVG 좌표계의 보드 외곽선으로 읽기
+
+    Args:
+        path: 외곽 레이어 Gerber 파일 (.GML, Edge_Cuts.gbr 등)
+        origin: SVG 원점에 해당하는 Gerber 좌표 (mm, None이면 외곽선 bbox의 왼쪽 아래)
+        board_height: SVG 높이 (None이면 외곽선 bbox 높이)
+        tol: 선분 끝점을 같은 점으로 볼 거리 (mm)
+
+    Returns:
+        rings: [보드 외곽 링, 구멍 링들...] (SVG 좌표)
+    """
+    rings, open_count = chain_polylines(read_gerber_polylines(path), tol)
+    if not rings:
+        raise ValueError(f"닫힌 외곽선을 찾을 수 없습니다: {path}")
+    if open_count:
+        print(f"경고: 닫히지 않은 외곽선 {open_count}개는 무시합니다.")
+
+    pts = np.concatenate(rings)
+    lo = pts.min(axis=0)
+    if origin is None:
+        origin = (lo[0], lo[1])
+    if board_height is None:
+        board_height = pts[:, 1].max() - lo[1]
+
+    rings = [drills_to_svg(ring, origin, board_height) for ring in rings]
+    # 가장 넓은 링이 보드 외곽
+    order = np.argsort(-np.abs(ring_areas(rings)), kind="stable")
+    return [rings[i] for i in order]
+
+
+def outline_bbox(rings):
+    """외곽선 bbox (min_x, min_y, max_x, max_y)"""
+    pts = np.concatenate(rings)
+    return (*pts.min(axis=0), *pts.max(axis=0))
+
+
+def read_svg_viewbox(svg_path, head_bytes=65536):
+    """SVG 루트의 viewBox (x, y, w, h) - 파일 앞부분만 읽음, 없으면 None"""
+    with open_svg_text(svg_path) as f:
+        head = f.read(head_bytes)
+    svg_match = re.search(r"<svg\b[^>]*>", head)
+    vb_match = re.search(r'\sviewBox="([^"]+)"', svg_match.group(0)) if svg_match else None
+    if not vb_match:
+        return None
+    nums = [float(v) for v in vb_match.group(1).replace(",", " ").split()]
+    return tuple(nums) if len(nums) == 4 else None
+
+
+def check_outline_fit(rings, viewbox, tol=0.05):
+    """
+    외곽선 bbox와 SVG viewBox가 맞는지 확인 - 다르면 경고를 출력하고 False
+    origin을 주지 않으면 구리 SVG 원점을 외곽선 bbox 왼쪽 아래로 가정하므로,
+    구리가 보드 가장자리까지 없는 레이어는 외곽선이 구리와 어긋남 (--outline_origin으로 지정)
+    """
+    x0, y0, x1, y1 = outline_bbox(rings)
+    vx, vy, vw, vh = viewbox
+    off = max(abs(x0 - vx), abs(y0 - vy), abs(x1 - (vx + vw)), abs(y1 - (vy + vh)))
+    if off <= tol:
+        return True
+    print(f"경고: 보드 외곽선 bbox ({x0:.3f}, {y0:.3f}) ~ ({x1:.3f}, {y1:.3f})가 SVG viewBox "
+          f"({vx:.3f}, {vy:.3f}) ~ ({vx + vw:.3f}, {vy + vh:.3f})와 최대 {off:.3f}mm 다릅니다. "
+          f"외곽선이 구리와 어긋났다면 --outline_origin으로 구리 SVG 왼쪽 아래의 Gerber 좌표를 지정하세요.")
+    return False
+
+
+def ring_points(ring, precision=4):
+    """링을 polygon points 속성 문자열로 변환"""
+    return " ".join(f"{format_number(x, precision)},{format_number(y, precision)}" for x, y in ring.tolist())
+
+
+def outline_svg_defs(rings, precision=4, indent="    "):
+    """
+    외곽선을 SVG에 넣을 요소들로 변환
+    - clip: 보드 외곽 링으로 된 clipPath (id="board-outline") - 배경 사각형에 clip-path로 적용
+    - holes: 마스크에 검은색으로 넣을 구멍 polygon들
+    path 대신 polygon을 쓰므로 path/circle을 정규식으로 읽는 후속 스크립트는 외곽선을 도형으로 오인하지 않음
+    """
+    clip = (f'{indent}<clipPath id="board-outline">\n'
+            f'{indent}    <polygon points="{ring_points(rings[0], precision)}"/>\n'
+            f'{indent}</clipPath>\n')
+    holes = "".join(f'{indent}    <polygon points="{ring_points(ring, precision)}" fill="black"/>\n' for ring in rings[1:])
+    return clip, holes
+
+
+def points_in_outline(points, rings):
+    """점들이 보드 안에 있는지 (외곽 링 안 + 구멍 밖, even-odd)"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    inside = np.zeros(len(points), dtype=bool)
+    for ring in rings:
+        inside ^= points_in_ring(points, ring)
+    return inside
+
+
+def _outline_edges(rings):
+    """외곽선 변 배열 (E, 4): x0, y0, x1, y1"""
+    return np.concatenate([np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in rings])
+
+
+def _edges_cross_boxes(bboxes, edges, chunk=1 << 20):
+    """
+    bbox마다 외곽선 변이 하나라도 지나가는지 (선분-사각형 교차, 분리축 검사)
+    - 변의 bbox와 사각형이 겹치고
+    - 사각형 꼭짓점 4개가 변을 포함한 직선의 한쪽에 모두 있지 않으면 교차
+    """
+    n = len(bboxes)
+    hit = np.zeros(n, dtype=bool)
+    if n == 0 or len(edges) == 0:
+        return hit
+    x0, y0, x1, y1 = (edges[:, k] for k in range(4))
+    ex_lo, ex_hi = np.minimum(x0, x1), np.maximum(x0, x1)
+    ey_lo, ey_hi = np.minimum(y0, y1), np.maximum(y0, y1)
+    dx, dy = x1 - x0, y1 - y0
+
+    step = max(1, chunk // len(edges))
+    for s in range(0, n, step):
+        b = bboxes[s:s + step, :, None]
+        overlap = (ex_lo <= b[:, 2]) & (ex_hi >= b[:, 0]) & (ey_lo <= b[:, 3]) & (ey_hi >= b[:, 1])
+        all_pos = np.ones(overlap.shape, dtype=bool)
+        all_neg = np.ones(overlap.shape, dtype=bool)
+        for cx, cy in ((0, 1), (2, 1), (2, 3), (0, 3)):
+            side = dx * (b[:, cy] - y0) - dy * (b[:, cx] - x0)
+            all_pos &= side > 0
+            all_neg &= side < 0
+        hit[s:s + step] = (overlap & ~all_pos & ~all_neg).any(axis=1)
+    return hit
+
+
+def _box_corners(bboxes):
+    return np.stack([bboxes[:, [0, 1]], bboxes[:, [2, 1]], bboxes[:, [2, 3]], bboxes[:, [0, 3]]], axis=1).reshape(-1, 2)
+
+
+def boxes_overlap_outline(bboxes, rings):
+    """
+    bbox가 보드 영역과 겹칠 수 있는지 (prefilter)
+    - 외곽선 bbox와 안 겹치면 바로 제외
+    - 꼭짓점이 보드 안에 있거나 외곽선 변이 지나가면 겹침
+    - False인 도형은 보드 밖에 완전히 있으므로 이후 단계에서 건너뛰어도 됨
+    """
+    bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    keep = np.zeros(len(bboxes), dtype=bool)
+    ox0, oy0, ox1, oy1 = outline_bbox(rings)
+    near = (bboxes[:, 0] <= ox1) & (bboxes[:, 2] >= ox0) & (bboxes[:, 1] <= oy1) & (bboxes[:, 3] >= oy0)
+    idx = np.flatnonzero(near)
+    if len(idx) == 0:
+        return keep
+    corner_in = points_in_outline(_box_corners(bboxes[idx]), rings).reshape(-1, 4).any(axis=1)
+    rest = idx[~corner_in]
+    keep[idx[corner_in]] = True
+    keep[rest] = _edges_cross_boxes(bboxes[rest], _outline_edges(rings))
+    return keep
+
+
+def boxes_inside_outline(bboxes, rings, margin=0.0):
+    """bbox를 margin만큼 넓힌 사각형이 보드 안에 완전히 들어가는지 (외곽선 변과 안 만나고 꼭짓점이 모두 안쪽)"""
+    bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4) + np.array([-margin, -margin, margin, margin])
+    inside = points_in_outline(_box_corners(bboxes), rings).reshape(-1, 4).all(axis=1)
+    idx = np.flatnonzero(inside)
+    inside[idx] = ~_edges_cross_boxes(bboxes[idx], _outline_edges(rings))
+    return inside
+
+
+def path_overlap_mask(ds, rings, transforms=None):
+    """path d 목록 중 보드와 겹칠 수 있는 것 (transform이 있는 path는 검사하지 않고 유지)"""
+    keep = boxes_overlap_outline(path_bboxes(ds), rings)
+    if transforms:
+        keep |= np.array([m is not None for m in transforms], dtype=bool)
+    return keep
+
+
+def circle_overlap_mask(circles, rings):
+    """(cx, cy, r) 목록 중 보드와 겹칠 수 있는 것"""
+    c = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+    bboxes = np.stack([c[:, 0] - c[:, 2], c[:, 1] - c[:, 2], c[:, 0] + c[:, 2], c[:, 1] + c[:, 2]], axis=1)
+    return boxes_overlap_outline(bboxes, rings)
+
+
+def distance_to_outline(points, rings, chunk=1 << 20):
+    """점들에서 외곽선(변)까지의 최소 거리"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    edges = _outline_edges(rings)
+    a = edges[:, :2]
+    ab = edges[:, 2:] - a
+    len2 = np.maximum((ab ** 2).sum(axis=1), 1e-24)
+    out = np.empty(len(points))
+    step = max(1, chunk // len(edges))
+    for s in range(0, len(points), step):
+        p = points[s:s + step, None, :]
+        t = np.clip(((p - a) * ab).sum(axis=2) / len2, 0.0, 1.0)
+        d = p - (a + t[..., None] * ab)
+        out[s:s + step] = np.sqrt((d ** 2).sum(axis=2).min(axis=1))
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("gerber", help="외곽 레이어 Gerber (.GML 등)")
+    p.add_argument("--svg", default=None, help="지정하면 이 SVG의 도형 중 보드 밖에 있는 개수 출력")
+    p.add_argument("--origin", type=float, nargs=2, default=None)
+    args = p.parse_args()
+
+    rings = load_board_outline(args.gerber, origin=args.origin)
+    x0, y0, x1, y1 = outline_bbox(rings)
+    print(f"외곽선 링: {len(rings)}개 (구멍 {len(rings) - 1}개)")
+    print(f"- bbox: ({x0:.4f}, {y0:.4f}) - ({x1:.4f}, {y1:.4f}), 크기 {x1 - x0:.4f} x {y1 - y0:.4f}")
+    print(f"- 보드 넓이: {abs(ring_areas(rings[:1])[0]) - np.abs(ring_areas(rings[1:])).sum():.4f}")
+
+    if args.svg:
+        from svg_writer import read_svg_text
+        content = read_svg_text(args.svg)
+        ds = re.findall(r'<path[^>]*?\sd="([^"]+)"[^>]*/>', content)
+        keep = path_overlap_mask(ds, rings)
+        print(f"- {args.svg}: path {len(ds)}개 중 보드 밖 {int((~keep).sum())}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+구리까지의 거리(clearance) 맵과 좁은 틈(slot) 분석 스크립트
+- 빈 공간 마스크에 유클리드 거리 변환(EDT)을 적용 (큰 보드는 타일 단위로 계산)
+- 결과: clearance 히트맵 PNG, 틈 폭 히스토그램, 기준보다 좁은 slot 목록 (JSON)
+"""
+
+import argparse
+import json
+
+import numpy as np
+from PIL import Image
+from scipy import ndimage
+
+from board_outline import load_board_outline
+from raster_mask import rasterize_svg, rasterize_outline, pixel_to_board
+
+
+def distance_transform_tiled(free, max_distance_px, tile=1024):
+    """
+    빈 공간 마스크의 EDT를 타일 단위로 계산
+    - 각 타일은 max_distance_px 만큼의 여유(halo)를 붙여서 계산하므로
+      max_distance_px 이하의 거리는 전체 계산과 동일
+    - 그보다 먼 거리는 max_distance_px로 잘림
+    """
+    h, w = free.shape
+    halo = int(np.ceil(max_distance_px)) + 1
+    dist = np.empty((h, w), dtype=np.float32)
+
+    for y0 in range(0, h, tile):
+        for x0 in range(0, w, tile):
+            y1, x1 = min(y0 + tile, h), min(x0 + tile, w)
+            ya, xa = max(y0 - halo, 0), max(x0 - halo, 0)
+            yb, xb = min(y1 + halo, h), min(x1 + halo, w)
+            block = free[ya:yb, xa:xb]
+            if block.all():
+                # 주변에 구리가 없음
+                dist[y0:y1, x0:x1] = max_distance_px
+                continue
+            d = ndimage.distance_transform_edt(block)
+            dist[y0:y1, x0:x1] = d[y0 - ya:y1 - ya, x0 - xa:x1 - xa]
+
+    np.minimum(dist, max_distance_px, out=dist)
+    return dist
+
+
+def find_ridges(dist, free):
+    """거리 맵의 능선(틈의 중심선) 픽셀 찾기 - 3x3 이웃 중 최대값인 픽셀"""
+    local_max = ndimage.maximum_filter(dist, size=3, mode="nearest")
+    return free & (dist > 0) & (dist >= local_max)
+
+
+def clearance_heatmap(dist, free, max_distance_px):
+    """거리 맵을 색상 이미지로 변환 (가까움=빨강, 멂=파랑, 구리=검정)"""
+    t = np.clip(dist / max_distance_px, 0.0, 1.0)
+    rgb = np.empty(dist.shape + (3,), dtype=np.uint8)
+    rgb[..., 0] = np.interp(t, [0.0, 0.5, 1.0], [255, 255, 0]).astype(np.uint8)
+    rgb[..., 1] = np.interp(t, [0.0, 0.5, 1.0], [0, 255, 64]).astype(np.uint8)
+    rgb[..., 2] = np.interp(t, [0.0, 0.5, 1.0], [0, 0, 255]).astype(np.uint8)
+    rgb[~free] = 0
+    return Image.fromarray(rgb, "RGB")
+
+
+def find_slots(ridge, width_mm, slot_width, vb, scale):
+    """slot_width보다 좁은 능선들을 연결 성분으로 묶어서 slot 목록 생성"""
+    h, w = ridge.shape
+    narrow = ridge & (width_mm < slot_width)
+    labels, count = ndimage.label(narrow, structure=np.ones((3, 3), dtype=bool))
+    if count == 0:
+        return []
+
+    index = np.arange(1, count + 1)
+    sizes = np.bincount(labels.ravel(), minlength=count + 1)[1:]
+    min_widths = ndimage.minimum(width_mm, labels, index)
+    mean_widths = ndimage.mean(width_mm, labels, index)
+    centers = ndimage.center_of_mass(narrow, labels, index)
+
+    slots = []
+    for i, sl in enumerate(ndimage.find_objects(labels)):
+        (r0, r1), (c0, c1) = (sl[0].start, sl[0].stop), (sl[1].start, sl[1].stop)
+        x0, y0 = pixel_to_board(c0 - 0.5, r0 - 0.5, vb, w, h)
+        x1, y1 = pixel_to_board(c1 - 0.5, r1 - 0.5, vb, w, h)
+        cx, cy = pixel_to_board(centers[i][1], centers[i][0], vb, w, h)
+        slots.append({
+            "center": [round(float(cx), 4), round(float(cy), 4)],
+            "bbox": [round(float(x0), 4), round(float(y0), 4), round(float(x1), 4), round(float(y1), 4)],
+            "length": round(float(sizes[i]) / scale, 4),
+            "min_width": round(float(min_widths[i]), 4),
+            "mean_width": round(float(mean_widths[i]), 4),
+        })
+
+    slots.sort(key=lambda s: s["min_width"])
+    return slots
+
+
+def clearance_map(input_file, output_png, output_json, scale=10, max_clearance=5.0,
+                  slot_width=0.5, bins=None, tile=1024, outline=None):
+    """
+    구리 SVG에서 clearance 맵과 좁은 틈 목록 생성
+
+    Args:
+        input_file: 구리 SVG (output.svg 또는 반전 마스크 SVG)
+        output_png: clearance 히트맵 PNG
+        output_json: 히스토그램과 slot 목록 JSON
+        scale: viewBox 1단위당 픽셀 수
+        max_clearance: 계산할 최대 거리 (이보다 먼 곳은 잘림)
+        slot_width: 이보다 폭이 좁은 틈을 slot으로 판단
+        bins: 틈 폭 히스토그램 구간
+        tile: EDT 타일 크기 (픽셀)
+        outline: 보드 외곽선 링 목록 - 지정하면 외곽선 밖은 빈 공간에서 제외 (보드 가장자리까지의 거리도 clearance로 봄)
+    """
+    if bins is None:
+        bins = [0, 0.1, 0.2, 0.3, 0.5, 1.0, 1.5, 2.0, 5.0, 2 * max_clearance]
+
+    copper, vb = rasterize_svg(input_file, scale)
+    free = ~copper
+    if outline is not None:
+        free &= rasterize_outline(outline, vb, copper.shape[1], copper.shape[0])
+    max_distance_px = max_clearance * scale
+
+    dist = distance_transform_tiled(free, max_distance_px, tile)
+
+    ridge = find_ridges(dist, free)
+    # 능선에서의 틈 폭 = 양쪽 구리까지 거리의 합
+    width_mm = 2.0 * dist / scale
+    ridge &= dist < max_distance_px
+    counts, edges = np.histogram(width_mm[ridge], bins=bins)
+
+    slots = find_slots(ridge, width_mm, slot_width, vb, scale)
+
+    clearance_heatmap(dist, free, max_distance_px).save(output_png)
+
+    report = {
+        "input": input_file,
+        "scale": scale,
+        "viewBox": list(vb),
+        "max_clearance": max_clearance,
+        "slot_width": slot_width,
+        "free_ratio": round(float(free.mean()), 6),
+        "gap_width_histogram": {
+            "edges": [float(e) for e in edges],
+            "counts": [int(c) for c in counts],
+        },
+        "slots": slots,
+    }
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"완료!")
+    print(f"- 래스터 크기: {copper.shape[1]}x{copper.shape[0]}")
+    print(f"- 빈 공간 비율: {report['free_ratio'] * 100:.1f}%")
+    print(f"- 폭 {slot_width} 미만 slot: {len(slots)}개")
+    print(f"- 히트맵: {output_png}")
+    print(f"- 리포트: {output_json}")
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="output.svg")
+    p.add_argument("--png", default="clearance_map.png")
+    p.add_argument("--json", default="clearance_report.json")
+    p.add_argument("--scale", type=float, default=10)
+    p.add_argument("--max_clearance", type=float, default=5.0)
+    p.add_argument("--slot_width", type=float, default=0.5)
+    p.add_argument("--tile", type=int, default=1024)
+    p.add_argument("--outline", default=None, help="보드 외곽선 Gerber (.GML 등)")
+    args = p.parse_args()
+
+    clearance_map(
+        args.svg,
+        args.png,
+        args.json,
+        scale=args.scale,
+        max_clearance=args.max_clearance,
+        slot_width=args.slot_width,
+        tile=args.tile,
+        outline=load_board_outline(args.outline) if args.outline else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+구리 밀도(fill ratio) 격자 분석 스크립트
+- 래스터화한 구리 마스크를 일정 크기 격자(예: 1mm)로 나누어 셀별 구리 비율 계산
+- 셀 합계는 도형별 반복 없이 reshape + sum (block-sum)으로 한 번에 계산
+- 결과: 셀별 비율 numpy 배열(.npy), JSON 요약, 히트맵 PNG
+- 여러 레이어 SVG를 한 번에 처리 가능
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+from board_outline import load_board_outline
+from raster_mask import rasterize_svg, rasterize_outline
+
+
+def block_sum(mask, cell_px):
+    """
+    2D 배열을 cell_px x cell_px 블록으로 나누어 합계 계산
+    가장자리의 남는 부분은 0으로 채우고, 셀마다 실제 픽셀 수도 같이 반환
+    """
+    h, w = mask.shape
+    ny = -(-h // cell_px)
+    nx = -(-w // cell_px)
+    padded = np.zeros((ny * cell_px, nx * cell_px), dtype=np.uint32)
+    padded[:h, :w] = mask
+    valid = np.zeros_like(padded)
+    valid[:h, :w] = 1
+    sums = padded.reshape(ny, cell_px, nx, cell_px).sum(axis=(1, 3))
+    counts = valid.reshape(ny, cell_px, nx, cell_px).sum(axis=(1, 3))
+    return sums, counts
+
+
+def density_heatmap(density, cell_px, low_threshold):
+    """셀별 구리 비율을 색상 이미지로 변환 (구리 적음=빨강, 많음=초록, 기준 미만 셀은 파란색 성분 추가)"""
+    rgb = np.empty(density.shape + (3,), dtype=np.uint8)
+    rgb[..., 0] = (255 * (1.0 - density)).astype(np.uint8)
+    rgb[..., 1] = (200 * density).astype(np.uint8)
+    rgb[..., 2] = 40
+    rgb[density < low_threshold, 2] = 255
+    rgb = np.repeat(np.repeat(rgb, cell_px, axis=0), cell_px, axis=1)
+    return Image.fromarray(rgb, "RGB")
+
+
+def copper_density(input_file, output_prefix, cell=1.0, scale=10, low_threshold=0.3, outline=None):
+    """
+    구리 SVG 한 장의 셀별 구리 밀도 계산
+
+    Args:
+        input_file: 구리 SVG (output.svg 등)
+        output_prefix: 출력 파일 경로 접두어 (.npy / .json / .png가 붙음)
+        cell: 격자 크기 (viewBox 단위, mm)
+        scale: viewBox 1단위당 픽셀 수
+        low_threshold: 이 비율보다 구리가 적은 셀을 따로 표시
+        outline: 보드 외곽선 링 목록 - 지정하면 셀마다 보드 안쪽 픽셀만 세고, 보드 밖 셀은 통계에서 제외
+    """
+    copper, vb = rasterize_svg(input_file, scale)
+    cell_px = max(1, int(round(cell * scale)))
+
+    if outline is not None:
+        board = rasterize_outline(outline, vb, copper.shape[1], copper.shape[0])
+        sums, _ = block_sum(copper & board, cell_px)
+        counts, _ = block_sum(board, cell_px)
+    else:
+        sums, counts = block_sum(copper, cell_px)
+    density = sums / np.maximum(counts, 1)
+    on_board = counts > 0
+    values = density[on_board]
+
+    low_cells = np.argwhere((density < low_threshold) & on_board)
+    vb_x, vb_y = vb[0], vb[1]
+    cell_w = cell_px / scale
+
+    np.save(output_prefix + ".npy", density)
+    density_heatmap(density, cell_px, low_threshold).save(output_prefix + ".png")
+
+    summary = {
+        "input": input_file,
+        "viewBox": list(vb),
+        "cell": cell_w,
+        "scale": scale,
+        "grid": [int(density.shape[1]), int(density.shape[0])],
+        "copper_ratio": round(float(sums.sum() / counts.sum()), 6),
+        "min": round(float(values.min()), 6),
+        "max": round(float(values.max()), 6),
+        "mean": round(float(values.mean()), 6),
+        "std": round(float(values.std()), 6),
+        "percentiles": {str(p): round(float(v), 6)
+                        for p, v in zip((5, 25, 50, 75, 95), np.percentile(values, (5, 25, 50, 75, 95)))},
+        "low_threshold": low_threshold,
+        "low_cells": [
+            {
+                "x": round(vb_x + int(c) * cell_w, 4),
+                "y": round(vb_y + int(r) * cell_w, 4),
+                "ratio": round(float(density[r, c]), 4),
+            }
+            for r, c in low_cells
+        ],
+    }
+    with open(output_prefix + ".json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"{input_file}: 구리 비율 {summary['copper_ratio'] * 100:.1f}%, "
+          f"격자 {summary['grid'][0]}x{summary['grid'][1]}, "
+          f"{low_threshold} 미만 셀 {len(low_cells)}개")
+    return density, summary
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svgs", nargs="*", default=["output.svg"])
+    p.add_argument("--out_dir", default=".")
+    p.add_argument("--cell", type=float, default=1.0)
+    p.add_argument("--scale", type=float, default=10)
+    p.add_argument("--low_threshold", type=float, default=0.3)
+    p.add_argument("--outline", default=None, help="보드 외곽선 Gerber (.GML 등)")
+    args = p.parse_args()
+
+    outline = load_board_outline(args.outline) if args.outline else None
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    for svg in args.svgs:
+        stem = os.path.splitext(os.path.basename(svg))[0]
+        output_prefix = os.path.join(args.out_dir, f"{stem}_density")
+        copper_density(svg, output_prefix, cell=args.cell, scale=args.scale, low_threshold=args.low_threshold,
+                       outline=outline)
+
+    print(f"완료! 출력 폴더: {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 import xml.etree.ElementTree as ET
 import re
 import math
+import sys
+from collections import Counter
+
+from svg_transform import compose, parse_transform, matrix_to_attr
+from svg_stream import stream_svg_shapes
+import memory_budget
+import tracing
 
 def parse_path_points(d):
     # M x1,y1 L x2,y2 L x3,y3 L x4,y4 Z 형태만 파싱
@@ -44,7 +51,10 @@ output_svg = 'cutted_inverted_output_mask.svg'
 REMOVE_PATH_D = [
     "M 87.78240000,22.06726000 L 87.78240000,22.47366000 L 60.72810000,22.47366000 L 60.72810000,22.06726000 Z"
 ]
-REMOVE_PATH_D_NORM = [normalize_d(d) for d in REMOVE_PATH_D]
+# 정규화한 d 값 집합 (path마다 목록 전체를 훑지 않도록 set으로 검사)
+REMOVE_PATH_D_NORM = {normalize_d(d) for d in REMOVE_PATH_D}
+
+SHAPE_TAGS = ('path', 'polygon', 'polyline', 'rect')
 
 def is_height_406px(height_str):
     # '0.406', '0.406px', '0.4060', '0.406000', '0.406 px' 등 다양한 경우 처리
@@ -59,8 +69,19 @@ def is_height_406px(height_str):
             return False
     return False
 
+def is_removed_path(d_val):
+    # 삭제 목록에 있거나 얇은 사각형이면 삭제
+    return normalize_d(d_val) in REMOVE_PATH_D_NORM or is_thin_rectangle_path(d_val, height=0.4064, tol=0.01)
+
+@tracing.traced("split_svg_objects")
 def split_svg_objects(input_path, output_path):
-    tree = ET.parse(input_path)
+    # 원본 트리 + 새 트리가 메모리 예산을 넘으면 스트리밍 버전으로
+    if not memory_budget.fits("split_svg_objects", memory_budget.xml_tree_bytes(input_path) * 2, fallback=True):
+        return split_svg_objects_stream(input_path, output_path)
+
+    with tracing.span("parse"):
+        tree = ET.parse(input_path)
+        memory_budget.buffer("xml_tree", tree)
     root = tree.getroot()
 
     # SVG 네임스페이스 처리
@@ -153,11 +174,13 @@ def split_svg_objects(input_path, output_path):
         elem.attrib['height'] = str(new_height)
 
     # 모든 path, polygon, polyline, rect를 그룹 내부까지 재귀적으로 추출
-    def extract_shapes(parent):
+    # matrix: 상위 그룹들의 transform을 누적한 행렬 (평탄화해도 위치가 유지되도록 요소에 붙임)
+    def extract_shapes(parent, matrix=None):
         for elem in parent:
             tag = elem.tag
             if tag.startswith('{'):
                 tag = tag.split('}', 1)[1]
+            elem_matrix = compose(matrix, parse_transform(elem.attrib.get('transform')))
             # rect의 height가 0.406px(오차 허용)이면 건너뜀
             if tag == 'rect':
                 height_val = elem.attrib.get('height')
@@ -169,24 +192,30 @@ def split_svg_objects(input_path, output_path):
             # path의 d 속성이 삭제 대상이면 건너뜀
             if tag == 'path':
                 d_val = elem.attrib.get('d', '').strip()
-                d_norm = normalize_d(d_val)
-                if d_norm in REMOVE_PATH_D_NORM or is_thin_rectangle_path(d_val, height=0.4064, tol=0.01):
+                if is_removed_path(d_val):
                     removed_paths.append(d_val)
                     continue
                 else:
                     kept_paths.append(d_val)
-            if tag in ['path', 'polygon', 'polyline', 'rect']:
+            if tag in SHAPE_TAGS:
                 # 속성 복사
                 new_elem = ET.Element(elem.tag, elem.attrib)
+                if matrix is not None:
+                    new_elem.set('transform', matrix_to_attr(elem_matrix))
                 new_root.append(new_elem)
             # 그룹 내부도 재귀적으로 탐색
             if len(elem):
-                extract_shapes(elem)
-    extract_shapes(root)
+                extract_shapes(elem, elem_matrix)
+    with tracing.span("compute"):
+        extract_shapes(root)
+    tracing.count("shapes_out", len(new_root), stage="split_svg_objects")
+    memory_budget.buffer("new_tree", new_root)
 
     # 트리 저장
-    new_tree = ET.ElementTree(new_root)
-    new_tree.write(output_path, encoding='utf-8', xml_declaration=True)
+    with tracing.span("serialize"):
+        new_tree = ET.ElementTree(new_root)
+        new_tree.write(output_path, encoding='utf-8', xml_declaration=True)
+    tracing.count_file("bytes_written", output_path, stage="split_svg_objects")
 
     print(f"제거된 rect height 값: {removed_rects}")
     print(f"남은 rect height 값: {kept_rects}")
@@ -195,6 +224,44 @@ def split_svg_objects(input_path, output_path):
     print(f"제거된 얇은 사각형 path d 값: {removed_paths}")
     print(f"제거된 얇은 사각형 path 개수: {len(removed_paths)}")
 
+@tracing.traced("split_svg_objects_stream")
+def split_svg_objects_stream(input_path, output_path):
+    """
+    split_svg_objects의 스트리밍 버전 (iterparse)
+    - 요소를 읽는 대로 필터(0.406 높이 rect, 삭제 목록 path, 얇은 사각형 path)를 적용하고 바로 파일에 씀
+    - 입력/출력 트리를 메모리에 만들지 않으므로 큰 패널 SVG도 일정한 메모리로 처리
+    - 값 목록 대신 개수만 출력 (제거된 rect는 height 값별 개수)
+    """
+    removed_rects = Counter()
+    counts = {'kept_rects': 0, 'removed_paths': 0}
+
+    def keep(tag, attrib):
+        if tag == 'rect':
+            height_val = attrib.get('height')
+            if is_height_406px(height_val):
+                removed_rects[height_val] += 1
+                return False
+            counts['kept_rects'] += 1
+        elif tag == 'path':
+            if is_removed_path(attrib.get('d', '').strip()):
+                counts['removed_paths'] += 1
+                return False
+        return True
+
+    written = stream_svg_shapes(input_path, output_path, SHAPE_TAGS, keep)
+    tracing.count("shapes_out", written, stage="split_svg_objects_stream")
+    tracing.count_file("bytes_written", output_path, stage="split_svg_objects_stream")
+
+    print(f"제거된 rect height 값: {dict(removed_rects)}")
+    print(f"제거된 rect 개수: {sum(removed_rects.values())}")
+    print(f"남은 rect 개수: {counts['kept_rects']}")
+    print(f"제거된 얇은 사각형 path 개수: {counts['removed_paths']}")
+    print(f"저장된 도형 개수: {written}")
+
 if __name__ == '__main__':
-    split_svg_objects(input_svg, output_svg)
+    # --stream: iterparse 스트리밍 모드 (큰 SVG용)
+    if '--stream' in sys.argv:
+        split_svg_objects_stream(input_svg, output_svg)
+    else:
+        split_svg_objects(input_svg, output_svg)
     print(f'분리된 객체로 저장 완료: {output_svg}')
@@ -0,0 +1,458 @@
+"""
+공간 단위 증분 재계산 - 레이어가 조금 바뀌면(ECO: trace 하나 이동 등) 바뀐 부분의 타일만 다시 래스터화
+- 지난 실행의 도형 목록(도형별 hash + 픽셀 bbox)을 출력 옆 캐시 파일(<출력>.tiles.npz)에 저장
+- 새 SVG의 도형 hash와 비교 → 없어진 도형 + 새로 생긴 도형의 bbox가 dirty 영역
+- dirty 영역에 걸친 타일만 다시 그려서 지난 출력 이미지에 붙임
+  - update_mask: test.build_mask(반전 흑백 마스크, PIL)의 증분 버전 - 타일 단위
+    타일에 걸친 도형만 정수 픽셀만큼 옮겨서 그리므로 전체를 다시 그린 것과 픽셀 단위로 같음
+  - update_mask_enclosed: remove_enclosed_raster.mask_enclosed(cairosvg)의 증분 버전 - dirty 타일이 있는 행 범위 단위
+- 캐시가 없거나 캔버스 / 옵션 / 도형 밖 내용(viewBox, mask 구조 등)이 바뀌었거나,
+  지난 출력 파일이 캐시를 쓴 뒤 바뀌었거나, dirty 타일 비율이 max_dirty를 넘으면 전체를 다시 그림
+- SVG 읽기와 도형 hash는 전체 크기에 비례하지만 (bbox는 새 도형만 계산, 나머지는 캐시에서)
+  래스터화(대부분의 시간)는 바뀐 영역 크기에 비례
+
+벡터 단계(invert / extract-enclosed / remove-enclosed)는 도형마다 마스크 목록에 옮겨 쓰는 것이라
+다시 계산할 영역이 없음 → 단계 단위 건너뛰기(emi_watch)로 처리
+
+사용 예:
+    python dirty_tiles.py mask output.svg mask.png --width 4000
+    python dirty_tiles.py mask-enclosed inverted_output_mask.svg enclosed_regions.svg inverted_without_enclosed_raster.png
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from xml.etree import ElementTree as ET
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from svg_geometry import path_extent, parse_number_list
+from svg_writer import read_svg_text
+import memory_budget
+import test
+import tracing
+
+
+TILE_PX = 256
+# dirty 타일이 이 비율을 넘으면 전체를 다시 그리는 쪽이 빠름
+MAX_DIRTY = 0.5
+CACHE_VERSION = 1
+# test.draw_shapes가 그리는 요소
+DRAW_TAGS = ("polygon", "polyline", "rect", "circle", "ellipse", "line", "path")
+# 텍스트에서 읽는 도형 태그 (mask는 도형이 어느 마스크에 속하는지 구분용)
+SHAPE_TAG_RE = re.compile(r"<(mask|path|circle|rect|polygon|polyline|ellipse|line)\b([^>]*)>", re.DOTALL)
+ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*"([^"]*)"')
+# cairo 안티앨리어싱 여유 (픽셀)
+AA_PAD = 2
+
+
+class _BBoxDraw:
+    """ImageDraw 대신 test.draw_shapes에 넘겨서 그려질 픽셀 범위만 기록"""
+
+    def __init__(self):
+        self.box = None
+
+    def _add(self, xy, pad):
+        xs = [p[0] for p in xy]
+        ys = [p[1] for p in xy]
+        box = (math.floor(min(xs) - pad), math.floor(min(ys) - pad),
+               math.ceil(max(xs) + pad) + 1, math.ceil(max(ys) + pad) + 1)
+        if self.box is None:
+            self.box = box
+        else:
+            self.box = (min(self.box[0], box[0]), min(self.box[1], box[1]),
+                        max(self.box[2], box[2]), max(self.box[3], box[3]))
+
+    def polygon(self, xy, fill=None):
+        self._add(xy, 1)
+
+    def line(self, xy, fill=None, width=1):
+        self._add(xy, width / 2 + 1)
+
+    def rectangle(self, xy, fill=None):
+        self._add(xy, 1)
+
+    def ellipse(self, xy, fill=None):
+        self._add(xy, 1)
+
+
+class _OffsetDraw:
+    """
+    전체 캔버스 좌표로 그린 것을 (dx, dy)에서 시작하는 타일 이미지에 그림
+    - 정수만큼 빼는 것은 float에서 정확하므로 타일 결과가 전체 마스크의 같은 영역과 같음
+      (viewBox를 타일 범위로 바꾸면 좌표 변환 오차로 경계 픽셀이 조금 달라짐)
+    """
+
+    def __init__(self, draw, dx, dy):
+        self.draw = draw
+        self.dx = dx
+        self.dy = dy
+
+    def _shift(self, xy):
+        return [(x - self.dx, y - self.dy) for x, y in xy]
+
+    def polygon(self, xy, fill=None):
+        self.draw.polygon(self._shift(xy), fill=fill)
+
+    def line(self, xy, fill=None, width=1):
+        self.draw.line(self._shift(xy), fill=fill, width=width)
+
+    def rectangle(self, xy, fill=None):
+        self.draw.rectangle(self._shift(xy), fill=fill)
+
+    def ellipse(self, xy, fill=None):
+        self.draw.ellipse(self._shift(xy), fill=fill)
+
+
+def shape_key(*parts):
+    """도형 hash (64비트 정수 - 캐시에 int64 배열로 저장)"""
+    return int.from_bytes(hashlib.sha1(repr(parts).encode("utf-8")).digest()[:8], "little", signed=True)
+
+
+def clip_box(box, out_w, out_h):
+    x0, y0, x1, y1 = max(box[0], 0), max(box[1], 0), min(box[2], out_w), min(box[3], out_h)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def changed_boxes(old_keys, old_boxes, new_keys, new_boxes):
+    """없어진 도형과 새로 생긴 도형의 bbox (같은 도형이 여러 개면 개수 차이만큼)"""
+    removed = Counter(old_keys) - Counter(new_keys)
+    added = Counter(new_keys) - Counter(old_keys)
+    boxes = [tuple(b) for k, b in zip(old_keys, old_boxes) if removed.get(k)]
+    boxes += [tuple(b) for k, b in zip(new_keys, new_boxes) if added.get(k)]
+    return boxes, sum(removed.values()), sum(added.values())
+
+
+def tiles_for_boxes(boxes, tile):
+    """bbox들이 걸친 타일 (열, 행) 집합"""
+    tiles = set()
+    for x0, y0, x1, y1 in boxes:
+        for ty in range(y0 // tile, (y1 - 1) // tile + 1):
+            for tx in range(x0 // tile, (x1 - 1) // tile + 1):
+                tiles.add((tx, ty))
+    return tiles
+
+
+def load_cache(cache_path, output_path, header):
+    """
+    캐시가 현재 조건(header)과 맞고 지난 출력 파일이 그대로면 (keys, boxes), 아니면 None
+    - keys: 도형 hash 목록, boxes: (N, 4) 픽셀 bbox 배열
+    """
+    if not (os.path.exists(cache_path) and os.path.exists(output_path)):
+        return None
+    with np.load(cache_path) as f:
+        meta = json.loads(str(f["meta"]))
+        st = os.stat(output_path)
+        if meta["header"] != header or meta["output"] != [st.st_mtime_ns, st.st_size]:
+            return None
+        return f["keys"].tolist(), f["boxes"]
+
+
+def save_cache(cache_path, output_path, header, keys, boxes):
+    """도형 hash / bbox를 배열로 저장 (도형이 많아도 JSON보다 훨씬 빠름)"""
+    st = os.stat(output_path)
+    meta = json.dumps({"header": header, "output": [st.st_mtime_ns, st.st_size]})
+    tmp = cache_path + ".tmp.npz"
+    np.savez(tmp, meta=np.array(meta), keys=np.array(keys, dtype=np.int64),
+             boxes=np.array(boxes, dtype=np.int64).reshape(-1, 4))
+    os.replace(tmp, cache_path)
+
+
+def known_boxes(cache):
+    """캐시의 도형 hash → bbox (바뀌지 않은 도형은 bbox를 다시 계산하지 않음)"""
+    if cache is None:
+        return {}
+    return dict(zip(cache[0], map(tuple, cache[1].tolist())))
+
+
+def plan(cache, keys, boxes, n_tiles, tile, max_dirty):
+    """
+    캐시와 새 도형 목록 비교 → (모드, dirty 타일, 통계)
+    모드: "full" (전체 다시), "unchanged" (그대로), "incremental" (dirty 타일만)
+    """
+    stats = {"shapes": len(keys), "removed": 0, "added": 0, "dirty_tiles": 0, "tiles": n_tiles}
+    if cache is None:
+        return "full", set(), stats
+    changed, stats["removed"], stats["added"] = changed_boxes(cache[0], cache[1].tolist(), keys, boxes)
+    dirty = tiles_for_boxes(changed, tile)
+    stats["dirty_tiles"] = len(dirty)
+    if not dirty:
+        return "unchanged", dirty, stats
+    if len(dirty) > max_dirty * n_tiles:
+        return "full", dirty, stats
+    return "incremental", dirty, stats
+
+
+def print_stats(output_path, mode, stats):
+    names = {"full": "전체 다시 그림", "unchanged": "변경 없음", "incremental": "dirty 타일만 다시 그림"}
+    print(f"완료! ({names[mode]})")
+    print(f"- 도형: {stats['shapes']}개 (없어짐 {stats['removed']}개, 새로 생김 {stats['added']}개)")
+    print(f"- dirty 타일: {stats['dirty_tiles']} / {stats['tiles']}개")
+    print(f"- 출력 파일: {output_path}")
+
+
+# ---------------------------------------------------------------- test.build_mask (PIL)
+
+def mask_shape_index(root, vb, out_w, out_h, stroke_width, known=None):
+    """
+    test.draw_shapes가 그리는 요소별 (요소, hash, 픽셀 bbox) - 캔버스 밖이거나 그려지는 것이 없는 요소는 제외
+    known: 지난 실행의 hash → bbox (있으면 그 도형은 bbox를 다시 계산하지 않음)
+    """
+    known = known or {}
+    elements, keys, boxes = [], [], []
+    for el in root.iter():
+        tag = test.strip_ns(el.tag)
+        if tag not in DRAW_TAGS:
+            continue
+        key = shape_key(tag, sorted(el.attrib.items()))
+        box = known.get(key)
+        if box is None:
+            rec = _BBoxDraw()
+            test.draw_shapes(rec, el, vb, out_w, out_h, stroke_width)
+            box = clip_box(rec.box, out_w, out_h) if rec.box else None
+            if box is None:
+                continue
+        elements.append(el)
+        keys.append(key)
+        boxes.append(box)
+    return elements, keys, boxes
+
+
+def redraw_tiles(mask, elements, boxes, tiles, tile, vb, out_w, out_h, stroke_width=2, invert=True):
+    """dirty 타일마다 걸친 도형만 다시 그려서 mask에 붙임"""
+    arr = np.array(boxes, dtype=np.int64).reshape(-1, 4)
+    for tx, ty in sorted(tiles, key=lambda t: (t[1], t[0])):
+        x0, y0 = tx * tile, ty * tile
+        x1, y1 = min(x0 + tile, out_w), min(y0 + tile, out_h)
+        hit = np.flatnonzero((arr[:, 0] < x1) & (arr[:, 2] > x0) & (arr[:, 1] < y1) & (arr[:, 3] > y0))
+        img = Image.new("L", (x1 - x0, y1 - y0), 0)
+        draw = _OffsetDraw(ImageDraw.Draw(img), x0, y0)
+        for i in hit:
+            test.draw_shapes(draw, elements[i], vb, out_w, out_h, stroke_width)
+        if invert:
+            img = Image.eval(img, lambda p: 255 - p)
+        mask.paste(img, (x0, y0))
+
+
+@tracing.traced("update_mask")
+def update_mask(svg_path, out_path, width=None, height=None, stroke_width=2, invert=True, tile=TILE_PX,
+                cache_path=None, max_dirty=MAX_DIRTY):
+    """
+    test.build_mask의 증분 버전 - 지난 실행 뒤 바뀐 도형이 걸친 타일만 다시 그림
+
+    Args:
+        svg_path, out_path, width, height, stroke_width, invert: test.build_mask와 같음
+        tile: 타일 크기 (픽셀)
+        cache_path: 도형 목록 캐시 경로 (기본: <out_path>.tiles.npz)
+        max_dirty: dirty 타일 비율이 이보다 크면 전체를 다시 그림
+    Returns:
+        (모드, 통계) - 모드는 "full" / "unchanged" / "incremental"
+    """
+    cache_path = cache_path or out_path + ".tiles.npz"
+    with tracing.span("parse"):
+        memory_budget.fits("update_mask.parse", memory_budget.xml_tree_bytes(svg_path))
+        root = ET.fromstring(read_svg_text(svg_path))
+        out_w, out_h, vb = test.get_canvas(root, width, height)
+        header = {"version": CACHE_VERSION, "kind": "mask", "canvas": [out_w, out_h, *vb],
+                  "stroke_width": stroke_width, "invert": invert, "tile": tile}
+        cache = load_cache(cache_path, out_path, header)
+        elements, keys, boxes = mask_shape_index(root, vb, out_w, out_h, stroke_width, known_boxes(cache))
+
+    n_tiles = math.ceil(out_w / tile) * math.ceil(out_h / tile)
+    mode, dirty, stats = plan(cache, keys, boxes, n_tiles, tile, max_dirty)
+    tracing.count("dirty_tiles", len(dirty), stage="update_mask")
+
+    if mode == "full":
+        mask = test.render_mask(root, vb, out_w, out_h, stroke_width, invert)
+        tracing.count("pixels", out_w * out_h, stage="update_mask")
+    elif mode == "incremental":
+        with Image.open(out_path) as prev:
+            mask = prev.convert("L")
+        with tracing.span("rasterize"):
+            redraw_tiles(mask, elements, boxes, dirty, tile, vb, out_w, out_h, stroke_width, invert)
+        tracing.count("pixels", len(dirty) * tile * tile, stage="update_mask")
+    if mode != "unchanged":
+        with tracing.span("serialize"):
+            mask.save(out_path)
+        save_cache(cache_path, out_path, header, keys, boxes)
+    print_stats(out_path, mode, stats)
+    return mode, stats
+
+
+# ---------------------------------------------------------------- remove_enclosed_raster.mask_enclosed (cairosvg)
+
+def element_extent(tag, attrs):
+    """SVG 좌표에서 요소가 그리는 범위 (stroke 포함) 또는 None"""
+    def num(name):
+        try:
+            return float(attrs.get(name) or 0.0)
+        except ValueError:
+            return 0.0
+
+    if tag == "path":
+        box = path_extent(attrs.get("d"))
+    elif tag == "circle":
+        cx, cy, r = num("cx"), num("cy"), num("r")
+        box = (cx - r, cy - r, cx + r, cy + r)
+    elif tag == "ellipse":
+        cx, cy, rx, ry = num("cx"), num("cy"), num("rx"), num("ry")
+        box = (cx - rx, cy - ry, cx + rx, cy + ry)
+    elif tag == "rect":
+        x, y = num("x"), num("y")
+        box = (x, y, x + num("width"), y + num("height"))
+    elif tag == "line":
+        box = (min(num("x1"), num("x2")), min(num("y1"), num("y2")), max(num("x1"), num("x2")), max(num("y1"), num("y2")))
+    else:
+        pts = parse_number_list(attrs.get("points"))
+        if len(pts) < 2:
+            return None
+        box = (min(pts[0::2]), min(pts[1::2]), max(pts[0::2]), max(pts[1::2]))
+    if box is None:
+        return None
+    half = num("stroke-width") / 2
+    return box[0] - half, box[1] - half, box[2] + half, box[3] + half
+
+
+def svg_text_shapes(svg_data, vb, out_w, out_h, prefix="", known=None):
+    """
+    SVG 텍스트의 도형 태그별 hash와 픽셀 bbox
+    - hash에 몇 번째 mask 안인지 포함 (같은 도형이 다른 마스크로 옮겨 가도 변경으로 봄)
+    - known: 지난 실행의 hash → bbox
+    """
+    known = known or {}
+    vb_x, vb_y, vb_w, vb_h = vb
+    sx, sy = out_w / vb_w, out_h / vb_h
+    keys, boxes = [], []
+    section = 0
+    for m in SHAPE_TAG_RE.finditer(svg_data):
+        tag = m.group(1)
+        if tag == "mask":
+            section += 1
+            continue
+        key = shape_key(prefix, section, m.group(0))
+        box = known.get(key)
+        if box is None:
+            extent = element_extent(tag, dict(ATTR_RE.findall(m.group(2))))
+            if extent is None:
+                continue
+            box = clip_box((math.floor((extent[0] - vb_x) * sx) - AA_PAD, math.floor((extent[1] - vb_y) * sy) - AA_PAD,
+                            math.ceil((extent[2] - vb_x) * sx) + AA_PAD + 1,
+                            math.ceil((extent[3] - vb_y) * sy) + AA_PAD + 1), out_w, out_h)
+            if box is None:
+                continue
+        keys.append(key)
+        boxes.append(box)
+    return keys, boxes
+
+
+def dirty_row_ranges(tiles, tile, out_h):
+    """dirty 타일이 있는 행들을 이어지는 범위로 묶음"""
+    ranges = []
+    for ty in sorted({ty for _, ty in tiles}):
+        y0, y1 = ty * tile, min((ty + 1) * tile, out_h)
+        if ranges and ranges[-1][1] == y0:
+            ranges[-1][1] = y1
+        else:
+            ranges.append([y0, y1])
+    return ranges
+
+
+@tracing.traced("update_mask_enclosed")
+def update_mask_enclosed(inverted_svg, enclosed_svg, output_png, scale=10, tile=TILE_PX, cache_path=None,
+                         max_dirty=MAX_DIRTY):
+    """
+    remove_enclosed_raster.mask_enclosed의 증분 버전 - 두 SVG 중 바뀐 도형이 걸친 행 범위만 다시 렌더링
+    - cairosvg는 행 범위(render_strip)로만 렌더링하므로 dirty 타일이 있는 행 전체를 다시 그림
+    - transform이 있는 SVG는 도형 범위를 정확히 알 수 없으므로 항상 전체를 다시 그림
+    Returns:
+        (모드, 통계)
+    """
+    import remove_enclosed_raster as rer
+
+    cache_path = cache_path or output_png + ".tiles.npz"
+    with tracing.span("parse"):
+        inv_data = read_svg_text(inverted_svg)
+        enc_data = read_svg_text(enclosed_svg)
+        width, height, vb = rer.svg_canvas(inv_data)
+        out_w = max(1, int(round(width * scale)))
+        out_h = max(1, int(round(height * scale)))
+        # 도형 밖 내용(viewBox, mask 구조, 배경 색 등)이 바뀌면 캐시를 쓰지 않음
+        frames = [hashlib.sha1(SHAPE_TAG_RE.sub("", data).encode("utf-8")).hexdigest() for data in (inv_data, enc_data)]
+        header = {"version": CACHE_VERSION, "kind": "mask_enclosed", "canvas": [out_w, out_h, *vb],
+                  "enclosed_canvas": list(rer.svg_canvas(enc_data)[2]), "frames": frames, "scale": scale, "tile": tile}
+        cache = None
+        if "transform=" not in inv_data and "transform=" not in enc_data:
+            cache = load_cache(cache_path, output_png, header)
+        known = known_boxes(cache)
+        inv_keys, inv_boxes = svg_text_shapes(inv_data, vb, out_w, out_h, "inverted", known)
+        enc_keys, enc_boxes = svg_text_shapes(enc_data, vb, out_w, out_h, "enclosed", known)
+        keys, boxes = inv_keys + enc_keys, inv_boxes + enc_boxes
+
+    n_tiles = math.ceil(out_w / tile) * math.ceil(out_h / tile)
+    mode, dirty, stats = plan(cache, keys, boxes, n_tiles, tile, max_dirty)
+    tracing.count("dirty_tiles", len(dirty), stage="update_mask_enclosed")
+
+    if mode == "full":
+        rer.mask_enclosed(inverted_svg, enclosed_svg, output_png, scale=scale)
+    elif mode == "incremental":
+        with Image.open(output_png) as prev:
+            result = np.array(prev.convert("RGBA"))
+        memory_budget.buffer("result", result)
+        rows = 0
+        with tracing.span("rasterize"):
+            for y0, y1 in dirty_row_ranges(dirty, tile, out_h):
+                with tracing.span("tile", row=y0, rows=y1 - y0):
+                    inv_arr = np.array(rer.render_strip(inv_data, out_w, out_h, y0, y1).convert("RGBA"))
+                    enc_arr = np.array(rer.render_strip(enc_data, out_w, out_h, y0, y1).convert("L"))
+                    inv_arr[enc_arr >= 128] = 0
+                    result[y0:y1] = inv_arr
+                    rows += y1 - y0
+        tracing.count("pixels", rows * out_w, stage="update_mask_enclosed")
+        with tracing.span("serialize"):
+            Image.frombuffer("RGBA", (out_w, out_h), result, "raw", "RGBA", 0, 1).save(output_png)
+    if mode != "unchanged":
+        save_cache(cache_path, output_png, header, keys, boxes)
+    print_stats(output_png, mode, stats)
+    return mode, stats
+
+
+def main():
+    p = argparse.ArgumentParser()
+    sub = p.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("mask", help="test.build_mask 증분 갱신")
+    s.add_argument("svg")
+    s.add_argument("out")
+    s.add_argument("--width", type=int, default=None)
+    s.add_argument("--height", type=int, default=None)
+    s.add_argument("--stroke_width", type=int, default=2)
+    s.add_argument("--no_invert", action="store_true")
+
+    s = sub.add_parser("mask-enclosed", help="remove_enclosed_raster.mask_enclosed 증분 갱신")
+    s.add_argument("inverted")
+    s.add_argument("enclosed")
+    s.add_argument("out")
+    s.add_argument("--scale", type=float, default=10)
+
+    for s in sub.choices.values():
+        s.add_argument("--tile", type=int, default=TILE_PX)
+        s.add_argument("--max_dirty", type=float, default=MAX_DIRTY)
+        s.add_argument("--cache", default=None, help="도형 목록 캐시 경로 (기본: <출력>.tiles.npz)")
+    args = p.parse_args()
+
+    if args.command == "mask":
+        update_mask(args.svg, args.out, args.width, args.height, args.stroke_width, not args.no_invert,
+                    args.tile, args.cache, args.max_dirty)
+    else:
+        update_mask_enclosed(args.inverted, args.enclosed, args.out, args.scale, args.tile, args.cache, args.max_dirty)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+EMI-Optimizer 통합 CLI
+- 파이프라인 단계마다 하위 명령 (gerber / invert / filter-thin / stroke-thin / extract-enclosed / remove-enclosed /
+  mask-enclosed / cut)
+- 분석 / 도구 스크립트는 하위 명령 뒤의 인자를 각 스크립트의 main()에 그대로 넘김 (clearance, drc, mask, ...)
+- 무거운 모듈(numpy, PIL, scipy, cairosvg, pygerber)은 고른 하위 명령이 필요할 때만 불러옴
+  → --help와 벡터 단계(invert, filter-thin, stroke-thin, extract-enclosed, remove-enclosed, cut)는 numpy 없이 바로 시작
+
+사용 예:
+    python emi_optimizer.py gerber B_Cu.gbr output.svg
+    python emi_optimizer.py invert output.svg inverted_output_mask.svg
+    python emi_optimizer.py extract-enclosed inverted_output_mask.svg enclosed_regions.svg
+    python emi_optimizer.py remove-enclosed inverted_output_mask.svg enclosed_regions.svg inverted_without_enclosed.svg
+    python emi_optimizer.py clearance output.svg --help
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+
+BACKGROUND_COLOR = "#288f28"
+# 파일 읽기 결과 캐시 크기 (서비스 모드 worker가 같은 Gerber / 외곽선을 다시 파싱하지 않도록)
+FILE_CACHE_SIZE = 32
+
+_file_cache = {}
+
+# 하위 명령 → (모듈, 설명) - 인자는 모듈의 main()이 직접 처리
+TOOLS = {
+    "analyze": ("analyze_paths", "원본 SVG path 크기 분포 분석"),
+    "classify": ("trace_classifier", "path 일괄 분류 (trace / pad / pour)"),
+    "thin-sweep": ("thin_sweep", "얇은 path 임계값 스윕"),
+    "clearance": ("clearance_map", "구리까지의 거리 맵과 좁은 틈 분석"),
+    "density": ("copper_density", "구리 밀도 격자 분석"),
+    "slots": ("slot_detector", "그라운드 plane의 긴 slot 검출"),
+    "vias": ("stitching_vias", "pour 경계 stitching via 후보 생성"),
+    "overlap": ("layer_overlap", "레이어 간 구리 겹침 분석"),
+    "drc": ("pour_drc", "pour - 구리 clearance DRC"),
+    "thermal": ("thermal_relief", "thermal relief 생성"),
+    "outline": ("board_outline", "보드 외곽선 읽기"),
+    "mask": ("test", "SVG → 흑백 마스크 PNG"),
+    "mask-update": ("dirty_tiles", "마스크 PNG 증분 갱신 (바뀐 도형이 걸친 타일만 다시 그림)"),
+    "synthetic": ("synthetic_board", "합성 보드 SVG 생성"),
+    "benchmark": ("benchmark_pipeline", "파이프라인 단계별 벤치마크"),
+    "benchmark-render": ("benchmark_render", "반전 마스크 렌더링 시간 비교"),
+    "regression": ("regression_check", "골든 출력 회귀 검사"),
+    "service": ("emi_service", "작업 큐 서비스 (의존성 / 캐시를 유지하는 상주 프로세스)"),
+    "watch": ("emi_watch", "폴더 감시 - 바뀐 레이어의 필요한 단계만 다시 실행"),
+    "batch": ("batch_runner", "여러 보드 일괄 처리 (manifest로 이어서 실행)"),
+}
+
+
+def cached_load(path, loader, *args):
+    """
+    loader(path, *args) 결과를 파일 수정 시각 / 크기 기준으로 캐시 (args도 key에 포함)
+    - 한 번만 실행하는 CLI에서는 의미 없지만 emi_service의 worker 프로세스에서는 작업 사이에 유지됨
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), loader.__module__, loader.__qualname__, args)
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _file_cache.pop(key, None)
+    if hit is None or hit[0] != stamp:
+        hit = (stamp, loader(path, *args))
+    _file_cache[key] = hit
+    while len(_file_cache) > FILE_CACHE_SIZE:
+        del _file_cache[next(iter(_file_cache))]
+    return hit[1]
+
+
+def load_outline(path, origin=None, svg_path=None):
+    """
+    --outline 인자가 있을 때만 board_outline(numpy)을 불러옴
+    - origin: 구리 SVG 왼쪽 아래에 해당하는 Gerber 좌표 (--outline_origin) - 주면 SVG viewBox 아래쪽 기준으로 y를 뒤집음
+    - svg_path: 단계의 입력 SVG - viewBox와 외곽선 bbox가 다르면 경고
+    """
+    if path is None:
+        return None
+    from board_outline import load_board_outline, read_svg_viewbox, check_outline_fit
+    viewbox = read_svg_viewbox(svg_path) if svg_path else None
+    board_height = None
+    if origin is not None:
+        origin = tuple(origin)
+        if viewbox is not None:
+            board_height = viewbox[1] + viewbox[3]
+    rings = cached_load(path, load_board_outline, origin, board_height)
+    if viewbox is not None:
+        check_outline_fit(rings, viewbox)
+    return rings
+
+
+def parse_gerber(path):
+    from pygerber.gerberx3.api.v2 import GerberFile
+    return GerberFile.from_file(path).parse()
+
+
+def run_gerber(args):
+    cached_load(args.input, parse_gerber).render_svg(args.output)
+    print(f"완료! 출력 파일: {args.output}")
+
+
+def run_invert(args):
+    from invert_svg import invert_svg, invert_svg_simple
+    if args.evenodd:
+        invert_svg_simple(args.input, args.output, fill_color=args.background_color)
+        return
+    invert_svg(args.input, args.output, background_color=args.background_color, precision=args.precision,
+               relative=args.relative, compound_paths=args.compound_paths,
+               outline=load_outline(args.outline, args.outline_origin, args.input))
+
+
+def run_filter_thin(args):
+    from filter_thin_paths import filter_thin_paths
+    filter_thin_paths(args.input, args.output, args.min_dimension)
+
+
+def run_stroke_thin(args):
+    from remove_zero_thickness import add_stroke_to_thin_paths
+    add_stroke_to_thin_paths(args.input, args.output, args.threshold, args.stroke_width)
+
+
+def run_extract_enclosed(args):
+    from extract_enclosed import extract_enclosed_from_inverted
+    extract_enclosed_from_inverted(args.input, args.output, background_color=args.background_color,
+                                   precision=args.precision,
+                                   outline=load_outline(args.outline, args.outline_origin, args.input))
+
+
+def run_remove_enclosed(args):
+    from remove_enclosed import remove_enclosed_from_inverted
+    remove_enclosed_from_inverted(args.inverted, args.enclosed, args.output, background_color=args.background_color,
+                                  precision=args.precision,
+                                  outline=load_outline(args.outline, args.outline_origin, args.inverted))
+
+
+def run_mask_enclosed(args):
+    from remove_enclosed_raster import mask_enclosed
+    mask_enclosed(args.inverted, args.enclosed, args.output, output_svg=args.svg, scale=args.scale)
+
+
+def run_cut(args):
+    from cut_svg import split_svg_objects, split_svg_objects_stream
+    if args.stream:
+        split_svg_objects_stream(args.input, args.output)
+    else:
+        split_svg_objects(args.input, args.output)
+    print(f"분리된 객체로 저장 완료: {args.output}")
+
+
+def run_tool(module_name, argv):
+    """스크립트의 main()을 하위 명령 뒤 인자로 실행"""
+    module = importlib.import_module(module_name)
+    # watch / service처럼 같은 프로세스에서 여러 번 실행되므로 끝나면 원래 sys.argv로 되돌림
+    saved = sys.argv
+    sys.argv = [f"{saved[0]} {module_name}"] + argv
+    try:
+        return module.main()
+    finally:
+        sys.argv = saved
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="emi_optimizer", description="EMI-Optimizer 파이프라인 / 분석 도구")
+    sub = p.add_subparsers(dest="command", metavar="<명령>")
+    sub.required = True
+
+    s = sub.add_parser("gerber", help="Gerber → SVG (pygerber)")
+    s.add_argument("input")
+    s.add_argument("output")
+    s.set_defaults(func=run_gerber)
+
+    s = sub.add_parser("invert", help="SVG 반전 (마스크 방식)")
+    s.add_argument("input")
+    s.add_argument("output")
+    s.add_argument("--background_color", default=BACKGROUND_COLOR)
+    s.add_argument("--precision", type=int, default=4)
+    s.add_argument("--relative", action="store_true")
+    s.add_argument("--compound_paths", type=int, default=None)
+    s.add_argument("--outline", default=None, help="Gerber 외곽 레이어")
+    s.add_argument("--outline_origin", type=float, nargs=2, default=None, metavar=("X", "Y"),
+                   help="구리 SVG 왼쪽 아래에 해당하는 Gerber 좌표 (mm, 기본: 외곽선 bbox 왼쪽 아래)")
+    s.add_argument("--evenodd", action="store_true", help="fill-rule: evenodd 방식으로 반전")
+    s.set_defaults(func=run_invert)
+
+    s = sub.add_parser("filter-thin", help="얇은 path 제거")
+    s.add_argument("input")
+    s.add_argument("output")
+    s.add_argument("--min_dimension", type=float, default=0.5)
+    s.set_defaults(func=run_filter_thin)
+
+    s = sub.add_parser("stroke-thin", help="얇은 path에 stroke를 붙여 틈 메우기")
+    s.add_argument("input")
+    s.add_argument("output")
+    s.add_argument("--threshold", type=float, default=0.5)
+    s.add_argument("--stroke_width", type=float, default=0.5)
+    s.set_defaults(func=run_stroke_thin)
+
+    s = sub.add_parser("extract-enclosed", help="반전 결과에서 둘러싸인 영역 추출")
+    s.add_argument("input")
+    s.add_argument("output")
+    s.add_argument("--background_color", default=BACKGROUND_COLOR)
+    s.add_argument("--precision", type=int, default=4)
+    s.add_argument("--outline", default=None, help="Gerber 외곽 레이어")
+    s.add_argument("--outline_origin", type=float, nargs=2, default=None, metavar=("X", "Y"),
+                   help="구리 SVG 왼쪽 아래에 해당하는 Gerber 좌표 (mm, 기본: 외곽선 bbox 왼쪽 아래)")
+    s.set_defaults(func=run_extract_enclosed)
+
+    s = sub.add_parser("remove-enclosed", help="둘러싸인 영역을 반전 결과에서 제거")
+    s.add_argument("inverted")
+    s.add_argument("enclosed")
+    s.add_argument("output")
+    s.add_argument("--background_color", default=BACKGROUND_COLOR)
+    s.add_argument("--precision", type=int, default=4)
+    s.add_argument("--outline", default=None, help="Gerber 외곽 레이어")
+    s.add_argument("--outline_origin", type=float, nargs=2, default=None, metavar=("X", "Y"),
+                   help="구리 SVG 왼쪽 아래에 해당하는 Gerber 좌표 (mm, 기본: 외곽선 bbox 왼쪽 아래)")
+    s.set_defaults(func=run_remove_enclosed)
+
+    s = sub.add_parser("mask-enclosed", help="둘러싸인 영역 제거 (래스터, cairosvg)")
+    s.add_argument("inverted")
+    s.add_argument("enclosed")
+    s.add_argument("output", help="출력 PNG")
+    s.add_argument("--svg", default=None, help="PNG를 감싼 SVG도 출력")
+    s.add_argument("--scale", type=float, default=10)
+    s.set_defaults(func=run_mask_enclosed)
+
+    s = sub.add_parser("cut", help="도형 평탄화 / 얇은 사각형 제거")
+    s.add_argument("input")
+    s.add_argument("output")
+    s.add_argument("--stream", action="store_true", help="iterparse 스트리밍 모드 (큰 SVG용)")
+    s.set_defaults(func=run_cut)
+
+    for name, (module_name, help_text) in TOOLS.items():
+        # 인자는 스크립트가 직접 처리 (-h도 스크립트의 도움말)
+        s = sub.add_parser(name, help=f"{help_text} ({module_name}.py)", add_help=False)
+        s.set_defaults(tool=module_name)
+    return p
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if getattr(args, "tool", None):
+        return run_tool(args.tool, rest)
+    if rest:
+        parser.error(f"알 수 없는 인자: {' '.join(rest)}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+"""
+작업 큐 서비스 (상주 프로세스)
+- asyncio HTTP 서버 (Unix socket 또는 localhost TCP)
+- 작업(job) = emi_optimizer 하위 명령 하나: {"stage": "invert", "args": ["output.svg", "out.svg"], "layer": "B_Cu"}
+- worker 프로세스 풀에서 실행 (동시 실행 수 = workers, 대기 작업 수 상한 = max_pending)
+  - worker는 시작할 때 numpy / PIL / 단계 모듈 / cairosvg / pygerber를 미리 불러옴 (있는 것만)
+  - worker 안에서 emi_optimizer.cached_load 캐시(Gerber 파싱 결과, 보드 외곽선)가 작업 사이에 유지됨
+- 진행 출력(단계 함수의 print)과 결과를 NDJSON으로 바로바로 돌려줌 (chunked 응답)
+
+HTTP:
+    POST /jobs     본문: 작업 하나 또는 목록 → 이벤트 줄들 {"job", "event": "queued" | "start" | "progress" | "result", ...}
+    GET  /health   상태 (worker 수, 대기 / 실행 중 작업 수, 단계별 누적 시간, 풀 교체 횟수)
+                   worker가 죽어 풀이 깨진 동안은 status "degraded" (다음 작업 때 새 풀로 교체)
+
+사용 예:
+    python emi_service.py serve --socket /tmp/emi.sock --workers 4
+    python emi_service.py submit --socket /tmp/emi.sock invert output.svg inverted_output_mask.svg
+    curl --unix-socket /tmp/emi.sock -d '{"stage": "filter-thin", "args": ["a.svg", "b.svg"], "cwd": "'$PWD'"}' http://x/jobs
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import itertools
+import json
+import os
+import signal
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+
+# worker가 시작할 때 미리 불러올 모듈 (없으면 건너뜀)
+WARM_MODULES = (
+    "numpy", "PIL.Image", "scipy.ndimage",
+    "svg_geometry", "invert_svg", "filter_thin_paths", "remove_zero_thickness", "extract_enclosed", "remove_enclosed",
+    "cut_svg", "test", "board_outline",
+    "cairosvg", "remove_enclosed_raster", "pygerber.gerberx3.api.v2",
+)
+MAX_BODY = 1 << 20
+
+# 작업으로 받는 emi_optimizer 하위 명령 - 파이프라인 단계와 분석 도구만
+# (service / watch / batch는 끝나지 않거나 자체 풀을 띄우고, benchmark / regression도 자체 프로세스를 띄우므로 제외)
+JOB_STAGES = (
+    "gerber", "invert", "filter-thin", "stroke-thin", "extract-enclosed", "remove-enclosed", "mask-enclosed", "cut",
+    "analyze", "classify", "thin-sweep", "clearance", "density", "slots", "vias", "overlap", "drc", "thermal",
+    "outline", "mask", "mask-update", "synthetic",
+)
+
+_events = None
+
+
+# ---------------------------------------------------------------- worker 프로세스
+
+class _EventWriter(io.TextIOBase):
+    """worker의 print 출력을 줄 단위 progress 이벤트로 보냄"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.buf = ""
+
+    def write(self, s):
+        self.buf += s
+        *lines, self.buf = self.buf.split("\n")
+        for line in lines:
+            _events.put({"job": self.job_id, "event": "progress", "line": line})
+        return len(s)
+
+    def flush(self):
+        if self.buf:
+            _events.put({"job": self.job_id, "event": "progress", "line": self.buf})
+            self.buf = ""
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except (ImportError, OSError):
+            pass
+
+
+def _run_job(job_id, argv, cwd):
+    """worker에서 작업 하나 실행 - 진행 / 결과는 이벤트 큐로 (결과가 항상 진행 출력 뒤에 오도록)"""
+    import emi_optimizer
+
+    _events.put({"job": job_id, "event": "start", "pid": os.getpid()})
+    writer = _EventWriter(job_id)
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        os.chdir(cwd)
+        with contextlib.redirect_stdout(writer):
+            emi_optimizer.main(argv)
+    except SystemExit as e:
+        if e.code not in (0, None):
+            status, error = "error", f"종료 코드 {e.code}"
+    except Exception as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        writer.write(traceback.format_exc())
+    writer.flush()
+    _events.put({"job": job_id, "event": "result", "status": status, "error": error,
+                 "seconds": round(time.perf_counter() - start, 4)})
+
+
+# ---------------------------------------------------------------- 서버
+
+class JobService:
+    """작업 접수 / worker 풀 / 이벤트 전달"""
+
+    def __init__(self, workers=None, max_pending=64):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.ctx = get_context("spawn")
+        self.pool = None
+        self.events = None
+        self.ids = itertools.count(1)
+        self.streams = {}
+        self.pending = 0
+        self.running = 0
+        self.done = 0
+        self.failed = 0
+        self.pool_restarts = 0
+        self.last_pool_error = None
+        self.stage_seconds = defaultdict(float)
+        self.loop = None
+
+    def start(self, loop):
+        self.loop = loop
+        self._new_pool()
+
+    def _new_pool(self):
+        """
+        worker 풀 생성 - 풀마다 이벤트 Queue와 읽는 thread를 따로 둠
+        (죽은 worker가 Queue 잠금을 쥔 채 끝났을 수 있으므로 풀을 바꿀 때 Queue도 새로)
+        """
+        events = self.ctx.Queue()
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.ctx,
+                                   initializer=_init_worker, initargs=(events,))
+        threading.Thread(target=self._read_events, args=(events,), daemon=True).start()
+        # worker를 미리 띄워서 첫 작업도 따뜻한 프로세스에서 실행
+        for _ in range(self.workers):
+            pool.submit(time.sleep, 0)
+        self.pool, self.events = pool, events
+
+    def _replace_pool(self, broken, error):
+        """worker가 죽어 깨진 풀을 새 풀로 교체 (같은 풀에서 여러 작업이 동시에 알려도 한 번만)"""
+        if broken is not self.pool:
+            return
+        self.pool_restarts += 1
+        self.last_pool_error = error
+        old_events = self.events
+        self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+        old_events.put(None)
+
+    def _read_events(self, events):
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            self.loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event):
+        stream = self.streams.get(event["job"])
+        if stream is not None:
+            stream.put_nowait(event)
+
+    def check_job(self, job):
+        """작업 형식 검사 → argv (틀리면 ValueError)"""
+        import emi_optimizer
+
+        if not isinstance(job, dict) or not isinstance(job.get("stage"), str):
+            raise ValueError('작업은 {"stage": ..., "args": [...]} 형식')
+        args = job.get("args", [])
+        if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+            raise ValueError("args는 문자열 목록")
+        if job["stage"] not in JOB_STAGES:
+            raise ValueError(f"작업으로 실행할 수 없는 명령: {job['stage']} (가능: {', '.join(JOB_STAGES)})")
+        argv = [job["stage"]] + args
+        parser = emi_optimizer.build_parser()
+        try:
+            with contextlib.redirect_stderr(io.StringIO()) as err:
+                parser.parse_known_args(argv)
+        except SystemExit:
+            raise ValueError(err.getvalue().strip().splitlines()[-1])
+        return argv
+
+    async def run(self, job):
+        """
+        작업 하나를 실행하면서 이벤트를 하나씩 돌려줌 (마지막은 result)
+        - worker가 죽어 풀이 깨지면 새 풀로 바꿈 → 시작 전이던 작업(같은 풀에서 함께 실패)은 새 풀에서 한 번 더 실행,
+          실행 중이던 작업은 error
+        - 어떤 경로로 끝나도(오류, 연결 끊김) pending / running 수를 되돌림
+        """
+        job_id = next(self.ids)
+        base = {"job": job_id, "layer": job.get("layer"), "stage": job.get("stage")}
+        try:
+            argv = self.check_job(job)
+        except ValueError as e:
+            yield dict(base, event="result", status="rejected", error=str(e))
+            return
+        if self.pending >= self.max_pending:
+            yield dict(base, event="result", status="rejected", error=f"대기 작업이 {self.max_pending}개로 가득 참")
+            return
+
+        stream = self.streams[job_id] = asyncio.Queue()
+        self.pending += 1
+        state = "pending"
+        retried = False
+        try:
+            yield dict(base, event="queued", pending=self.pending)
+            while True:
+                pool = self.pool
+                try:
+                    future = asyncio.wrap_future(pool.submit(_run_job, job_id, argv, job.get("cwd") or os.getcwd()))
+                    while True:
+                        get = asyncio.ensure_future(stream.get())
+                        done, _ = await asyncio.wait({get, future}, return_when=asyncio.FIRST_COMPLETED)
+                        if get not in done:
+                            get.cancel()
+                            # worker가 죽으면 result 이벤트가 오지 않음 → 여기서 예외
+                            future.result()
+                            future = asyncio.get_running_loop().create_future()
+                            continue
+                        event = dict(base, **get.result())
+                        if event["event"] == "start" and state == "pending":
+                            self.pending -= 1
+                            self.running += 1
+                            state = "running"
+                        elif event["event"] == "result":
+                            if state == "running":
+                                self.running -= 1
+                            elif state == "pending":
+                                self.pending -= 1
+                            state = "done"
+                            self.done += 1
+                            self.failed += event["status"] != "ok"
+                            self.stage_seconds[job["stage"]] += event["seconds"]
+                        yield event
+                        if event["event"] == "result":
+                            return
+                except BrokenProcessPool as e:
+                    self._replace_pool(pool, f"{type(e).__name__}: {e}")
+                    if state == "pending" and not retried:
+                        retried = True
+                        continue
+                    error = f"{type(e).__name__}: worker 프로세스가 비정상 종료됨"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                self.failed += 1
+                yield dict(base, event="result", status="error", error=error)
+                return
+        finally:
+            if state == "pending":
+                self.pending -= 1
+            elif state == "running":
+                self.running -= 1
+            self.streams.pop(job_id, None)
+
+    def health(self):
+        # worker가 작업 없이 죽어도 풀은 깨진 상태가 됨 → 다음 작업 때 새 풀로 바뀜
+        broken = self.pool is None or bool(getattr(self.pool, "_broken", False))
+        return {
+            "status": "degraded" if broken else "ok",
+            "pid": os.getpid(),
+            "workers": self.workers,
+            "pending": self.pending,
+            "running": self.running,
+            "done": self.done,
+            "failed": self.failed,
+            "pool_restarts": self.pool_restarts,
+            "last_pool_error": self.last_pool_error,
+            "stage_seconds": {k: round(v, 4) for k, v in sorted(self.stage_seconds.items())},
+        }
+
+    def close(self):
+        if self.pool is not None:
+            self.events.put(None)
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def _merge(generators):
+    """여러 작업의 이벤트를 도착 순서대로 합침"""
+    queue = asyncio.Queue()
+
+    async def pump(gen):
+        try:
+            async for event in gen:
+                await queue.put(event)
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.ensure_future(pump(g)) for g in generators]
+    remaining = len(tasks)
+    while remaining:
+        event = await queue.get()
+        if event is None:
+            remaining -= 1
+        else:
+            yield event
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path = line.decode("latin-1").split()[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise ValueError("본문이 너무 큼")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body
+
+
+def _head(status, content_type, chunked=False):
+    lines = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", "Connection: close"]
+    if chunked:
+        lines.append("Transfer-Encoding: chunked")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+async def _send_json(writer, status, obj):
+    body = json.dumps(obj, ensure_ascii=False).encode() + b"\n"
+    writer.write(_head(status, "application/json")[:-2] + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+async def handle_client(service, reader, writer):
+    try:
+        try:
+            request = await _read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            await _send_json(writer, "400 Bad Request", {"error": str(e)})
+            return
+        if request is None:
+            return
+        method, path, body = request
+
+        if method == "GET" and path == "/health":
+            await _send_json(writer, "200 OK", service.health())
+            return
+        if method != "POST" or path != "/jobs":
+            await _send_json(writer, "404 Not Found", {"error": f"{method} {path}"})
+            return
+        try:
+            jobs = json.loads(body or b"null")
+        except json.JSONDecodeError as e:
+            await _send_json(writer, "400 Bad Request", {"error": f"JSON: {e}"})
+            return
+        jobs = jobs if isinstance(jobs, list) else [jobs]
+
+        writer.write(_head("200 OK", "application/x-ndjson", chunked=True))
+        async for event in _merge([service.run(job) for job in jobs]):
+            data = json.dumps(event, ensure_ascii=False).encode() + b"\n"
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(socket_path=None, host="127.0.0.1", port=8765, workers=None, max_pending=64):
+    service = JobService(workers, max_pending)
+    service.start(asyncio.get_running_loop())
+
+    def handler(reader, writer):
+        return handle_client(service, reader, writer)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(handler, path=socket_path)
+        where = socket_path
+    else:
+        server = await asyncio.start_server(handler, host=host, port=port)
+        where = f"http://{host}:{port}"
+    print(f"서비스 시작: {where} (worker {service.workers}개)", flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+        print("서비스 종료", flush=True)
+    finally:
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+# ---------------------------------------------------------------- 클라이언트
+
+async def submit(jobs, socket_path=None, host="127.0.0.1", port=8765):
+    """작업 목록을 보내고 이벤트를 하나씩 돌려줌"""
+    if socket_path:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(jobs, ensure_ascii=False).encode()
+    writer.write(f"POST /jobs HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status = await reader.readline()
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    if b" 200 " not in status:
+        raise RuntimeError((status + await reader.read()).decode(errors="replace").strip())
+    try:
+        while True:
+            size = int((await reader.readline()).strip() or b"0", 16)
+            if size == 0:
+                break
+            data = await reader.readexactly(size + 2)
+            yield json.loads(data[:-2])
+    finally:
+        writer.close()
+
+
+async def _submit_and_print(jobs, socket_path, host, port):
+    failed = 0
+    async for event in submit(jobs, socket_path, host, port):
+        tag = f"[{event['job']}:{event.get('layer') or event.get('stage')}]"
+        if event["event"] == "progress":
+            print(f"{tag} {event['line']}")
+        elif event["event"] == "result":
+            failed += event["status"] != "ok"
+            extra = f" {event['seconds']:.3f}s" if "seconds" in event else ""
+            print(f"{tag} {event['status']}{extra}" + (f" - {event['error']}" if event.get("error") else ""))
+    return failed
+
+
+def main():
+    p = argparse.ArgumentParser()
+    sub = p.add_subparsers(dest="command", required=True)
+    for name in ("serve", "submit", "health"):
+        s = sub.add_parser(name)
+        s.add_argument("--socket", default=None, help="Unix socket 경로 (없으면 localhost TCP)")
+        s.add_argument("--host", default="127.0.0.1")
+        s.add_argument("--port", type=int, default=8765)
+        if name == "serve":
+            s.add_argument("--workers", type=int, default=None)
+            s.add_argument("--max_pending", type=int, default=64)
+        elif name == "submit":
+            s.add_argument("--layer", default=None)
+            s.add_argument("--jobs", default=None, help="작업 목록 JSON 파일 (없으면 뒤의 인자가 작업 하나)")
+            s.add_argument("argv", nargs=argparse.REMAINDER, help="emi_optimizer 하위 명령과 인자")
+    args = p.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve(args.socket, args.host, args.port, args.workers, args.max_pending))
+    elif args.command == "health":
+        async def health():
+            if args.socket:
+                reader, writer = await asyncio.open_unix_connection(args.socket)
+            else:
+                reader, writer = await asyncio.open_connection(args.host, args.port)
+            writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            data = await reader.read()
+            writer.close()
+            return data.split(b"\r\n\r\n", 1)[1].decode()
+        print(asyncio.run(health()).strip())
+    else:
+        if args.jobs:
+            with open(args.jobs, "r", encoding="utf-8") as f:
+                jobs = json.load(f)
+            jobs = jobs if isinstance(jobs, list) else [jobs]
+        else:
+            if not args.argv:
+                p.error("작업(emi_optimizer 하위 명령) 또는 --jobs가 필요")
+            jobs = [{"stage": args.argv[0], "args": args.argv[1:], "layer": args.layer}]
+        for job in jobs:
+            job.setdefault("cwd", os.getcwd())
+        failed = asyncio.run(_submit_and_print(jobs, args.socket, args.host, args.port))
+        raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+watch 모드 - Gerber / asset 폴더를 지켜보다가 바뀐 레이어의 필요한 단계만 다시 실행
+- 폴더를 주기적으로 훑어 (수정 시각, 크기)가 바뀐 파일을 찾고, debounce 시간 동안 더 바뀌지 않으면 실행
+  (내보내기 도중의 반쯤 쓴 파일로 실행하지 않도록)
+- 레이어마다 단계 순서: gerber → invert → filter-thin / extract-enclosed → remove-enclosed → cut
+  (원본이 SVG면 gerber 단계 없이 invert부터)
+- 단계마다 입력 파일 내용 + 옵션의 hash를 기록 → hash가 같고 출력이 있으면 건너뜀
+  → Gerber를 다시 내보냈어도 도형이 같으면 gerber 단계만 돌고 나머지는 그대로
+  → 바뀌지 않은 레이어는 아무 단계도 실행하지 않음
+- 단계는 emi_optimizer 하위 명령으로 같은 프로세스에서 실행 → 모듈과 cached_load 캐시(Gerber 파싱, 외곽선)가 유지됨
+- 레이어 출력 / 기록은 지켜보는 폴더 기준 상대 경로로 구분 (assets/<보드>/processed/B_Cu.gbr → out_dir/<보드>/processed/B_Cu/)
+  → 여러 보드에 같은 이름의 레이어가 있어도 서로 덮어쓰지 않음
+- 단계별 실행 시간 출력, 기록은 출력 폴더의 watch_state.json (다시 시작해도 이어서 씀)
+
+사용 예:
+    python emi_watch.py "assets/Seven segment display gerber/processed" --out_dir watch_out
+    python emi_watch.py assets --pattern "*_Cu.gbr" --outline "assets/.../Edge_Cuts.gbr" --once
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import time
+
+import emi_optimizer
+
+
+DEFAULT_PATTERNS = ("*_Cu.gbr",)
+STATE_FILE = "watch_state.json"
+
+# (단계, 입력 파일 키, 출력 파일 키, 단계 옵션 이름) - 옵션은 emi_optimizer 하위 명령의 옵션
+STAGES = [
+    ("gerber", ("source",), "svg", ()),
+    ("invert", ("svg",), "inverted", ("background_color", "precision", "outline", "outline_origin")),
+    ("filter-thin", ("inverted",), "filtered", ("min_dimension",)),
+    ("extract-enclosed", ("inverted",), "enclosed", ("background_color", "precision", "outline", "outline_origin")),
+    ("remove-enclosed", ("inverted", "enclosed"), "removed",
+     ("background_color", "precision", "outline", "outline_origin")),
+    ("cut", ("removed",), "cut", ()),
+]
+OUTPUT_NAMES = {
+    "svg": "output.svg",
+    "inverted": "inverted_output_mask.svg",
+    "filtered": "inverted_output_mask_filtered.svg",
+    "enclosed": "enclosed_regions.svg",
+    "removed": "inverted_without_enclosed.svg",
+    "cut": "cut_inverted_output_mask.svg",
+}
+
+_hash_cache = {}
+
+
+def file_hash(path):
+    """파일 내용 hash ((수정 시각, 크기)가 같으면 다시 읽지 않음)"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _hash_cache.get(path)
+    if hit is None or hit[0] != stamp:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        hit = _hash_cache[path] = (stamp, h.hexdigest())
+    return hit[1]
+
+
+def scan(folders, patterns):
+    """패턴에 맞는 파일 → (수정 시각, 크기)"""
+    found = {}
+    for folder in folders:
+        for root, _, names in os.walk(folder):
+            for name in names:
+                if any(fnmatch.fnmatch(name, p) for p in patterns):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    found[path] = (st.st_mtime_ns, st.st_size)
+    return found
+
+
+def layer_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def layer_key(path, roots):
+    """
+    출력 폴더 / 기록에 쓸 레이어 이름 - 원본을 찾은 폴더(roots 중 하나) 기준 상대 경로에서 확장자를 뺀 것
+    - roots가 여러 개면 폴더 이름을 앞에 붙임 (서로 다른 폴더의 같은 상대 경로 구분)
+    - roots가 없거나 어느 폴더에도 속하지 않으면 파일 이름만
+    """
+    path = os.path.abspath(path)
+    for root in roots or ():
+        root = os.path.abspath(root)
+        if os.path.commonpath([path, root]) == root and path != root:
+            rel = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, "/")
+            return f"{os.path.basename(root)}/{rel}" if len(roots) > 1 else rel
+    return layer_name(path)
+
+
+class Watcher:
+    """
+    레이어별 단계 실행과 hash 기록
+    - roots: 지켜보는 폴더 목록 - 레이어 출력 폴더와 기록을 이 폴더 기준 상대 경로로 구분 (layer_key)
+      (없으면 파일 이름만 사용 - batch_runner처럼 보드마다 out_dir을 따로 주는 경우)
+    """
+
+    def __init__(self, out_dir, options, verbose=False, state_file=STATE_FILE, roots=None):
+        self.out_dir = out_dir
+        self.options = options
+        self.verbose = verbose
+        self.roots = list(roots) if roots else []
+        self.state_path = os.path.join(out_dir, state_file)
+        os.makedirs(out_dir, exist_ok=True)
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.state_path)
+
+    def stage_argv(self, stage, inputs, output, option_names, files):
+        argv = [stage] + [files[k] for k in inputs] + [files[output]]
+        for name in option_names:
+            value = self.options.get(name)
+            if isinstance(value, (list, tuple)):
+                argv += [f"--{name}"] + [str(v) for v in value]
+            elif value is not None:
+                argv += [f"--{name}", str(value)]
+        return argv
+
+    def stage_key(self, argv, files, inputs, option_names):
+        """입력 파일 내용 + 옵션 (+ 외곽선 파일 내용) hash"""
+        h = hashlib.sha1()
+        h.update(argv[0].encode())
+        for k in inputs:
+            h.update(file_hash(files[k]).encode())
+        for name in option_names:
+            h.update(f"{name}={self.options.get(name)}".encode())
+        if "outline" in option_names and self.options.get("outline"):
+            h.update(file_hash(self.options["outline"]).encode())
+        return h.hexdigest()
+
+    def layer_key(self, source):
+        return layer_key(source, self.roots)
+
+    def run_layer(self, source):
+        """레이어 하나의 단계들을 필요한 것만 실행 → [(단계, 초 또는 None(건너뜀), 오류)]"""
+        layer = self.layer_key(source)
+        folder = os.path.join(self.out_dir, *layer.split("/"))
+        os.makedirs(folder, exist_ok=True)
+        files = {k: os.path.join(folder, v) for k, v in OUTPUT_NAMES.items()}
+        files["source"] = source
+        if source.lower().endswith(".svg"):
+            files["svg"] = source
+        layer_state = self.state.setdefault(layer, {})
+
+        results = []
+        for stage, inputs, output, option_names in STAGES:
+            if stage == "gerber" and files["svg"] == source:
+                continue
+            argv = self.stage_argv(stage, inputs, output, option_names, files)
+            key = self.stage_key(argv, files, inputs, option_names)
+            if layer_state.get(stage) == key and os.path.exists(files[output]):
+                results.append((stage, None, None))
+                continue
+
+            start = time.perf_counter()
+            try:
+                with contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO()):
+                    emi_optimizer.main(argv)
+            except (Exception, SystemExit) as e:
+                layer_state.pop(stage, None)
+                results.append((stage, time.perf_counter() - start, f"{type(e).__name__}: {e}"))
+                # 실패한 단계 뒤는 입력이 없거나 오래된 것이므로 실행하지 않음
+                break
+            layer_state[stage] = key
+            results.append((stage, time.perf_counter() - start, None))
+        self.save_state()
+        return results
+
+    def run(self, sources):
+        """바뀐 원본들 처리 후 단계별 시간 출력"""
+        total_start = time.perf_counter()
+        for source in sorted(sources):
+            results = self.run_layer(source)
+            ran = [(s, t) for s, t, err in results if t is not None]
+            print(f"[{self.layer_key(source)}] {sum(t for _, t in ran):.3f}초")
+            for stage, seconds, error in results:
+                if error:
+                    print(f"  - {stage}: 실패 ({seconds:.3f}초) - {error}")
+                elif seconds is None:
+                    print(f"  - {stage}: 변경 없음")
+                else:
+                    print(f"  - {stage}: {seconds:.3f}초")
+        print(f"완료! ({time.perf_counter() - total_start:.3f}초)")
+
+
+def watch(folders, out_dir="watch_out", patterns=DEFAULT_PATTERNS, interval=0.5, debounce=1.0, once=False,
+          verbose=False, **options):
+    """
+    Args:
+        folders: 지켜볼 폴더 목록 (하위 폴더 포함)
+        out_dir: 레이어별 출력 폴더 (out_dir/<폴더 기준 상대 경로>/...)와 watch_state.json 위치
+        patterns: 원본 파일 이름 패턴 (Gerber 또는 SVG)
+        interval: 폴더를 훑는 간격 (초)
+        debounce: 마지막 변경 뒤 이 시간 동안 더 바뀌지 않으면 실행 (초)
+        once: 한 번만 실행하고 종료
+        verbose: 단계 함수의 출력도 표시
+        options: 단계 옵션 (background_color, precision, min_dimension, outline, outline_origin)
+    """
+    watcher = Watcher(out_dir, options, verbose, roots=folders)
+    outline = options.get("outline")
+    seen = scan(folders, patterns)
+    if not seen:
+        print(f"지켜볼 파일이 없음: {', '.join(folders)} ({', '.join(patterns)})")
+    # 처음에는 모든 레이어를 확인 (기록된 hash가 같으면 건너뜀)
+    watcher.run(seen)
+    if once:
+        return
+    print(f"변경 대기 중... ({len(seen)}개 레이어, Ctrl+C로 종료)")
+
+    outline_stamp = scan([os.path.dirname(outline) or "."], [os.path.basename(outline)]) if outline else {}
+    changed = set()
+    last_change = None
+    try:
+        while True:
+            time.sleep(interval)
+            current = scan(folders, patterns)
+            diff = {p for p, stamp in current.items() if seen.get(p) != stamp}
+            if outline:
+                current_outline = scan([os.path.dirname(outline) or "."], [os.path.basename(outline)])
+                if current_outline != outline_stamp:
+                    # 외곽선이 바뀌면 모든 레이어의 invert / extract-enclosed가 다시 돌아야 함
+                    outline_stamp = current_outline
+                    diff |= set(current)
+            for gone in set(seen) - set(current):
+                print(f"[{watcher.layer_key(gone)}] 파일 없어짐: {gone}")
+            seen = current
+            if diff:
+                changed |= diff
+                last_change = time.monotonic()
+                continue
+            if changed and time.monotonic() - last_change >= debounce:
+                watcher.run({p for p in changed if p in current})
+                changed.clear()
+                print("변경 대기 중...")
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("folders", nargs="*", default=["assets"], help="지켜볼 폴더 (기본: assets)")
+    p.add_argument("--out_dir", default="watch_out")
+    p.add_argument("--pattern", action="append", default=None, help=f"원본 파일 이름 패턴 (기본: {DEFAULT_PATTERNS[0]})")
+    p.add_argument("--interval", type=float, default=0.5)
+    p.add_argument("--debounce", type=float, default=1.0)
+    p.add_argument("--once", action="store_true", help="한 번만 실행하고 종료")
+    p.add_argument("--verbose", action="store_true")
+    p.add_argument("--background_color", default=None)
+    p.add_argument("--precision", type=int, default=None)
+    p.add_argument("--min_dimension", type=float, default=None)
+    p.add_argument("--outline", default=None, help="Gerber 외곽 레이어")
+    p.add_argument("--outline_origin", type=float, nargs=2, default=None, metavar=("X", "Y"),
+                   help="구리 SVG 왼쪽 아래에 해당하는 Gerber 좌표 (mm, 기본: 외곽선 bbox 왼쪽 아래)")
+    args = p.parse_args()
+
+    watch(args.folders, args.out_dir, tuple(args.pattern or DEFAULT_PATTERNS), args.interval, args.debounce,
+          args.once, args.verbose, background_color=args.background_color, precision=args.precision,
+          min_dimension=args.min_dimension, outline=args.outline, outline_origin=args.outline_origin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Excellon 드릴 파일 읽기/쓰기
+- 공구 정의(TnnCd)와 좌표(XnnYnn)를 읽어서 (x, y, 지름) 배열로 변환 (단위: mm)
+- 소수점 없는 좌표는 decimals 자리수로 나눔 (EAGLE 기본: inch 2.5 → 1/100000 inch)
+- SVG 좌표계(y 아래 방향, 보드 원점 기준)와의 변환 함수 포함
+"""
+
+import re
+
+import numpy as np
+
+
+INCH = 25.4
+
+COORD_RE = re.compile(r"^(?:X([-+]?[0-9.]+))?(?:Y([-+]?[0-9.]+))?$")
+TOOL_DEF_RE = re.compile(r"^T(\d+)(?:F[0-9.]+|S[0-9.]+|B[0-9.]+)*C([0-9.]+)")
+
+
+def _coord_value(s, decimals):
+    if "." in s:
+        return float(s)
+    return int(s) / 10 ** decimals
+
+
+def read_excellon(path, decimals=None):
+    """
+    Excellon 파일을 읽어서 드릴 배열 반환
+
+    Args:
+        path: 드릴 파일 경로
+        decimals: 소수점 없는 좌표의 소수 자리수 (None이면 inch=5, mm=3)
+
+    Returns:
+        (N, 3) 배열 (x, y, 지름) - 드릴 파일 좌표계, 단위 mm
+    """
+    unit = INCH
+    tools = {}
+    current = None
+    x = y = 0.0
+    drills = []
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(";"):
+                continue
+            upper = line.upper()
+            if upper.startswith("METRIC") or upper == "M71":
+                unit = 1.0
+                continue
+            if upper.startswith("INCH") or upper == "M72":
+                unit = INCH
+                continue
+
+            m = TOOL_DEF_RE.match(upper)
+            if m:
+                tools[int(m.group(1))] = float(m.group(2)) * unit
+                continue
+            if re.match(r"^T\d+$", upper):
+                current = int(upper[1:])
+                continue
+
+            m = COORD_RE.match(upper)
+            if m and (m.group(1) or m.group(2)) and current is not None:
+                dec = decimals if decimals is not None else (5 if unit == INCH else 3)
+                if m.group(1):
+                    x = _coord_value(m.group(1), dec) * unit
+                if m.group(2):
+                    y = _coord_value(m.group(2), dec) * unit
+                drills.append((x, y, tools.get(current, 0.0)))
+
+    return np.array(drills, dtype=np.float64).reshape(-1, 3)
+
+
+def drills_to_svg(drills, origin, board_height):
+    """드릴 좌표계(y 위 방향)를 SVG 좌표계(y 아래 방향, 보드 원점 기준)로 변환"""
+    out = drills.copy()
+    out[:, 0] = drills[:, 0] - origin[0]
+    out[:, 1] = board_height - (drills[:, 1] - origin[1])
+    return out
+
+
+def svg_to_drills(points, origin, board_height):
+    """SVG 좌표를 드릴 좌표계로 되돌림"""
+    out = np.array(points, dtype=np.float64, copy=True)
+    out[:, 0] += origin[0]
+    out[:, 1] = board_height - out[:, 1] + origin[1]
+    return out
+
+
+def write_excellon(path, points, diameter, comment="stitching vias"):
+    """
+    좌표들을 Excellon 파일로 저장 (METRIC, 소수점 좌표, 공구 1개)
+
+    Args:
+        path: 출력 파일 경로
+        points: (N, 2) 드릴 좌표계 좌표 (mm)
+        diameter: 드릴 지름 (mm)
+        comment: 헤더 주석
+    """
+    lines = ["M48", f"; {comment}", "FMAT,2", "METRIC", f"T1C{diameter:.3f}", "%", "G90", "G05", "T1"]
+    lines.extend(f"X{x:.3f}Y{y:.3f}" for x, y in np.asarray(points).tolist())
+    lines.append("M30")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
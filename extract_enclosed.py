@@ -5,6 +5,11 @@
 """
 
 import re
+import sys
+
+from svg_writer import SvgWriter, read_svg_text
+import memory_budget
+import tracing
 
 
 def parse_path_commands(d):
@@ -66,7 +71,8 @@ def bbox_touches_boundary(bbox, vb_x, vb_y, vb_width, vb_height, margin=0.5):
     return False
 
 
-def extract_enclosed_from_inverted(input_file, output_file, background_color="#288f28"):
+@tracing.traced("extract_enclosed_from_inverted")
+def extract_enclosed_from_inverted(input_file, output_file, background_color="#288f28", precision=4, outline=None):
     """
     반전된 SVG에서 둘러싸인 영역만 추출
 
@@ -79,98 +85,132 @@ def extract_enclosed_from_inverted(input_file, output_file, background_color="#2
     - 경계에 닿는 도형들(boundary_paths)을 찾음
     - 이 도형들 "바깥쪽" 빈 공간은 외부와 연결됨
     - 경계에 닿지 않는 도형들(enclosed_paths) "안쪽" 빈 공간만 둘러싸인 영역
-    """
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    precision: 출력 좌표의 소수 자리수 (None이면 원본 그대로), 출력이 .svgz면 gzip 압축
+    outline: 보드 외곽선 링 목록 (board_outline.load_board_outline) - 지정하면 viewBox 사각형 대신
+             외곽선을 경계로 사용하고, 외곽선 밖에 완전히 있는 도형은 건너뜀
+    """
 
-    # viewBox와 dimensions 추출
-    viewbox_match = re.search(r'viewBox="([^"]+)"', content)
-    width_match = re.search(r'width="([^"]+)"', content)
-    height_match = re.search(r'height="([^"]+)"', content)
+    if outline is not None:
+        # 외곽선 처리에만 numpy가 필요 → 외곽선이 있을 때만 불러옴 (CLI 시작 시간)
+        from board_outline import outline_svg_defs, boxes_inside_outline, path_overlap_mask, circle_overlap_mask
 
-    if viewbox_match:
-        vb_parts = viewbox_match.group(1).split()
-        vb_x, vb_y, vb_width, vb_height = float(vb_parts[0]), float(vb_parts[1]), float(vb_parts[2]), float(vb_parts[3])
-    else:
-        vb_x, vb_y, vb_width, vb_height = 0, 0, 100, 100
+    with tracing.span("parse"):
+        content = read_svg_text(input_file)
+        memory_budget.buffer("svg_text", content)
 
-    width = width_match.group(1) if width_match else str(vb_width)
-    height = height_match.group(1) if height_match else str(vb_height)
+        # viewBox와 dimensions 추출
+        viewbox_match = re.search(r'viewBox="([^"]+)"', content)
+        width_match = re.search(r'width="([^"]+)"', content)
+        height_match = re.search(r'height="([^"]+)"', content)
 
-    # 마스크 내의 모든 path 추출
-    paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', content)
-    circles = re.findall(r'<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>', content)
+        if viewbox_match:
+            vb_parts = viewbox_match.group(1).split()
+            vb_x, vb_y, vb_width, vb_height = float(vb_parts[0]), float(vb_parts[1]), float(vb_parts[2]), float(vb_parts[3])
+        else:
+            vb_x, vb_y, vb_width, vb_height = 0, 0, 100, 100
 
-    print(f"총 path 개수: {len(paths)}")
-    print(f"총 circle 개수: {len(circles)}")
+        width = width_match.group(1) if width_match else str(vb_width)
+        height = height_match.group(1) if height_match else str(vb_height)
 
-    # 유효한 path들 (폐곡선, 얇지 않음)
-    valid_paths = []
-    for path_d in paths:
-        if is_closed_path(path_d) and not is_thin_path(path_d, 0.3):
-            bbox = get_path_bbox(path_d)
-            if bbox:
-                valid_paths.append((path_d, bbox))
+        # 마스크 내의 모든 path 추출
+        paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', content)
+        circles = re.findall(r'<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>', content)
 
-    print(f"유효한 path 개수: {len(valid_paths)}")
+    tracing.count("paths_in", len(paths), stage="extract_enclosed_from_inverted")
+    tracing.count("circles_in", len(circles), stage="extract_enclosed_from_inverted")
 
-    # 경계에 닿는 path들 찾기 (이것들이 둘러싸는 외곽 도형들)
-    boundary_paths = []
-    inner_paths = []
+    print(f"총 path 개수: {len(paths)}")
+    print(f"총 circle 개수: {len(circles)}")
 
-    for path_d, bbox in valid_paths:
-        if bbox_touches_boundary(bbox, vb_x, vb_y, vb_width, vb_height, margin=0.5):
-            boundary_paths.append((path_d, bbox))
+    with tracing.span("compute"):
+        # 보드 외곽선 밖에 완전히 있는 도형 제외 (bbox prefilter)
+        if outline is not None:
+            keep = path_overlap_mask(paths, outline).tolist()
+            paths = [d for d, k in zip(paths, keep) if k]
+            keep = circle_overlap_mask([(float(cx), float(cy), float(r)) for cx, cy, r in circles], outline).tolist()
+            circles = [c for c, k in zip(circles, keep) if k]
+            print(f"보드 외곽선 안쪽 path: {len(paths)}개, circle: {len(circles)}개")
+
+        # 유효한 path들 (폐곡선, 얇지 않음)
+        valid_paths = []
+        for path_d in paths:
+            if is_closed_path(path_d) and not is_thin_path(path_d, 0.3):
+                bbox = get_path_bbox(path_d)
+                if bbox:
+                    valid_paths.append((path_d, bbox))
+
+        print(f"유효한 path 개수: {len(valid_paths)}")
+
+        # 경계에 닿는 path들 찾기 (이것들이 둘러싸는 외곽 도형들)
+        boundary_paths = []
+        inner_paths = []
+
+        if outline is not None:
+            # 외곽선 안쪽으로 margin 이상 떨어져 있지 않으면 경계에 닿는 것으로 판단
+            touches = (~boxes_inside_outline([bbox for _, bbox in valid_paths], outline, margin=0.5)).tolist()
         else:
-            inner_paths.append((path_d, bbox))
+            touches = [bbox_touches_boundary(bbox, vb_x, vb_y, vb_width, vb_height, margin=0.5)
+                       for _, bbox in valid_paths]
+
+        for (path_d, bbox), touch in zip(valid_paths, touches):
+            if touch:
+                boundary_paths.append((path_d, bbox))
+            else:
+                inner_paths.append((path_d, bbox))
 
-    print(f"경계에 닿는 path (외곽): {len(boundary_paths)}개")
-    print(f"경계에 안 닿는 path (내부): {len(inner_paths)}개")
+        print(f"경계에 닿는 path (외곽): {len(boundary_paths)}개")
+        print(f"경계에 안 닿는 path (내부): {len(inner_paths)}개")
 
     # SVG 생성
     # 방법: 전체 반전 결과에서, 경계에 닿는 도형들 "내부"의 빈 공간만 표시
     # = 경계 도형들이 감싸고 있는 영역에서 원본 도형들을 제외한 부분
 
-    svg_output = f'''<?xml version="1.0" encoding="UTF-8"?>
+    # 외곽선: 배경 사각형을 외곽 링으로 자르고(clipPath), 구멍은 마스크에서 검은색으로 가림
+    outline_clip, outline_holes, clip_attr = "", "", ""
+    if outline is not None:
+        outline_clip, outline_holes = outline_svg_defs(outline, precision if precision is not None else 8)
+        clip_attr = ' clip-path="url(#board-outline)"'
+
+    with tracing.span("serialize"), SvgWriter(output_file, precision=precision) as w:
+        w.write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
      width="{width}" height="{height}" viewBox="{vb_x} {vb_y} {vb_width} {vb_height}">
 <defs>
-    <!-- 마스크1: 원본 도형들 가리기 (반전) -->
+{outline_clip}    <!-- 마스크1: 원본 도형들 가리기 (반전) -->
     <mask id="invert-mask">
         <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" fill="white"/>
-'''
+{outline_holes}''')
 
-    for path_d in paths:
-        svg_output += f'        <path d="{path_d}" fill="black"/>\n'
+        for path_d in paths:
+            w.path(path_d, indent="        ", fill="black")
 
-    for cx, cy, r in circles:
-        svg_output += f'        <circle cx="{cx}" cy="{cy}" r="{r}" fill="black"/>\n'
+        for cx, cy, r in circles:
+            w.circle(cx, cy, r, indent="        ", fill="black")
 
-    svg_output += f'''    </mask>
+        w.write(f'''    </mask>
     
     <!-- 마스크2: 경계에 닿는 도형들의 내부 영역만 선택 -->
     <mask id="boundary-interior-mask">
         <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" fill="black"/>
-'''
+''')
 
-    # 경계에 닿는 도형들을 흰색으로 (이 도형들 내부가 둘러싸인 영역)
-    for path_d, bbox in boundary_paths:
-        svg_output += f'        <path d="{path_d}" fill="white"/>\n'
+        # 경계에 닿는 도형들을 흰색으로 (이 도형들 내부가 둘러싸인 영역)
+        for path_d, bbox in boundary_paths:
+            w.path(path_d, indent="        ", fill="white")
 
-    svg_output += f'''    </mask>
+        w.write(f'''    </mask>
 </defs>
 
 <!-- 경계 도형들 내부의 빈 공간만 표시 -->
 <g mask="url(#boundary-interior-mask)">
     <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" 
-          fill="{background_color}" mask="url(#invert-mask)"/>
+          fill="{background_color}" mask="url(#invert-mask)"{clip_attr}/>
 </g>
-</svg>'''
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(svg_output)
+</svg>''')
 
+    tracing.count("shapes_out", w.count, stage="extract_enclosed_from_inverted")
+    tracing.count_file("bytes_written", output_file, stage="extract_enclosed_from_inverted")
     print(f"완료! 출력 파일: {output_file}")
 
 
@@ -178,5 +218,10 @@ if __name__ == "__main__":
     input_file = "inverted_output_mask.svg"
     output_file = "enclosed_regions.svg"
 
-    extract_enclosed_from_inverted(input_file, output_file, background_color="#288f28")
+    # --outline <Gerber 외곽 레이어>: viewBox 대신 실제 보드 외곽선을 경계로 사용
+    outline = None
+    if '--outline' in sys.argv:
+        from board_outline import load_board_outline
+        outline = load_board_outline(sys.argv[sys.argv.index('--outline') + 1])
+    extract_enclosed_from_inverted(input_file, output_file, background_color="#288f28", outline=outline)
 
@@ -1,5 +1,9 @@
 import xml.etree.ElementTree as ET
 import re
+import sys
+
+from svg_transform import compose, parse_transform, matrix_to_attr
+from svg_stream import stream_svg_shapes
 
 INPUT_SVG = 'cutting_inverted_output_mask.svg'
 OUTPUT_SVG = 'extracted_paths.svg'
@@ -24,17 +28,21 @@ def extract_all_paths(input_svg, output_svg):
             new_root.append(child)
 
     # 모든 path 추출 (재귀)
-    def find_paths(parent):
+    # matrix: 상위 그룹들의 transform을 누적한 행렬 (평탄화해도 위치가 유지되도록 요소에 붙임)
+    def find_paths(parent, matrix=None):
         for elem in parent:
             tag = elem.tag
             if tag.startswith('{'):
                 tag = tag.split('}', 1)[1]
+            elem_matrix = compose(matrix, parse_transform(elem.attrib.get('transform')))
             if tag == 'path':
                 # 속성 복사
                 new_elem = ET.Element(elem.tag, elem.attrib)
+                if matrix is not None:
+                    new_elem.set('transform', matrix_to_attr(elem_matrix))
                 new_root.append(new_elem)
             if len(elem):
-                find_paths(elem)
+                find_paths(elem, elem_matrix)
     find_paths(root)
 
     # 저장
@@ -43,7 +51,17 @@ def extract_all_paths(input_svg, output_svg):
     print(f'총 추출된 path 개수: {len(new_root.findall(".//{http://www.w3.org/2000/svg}path"))}')
     print(f'결과 파일: {output_svg}')
 
+def extract_all_paths_stream(input_svg, output_svg):
+    # extract_all_paths의 스트리밍 버전 (iterparse) - 읽은 요소는 바로 쓰고 지우므로 메모리 사용량이 일정함
+    count = stream_svg_shapes(input_svg, output_svg, ('path',))
+    print(f'총 추출된 path 개수: {count}')
+    print(f'결과 파일: {output_svg}')
+
 if __name__ == '__main__':
-    extract_all_paths(INPUT_SVG, OUTPUT_SVG)
+    # --stream: iterparse 스트리밍 모드 (큰 SVG용)
+    if '--stream' in sys.argv:
+        extract_all_paths_stream(INPUT_SVG, OUTPUT_SVG)
+    else:
+        extract_all_paths(INPUT_SVG, OUTPUT_SVG)
     print('SVG path 추출 완료.')
 
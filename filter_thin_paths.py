@@ -6,6 +6,12 @@ SVG에서 얇은 요소들을 제거하는 스크립트
 import re
 import math
 
+import memory_budget
+import tracing
+from svg_writer import open_svg_text, read_svg_text
+
+OUTLINE_HOLE_RE = re.compile(r'<polygon[^>]*/>')
+
 
 def parse_path_commands(d):
     """SVG path의 d 속성을 파싱하여 좌표들을 추출"""
@@ -58,6 +64,46 @@ def is_thin_path(d, min_dimension=0.5):
     return False
 
 
+def build_filtered_content(content, mask_match, rect_element, paths, thin):
+    """
+    마스크 내용을 얇지 않은 path들로만 다시 만든 SVG 문자열 생성
+    (thin_sweep.py에서 임계값마다 재사용)
+
+    Returns:
+        (새 SVG 문자열, 제거된 개수, 유지된 개수)
+    """
+    mask_start = mask_match.group(1)
+    mask_end = mask_match.group(3)
+    # 보드 외곽선 구멍 (board_outline.outline_svg_defs의 polygon) - 얇은 path 검사 대상이 아니므로 그대로 유지
+    outline_holes = ''.join(f'        {tag}\n' for tag in OUTLINE_HOLE_RE.findall(mask_match.group(2)))
+
+    filtered_count = 0
+    kept_count = 0
+    filtered_paths = []
+
+    for path_d, is_thin in zip(paths, thin):
+        if is_thin:
+            filtered_count += 1
+        else:
+            kept_count += 1
+            filtered_paths.append(f'        <path d="{path_d}" fill="black"/>')
+
+    # 새로운 마스크 내용 생성
+    new_mask_content = f'''
+        <!-- 전체 영역을 흰색으로 (보이게) -->
+        {rect_element}
+{outline_holes}        
+        <!-- 원본 도형들을 검은색으로 (안 보이게 = 마스크에서 제외) -->
+        <!-- 얇은 요소 제거됨: {filtered_count}개, 유지됨: {kept_count}개 -->
+'''
+    new_mask_content += '\n'.join(filtered_paths) + '\n    '
+
+    # 원본 content에서 마스크 부분 교체
+    new_content = content[:mask_match.start()] + mask_start + new_mask_content + mask_end + content[mask_match.end():]
+    return new_content, filtered_count, kept_count
+
+
+@tracing.traced("filter_thin_paths")
 def filter_thin_paths(input_file, output_file, min_dimension=0.5):
     """
     SVG 파일에서 얇은 path들을 제거
@@ -68,8 +114,9 @@ def filter_thin_paths(input_file, output_file, min_dimension=0.5):
         min_dimension: 최소 폭/높이 기준 (기본값 0.5)
     """
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    with tracing.span("parse"):
+        content = read_svg_text(input_file)
+        memory_budget.buffer("svg_text", content)
 
     # mask 태그 내의 path들만 필터링
     mask_match = re.search(r'(<mask[^>]*>)(.*?)(</mask>)', content, re.DOTALL)
@@ -89,36 +136,19 @@ def filter_thin_paths(input_file, output_file, min_dimension=0.5):
     # 모든 path 추출
     paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', mask_content)
 
-    filtered_count = 0
-    kept_count = 0
-    filtered_paths = []
+    tracing.count("paths_in", len(paths), stage="filter_thin_paths")
 
-    for path_d in paths:
-        width, height = get_path_dimensions(path_d)
+    with tracing.span("compute"):
+        thin = [is_thin_path(path_d, min_dimension) for path_d in paths]
+        new_content, filtered_count, kept_count = build_filtered_content(content, mask_match, rect_element, paths, thin)
+        memory_budget.buffer("output_text", new_content)
 
-        if is_thin_path(path_d, min_dimension):
-            filtered_count += 1
-            # print(f"제거됨: 폭={width:.4f}, 높이={height:.4f}")
-        else:
-            kept_count += 1
-            filtered_paths.append(f'        <path d="{path_d}" fill="black"/>')
-
-    # 새로운 마스크 내용 생성
-    new_mask_content = f'''
-        <!-- 전체 영역을 흰색으로 (보이게) -->
-        {rect_element}
-        
-        <!-- 원본 도형들을 검은색으로 (안 보이게 = 마스크에서 제외) -->
-        <!-- 얇은 요소 제거됨: {filtered_count}개, 유지됨: {kept_count}개 -->
-'''
-    new_mask_content += '\n'.join(filtered_paths) + '\n    '
-
-    # 원본 content에서 마스크 부분 교체
-    new_content = content[:mask_match.start()] + mask_start + new_mask_content + mask_end + content[mask_match.end():]
-
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with tracing.span("serialize"), open_svg_text(output_file, 'w') as f:
         f.write(new_content)
 
+    tracing.count("shapes_out", kept_count, stage="filter_thin_paths")
+    tracing.count_file("bytes_written", output_file, stage="filter_thin_paths")
+
     print(f"완료!")
     print(f"- 제거된 얇은 요소: {filtered_count}개")
     print(f"- 유지된 요소: {kept_count}개")
@@ -0,0 +1,310 @@
+"""
+열 단위(struct-of-arrays) 도형 저장소
+- 문서의 모든 도형을 배열 몇 개에 모아 둠 (도형마다 튜플 / ElementTree 요소 / numpy 배열을 따로 만들지 않음)
+  coords (P, 2) float64      모든 링의 꼭짓점 (transform을 적용한 문서 좌표)
+  ring_offsets (R + 1,)      링 r = coords[ring_offsets[r]:ring_offsets[r + 1]]
+  shape_offsets (N + 1,)     도형 i의 링 번호 = shape_offsets[i] ~ shape_offsets[i + 1] - 1
+  kind (N,) uint8            KINDS의 번호 (원본 태그)
+  circles (N, 3) float64     원으로 남는 도형의 (cx, cy, r), 나머지는 0 - 이런 원은 링이 없음
+  bbox (N, 4) float64        (min_x, min_y, max_x, max_y)
+  attr_ids (N,) int32        좌표 밖 속성(fill, stroke, fill-rule 등) 조합 번호 → attrs (같은 조합은 한 번만 저장)
+  matrix_ids (N,) int32      누적 transform 번호 → matrices (-1이면 없음)
+  sources                    원본 d / points 문자열 목록 (keep_source=True일 때, 아니면 None)
+- 도형 하나는 Shape(__slots__, 저장소 + 번호만 가짐), 여러 도형은 GeometryView(번호 배열)
+  → select / by_kind / where_attr는 번호 배열만 새로 만들고 좌표는 복사하지 않음
+- 읽는 규칙은 svg_geometry.walk_shapes와 같음 (그룹 / use transform 누적, 흰색 배경 제외)
+  원은 transform이 원을 유지하면 circles에, 아니면 32각형 링으로 저장
+
+사용 예:
+    store = GeometryStore.from_svg("inverted_output_mask.svg")
+    pads = store.view().by_kind("circle")
+    big = store.view().select(store.widths() > 1.0)
+    for shape in big:
+        print(shape.kind, shape.bbox, shape.get("fill"))
+"""
+
+import math
+from xml.etree import ElementTree as ET
+
+import numpy as np
+
+from svg_geometry import (load_templates, walk_shapes, element_rings, circles_to_rings,
+                          apply_matrix_point, is_similarity, segment_min_max)
+
+
+KINDS = ("path", "polygon", "polyline", "rect", "circle")
+KIND_CODES = {name: i for i, name in enumerate(KINDS)}
+# 좌표를 담는 속성 (attrs 표에는 넣지 않음)
+GEOMETRY_ATTRS = {"d", "points", "x", "y", "width", "height", "cx", "cy", "r", "transform", "id"}
+SOURCE_ATTRS = {"path": "d", "polygon": "points", "polyline": "points"}
+ELLIPSE_SEGMENTS = 32
+
+
+class Shape:
+    """저장소의 도형 하나를 가리키는 가벼운 뷰 (값은 필요할 때 열에서 읽음)"""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def kind(self):
+        return KINDS[self.store.kind[self.index]]
+
+    @property
+    def bbox(self):
+        return tuple(self.store.bbox[self.index].tolist())
+
+    @property
+    def circle(self):
+        """(cx, cy, r) - 원으로 저장된 도형이 아니면 None"""
+        c = self.store.circles[self.index]
+        return tuple(c.tolist()) if c[2] > 0 else None
+
+    @property
+    def rings(self):
+        """링 목록 (coords의 뷰)"""
+        return self.store.shape_rings(self.index)
+
+    @property
+    def attrs(self):
+        return self.store.attrs[self.store.attr_ids[self.index]]
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    @property
+    def matrix(self):
+        m = self.store.matrix_ids[self.index]
+        return self.store.matrices[m] if m >= 0 else None
+
+    @property
+    def source(self):
+        return self.store.sources[self.index] if self.store.sources is not None else None
+
+    def __repr__(self):
+        return f"<Shape {self.index} {self.kind} bbox={self.bbox}>"
+
+
+class GeometryView:
+    """저장소의 도형 일부 (번호 배열) - 선택 / 필터 결과, 좌표는 저장소와 공유"""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = np.asarray(index, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        store = self.store
+        return (Shape(store, i) for i in self.index.tolist())
+
+    def __getitem__(self, i):
+        return Shape(self.store, int(self.index[i]))
+
+    def select(self, which):
+        """
+        이 뷰 안에서 다시 고르기
+        which: 이 뷰 길이의 bool 배열 또는 이 뷰 안의 번호 배열
+        """
+        which = np.asarray(which)
+        if which.dtype == bool:
+            return GeometryView(self.store, self.index[which])
+        return GeometryView(self.store, self.index[which.astype(np.int64)])
+
+    def by_kind(self, *names):
+        codes = [KIND_CODES[n] for n in names]
+        return self.select(np.isin(self.store.kind[self.index], codes))
+
+    def where_attr(self, name, value):
+        """속성 값이 value인 도형 (속성 조합 표에서 먼저 찾고 번호로 비교)"""
+        ids = [i for i, attrs in enumerate(self.store.attrs) if attrs.get(name) == value]
+        return self.select(np.isin(self.store.attr_ids[self.index], ids))
+
+    @property
+    def bbox(self):
+        return self.store.bbox[self.index]
+
+    @property
+    def kind(self):
+        return self.store.kind[self.index]
+
+    def widths(self):
+        b = self.bbox
+        return b[:, 2] - b[:, 0]
+
+    def heights(self):
+        b = self.bbox
+        return b[:, 3] - b[:, 1]
+
+    def circle_array(self):
+        """원으로 저장된 도형들의 (M, 3) 배열"""
+        c = self.store.circles[self.index]
+        return c[c[:, 2] > 0]
+
+    def ring_counts(self):
+        offsets = self.store.shape_offsets
+        return offsets[self.index + 1] - offsets[self.index]
+
+    def ring_ids(self):
+        """뷰에 속한 링 번호 (도형 순서대로)"""
+        counts = self.ring_counts()
+        starts = np.repeat(self.store.shape_offsets[self.index], counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return starts + local
+
+    def rings(self):
+        """링 목록 - 각 링은 coords의 뷰 (복사 없음)"""
+        return self.store.rings_by_id(self.ring_ids())
+
+    def sources(self):
+        return [self.store.sources[i] for i in self.index.tolist()]
+
+
+class GeometryStore:
+    """도형 열(column) 저장소 - 구성은 모듈 설명 참고"""
+
+    def __init__(self, coords, ring_offsets, shape_offsets, kind, circles, bbox, attr_ids, attrs, matrix_ids,
+                 matrices, sources=None):
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.shape_offsets = shape_offsets
+        self.kind = kind
+        self.circles = circles
+        self.bbox = bbox
+        self.attr_ids = attr_ids
+        self.attrs = attrs
+        self.matrix_ids = matrix_ids
+        self.matrices = matrices
+        self.sources = sources
+
+    def __len__(self):
+        return len(self.kind)
+
+    def view(self):
+        """모든 도형"""
+        return GeometryView(self, np.arange(len(self)))
+
+    def shape(self, i):
+        return Shape(self, i)
+
+    def widths(self):
+        return self.bbox[:, 2] - self.bbox[:, 0]
+
+    def heights(self):
+        return self.bbox[:, 3] - self.bbox[:, 1]
+
+    def rings_by_id(self, ring_ids):
+        offsets = self.ring_offsets
+        coords = self.coords
+        return [coords[offsets[r]:offsets[r + 1]] for r in np.asarray(ring_ids).tolist()]
+
+    def shape_rings(self, i):
+        return self.rings_by_id(range(self.shape_offsets[i], self.shape_offsets[i + 1]))
+
+    def nbytes(self):
+        """배열 열들의 메모리 (속성 / 원본 문자열 제외)"""
+        return sum(a.nbytes for a in (self.coords, self.ring_offsets, self.shape_offsets, self.kind, self.circles,
+                                      self.bbox, self.attr_ids, self.matrix_ids))
+
+    @classmethod
+    def from_svg(cls, svg_path, keep_source=True):
+        return cls.from_root(ET.parse(svg_path).getroot(), keep_source)
+
+    @classmethod
+    def from_root(cls, root, keep_source=True):
+        """SVG 루트에서 그려지는 도형들을 읽어 저장소 생성 (svg_geometry.walk_shapes 순서)"""
+        kinds, circles, attr_ids, matrix_ids, ring_counts, sources = [], [], [], [], [], []
+        rings, ring_matrix = [], []
+        attr_table, attrs = {}, []
+        matrix_table, matrices = {}, []
+
+        for elem, tag, m in walk_shapes(root, load_templates(root)):
+            circle = (0.0, 0.0, 0.0)
+            if tag == "circle":
+                r = float(elem.get("r") or 0.0)
+                if r <= 0:
+                    continue
+                cx = float(elem.get("cx") or 0.0)
+                cy = float(elem.get("cy") or 0.0)
+                if m is None:
+                    circle, shape_rings = (cx, cy, r), []
+                elif m[:4] == (1.0, 0.0, 0.0, 1.0):
+                    circle, shape_rings = (cx + m[4], cy + m[5], r), []
+                elif is_similarity(m):
+                    circle = apply_matrix_point(m, cx, cy) + (r * math.sqrt(abs(m[0] * m[3] - m[1] * m[2])),)
+                    shape_rings = []
+                else:
+                    # 배율이 방향마다 다르면 타원 → 다각형
+                    shape_rings = circles_to_rings([(cx, cy, r)], segments=ELLIPSE_SEGMENTS)
+            else:
+                shape_rings = element_rings(elem, tag)
+                if not shape_rings:
+                    continue
+
+            key = tuple([kv for kv in elem.attrib.items() if kv[0] not in GEOMETRY_ATTRS])
+            aid = attr_table.get(key)
+            if aid is None:
+                # 속성 순서만 다른 조합은 같은 번호
+                canonical = tuple(sorted(key))
+                aid = attr_table.get(canonical)
+                if aid is None:
+                    aid = attr_table[canonical] = len(attrs)
+                    attrs.append(dict(canonical))
+                attr_table[key] = aid
+            mid = -1
+            if m is not None:
+                mid = matrix_table.get(m)
+                if mid is None:
+                    mid = matrix_table[m] = len(matrices)
+                    matrices.append(m)
+
+            kinds.append(KIND_CODES[tag])
+            circles.append(circle)
+            attr_ids.append(aid)
+            matrix_ids.append(mid)
+            ring_counts.append(len(shape_rings))
+            rings.extend(shape_rings)
+            # 원으로 남은 도형은 이미 문서 좌표, 링은 아래에서 한 번에 변환
+            ring_matrix.extend([mid] * len(shape_rings))
+            if keep_source:
+                sources.append(elem.get(SOURCE_ATTRS[tag]) if tag in SOURCE_ATTRS else None)
+
+        ring_lengths = np.array([len(r) for r in rings], dtype=np.int64)
+        ring_offsets = np.concatenate([[0], np.cumsum(ring_lengths)])
+        coords = np.concatenate(rings) if rings else np.zeros((0, 2))
+        ring_matrix = np.array(ring_matrix, dtype=np.int32)
+        if matrices and len(coords):
+            # 점마다 행렬 계수를 모아 한 번에 변환 (use마다 행렬이 달라도 행렬 수만큼 반복하지 않음)
+            table = np.array(matrices + [(1.0, 0.0, 0.0, 1.0, 0.0, 0.0)], dtype=np.float64)
+            a, b, c, d, e, f = table[np.repeat(ring_matrix, ring_lengths)].T
+            x, y = coords[:, 0].copy(), coords[:, 1]
+            coords[:, 0] = a * x + c * y + e
+            coords[:, 1] = b * x + d * y + f
+
+        kind = np.array(kinds, dtype=np.uint8)
+        circles = np.array(circles, dtype=np.float64).reshape(-1, 3)
+        ring_counts = np.array(ring_counts, dtype=np.int64)
+        shape_offsets = np.concatenate([[0], np.cumsum(ring_counts)])
+        bbox = shape_bboxes(coords, ring_lengths, ring_counts, circles)
+        return cls(coords, ring_offsets, shape_offsets, kind, circles, bbox,
+                   np.array(attr_ids, dtype=np.int32), attrs, np.array(matrix_ids, dtype=np.int32), matrices,
+                   sources if keep_source else None)
+
+
+def shape_bboxes(coords, ring_lengths, ring_counts, circles):
+    """도형별 bbox - 링이 있는 도형은 꼭짓점 범위, 원은 중심 ± 반지름"""
+    shape_points = np.bincount(np.repeat(np.arange(len(ring_counts)), ring_counts), weights=ring_lengths,
+                               minlength=len(ring_counts)).astype(np.int64)
+    min_x, max_x = segment_min_max(coords[:, 0], shape_points)
+    min_y, max_y = segment_min_max(coords[:, 1], shape_points)
+    bbox = np.stack([min_x, min_y, max_x, max_y], axis=1)
+    round_ = circles[:, 2] > 0
+    c = circles[round_]
+    bbox[round_] = np.stack([c[:, 0] - c[:, 2], c[:, 1] - c[:, 2], c[:, 0] + c[:, 2], c[:, 1] + c[:, 2]], axis=1)
+    return bbox
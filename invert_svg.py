@@ -10,102 +10,260 @@ import re
 from xml.etree import ElementTree as ET
 import sys
 
+from svg_transform import matrix_to_attr
+from svg_writer import SvgWriter, read_svg_text, rings_to_path_d
+import memory_budget
+import tracing
 
-def invert_svg(input_file, output_file, background_color="#ffffff", inverted_color="#000000"):
+# 곡선 명령이 있는 path는 링으로 바꾸면 모양이 달라지므로 compound path에 넣지 않음
+CURVE_CMD_RE = re.compile(r"[CcSsQqTtAa]")
+
+
+@tracing.traced("invert_svg")
+def invert_svg(input_file, output_file, background_color="#ffffff", inverted_color="#000000",
+               precision=4, relative=False, compound_paths=None, outline=None):
     """
     SVG 파일을 반전시킵니다.
 
     Args:
         input_file: 입력 SVG 파일 경로
-        output_file: 출력 SVG 파일 경로
+        output_file: 출력 SVG 파일 경로 (.svgz면 gzip 압축)
         background_color: 반전된 영역의 색상 (기본: 흰색)
         inverted_color: 원래 도형이 있던 영역의 색상 (기본: 검은색 - 투명하게 만들어짐)
+        precision: 출력 좌표의 소수 자리수 (None이면 원본 그대로)
+        relative: path를 상대 좌표 명령으로 출력 (bbox를 정규식으로 읽는 후속 단계에는 사용하지 말 것)
+        compound_paths: 지정하면 마스크 도형들을 최대 이 개수의 compound path(fill-rule: nonzero)로 묶음
+                        (렌더링용 - 도형별 path를 읽는 후속 단계에는 사용하지 말 것)
+        outline: 보드 외곽선 링 목록 (board_outline.load_board_outline) - 지정하면 viewBox 사각형 대신
+                 외곽선 안쪽만 채우고, 외곽선 밖에 완전히 있는 도형은 마스크에서 제외
     """
 
-    # SVG 파일 읽기
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # viewBox와 width/height 추출
-    viewbox_match = re.search(r'viewBox="([^"]+)"', content)
-    width_match = re.search(r'width="([^"]+)"', content)
-    height_match = re.search(r'height="([^"]+)"', content)
-
-    if viewbox_match:
-        viewbox = viewbox_match.group(1)
-        vb_parts = viewbox.split()
-        vb_x, vb_y, vb_width, vb_height = float(vb_parts[0]), float(vb_parts[1]), float(vb_parts[2]), float(vb_parts[3])
-    else:
-        vb_x, vb_y = 0, 0
-        vb_width = float(width_match.group(1).replace('mm', '').replace('px', '')) if width_match else 100
-        vb_height = float(height_match.group(1).replace('mm', '').replace('px', '')) if height_match else 100
-
-    width = width_match.group(1) if width_match else str(vb_width)
-    height = height_match.group(1) if height_match else str(vb_height)
-
-    # 모든 path 요소와 circle, rect 등의 도형 요소 추출
-    paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', content)
-    circles = re.findall(r'<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>', content)
-
-    # use 요소에서 참조하는 도형도 처리
-    uses = re.findall(r'<use[^>]*xlink:href="#([^"]+)"[^>]*x="([^"]+)"[^>]*y="([^"]+)"[^>]*/>', content)
-
-    # defs에서 정의된 도형들 추출
-    defs_circles = {}
-    defs_match = re.search(r'<defs>(.*?)</defs>', content, re.DOTALL)
-    if defs_match:
-        defs_content = defs_match.group(1)
-        # g 요소 안의 circle 추출
-        g_patterns = re.findall(r'<g id="([^"]+)">\s*<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>\s*</g>', defs_content)
-        for g_id, cx, cy, r in g_patterns:
-            defs_circles[g_id] = (float(cx), float(cy), float(r))
-
-    # 반전된 SVG 생성
-    inverted_svg = f'''<?xml version="1.0" encoding="UTF-8"?>
+    with tracing.span("parse"):
+        # SVG 파일 읽기
+        content = read_svg_text(input_file)
+        memory_budget.buffer("svg_text", content)
+
+        # viewBox와 width/height 추출
+        viewbox_match = re.search(r'viewBox="([^"]+)"', content)
+        width_match = re.search(r'width="([^"]+)"', content)
+        height_match = re.search(r'height="([^"]+)"', content)
+
+        if viewbox_match:
+            viewbox = viewbox_match.group(1)
+            vb_parts = viewbox.split()
+            vb_x, vb_y, vb_width, vb_height = float(vb_parts[0]), float(vb_parts[1]), float(vb_parts[2]), float(vb_parts[3])
+        else:
+            vb_x, vb_y = 0, 0
+            vb_width = float(width_match.group(1).replace('mm', '').replace('px', '')) if width_match else 100
+            vb_height = float(height_match.group(1).replace('mm', '').replace('px', '')) if height_match else 100
+
+        width = width_match.group(1) if width_match else str(vb_width)
+        height = height_match.group(1) if height_match else str(vb_height)
+
+        # 모든 path 요소와 circle, rect 등의 도형 요소 추출
+        paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', content)
+        circles = re.findall(r'<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>', content)
+
+        # use 요소에서 참조하는 도형도 처리
+        uses = re.findall(r'<use[^>]*xlink:href="#([^"]+)"[^>]*x="([^"]+)"[^>]*y="([^"]+)"[^>]*/>', content)
+
+        # defs에서 정의된 도형들 추출
+        defs_circles = {}
+        defs_match = re.search(r'<defs>(.*?)</defs>', content, re.DOTALL)
+        if defs_match:
+            defs_content = defs_match.group(1)
+            # g 요소 안의 circle 추출
+            g_patterns = re.findall(r'<g id="([^"]+)">\s*<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>\s*</g>', defs_content)
+            for g_id, cx, cy, r in g_patterns:
+                defs_circles[g_id] = (float(cx), float(cy), float(r))
+
+        # transform이 있으면 정규식 대신 트리를 따라가며 그룹/use/요소의 transform을 누적해서 읽음
+        transforms = None
+        if 'transform=' in content:
+            paths, transforms, circles = read_transformed_shapes(content)
+            uses = []
+
+    tracing.count("paths_in", len(paths), stage="invert_svg")
+    tracing.count("circles_in", len(circles) + len(uses), stage="invert_svg")
+
+    # 보드 외곽선 밖에 완전히 있는 도형은 마스크에 넣지 않음 (bbox prefilter)
+    with tracing.span("compute"):
+        dropped = 0
+        if outline is not None:
+            # 외곽선 처리에만 numpy가 필요 → 외곽선이 있을 때만 불러옴 (CLI 시작 시간)
+            from board_outline import path_overlap_mask, circle_overlap_mask
+            total = len(paths) + len(circles) + len(uses)
+            keep = path_overlap_mask(paths, outline, transforms).tolist()
+            paths = [d for d, k in zip(paths, keep) if k]
+            if transforms:
+                transforms = [m for m, k in zip(transforms, keep) if k]
+            keep = circle_overlap_mask([(float(cx), float(cy), float(r)) for cx, cy, r in circles], outline).tolist()
+            circles = [c for c, k in zip(circles, keep) if k]
+            use_circles = [(defs_circles[ref_id][0] + float(x), defs_circles[ref_id][1] + float(y), defs_circles[ref_id][2])
+                           if ref_id in defs_circles else (0.0, 0.0, 0.0) for ref_id, x, y in uses]
+            keep = circle_overlap_mask(use_circles, outline).tolist()
+            uses = [u for u, k in zip(uses, keep) if k or u[0] not in defs_circles]
+            dropped = total - len(paths) - len(circles) - len(uses)
+
+    # 외곽선: 배경 사각형을 외곽 링으로 자르고(clipPath), 구멍은 마스크에서 검은색으로 가림
+    outline_clip, outline_holes, clip_attr = "", "", ""
+    if outline is not None:
+        from board_outline import outline_svg_defs
+        outline_clip, outline_holes = outline_svg_defs(outline, precision if precision is not None else 8)
+        clip_attr = ' clip-path="url(#board-outline)"'
+
+    # 반전된 SVG 생성 (요소를 만들 때마다 바로 파일에 씀)
+    with tracing.span("serialize"), SvgWriter(output_file, precision=precision, relative=relative) as w:
+        w.write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
      width="{width}" height="{height}" viewBox="{vb_x} {vb_y} {vb_width} {vb_height}">
 <defs>
-    <!-- 원본 도형들을 마스크로 정의 -->
+{outline_clip}    <!-- 원본 도형들을 마스크로 정의 -->
     <mask id="inverted-mask">
         <!-- 전체 영역을 흰색으로 (보이게) -->
         <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" fill="white"/>
-        
+{outline_holes}        
         <!-- 원본 도형들을 검은색으로 (안 보이게 = 마스크에서 제외) -->
-'''
-
-    # Path 요소들을 마스크에 추가
-    for path_d in paths:
-        inverted_svg += f'        <path d="{path_d}" fill="black"/>\n'
-
-    # Circle 요소들을 마스크에 추가
-    for cx, cy, r in circles:
-        if float(r) > 0:  # 반지름이 0보다 큰 경우만
-            inverted_svg += f'        <circle cx="{cx}" cy="{cy}" r="{r}" fill="black"/>\n'
-
-    # Use 요소에서 참조된 도형들을 마스크에 추가
-    for ref_id, x, y in uses:
-        if ref_id in defs_circles:
-            cx, cy, r = defs_circles[ref_id]
-            if r > 0:
-                actual_cx = cx + float(x)
-                actual_cy = cy + float(y)
-                inverted_svg += f'        <circle cx="{actual_cx}" cy="{actual_cy}" r="{r}" fill="black"/>\n'
-
-    inverted_svg += f'''    </mask>
+''')
+
+        if compound_paths:
+            shape_circles = [(float(cx), float(cy), float(r)) for cx, cy, r in circles]
+            for ref_id, x, y in uses:
+                if ref_id in defs_circles:
+                    cx, cy, r = defs_circles[ref_id]
+                    shape_circles.append((cx + float(x), cy + float(y), r))
+            write_compound_mask(w, paths, shape_circles, compound_paths, indent="        ", transforms=transforms)
+            paths, circles, uses = [], [], []
+
+        # Path 요소들을 마스크에 추가
+        for i, path_d in enumerate(paths):
+            m = transforms[i] if transforms else None
+            w.path(path_d, indent="        ", fill="black", transform=matrix_to_attr(m) if m else None)
+
+        # Circle 요소들을 마스크에 추가
+        for cx, cy, r in circles:
+            if float(r) > 0:  # 반지름이 0보다 큰 경우만
+                w.circle(cx, cy, r, indent="        ", fill="black")
+
+        # Use 요소에서 참조된 도형들을 마스크에 추가
+        for ref_id, x, y in uses:
+            if ref_id in defs_circles:
+                cx, cy, r = defs_circles[ref_id]
+                if r > 0:
+                    actual_cx = cx + float(x)
+                    actual_cy = cy + float(y)
+                    w.circle(actual_cx, actual_cy, r, indent="        ", fill="black")
+
+        w.write(f'''    </mask>
 </defs>
 
 <!-- 마스크를 적용한 배경 사각형 - 원본 도형이 없던 부분만 보임 -->
 <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" 
-      fill="{background_color}" mask="url(#inverted-mask)"/>
-</svg>'''
-
-    # 결과 저장
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(inverted_svg)
+      fill="{background_color}" mask="url(#inverted-mask)"{clip_attr}/>
+</svg>''')
 
+    tracing.count("shapes_out", w.count, stage="invert_svg")
+    tracing.count_file("bytes_written", output_file, stage="invert_svg")
     print(f"반전된 SVG가 '{output_file}'에 저장되었습니다.")
+    if outline is not None:
+        print(f"- 보드 외곽선 적용: 외곽선 밖 도형 {dropped}개 제외")
     print(f"- 원본에서 도형이 있던 부분: 투명 (빈 공간)")
     print(f"- 원본에서 빈 공간이었던 부분: {background_color} 색상으로 채워짐")
+    if compound_paths:
+        print(f"- 마스크 path 개수: {w.count}개 (compound path 최대 {compound_paths}개)")
+
+
+def read_transformed_shapes(content):
+    """
+    transform이 있는 SVG에서 마스크에 넣을 도형 읽기
+
+    Returns:
+        paths: path d 문자열 목록 (rect / polygon도 path로 변환)
+        transforms: path별 누적 행렬 (없으면 None)
+        circles: (cx, cy, r) 목록 - 원이 유지되는 transform은 중심/반지름에 바로 적용
+    """
+    from svg_geometry import (load_templates, walk_shapes, element_rings, circles_to_rings, apply_matrix,
+                              apply_matrix_point, is_similarity)
+
+    root = ET.fromstring(content)
+    paths, transforms, circles = [], [], []
+    for elem, tag, m in walk_shapes(root, load_templates(root)):
+        if tag == "path":
+            paths.append(elem.get("d") or "")
+            transforms.append(m)
+        elif tag == "circle":
+            cx, cy, r = (float(elem.get(k) or 0.0) for k in ("cx", "cy", "r"))
+            if r <= 0:
+                continue
+            if m is None:
+                circles.append((cx, cy, r))
+            elif is_similarity(m):
+                a, b, c, d = m[:4]
+                circles.append(apply_matrix_point(m, cx, cy) + (r * abs(a * d - b * c) ** 0.5,))
+            else:
+                # 배율이 방향마다 다르면 타원이 되므로 다각형 path로 출력
+                paths.append(rings_to_path_d([apply_matrix(circles_to_rings([(cx, cy, r)], 32)[0], m)], 8))
+                transforms.append(None)
+        else:
+            rings = element_rings(elem, tag)
+            if rings:
+                paths.append(rings_to_path_d(rings, 8))
+                transforms.append(m)
+    return paths, transforms, circles
+
+
+def write_compound_mask(w, paths, circles, max_paths, indent="", transforms=None):
+    """
+    마스크 도형들을 최대 max_paths개의 compound path로 묶어서 출력
+    - 모든 링을 넓이가 양수인 방향으로 맞춘 뒤(구멍만 반대 방향) nonzero 규칙으로 채움
+      → 겹치는 도형은 winding이 더해질 뿐 상쇄되지 않음 (evenodd로 합치면 겹친 부분이 비게 됨)
+    - 도형 중심 기준으로 띠(band) 단위 정렬 후 나누어, 각 path가 보드의 가까운 영역만 덮도록 함
+    - 곡선이 있는 path는 원래 d 그대로 (transform 속성과 함께) 따로 출력
+    - transforms: path별 누적 행렬 - 링 좌표에 행렬 곱으로 적용
+    """
+    import numpy as np
+
+    from svg_geometry import path_to_rings, normalize_windings, apply_matrix
+
+    shapes = []
+    for i, path_d in enumerate(paths):
+        m = transforms[i] if transforms else None
+        if CURVE_CMD_RE.search(path_d):
+            w.path(path_d, indent=indent, fill="black", transform=matrix_to_attr(m) if m else None)
+            continue
+        # 닫는 점(시작점과 같은 마지막 점)은 Z가 대신하므로 제거
+        rings = [ring[:-1] if np.array_equal(ring[0], ring[-1]) else ring for ring in path_to_rings(path_d)]
+        rings = [ring for ring in rings if len(ring) >= 3]
+        if rings and m is not None:
+            lengths = np.cumsum([len(r) for r in rings])[:-1]
+            rings = np.split(apply_matrix(np.concatenate(rings), m), lengths)
+        if rings:
+            shapes.append(normalize_windings(rings))
+
+    circles = np.array([c for c in circles if c[2] > 0], dtype=np.float64).reshape(-1, 3)
+    total = len(shapes) + len(circles)
+    if total == 0:
+        return
+
+    centers = np.zeros((total, 2))
+    for i, rings in enumerate(shapes):
+        pts = np.concatenate(rings)
+        centers[i] = (pts.min(axis=0) + pts.max(axis=0)) / 2.0
+    centers[len(shapes):] = circles[:, :2]
+
+    groups = max(1, min(int(max_paths), total))
+    bands = max(1, int(np.ceil(np.sqrt(groups))))
+    lo = centers.min(axis=0)
+    span = np.maximum(centers.max(axis=0) - lo, 1e-12)
+    band = np.minimum(((centers[:, 1] - lo[1]) / span[1] * bands).astype(np.int64), bands - 1)
+    # 띠마다 x 방향이 번갈아 가도록 정렬 (잘린 구간이 띠 경계에서 멀리 튀지 않게)
+    x_key = np.where(band % 2 == 0, centers[:, 0], -centers[:, 0])
+    order = np.lexsort((x_key, band))
+
+    for chunk in np.array_split(order, groups):
+        rings = [ring for i in chunk if i < len(shapes) for ring in shapes[i]]
+        chunk_circles = circles[chunk[chunk >= len(shapes)] - len(shapes)]
+        w.compound_path(rings, chunk_circles.tolist(), indent=indent, fill="black", fill_rule="nonzero")
 
 
 def invert_svg_simple(input_file, output_file, fill_color="#000000"):
@@ -167,7 +325,12 @@ if __name__ == "__main__":
     print("=" * 50)
     print("SVG 반전 (마스크 방식)")
     print("=" * 50)
-    invert_svg(input_file, output_file_mask, background_color="#288f28")
+    # --outline <Gerber 외곽 레이어>: viewBox 대신 실제 보드 외곽선 안쪽만 반전
+    outline = None
+    if '--outline' in sys.argv:
+        from board_outline import load_board_outline
+        outline = load_board_outline(sys.argv[sys.argv.index('--outline') + 1])
+    invert_svg(input_file, output_file_mask, background_color="#288f28", outline=outline)
 
     print("\n" + "=" * 50)
     print("SVG 반전 (fill-rule: evenodd 방식)")
@@ -0,0 +1,262 @@
+"""
+레이어 간 구리 겹침 분석 스크립트 (예: 윗면 GTL / 아랫면 GBL을 SVG로 변환한 파일들)
+- 모든 레이어를 같은 원점 / 같은 배율의 캔버스에 래스터화 (레이어별 프로세스에서 병렬 처리)
+- 래스터는 np.packbits로 1픽셀 = 1비트 마스크로만 보관 (RGBA 이미지는 만들지 않음)
+- 인접한 레이어 쌍마다 비트 연산으로 지도 계산:
+  - overlap: 두 레이어 모두 구리 (A & B)
+  - uncovered: 신호 레이어(A)의 구리 아래에 기준 레이어(B) 구리가 없는 부분 (A & ~B)
+  - void: 기준 레이어(B)의 빈 공간 중 A의 구리 아래를 지나는 성분 전체 (신호의 귀환 경로를 끊는 구멍)
+- 결과: 쌍별 넓이(mm²)와 uncovered / void 영역 위치(bbox, 중심) JSON, 선택적으로 지도 PNG
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree as ET
+
+import numpy as np
+from PIL import Image
+from scipy import ndimage
+
+from board_outline import load_board_outline
+from raster_mask import rasterize_shapes, rasterize_outline, pixel_to_board
+from svg_geometry import read_svg_shapes
+from test import parse_viewbox
+
+
+# 바이트 값별 1비트 개수 (packbits 마스크의 넓이 계산용)
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def bit_count(packed):
+    """packbits 마스크의 True 픽셀 수"""
+    return int(POPCOUNT[packed].sum(dtype=np.int64))
+
+
+def parse_layer_arg(arg):
+    """'파일.svg' 또는 '파일.svg@dx,dy' (레이어별 원점 보정) → (파일, (dx, dy))"""
+    if "@" in arg:
+        path, offset = arg.rsplit("@", 1)
+        dx, dy = (float(v) for v in offset.split(","))
+        return path, (dx, dy)
+    return arg, (0.0, 0.0)
+
+
+def shared_canvas(layers, scale):
+    """
+    모든 레이어의 viewBox(보정 후)를 덮는 공통 캔버스
+
+    Returns:
+        vb: (x, y, w, h), out_w, out_h
+    """
+    boxes = []
+    for path, (dx, dy) in layers:
+        root = read_svg_root(path)
+        vb = parse_viewbox(root)
+        if vb is None:
+            raise ValueError(f"viewBox가 없는 SVG입니다: {path}")
+        boxes.append((vb[0] + dx, vb[1] + dy, vb[0] + dx + vb[2], vb[1] + dy + vb[3]))
+    boxes = np.array(boxes)
+    x0, y0 = boxes[:, :2].min(axis=0)
+    x1, y1 = boxes[:, 2:].max(axis=0)
+    out_w = max(1, int(round((x1 - x0) * scale)))
+    out_h = max(1, int(round((y1 - y0) * scale)))
+    return (float(x0), float(y0), float(x1 - x0), float(y1 - y0)), out_w, out_h
+
+
+def read_svg_root(path):
+    """루트 요소만 필요할 때 - 첫 태그까지만 읽음"""
+    with open(path, "rb") as f:
+        for _, elem in ET.iterparse(f, events=("start",)):
+            return elem
+    raise ValueError(f"SVG를 읽을 수 없습니다: {path}")
+
+
+def rasterize_layer(task):
+    """레이어 하나를 공통 캔버스에 래스터화해서 packbits 마스크로 반환 (프로세스 작업 단위)"""
+    path, (dx, dy), vb, out_w, out_h = task
+    _, polygons, circles = read_svg_shapes(path)
+    if dx or dy:
+        shift = np.array([dx, dy])
+        polygons = [ring + shift for ring in polygons]
+        if len(circles):
+            circles = circles.copy()
+            circles[:, :2] += shift
+    return np.packbits(rasterize_shapes(polygons, circles, vb, out_w, out_h), axis=1)
+
+
+def rasterize_layers(layers, vb, out_w, out_h, workers=None):
+    """모든 레이어를 병렬로 래스터화 (workers=1이면 현재 프로세스에서 순서대로)"""
+    tasks = [(path, offset, vb, out_w, out_h) for path, offset in layers]
+    if workers == 1 or len(tasks) == 1:
+        return [rasterize_layer(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(rasterize_layer, tasks))
+
+
+def region_report(mask, vb, out_w, out_h, scale, min_area, limit):
+    """
+    bool 마스크의 연결 성분별 넓이 / 위치 (넓이 큰 순서, min_area 미만 제외)
+    """
+    labels, count = ndimage.label(mask, structure=np.ones((3, 3), dtype=bool))
+    if count == 0:
+        return []
+    px_area = 1.0 / (scale * scale)
+    index = np.arange(1, count + 1)
+    areas = np.bincount(labels.ravel(), minlength=count + 1)[1:] * px_area
+    centers = ndimage.center_of_mass(mask, labels, index)
+    objects = ndimage.find_objects(labels)
+
+    regions = []
+    for i in np.argsort(-areas, kind="stable"):
+        if areas[i] < min_area or len(regions) >= limit:
+            break
+        sl = objects[i]
+        cx, cy = pixel_to_board(centers[i][1], centers[i][0], vb, out_w, out_h)
+        x0, y0 = pixel_to_board(sl[1].start - 0.5, sl[0].start - 0.5, vb, out_w, out_h)
+        x1, y1 = pixel_to_board(sl[1].stop - 0.5, sl[0].stop - 0.5, vb, out_w, out_h)
+        regions.append({
+            "area": round(float(areas[i]), 4),
+            "center": [round(float(cx), 4), round(float(cy), 4)],
+            "bbox": [round(float(x0), 4), round(float(y0), 4), round(float(x1), 4), round(float(y1), 4)],
+        })
+    return regions
+
+
+def reference_voids(signal, reference_free):
+    """
+    기준 레이어 빈 공간(reference_free)의 연결 성분 중 신호 구리(signal)와 겹치는 성분 전체
+    (packbits 입력 / 출력)
+    """
+    free = np.unpackbits(reference_free, axis=1).view(bool)
+    labels, count = ndimage.label(free, structure=np.ones((3, 3), dtype=bool))
+    hit_labels = labels[np.unpackbits(signal & reference_free, axis=1).view(bool)]
+    hit = np.zeros(count + 1, dtype=bool)
+    hit[hit_labels] = True
+    hit[0] = False
+    return np.packbits(hit[labels], axis=1)
+
+
+def pair_maps(a, b, board):
+    """
+    레이어 A(신호) / B(기준) packbits 마스크로 지도 계산 (모두 packbits)
+    board: 보드 안쪽 마스크 (없으면 None)
+    """
+    overlap = a & b
+    b_free = ~b if board is None else board & ~b
+    uncovered = a & b_free
+    void = reference_voids(a, b_free)
+    return overlap, uncovered, void
+
+
+def save_map_png(path, a, b, overlap, uncovered, void, out_w):
+    """지도 PNG: A 구리(어두운 초록), B 구리(어두운 파랑), 겹침(회색), void(노랑), uncovered(빨강)"""
+    def unpack(m):
+        return np.unpackbits(m, axis=1, count=out_w).view(bool)
+
+    h = a.shape[0]
+    rgb = np.zeros((h, out_w, 3), dtype=np.uint8)
+    rgb[unpack(a)] = (0, 90, 0)
+    rgb[unpack(b)] = (0, 0, 110)
+    rgb[unpack(overlap)] = (120, 120, 120)
+    rgb[unpack(void)] = (200, 170, 0)
+    rgb[unpack(uncovered)] = (255, 0, 0)
+    Image.fromarray(rgb, "RGB").save(path)
+
+
+def layer_overlap(layer_args, output_json, scale=10, outline=None, min_area=0.01, limit=200,
+                  png_prefix=None, workers=None):
+    """
+    인접한 레이어 쌍마다 겹침 / 기준면 없는 신호 / 기준면 구멍 분석
+
+    Args:
+        layer_args: 적층 순서대로 레이어 SVG ('파일.svg' 또는 '파일.svg@dx,dy')
+        output_json: 결과 JSON
+        scale: viewBox 1단위당 픽셀 수 (모든 레이어 공통)
+        outline: 보드 외곽선 링 목록 - 지정하면 외곽선 밖은 기준면 빈 공간에서 제외
+        min_area: 보고할 최소 영역 넓이 (mm²)
+        limit: 쌍 / 지도별 최대 보고 영역 수
+        png_prefix: 지정하면 쌍별 지도 PNG 저장
+        workers: 래스터화 프로세스 수 (None이면 CPU 수)
+    """
+    layers = [parse_layer_arg(a) for a in layer_args]
+    if len(layers) < 2:
+        raise ValueError("레이어가 2개 이상 필요합니다.")
+
+    vb, out_w, out_h = shared_canvas(layers, scale)
+    masks = rasterize_layers(layers, vb, out_w, out_h, workers)
+    print(f"공통 캔버스: {out_w}x{out_h} (viewBox {vb[0]:.4f} {vb[1]:.4f} {vb[2]:.4f} {vb[3]:.4f})")
+
+    # 마지막 바이트의 남는 비트(캔버스 폭이 8의 배수가 아닐 때)는 ~ 연산에서 켜지지 않도록 보드 마스크로 막음
+    board = np.packbits(np.ones((out_h, out_w), dtype=bool), axis=1)
+    if outline is not None:
+        board = np.packbits(rasterize_outline(outline, vb, out_w, out_h), axis=1)
+
+    px_area = 1.0 / (scale * scale)
+    report = {
+        "layers": [{"file": p, "offset": list(o), "copper_area": round(bit_count(m) * px_area, 4)}
+                   for (p, o), m in zip(layers, masks)],
+        "scale": scale,
+        "viewBox": list(vb),
+        "board_area": round(bit_count(board) * px_area, 4),
+        "pairs": [],
+    }
+
+    for i in range(len(layers) - 1):
+        for s, r in ((i, i + 1), (i + 1, i)):
+            a, b = masks[s], masks[r]
+            overlap, uncovered, void = pair_maps(a, b, board)
+            name_a = os.path.splitext(os.path.basename(layers[s][0]))[0]
+            name_b = os.path.splitext(os.path.basename(layers[r][0]))[0]
+            entry = {
+                "signal": layers[s][0],
+                "reference": layers[r][0],
+                "overlap_area": round(bit_count(overlap) * px_area, 4),
+                "uncovered_area": round(bit_count(uncovered) * px_area, 4),
+                "void_area": round(bit_count(void) * px_area, 4),
+                "uncovered_regions": region_report(np.unpackbits(uncovered, axis=1, count=out_w).view(bool),
+                                                   vb, out_w, out_h, scale, min_area, limit),
+                "void_regions": region_report(np.unpackbits(void, axis=1, count=out_w).view(bool),
+                                              vb, out_w, out_h, scale, min_area, limit),
+            }
+            if png_prefix:
+                entry["png"] = f"{png_prefix}_{name_a}_over_{name_b}.png"
+                save_map_png(entry["png"], a, b, overlap, uncovered, void, out_w)
+            report["pairs"].append(entry)
+            print(f"- {name_a} → {name_b}: 겹침 {entry['overlap_area']:.2f}mm², "
+                  f"기준면 없는 신호 {entry['uncovered_area']:.2f}mm² ({len(entry['uncovered_regions'])}곳), "
+                  f"기준면 구멍 {entry['void_area']:.2f}mm² ({len(entry['void_regions'])}곳)")
+
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"완료! 리포트: {output_json}")
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("layers", nargs="+", help="적층 순서대로 레이어 SVG (파일.svg 또는 파일.svg@dx,dy)")
+    p.add_argument("--json", default="layer_overlap.json")
+    p.add_argument("--scale", type=float, default=10)
+    p.add_argument("--outline", default=None, help="보드 외곽선 Gerber (.GML 등)")
+    p.add_argument("--min_area", type=float, default=0.01)
+    p.add_argument("--limit", type=int, default=200)
+    p.add_argument("--png_prefix", default=None)
+    p.add_argument("--workers", type=int, default=None)
+    args = p.parse_args()
+
+    layer_overlap(
+        args.layers,
+        args.json,
+        scale=args.scale,
+        outline=load_board_outline(args.outline) if args.outline else None,
+        min_area=args.min_area,
+        limit=args.limit,
+        png_prefix=args.png_prefix,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
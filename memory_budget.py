@@ -0,0 +1,359 @@
+"""
+단계별 메모리 측정 / 메모리 예산 모듈
+- 측정: tracing의 span(단계, parse / compute / rasterize / serialize, 타일)마다
+  tracemalloc 최대치와 RSS(시작 / 끝 / 최대)를 기록 → JSON 리포트
+- buffer(name, obj): 큰 버퍼(numpy 배열, PIL 이미지, XML 트리, 출력 문자열)의 크기를 현재 span에 기록
+- 예산: 큰 버퍼를 만들기 전에 fits(stage, 예상 bytes)로 검사
+  → 넘으면 타일 / 스트리밍 모드로 전환(가능한 단계, policy=tile) 또는 MemoryBudgetExceeded로 바로 실패
+- 예산 검사는 측정을 켜지 않아도 동작 (현재 RSS + 예상 크기 ≤ 예산)
+
+기존 스크립트를 그대로 실행하면서 켜기 (환경 변수):
+    EMI_MEMORY=memory.json python remove_enclosed_raster.py
+    EMI_MEMORY_BUDGET_MB=2048 EMI_MEMORY_POLICY=fail python test.py big.svg mask.png
+    (EMI_MEMORY 경로의 {pid}는 프로세스 번호로 바뀜)
+"""
+
+import atexit
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+import tracing
+
+
+MB = 1024 * 1024
+# ElementTree 트리 메모리 / SVG 파일 크기 (output.svg, inverted_output_mask.svg에서 측정한 값 약 6.3 ~ 7.6배)
+XML_TREE_FACTOR = 8
+POLICIES = ("tile", "fail")
+
+_budget = None
+_policy = "tile"
+_tracker = None
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """예산을 넘는 버퍼를 만들려고 할 때 (타일 모드로 전환할 수 없는 경우)"""
+
+    def __init__(self, stage, needed, available):
+        self.stage = stage
+        self.needed = needed
+        self.available = available
+        super().__init__(f"{stage}: 필요 {needed / MB:.1f}MB > 남은 예산 {available / MB:.1f}MB")
+
+
+def rss_bytes():
+    """현재 RSS (Linux가 아니면 최대 RSS로 대신함)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    """최대 RSS (Linux는 reset_rss_peak 이후의 최대값)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            m = re.search(r"VmHWM:\s+(\d+)\s+kB", f.read())
+        if m:
+            return int(m.group(1)) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_rss_peak():
+    """최대 RSS를 현재 RSS로 되돌림 (Linux /proc/self/clear_refs, 안 되면 False)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def sizeof(obj):
+    """
+    큰 버퍼의 대략적인 메모리 크기 (bytes)
+    - numpy 배열: nbytes, PIL 이미지: 폭 x 높이 x 채널, bytes / str: sys.getsizeof
+    - ElementTree 트리 / 요소: 요소, 속성, 텍스트 크기의 합
+    - list / tuple / dict: 항목들의 합
+    """
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if hasattr(obj, "getbands") and hasattr(obj, "size"):
+        w, h = obj.size
+        return w * h * len(obj.getbands())
+    if isinstance(obj, (bytes, bytearray, str, memoryview)):
+        return sys.getsizeof(obj)
+    if hasattr(obj, "getroot"):
+        obj = obj.getroot()
+    if hasattr(obj, "iter") and hasattr(obj, "attrib"):
+        total = 0
+        for el in obj.iter():
+            total += sys.getsizeof(el) + sys.getsizeof(el.attrib)
+            total += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in el.attrib.items())
+            if el.text:
+                total += sys.getsizeof(el.text)
+        return total
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(sizeof(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class _Frame:
+    __slots__ = ("record", "outer_peak", "child_peak", "child_rss_peak", "start_current")
+
+
+class MemoryTracker:
+    """tracing span listener - span마다 tracemalloc / RSS 최대치 기록"""
+
+    def __init__(self, report_file=None):
+        self.report_file = report_file
+        self.records = []
+        self.decisions = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._rss_reset = reset_rss_peak()
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, path, args):
+        frame = _Frame()
+        current, frame.outer_peak = tracemalloc.get_traced_memory()
+        frame.start_current = current
+        frame.child_peak = 0
+        frame.child_rss_peak = 0
+        tracemalloc.reset_peak()
+        rss = rss_bytes()
+        # 바깥 span의 최대 RSS를 잃지 않도록 지금까지의 최대값을 먼저 넘김
+        stack = self.stack()
+        if stack:
+            stack[-1].child_rss_peak = max(stack[-1].child_rss_peak, peak_rss_bytes())
+        if self._rss_reset:
+            reset_rss_peak()
+        frame.record = {
+            "stage": path,
+            "args": dict(args) if args else {},
+            "start": time.time(),
+            "rss_start_mb": round(rss / MB, 2),
+            "buffers_mb": {},
+        }
+        stack.append(frame)
+
+    def exit(self, path, exc_type):
+        stack = self.stack()
+        if not stack or stack[-1].record["stage"] != path:
+            return
+        frame = stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame.child_peak)
+        rss_peak = max(peak_rss_bytes(), frame.child_rss_peak)
+        record = frame.record
+        record["seconds"] = round(time.time() - record.pop("start"), 4)
+        record["tracemalloc_peak_mb"] = round((peak - frame.start_current) / MB, 2)
+        record["tracemalloc_net_mb"] = round((current - frame.start_current) / MB, 2)
+        record["rss_end_mb"] = round(rss_bytes() / MB, 2)
+        record["rss_peak_mb"] = round(rss_peak / MB, 2)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if stack:
+            parent = stack[-1]
+            parent.child_peak = max(parent.child_peak, frame.outer_peak, peak)
+            parent.child_rss_peak = max(parent.child_rss_peak, rss_peak)
+        with self._lock:
+            self.records.append(record)
+
+    def buffer(self, name, nbytes):
+        stack = self.stack()
+        if stack:
+            buffers = stack[-1].record["buffers_mb"]
+            buffers[name] = max(buffers.get(name, 0), round(nbytes / MB, 2))
+
+    def summary(self):
+        """span 경로별 호출 수, 최대 tracemalloc / RSS, 가장 큰 버퍼"""
+        out = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "tracemalloc_peak_mb": 0.0,
+                                   "rss_peak_mb": 0.0, "buffers_mb": {}})
+        for r in self.records:
+            s = out[r["stage"]]
+            s["calls"] += 1
+            s["seconds"] = round(s["seconds"] + r["seconds"], 4)
+            s["tracemalloc_peak_mb"] = max(s["tracemalloc_peak_mb"], r["tracemalloc_peak_mb"])
+            s["rss_peak_mb"] = max(s["rss_peak_mb"], r["rss_peak_mb"])
+            for name, mb in r["buffers_mb"].items():
+                s["buffers_mb"][name] = max(s["buffers_mb"].get(name, 0), mb)
+        return dict(out)
+
+    def stop(self):
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def flush(self):
+        if not self.report_file:
+            return
+        # 타일이 많으면 단계 기록이 길어지므로 요약을 먼저 둠
+        report = {
+            "budget_mb": None if _budget is None else round(_budget / MB, 1),
+            "policy": _policy,
+            "rss_peak_resettable": self._rss_reset,
+            "summary": self.summary(),
+            "decisions": self.decisions,
+            "stages": self.records,
+        }
+        with open(self.report_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def buffer(name, obj, nbytes=None):
+    """큰 버퍼 크기를 현재 span에 기록 (측정이 꺼져 있으면 바로 반환)"""
+    if _tracker is None:
+        return
+    _tracker.buffer(name, sizeof(obj) if nbytes is None else nbytes)
+
+
+def set_budget(budget_mb=None, policy="tile"):
+    """
+    메모리 예산 설정
+
+    Args:
+        budget_mb: 프로세스 RSS 예산 (MB, None이면 예산 없음)
+        policy: 예산을 넘을 때 - "tile"(가능한 단계는 타일 / 스트리밍 모드) 또는 "fail"(바로 실패)
+    """
+    global _budget, _policy
+    if policy not in POLICIES:
+        raise ValueError(f"policy는 {POLICIES} 중 하나: {policy}")
+    _budget = None if budget_mb is None else int(budget_mb * MB)
+    _policy = policy
+
+
+def available_bytes():
+    """예산에서 현재 RSS를 뺀 값 (예산이 없으면 None)"""
+    if _budget is None:
+        return None
+    return max(_budget - rss_bytes(), 0)
+
+
+def fits(stage, needed_bytes, fallback=False):
+    """
+    needed_bytes 크기의 버퍼를 한 번에 만들어도 예산 안인지 검사
+
+    Args:
+        stage: 단계 이름 (오류 메시지 / 리포트용)
+        needed_bytes: 예상 크기
+        fallback: 호출한 쪽에 타일 / 스트리밍 모드가 있는지
+
+    Returns:
+        True: 한 번에 처리, False: 타일 / 스트리밍 모드로 처리
+
+    Raises:
+        MemoryBudgetExceeded: 예산을 넘는데 fallback이 없거나 policy가 "fail"
+    """
+    available = available_bytes()
+    ok = available is None or needed_bytes <= available
+    if _tracker is not None and available is not None:
+        _tracker.decisions.append({
+            "stage": stage,
+            "needed_mb": round(needed_bytes / MB, 2),
+            "available_mb": round(available / MB, 2),
+            "mode": "full" if ok else ("fallback" if fallback and _policy == "tile" else "fail"),
+        })
+    if ok:
+        return True
+    if fallback and _policy == "tile":
+        return False
+    raise MemoryBudgetExceeded(stage, needed_bytes, available)
+
+
+def tile_rows(stage, total_rows, row_bytes, fixed_bytes=0, min_rows=16):
+    """
+    타일(가로 띠) 높이 - 띠 하나의 버퍼(row_bytes x 행 수)가 남은 예산에 들어가도록
+
+    Args:
+        total_rows: 전체 행 수
+        row_bytes: 한 행을 처리할 때 필요한 bytes (띠 버퍼 기준)
+        fixed_bytes: 띠 크기와 무관하게 필요한 bytes (전체 출력 배열 등)
+        min_rows: 최소 띠 높이 (이것도 안 들어가면 MemoryBudgetExceeded)
+    """
+    available = available_bytes()
+    if available is None:
+        return total_rows
+    rows = int((available - fixed_bytes) // max(row_bytes, 1))
+    if rows < min(min_rows, total_rows):
+        raise MemoryBudgetExceeded(stage, fixed_bytes + row_bytes * min_rows, available)
+    return min(rows, total_rows)
+
+
+def system_available_bytes():
+    """시스템에서 새로 쓸 수 있는 메모리 (Linux MemAvailable, 알 수 없으면 None)"""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def xml_tree_bytes(path):
+    """SVG 파일을 ElementTree로 읽을 때 예상 메모리"""
+    return os.path.getsize(path) * XML_TREE_FACTOR
+
+
+def enabled():
+    return _tracker is not None
+
+
+def enable(report_file=None):
+    """메모리 측정 켜기 (tracing span에 listener 등록, tracemalloc 시작)"""
+    global _tracker
+    if _tracker is not None:
+        disable()
+    _tracker = MemoryTracker(report_file)
+    tracing.add_listener(_tracker)
+    return _tracker
+
+
+def disable():
+    """메모리 측정 끄고 리포트 출력"""
+    global _tracker
+    tracker, _tracker = _tracker, None
+    if tracker is not None:
+        tracing.remove_listener(tracker)
+        tracker.stop()
+        tracker.flush()
+    return tracker
+
+
+def enable_from_env():
+    """EMI_MEMORY / EMI_MEMORY_BUDGET_MB / EMI_MEMORY_POLICY 환경 변수 적용"""
+    budget = os.environ.get("EMI_MEMORY_BUDGET_MB")
+    if budget:
+        set_budget(float(budget), os.environ.get("EMI_MEMORY_POLICY", "tile"))
+    report_file = os.environ.get("EMI_MEMORY")
+    if not report_file:
+        return None
+    tracker = enable(report_file.replace("{pid}", str(os.getpid())))
+    atexit.register(disable)
+    return tracker
+
+
+enable_from_env()
@@ -0,0 +1,616 @@
+"""
+copper pour - 구리 clearance DRC 스크립트
+- pour: 반전 마스크 SVG(invert_svg / remove_enclosed / cut_svg 결과)에서 마스크로 가린 도형 밖의 보드 영역
+- 구리: 원본 SVG (output.svg)의 도형
+- pour 경계점마다 구리(합집합)까지의 간격(gap)을 구하고 가장 가까운 구리 도형에 배정
+- clearance 미만인 도형을 위반으로 보고 - pour가 닿거나 겹치는 도형(간격 <= touch_tol)도 간격 0인 위반
+  (pour와 연결되어도 되는 같은 net 도형은 --same_net 목록이나 --allow_touch로 명시했을 때만 제외)
+
+정밀 검사 (기본):
+- 도형 경계를 "반지름이 있는 선분"(capsule)으로 표현 - 다각형 변은 반지름 0(stroke가 있으면 stroke/2), 원은 길이 0인 선분 + 반지름
+- broad phase: 경계를 step 간격으로 샘플링하고 KD-tree로 clearance + step 이내의 (구리 변, pour 경계 변) 쌍만 찾음
+- pour 경계 확인: 가림 도형 경계점을 바깥으로 조금 옮긴 점이 보드 안이고 다른 가림 도형 안에 없을 때만 pour 경계
+- narrow phase: 후보 쌍마다 선분-선분 최단 거리를 정확히 계산하고, 그 점에서 근처 구리 변까지 거리로 간격을 구함
+- 도형 수에 거의 선형 (샘플 수 + 근처 쌍 수에 비례), 후보 쌍 / 포함 검사는 점을 chunk개씩 나눠서 만들어 메모리도 선형
+
+래스터 검사 (--raster): 구리 / pour를 래스터화하고 구리까지 거리(EDT)로 위반 영역만 빠르게 찾음 (픽셀 해상도, stroke 무시)
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+from scipy import ndimage
+from scipy.spatial import cKDTree
+from xml.etree import ElementTree as ET
+
+from board_outline import load_board_outline, points_in_outline
+from clearance_map import distance_transform_tiled
+from geometry_store import GeometryStore
+from raster_mask import get_raster_canvas, rasterize_shapes, rasterize_outline, pixel_to_board
+from svg_geometry import read_svg_shapes, concat_rings, ring_areas
+from test import get_canvas
+
+
+def read_keepouts(pour_svg):
+    """
+    반전 마스크 SVG에서 pour를 가리는 도형 읽기 (마스크의 검은색 도형, 흰색 배경 제외)
+
+    Returns:
+        rings: 다각형 링 목록
+        ring_radius: 링별 stroke 반폭 (stroke가 없으면 0)
+        circles: (M, 3) 배열 (cx, cy, r + stroke 반폭)
+        root: SVG 루트
+    """
+    root = ET.parse(pour_svg).getroot()
+    store = GeometryStore.from_root(root, keep_source=False)
+    # stroke 반폭은 속성 조합별, 배율은 행렬별로 한 번만 계산
+    half = np.array([float(a.get("stroke-width") or 1.0) / 2.0 if (a.get("stroke") or "none").strip().lower() != "none"
+                     else 0.0 for a in store.attrs] or [0.0])[store.attr_ids]
+    scale = np.array([abs(m[0] * m[3] - m[1] * m[2]) ** 0.5 for m in store.matrices] + [1.0])[store.matrix_ids]
+    radius = half * scale
+
+    round_ = store.circles[:, 2] > 0
+    circles = store.circles[round_].copy()
+    circles[:, 2] += radius[round_]
+    shapes = store.view().select(~round_)
+    ring_radius = np.repeat(radius[shapes.index], shapes.ring_counts())
+    return shapes.rings(), ring_radius, circles, root
+
+
+def edge_table(rings, ring_radius, circles):
+    """
+    도형 경계를 capsule(선분 + 반지름) 배열로 변환
+    - 도형 번호: 링 0..R-1, 원 R..R+C-1
+
+    Returns:
+        dict: a, b (E, 2) 끝점, radius (E,), shape (E,), normal (E, 2) 바깥 방향 단위 법선 (원은 0)
+    """
+    pts, ids, nxt = concat_rings(rings)
+    a = pts
+    b = pts[nxt]
+    radius = np.asarray(ring_radius, dtype=np.float64)[ids] if len(ids) else np.zeros(0)
+    d = b - a
+    length = np.maximum(np.hypot(d[:, 0], d[:, 1]), 1e-12)
+    # 넓이가 양수인 링은 진행 방향 왼쪽이 내부 → 바깥 법선은 오른쪽
+    sign = np.sign(ring_areas(rings))[ids] if len(ids) else np.zeros(0)
+    sign[sign == 0] = 1.0
+    normal = np.stack([d[:, 1], -d[:, 0]], axis=1) / length[:, None] * sign[:, None]
+
+    c = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+    return {
+        "a": np.concatenate([a, c[:, :2]]),
+        "b": np.concatenate([b, c[:, :2]]),
+        "radius": np.concatenate([radius, c[:, 2]]),
+        "shape": np.concatenate([ids, len(rings) + np.arange(len(c))]).astype(np.int64),
+        "normal": np.concatenate([normal, np.zeros((len(c), 2))]),
+    }
+
+
+def sample_boundary(edges, step):
+    """
+    capsule 경계를 step 이하 간격으로 샘플링
+
+    Returns:
+        points: 경계 위의 점, dirs: 바깥 방향 단위 벡터, edge_ids: 샘플이 속한 capsule 번호
+    """
+    a, b, radius, normal = edges["a"], edges["b"], edges["radius"], edges["normal"]
+    d = b - a
+    length = np.hypot(d[:, 0], d[:, 1])
+    is_seg = length > 1e-12
+
+    # 선분: 길이를 균등 분할한 점 + 법선 방향으로 반지름만큼
+    seg = np.flatnonzero(is_seg)
+    n = np.maximum(1, np.ceil(length[seg] / step)).astype(np.int64)
+    e1 = np.repeat(seg, n)
+    k = np.arange(len(e1)) - np.repeat(np.cumsum(n) - n, n)
+    t = (k + 0.5) / np.repeat(n, n)
+    p1 = a[e1] + d[e1] * t[:, None] + normal[e1] * radius[e1][:, None]
+    dir1 = normal[e1]
+
+    # 원(길이 0인 capsule): 둘레를 균등 분할
+    circ = np.flatnonzero(~is_seg & (radius > 0))
+    n = np.maximum(8, np.ceil(2 * np.pi * radius[circ] / step)).astype(np.int64)
+    e2 = np.repeat(circ, n)
+    k = np.arange(len(e2)) - np.repeat(np.cumsum(n) - n, n)
+    ang = 2 * np.pi * k / np.repeat(n, n)
+    dir2 = np.stack([np.cos(ang), np.sin(ang)], axis=1)
+    p2 = a[e2] + dir2 * radius[e2][:, None]
+
+    return np.concatenate([p1, p2]), np.concatenate([dir1, dir2]), np.concatenate([e1, e2])
+
+
+def segment_distances(a0, a1, b0, b1):
+    """
+    선분 쌍 (a0-a1, b0-b1)의 최단 거리와 각 선분 위의 가장 가까운 점 (모든 쌍을 한 번에)
+
+    Returns:
+        dist (N,), pa (N, 2), pb (N, 2)
+    """
+    d1 = a1 - a0
+    d2 = b1 - b0
+    r = a0 - b0
+    aa = (d1 * d1).sum(axis=1)
+    ee = (d2 * d2).sum(axis=1)
+    ff = (d2 * r).sum(axis=1)
+    cc = (d1 * r).sum(axis=1)
+    bb = (d1 * d2).sum(axis=1)
+    eps = 1e-18
+    a_ok = aa > eps
+    e_ok = ee > eps
+    aa_s = np.where(a_ok, aa, 1.0)
+    ee_s = np.where(e_ok, ee, 1.0)
+
+    denom = aa * ee - bb * bb
+    s = np.where(denom > eps, np.clip((bb * ff - cc * ee) / np.where(denom > eps, denom, 1.0), 0.0, 1.0), 0.0)
+    t = (bb * s + ff) / ee_s
+    # t가 범위를 벗어나면 t를 자르고 s를 다시 계산
+    s = np.where(t < 0, np.clip(-cc / aa_s, 0.0, 1.0), np.where(t > 1, np.clip((bb - cc) / aa_s, 0.0, 1.0), s))
+    t = np.clip(t, 0.0, 1.0)
+
+    # 길이 0인 선분(점) 처리
+    s = np.where(~e_ok, np.clip(-cc / aa_s, 0.0, 1.0), s)
+    t = np.where(~e_ok, 0.0, t)
+    t = np.where(~a_ok, np.clip(ff / ee_s, 0.0, 1.0), t)
+    s = np.where(~a_ok, 0.0, s)
+    t = np.where(~a_ok & ~e_ok, 0.0, t)
+
+    pa = a0 + d1 * s[:, None]
+    pb = b0 + d2 * t[:, None]
+    diff = pa - pb
+    return np.hypot(diff[:, 0], diff[:, 1]), pa, pb
+
+
+def point_segment_distances(p, a, b):
+    """점 - 선분 최단 거리와 선분 위의 가장 가까운 점"""
+    d = b - a
+    len2 = (d * d).sum(axis=1)
+    t = np.clip(((p - a) * d).sum(axis=1) / np.maximum(len2, 1e-18), 0.0, 1.0)
+    q = a + d * t[:, None]
+    return np.hypot(p[:, 0] - q[:, 0], p[:, 1] - q[:, 1]), q
+
+
+class ShapeIndex:
+    """
+    도형(링 + 원) 포함 여부 검사용 공간 색인
+    - bbox가 덮는 격자 칸마다 도형 번호를 등록 (칸 크기는 도형 크기의 중앙값 기준)
+    - 칸을 너무 많이 덮는 큰 도형(외곽선, pour 영역 등)은 따로 bbox로 직접 비교
+    - 후보 (점, 링) 쌍은 링의 변을 펼쳐서 crossing number를 한 번에 계산
+    """
+
+    def __init__(self, rings, circles, max_cells=64):
+        self.circles = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+        self.n_rings = len(rings)
+        self.pts, ids, self.nxt = concat_rings(rings)
+        self.ring_len = np.bincount(ids, minlength=self.n_rings).astype(np.int64)
+        self.ring_start = np.cumsum(self.ring_len) - self.ring_len
+
+        ring_boxes = np.zeros((self.n_rings, 4))
+        nonempty = self.ring_len > 0
+        if nonempty.any():
+            s = self.ring_start[nonempty]
+            ring_boxes[nonempty] = np.hstack([np.minimum.reduceat(self.pts, s), np.maximum.reduceat(self.pts, s)])
+        c = self.circles
+        circle_boxes = np.stack([c[:, 0] - c[:, 2], c[:, 1] - c[:, 2], c[:, 0] + c[:, 2], c[:, 1] + c[:, 2]], axis=1)
+        self.boxes = np.concatenate([ring_boxes, circle_boxes])
+
+        size = np.maximum(self.boxes[:, 2] - self.boxes[:, 0], self.boxes[:, 3] - self.boxes[:, 1])
+        self.cell = max(float(np.median(size)) if len(size) else 1.0, 1e-6)
+        lo = np.floor(self.boxes[:, :2] / self.cell).astype(np.int64)
+        hi = np.floor(self.boxes[:, 2:] / self.cell).astype(np.int64)
+        span = hi - lo + 1
+        n_cells = span[:, 0] * span[:, 1]
+        self.large = np.flatnonzero(n_cells > max_cells)
+        small = np.flatnonzero(n_cells <= max_cells)
+
+        # (칸 번호, 도형 번호) 쌍을 칸 번호 순으로 정렬
+        cnt = n_cells[small]
+        shape = np.repeat(small, cnt)
+        k = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        w = span[shape, 0]
+        keys = self.cell_key(lo[shape, 0] + k % w, lo[shape, 1] + k // w)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.key_shapes = shape[order]
+
+    @staticmethod
+    def cell_key(ix, iy):
+        return ix * 4294967311 + iy
+
+    def candidate_pairs(self, points):
+        """bbox에 점이 들어가는 (점 번호, 도형 번호) 쌍"""
+        cells = np.floor(points / self.cell).astype(np.int64)
+        keys = self.cell_key(cells[:, 0], cells[:, 1])
+        first = np.searchsorted(self.keys, keys, side="left")
+        cnt = np.searchsorted(self.keys, keys, side="right") - first
+        pi = [np.repeat(np.arange(len(points)), cnt)]
+        si = [self.key_shapes[np.repeat(first, cnt) + np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)]]
+        for s in self.large.tolist():
+            x0, y0, x1, y1 = self.boxes[s]
+            hit = np.flatnonzero((points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1))
+            pi.append(hit)
+            si.append(np.full(len(hit), s, dtype=np.int64))
+        pi = np.concatenate(pi)
+        si = np.concatenate(si)
+        box = self.boxes[si]
+        p = points[pi]
+        inside = (p[:, 0] >= box[:, 0]) & (p[:, 0] <= box[:, 2]) & (p[:, 1] >= box[:, 1]) & (p[:, 1] <= box[:, 3])
+        return pi[inside], si[inside]
+
+    def contains_pairs(self, points, shape_ids, chunk=1 << 19):
+        """(점, 도형) 쌍마다 점이 도형 안에 있는지"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        shape_ids = np.asarray(shape_ids, dtype=np.int64)
+        out = np.zeros(len(points), dtype=bool)
+
+        ci = np.flatnonzero(shape_ids >= self.n_rings)
+        c = self.circles[shape_ids[ci] - self.n_rings]
+        out[ci] = np.hypot(points[ci, 0] - c[:, 0], points[ci, 1] - c[:, 1]) < c[:, 2]
+
+        # 변이 많은 쌍이 몰려도 메모리가 넘치지 않도록 펼친 변 개수 기준으로 나눠서 계산
+        ri = np.flatnonzero(shape_ids < self.n_rings)
+        counts = self.ring_len[shape_ids[ri]]
+        cum = np.cumsum(counts)
+        bounds = np.unique(np.searchsorted(cum, np.arange(chunk, cum[-1] if len(cum) else 0, chunk), side="right"))
+        for sel, cnt in zip(np.split(ri, bounds), np.split(counts, bounds)):
+            if len(sel) == 0:
+                continue
+            pair = np.repeat(np.arange(len(sel)), cnt)
+            edge = np.repeat(self.ring_start[shape_ids[sel]], cnt) + np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            a = self.pts[edge]
+            b = self.pts[self.nxt[edge]]
+            px = points[sel, 0][pair]
+            py = points[sel, 1][pair]
+            crosses = (a[:, 1] > py) != (b[:, 1] > py)
+            dy = np.where(crosses, b[:, 1] - a[:, 1], 1.0)
+            x_at = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / dy
+            out[sel] = np.bincount(pair, weights=crosses & (px < x_at), minlength=len(sel)) % 2 == 1
+        return out
+
+    def contains_any(self, points, chunk=1 << 16):
+        """
+        점마다 도형 중 하나라도 안에 있는지
+        - 후보 쌍을 점 chunk개씩 만들어서 검사 (쌍 배열이 전체 점 수만큼 한 번에 커지지 않도록)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        out = np.zeros(len(points), dtype=bool)
+        for start in range(0, len(points), chunk):
+            part = points[start:start + chunk]
+            pi, si = self.candidate_pairs(part)
+            hit = self.contains_pairs(part[pi], si)
+            out[start + pi[hit]] = True
+        return out
+
+
+def board_test(root, outline):
+    """보드 안쪽 판정 함수 (외곽선이 없으면 viewBox 사각형)"""
+    if outline is not None:
+        return lambda p: points_in_outline(p, outline)
+    _, _, vb = get_canvas(root, None, None)
+    x, y, w, h = vb
+    return lambda p: (p[:, 0] >= x) & (p[:, 0] <= x + w) & (p[:, 1] >= y) & (p[:, 1] <= y + h)
+
+
+def exact_drc(copper_rings, copper_circles, keep_rings, keep_radius, keep_circles, in_board, clearance, step,
+              touch_tol=1e-3, offset=1e-4, allow_touch=False, same_net=None, chunk=1 << 16):
+    """
+    구리 도형별 pour까지 최소 간격 (정밀 검사)
+    - pour 경계점마다 구리 전체(합집합)까지의 간격을 구하고 가장 가까운 구리 도형에 배정
+    - 간격이 touch_tol 이하인 점은 닿거나 겹친 것으로 보고 간격 0인 위반
+    - allow_touch: 닿거나 겹치는 도형을 위반에서 제외 (모든 도형이 pour와 같은 net일 때)
+    - same_net (S,) bool: pour와 같은 net이라 위반에서 제외할 도형
+    - chunk: KD-tree 쌍 / 포함 검사를 한 번에 처리할 점 개수 (메모리 상한)
+
+    Returns:
+        gap (S,): 구리 도형별 최소 간격 (위반이 없으면 inf)
+        touching (S,): pour가 닿거나 겹치는 도형 (제외 여부와 무관)
+        copper_pt, pour_pt (S, 2): 최소 간격 위치
+        stats: 샘플 / 쌍 개수
+    """
+    copper = edge_table(copper_rings, np.zeros(len(copper_rings)), copper_circles)
+    keep = edge_table(keep_rings, keep_radius, keep_circles)
+    keep_index = ShapeIndex(keep_rings, keep_circles)
+    n_shapes = len(copper_rings) + len(copper_circles)
+    gap = np.full(n_shapes, np.inf)
+    touching = np.zeros(n_shapes, dtype=bool)
+    copper_pt = np.full((n_shapes, 2), np.nan)
+    pour_pt = np.full((n_shapes, 2), np.nan)
+
+    def is_pour(points):
+        # 보드 안 검사도 점 x 외곽선 변 배열을 만들므로 점을 나눠서 검사
+        ok = np.zeros(len(points), dtype=bool)
+        for start in range(0, len(points), chunk):
+            part = points[start:start + chunk]
+            inside = in_board(part)
+            idx = np.flatnonzero(inside)
+            inside[idx] = ~keep_index.contains_any(part[idx])
+            ok[start:start + chunk] = inside
+        return ok
+
+    # 가림 도형 경계 중 바깥쪽이 실제 pour인 샘플만 남김
+    k_pts, k_dir, k_edge = sample_boundary(keep, step)
+    pour = is_pour(k_pts + k_dir * offset)
+    k_pts, k_edge = k_pts[pour], k_edge[pour]
+    c_pts, _, c_edge = sample_boundary(copper, step)
+    c_tree = cKDTree(c_pts) if len(c_pts) else None
+    stats = {"keepout_samples": int(len(pour)), "pour_samples": int(len(k_pts)), "copper_samples": int(len(c_pts))}
+    if len(k_pts) == 0 or c_tree is None:
+        stats.update(pairs=0, pour_points=0)
+        return gap, touching, copper_pt, pour_pt, stats
+
+    # broad phase: clearance + step 이내의 샘플 쌍 → (구리 변, 가림 도형 변) 쌍
+    # (KD-tree 쌍 배열이 한 번에 커지지 않도록 pour 샘플을 chunk개씩 나눠서 찾음)
+    n_keep = len(keep["a"])
+    pair_parts = []
+    near_pour = np.zeros(len(k_pts), dtype=bool)
+    for start in range(0, len(k_pts), chunk):
+        near = c_tree.sparse_distance_matrix(cKDTree(k_pts[start:start + chunk]), clearance + step,
+                                             output_type="ndarray")
+        pair_parts.append(np.unique(c_edge[near["i"]] * n_keep + k_edge[start + near["j"]]))
+        near_pour[start + near["j"]] = True
+    pairs = np.unique(np.concatenate(pair_parts))
+    pce, pke = pairs // n_keep, pairs % n_keep
+    stats["pairs"] = int(len(pairs))
+
+    # narrow phase: 쌍마다 선분-선분 최단 거리의 pour 쪽 점 (바깥이 실제 pour인 점만 사용)
+    _, pc, pk = segment_distances(copper["a"][pce], copper["b"][pce], keep["a"][pke], keep["b"][pke])
+    toward = pc - pk
+    norm = np.hypot(toward[:, 0], toward[:, 1])
+    u = np.where(norm[:, None] > 1e-12, toward / np.maximum(norm, 1e-12)[:, None], keep["normal"][pke])
+    closest = pk + u * keep["radius"][pke][:, None]
+    closest = closest[is_pour(closest + u * offset)]
+
+    # pour 점 후보: 가장 가까운 점 + 구리 근처의 pour 경계 샘플 (가장 가까운 점이 가려진 경우 보완)
+    points = np.concatenate([closest, k_pts[near_pour]])
+    stats["pour_points"] = int(len(points))
+
+    # 점마다 clearance 이내의 모든 구리 변까지 정확한 거리 → 구리 합집합까지 간격 (점 chunk개씩)
+    copper_index = ShapeIndex(copper_rings, copper_circles)
+    n_edges = len(copper["a"])
+    parts = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros((0, 2)),
+              np.zeros(0, dtype=np.int64))]
+    for start in range(0, len(points), chunk):
+        part = points[start:start + chunk]
+        near = cKDTree(part).sparse_distance_matrix(c_tree, clearance + step, output_type="ndarray")
+        edges = np.unique(near["i"].astype(np.int64) * n_edges + c_edge[near["j"]])
+        pi, ce = edges // n_edges, edges % n_edges
+        dist, q = point_segment_distances(part[pi], copper["a"][ce], copper["b"][ce])
+        value = dist - copper["radius"][ce]
+        shapes = copper["shape"][ce]
+        # 구리 안에 들어간 pour 점은 겹침 (간격 0)
+        inside = copper_index.contains_pairs(part[pi], shapes)
+        value[inside | (value < 0)] = 0.0
+
+        # 점마다 가장 가까운 구리 변 하나만 남김
+        order = np.lexsort((value, pi))
+        pi, ce, value, q, shapes = pi[order], ce[order], value[order], q[order], shapes[order]
+        first = np.ones(len(pi), dtype=bool)
+        first[1:] = pi[1:] != pi[:-1]
+        parts.append((start + pi[first], ce[first], value[first], q[first], shapes[first]))
+    pi, ce, value, q, shapes = (np.concatenate(arrays) for arrays in zip(*parts))
+
+    touching[shapes[value <= touch_tol]] = True
+    value[value <= touch_tol] = 0.0
+    exempt = touching.copy() if allow_touch else np.zeros(n_shapes, dtype=bool)
+    if same_net is not None:
+        exempt |= same_net
+    bad = (value < clearance) & ~exempt[shapes]
+    pi, ce, value, q, shapes = pi[bad], ce[bad], value[bad], q[bad], shapes[bad]
+
+    # 도형별 최소 간격
+    order = np.lexsort((value, shapes))
+    pi, ce, value, q, shapes = pi[order], ce[order], value[order], q[order], shapes[order]
+    first = np.ones(len(shapes), dtype=bool)
+    first[1:] = shapes[1:] != shapes[:-1]
+    pi, ce, value, q, shapes = pi[first], ce[first], value[first], q[first], shapes[first]
+    toward = points[pi] - q
+    tn = np.maximum(np.hypot(toward[:, 0], toward[:, 1]), 1e-12)
+    gap[shapes] = value
+    copper_pt[shapes] = q + toward / tn[:, None] * copper["radius"][ce][:, None]
+    pour_pt[shapes] = points[pi]
+    return gap, touching, copper_pt, pour_pt, stats
+
+
+def raster_drc(copper_rings, copper_circles, keep_rings, keep_circles, root, outline, clearance, scale, min_pixels=1,
+               same_net=None):
+    """
+    래스터 빠른 검사: pour 픽셀 중 구리까지 거리가 clearance 미만인 영역 (닿는 영역은 간격 0)
+    - same_net (S,) bool: 거리 계산에서 뺄 구리 도형 (pour와 같은 net)
+
+    Returns:
+        영역 목록 (넓이, 중심, bbox, 최소 간격)
+    """
+    if same_net is not None:
+        n_rings = len(copper_rings)
+        copper_rings = [r for r, skip in zip(copper_rings, same_net[:n_rings].tolist()) if not skip]
+        copper_circles = np.asarray(copper_circles).reshape(-1, 3)[~same_net[n_rings:]]
+    out_w, out_h, vb = get_raster_canvas(root, scale)
+    copper = rasterize_shapes(copper_rings, copper_circles, vb, out_w, out_h)
+    pour = ~rasterize_shapes(keep_rings, keep_circles, vb, out_w, out_h)
+    if outline is not None:
+        pour &= rasterize_outline(outline, vb, out_w, out_h)
+
+    max_px = clearance * scale
+    dist = distance_transform_tiled(~copper, max_px + 1)
+    bad = pour & (dist < max_px)
+    labels, count = ndimage.label(bad, structure=np.ones((3, 3), dtype=bool))
+    if count == 0:
+        return []
+    index = np.arange(1, count + 1)
+    sizes = np.bincount(labels.ravel(), minlength=count + 1)[1:]
+    min_dist = ndimage.minimum(dist, labels, index)
+    objects = ndimage.find_objects(labels)
+
+    regions = []
+    for i in np.argsort(min_dist, kind="stable"):
+        if sizes[i] < min_pixels:
+            continue
+        sl = objects[i]
+        x0, y0 = pixel_to_board(sl[1].start - 0.5, sl[0].start - 0.5, vb, out_w, out_h)
+        x1, y1 = pixel_to_board(sl[1].stop - 0.5, sl[0].stop - 0.5, vb, out_w, out_h)
+        touching = bool(min_dist[i] <= 1.0)
+        regions.append({
+            "min_gap": 0.0 if touching else round(max(float(min_dist[i]) - 0.5, 0.0) / scale, 4),
+            "touching": touching,
+            "area": round(float(sizes[i]) / (scale * scale), 4),
+            "bbox": [round(float(x0), 4), round(float(y0), 4), round(float(x1), 4), round(float(y1), 4)],
+        })
+    return regions
+
+
+def write_overlay_svg(output_file, root, entries):
+    """위반 위치 표시 SVG (구리 쪽 점 - pour 쪽 점을 잇는 선 + pour 쪽 점에 원)"""
+    _, _, vb = get_canvas(root, None, None)
+    vb_x, vb_y, vb_w, vb_h = vb
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{vb_w}" height="{vb_h}" viewBox="{vb_x} {vb_y} {vb_w} {vb_h}">',
+        '<g fill="none" stroke="#ff0000" stroke-width="0.05">',
+    ]
+    for e in entries:
+        (x0, y0), (x1, y1) = e["copper_point"], e["pour_point"]
+        lines.append(f'  <line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}"/>')
+        lines.append(f'  <circle cx="{x1}" cy="{y1}" r="0.2"/>')
+    lines.append('</g>')
+    lines.append('</svg>')
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def load_same_net(path, n_rings, n_circles):
+    """
+    pour와 같은 net인 구리 도형 목록 JSON → 도형별 bool (링 다음에 원)
+    - 형식: [{"kind": "polygon" | "circle", "shape": 번호}, ...] - 리포트 violations 항목과 같은 번호
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    same_net = np.zeros(n_rings + n_circles, dtype=bool)
+    for e in entries:
+        i = int(e["shape"])
+        if e.get("kind", "polygon") == "circle":
+            if not 0 <= i < n_circles:
+                raise ValueError(f"원 번호가 범위를 벗어남: {i} (원 {n_circles}개)")
+            same_net[n_rings + i] = True
+        else:
+            if not 0 <= i < n_rings:
+                raise ValueError(f"다각형 번호가 범위를 벗어남: {i} (다각형 {n_rings}개)")
+            same_net[i] = True
+    return same_net
+
+
+def pour_clearance_drc(copper_svg, pour_svg, output_json, clearance=0.2, step=None, outline=None,
+                       touch_tol=1e-3, raster=False, scale=20, overlay_svg=None, allow_touch=False, same_net=None):
+    """
+    pour와 원본 구리 사이 clearance 검사
+
+    Args:
+        copper_svg: 원본 구리 SVG (output.svg)
+        pour_svg: 최종 pour SVG (반전 마스크 형식)
+        output_json: 결과 JSON
+        clearance: 최소 간격 (mm)
+        step: 경계 샘플 간격 (None이면 clearance / 2)
+        outline: 보드 외곽선 링 목록 (None이면 pour SVG의 viewBox)
+        touch_tol: 간격이 이 이하면 pour가 구리에 닿은 것으로 봄 (간격 0인 위반)
+        raster: True면 래스터 빠른 검사만 실행
+        scale: 래스터 검사의 viewBox 1단위당 픽셀 수
+        overlay_svg: 위반 위치 표시 SVG (None이면 생략)
+        allow_touch: pour가 닿거나 겹치는 도형을 같은 net으로 보고 위반에서 제외
+        same_net: pour와 같은 net인 구리 도형 목록 JSON (load_same_net 형식, 이 도형들은 위반에서 제외)
+    """
+    start = time.perf_counter()
+    _, copper_rings, copper_circles = read_svg_shapes(copper_svg)
+    keep_rings, keep_radius, keep_circles, root = read_keepouts(pour_svg)
+    n_shapes = len(copper_rings) + len(copper_circles)
+    print(f"구리 도형: {n_shapes}개, pour 가림 도형: {len(keep_rings) + len(keep_circles)}개")
+    net_mask = load_same_net(same_net, len(copper_rings), len(copper_circles)) if same_net else None
+
+    report = {
+        "copper": copper_svg,
+        "pour": pour_svg,
+        "clearance": clearance,
+        "mode": "raster" if raster else "exact",
+        "copper_shapes": n_shapes,
+        "allow_touch": allow_touch,
+        "same_net": int(net_mask.sum()) if net_mask is not None else 0,
+    }
+
+    if raster:
+        regions = raster_drc(copper_rings, copper_circles, keep_rings, keep_circles, root, outline, clearance, scale,
+                             same_net=net_mask)
+        touching = sum(r["touching"] for r in regions)
+        if allow_touch:
+            regions = [r for r in regions if not r["touching"]]
+        report.update(scale=scale, touching=touching, violation_count=len(regions), violations=regions)
+        print(f"- clearance {clearance} 미만 영역 (래스터 {scale}px/mm): {len(regions)}곳")
+        print(f"- pour가 구리에 닿는 영역: {touching}곳" + (" (위반에서 제외)" if allow_touch else ""))
+    else:
+        step = clearance / 2.0 if step is None else step
+        gap, touching, copper_pt, pour_pt, stats = exact_drc(copper_rings, copper_circles, keep_rings, keep_radius,
+                                                             keep_circles, board_test(root, outline), clearance,
+                                                             step, touch_tol, allow_touch=allow_touch,
+                                                             same_net=net_mask)
+        violating = np.flatnonzero(np.isfinite(gap))
+        violating = violating[np.argsort(gap[violating], kind="stable")]
+        n_rings = len(copper_rings)
+        entries = [
+            {
+                "shape": int(s) if s < n_rings else int(s - n_rings),
+                "kind": "polygon" if s < n_rings else "circle",
+                "gap": round(float(gap[s]), 5),
+                "touching": bool(touching[s]),
+                "copper_point": [round(float(v), 4) for v in copper_pt[s]],
+                "pour_point": [round(float(v), 4) for v in pour_pt[s]],
+            }
+            for s in violating.tolist()
+        ]
+        report.update(step=step, stats=stats, touching=int(touching.sum()), violation_count=int(len(violating)),
+                      violations=entries)
+        if overlay_svg:
+            write_overlay_svg(overlay_svg, root, entries)
+        print(f"- 후보 쌍: {stats['pairs']}개 (pour 경계 샘플 {stats['pour_samples']}개)")
+        n_touch = int(touching[violating].sum())
+        print(f"- clearance {clearance} 미만: {len(violating)}개 (닿거나 겹침 {n_touch}개 포함)")
+        print(f"- pour가 닿거나 겹치는 도형: {int(touching.sum())}개" + (" (위반에서 제외)" if allow_touch else ""))
+
+    report["elapsed"] = round(time.perf_counter() - start, 3)
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"완료! ({report['elapsed']}s) 리포트: {output_json}")
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("pour", nargs="?", default="inverted_without_enclosed.svg")
+    p.add_argument("--copper", default="output.svg")
+    p.add_argument("--json", default="pour_drc.json")
+    p.add_argument("--clearance", type=float, default=0.2)
+    p.add_argument("--step", type=float, default=None)
+    p.add_argument("--outline", default=None, help="보드 외곽선 Gerber (.GML 등)")
+    p.add_argument("--raster", action="store_true", help="래스터 빠른 검사")
+    p.add_argument("--scale", type=float, default=20)
+    p.add_argument("--overlay", default=None)
+    p.add_argument("--touch_tol", type=float, default=1e-3)
+    p.add_argument("--allow_touch", action="store_true", help="pour가 닿거나 겹치는 도형을 같은 net으로 보고 위반에서 제외")
+    p.add_argument("--same_net", default=None, help='pour와 같은 net인 도형 목록 JSON ([{"kind", "shape"}, ...])')
+    args = p.parse_args()
+
+    pour_clearance_drc(
+        args.copper,
+        args.pour,
+        args.json,
+        clearance=args.clearance,
+        step=args.step,
+        outline=load_board_outline(args.outline) if args.outline else None,
+        touch_tol=args.touch_tol,
+        raster=args.raster,
+        scale=args.scale,
+        overlay_svg=args.overlay,
+        allow_touch=args.allow_touch,
+        same_net=args.same_net,
+    )
+
+
+if __name__ == "__main__":
+    main()
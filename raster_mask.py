@@ -0,0 +1,72 @@
+"""
+구리 도형 래스터화 모듈
+- svg_geometry로 읽은 도형을 PIL로 그려서 numpy bool 마스크로 변환
+- 좌표 변환은 test.py의 get_canvas / map_point와 동일한 viewBox 매핑 사용
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from svg_geometry import read_svg_shapes
+from test import get_canvas, map_point
+
+
+def get_raster_canvas(root, scale=10):
+    """viewBox 1단위당 scale 픽셀인 캔버스 크기와 viewBox 반환"""
+    _, _, vb = get_canvas(root, None, None)
+    out_w = max(1, int(round(vb[2] * scale)))
+    out_h = max(1, int(round(vb[3] * scale)))
+    return out_w, out_h, vb
+
+
+def rasterize_shapes(polygons, circles, vb, out_w, out_h):
+    """도형들을 그려서 구리 마스크 반환 (구리 = True)"""
+    mask = Image.new("L", (out_w, out_h), 0)
+    draw = ImageDraw.Draw(mask)
+
+    for ring in polygons:
+        if len(ring) < 3:
+            continue
+        px, py = map_point(ring[:, 0], ring[:, 1], vb, out_w, out_h)
+        draw.polygon(list(zip(px.tolist(), py.tolist())), fill=255)
+
+    if len(circles):
+        cx, cy = map_point(circles[:, 0], circles[:, 1], vb, out_w, out_h)
+        rx = circles[:, 2] / vb[2] * out_w
+        ry = circles[:, 2] / vb[3] * out_h
+        for x, y, a, b in zip(cx.tolist(), cy.tolist(), rx.tolist(), ry.tolist()):
+            draw.ellipse([x - a, y - b, x + a, y + b], fill=255)
+
+    return np.asarray(mask) > 0
+
+
+def rasterize_outline(rings, vb, out_w, out_h):
+    """보드 외곽선 안쪽 마스크 (보드 = True, 구멍 링은 even-odd로 빠짐)"""
+    board = np.zeros((out_h, out_w), dtype=bool)
+    for ring in rings:
+        img = Image.new("L", (out_w, out_h), 0)
+        px, py = map_point(ring[:, 0], ring[:, 1], vb, out_w, out_h)
+        ImageDraw.Draw(img).polygon(list(zip(px.tolist(), py.tolist())), fill=255)
+        board ^= np.asarray(img) > 0
+    return board
+
+
+def rasterize_svg(svg_path, scale=10):
+    """
+    SVG 파일의 구리 영역을 래스터화
+
+    Returns:
+        copper: (out_h, out_w) bool 배열
+        vb: (vb_x, vb_y, vb_w, vb_h)
+    """
+    root, polygons, circles = read_svg_shapes(svg_path)
+    out_w, out_h, vb = get_raster_canvas(root, scale)
+    return rasterize_shapes(polygons, circles, vb, out_w, out_h), vb
+
+
+def pixel_to_board(cols, rows, vb, out_w, out_h):
+    """픽셀 인덱스(열, 행)를 viewBox 좌표(픽셀 중심)로 변환"""
+    vb_x, vb_y, vb_w, vb_h = vb
+    x = vb_x + (np.asarray(cols) + 0.5) / out_w * vb_w
+    y = vb_y + (np.asarray(rows) + 0.5) / out_h * vb_h
+    return x, y
@@ -0,0 +1,559 @@
+"""
+골든 출력 회귀 검사 스크립트
+- 저장소에 있는 중간 결과물(inverted_output_mask.svg, enclosed_regions.svg, cutted_inverted_output_mask.svg 등)을
+  기준(golden)으로 삼아, 각 단계를 기준 입력으로 다시 실행한 새 출력과 비교
+- 비교: 새 출력과 기준 출력을 같은 배율로 그려서(render_svg) 색별 XOR 픽셀 수 계산
+  - 브라우저처럼 합성한 최종 화면을 비교 (fill-rule, stroke 폭, mask, transform, use 반영)
+  - 기준 / 새 도형 경계에서 tolerance_px 이내의 차이는 허용 (좌표 반올림 등)
+  - 나머지 차이가 max_diff_pixels보다 많으면 실패
+  - 레이어: 최종 화면에 보이는 채움 색마다 하나 (예: 마스크를 적용한 배경 사각형의 #288f28),
+    참조된 mask마다 보이게 하는 영역 하나
+- 성능 예산: 단계별 시간 / 메모리를 regression_budgets.json에 기록해 두고 넘으면 실패
+  (--record_budgets로 현재 측정값 x 여유 배율을 기록)
+- 단계는 benchmark_pipeline과 같은 방식으로 새 프로세스(spawn)에서 실행, 필요한 모듈이 없으면 건너뜀
+- 실패가 있으면 종료 코드 1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from xml.etree import ElementTree as ET
+
+import numpy as np
+from PIL import Image, ImageDraw
+from scipy import ndimage
+
+from benchmark_pipeline import run_stage
+from raster_mask import get_raster_canvas
+from svg_geometry import (XLINK_HREF, apply_matrix, circles_to_rings, element_rings, load_templates,
+                          normalize_windings, ring_areas, strip_ns)
+from svg_transform import compose, parse_transform, translation
+from test import map_point
+
+
+# (이름, 모듈, 함수, 기준 입력 파일들, 기준 출력 파일, 키워드 인자)
+# 입력은 모두 저장소의 기준 파일 → 한 단계가 틀려도 다음 단계 검사에 번지지 않음
+CASES = [
+    ("invert_svg", "invert_svg", "invert_svg", ("output.svg",), "inverted_output_mask.svg",
+     {"background_color": "#288f28"}),
+    ("invert_svg_simple", "invert_svg", "invert_svg_simple", ("output.svg",), "inverted_output_evenodd.svg",
+     {"fill_color": "#288f28"}),
+    ("filter_thin_paths", "filter_thin_paths", "filter_thin_paths", ("inverted_output_mask.svg",),
+     "inverted_output_mask_filtered.svg", {"min_dimension": 0.5}),
+    ("add_stroke_to_thin_paths", "remove_zero_thickness", "add_stroke_to_thin_paths", ("inverted_output_mask.svg",),
+     "inverted_output_mask_final.svg", {"threshold": 0.5, "stroke_width": 0.5}),
+    ("extract_enclosed_from_inverted", "extract_enclosed", "extract_enclosed_from_inverted",
+     ("inverted_output_mask.svg",), "enclosed_regions.svg", {"background_color": "#288f28"}),
+    ("remove_enclosed_from_inverted", "remove_enclosed", "remove_enclosed_from_inverted",
+     ("inverted_output_mask.svg", "enclosed_regions.svg"), "inverted_without_enclosed.svg",
+     {"background_color": "#288f28"}),
+    ("mask_enclosed", "remove_enclosed_raster", "mask_enclosed", ("inverted_output_mask.svg", "enclosed_regions.svg"),
+     "inverted_without_enclosed_raster.png", {"scale": 10}),
+    ("split_svg_objects", "cut_svg", "split_svg_objects", ("cutting_inverted_output_mask.svg",),
+     "cutted_inverted_output_mask.svg", {}),
+]
+CASE_NAMES = [c[0] for c in CASES]
+
+
+def square(x0, y0, size, ccw=True):
+    ring = np.array([(x0, y0), (x0 + size, y0), (x0 + size, y0 + size), (x0, y0 + size)], dtype=np.float64)
+    return ring if ccw else ring[::-1]
+
+
+# normalize_windings 검사용 링 묶음 (넓이가 양수인 방향 = ccw) - 모두 (0, 0) ~ (20, 20) 안
+WINDING_CASES = [
+    ("island_in_hole", [square(0, 0, 20), square(5, 5, 10, ccw=False), square(8, 8, 4)]),
+    ("cw_island_in_hole", [square(0, 0, 20), square(5, 5, 10, ccw=False), square(8, 8, 4, ccw=False)]),
+    ("same_direction_nested", [square(0, 0, 20), square(5, 5, 10), square(8, 8, 4, ccw=False)]),
+    ("cw_outer", [square(0, 0, 20, ccw=False), square(5, 5, 10)]),
+]
+GEOMETRY_CHECKS = ["normalize_windings"]
+
+BUDGET_FILE = "regression_budgets.json"
+
+
+# 부모에서 물려받는 표현 속성과 SVG 기본값
+PAINT_DEFAULTS = {"fill": "black", "fill-rule": "nonzero", "stroke": "none", "stroke-width": "1"}
+NAMED_COLORS = {"black": "#000000", "white": "#ffffff", "red": "#ff0000", "green": "#008000", "blue": "#0000ff"}
+# 자식을 그대로 그리는 요소 (defs / mask 등은 참조될 때만 그림)
+CONTAINER_TAGS = ("svg", "g", "a", "switch")
+CIRCLE_SEGMENTS = 48
+
+
+def element_paint(elem, inherited):
+    """요소의 표현 속성 (부모 값 < 속성 < style 순서로 덮어씀)"""
+    paint = dict(inherited)
+    for key in PAINT_DEFAULTS:
+        if elem.get(key) is not None:
+            paint[key] = elem.get(key).strip()
+    for item in (elem.get("style") or "").split(";"):
+        key, _, value = item.partition(":")
+        if key.strip() in PAINT_DEFAULTS:
+            paint[key.strip()] = value.strip()
+    return paint
+
+
+def is_hidden(elem):
+    style = (elem.get("style") or "").replace(" ", "")
+    return elem.get("display") == "none" or "display:none" in style
+
+
+def normalize_color(value):
+    """색 문자열 정리 (#rgb / 이름 / #rrggbbaa -> #rrggbb, 칠하지 않으면 None)"""
+    value = (value or "").strip().lower()
+    if value in ("", "none", "transparent"):
+        return None
+    value = NAMED_COLORS.get(value, value)
+    if len(value) == 4 and value.startswith("#"):
+        value = "#" + "".join(ch * 2 for ch in value[1:])
+    if len(value) == 9 and value.startswith("#"):
+        if value[7:] == "00":
+            return None
+        value = value[:7]
+    return value
+
+
+def luminance(color):
+    """mask에서 보이게 하는 색인지 (밝기 > 0.5, 해석할 수 없는 색은 가림)"""
+    try:
+        r, g, b = (int(color[i:i + 2], 16) / 255.0 for i in (1, 3, 5))
+    except (TypeError, ValueError):
+        return False
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b > 0.5
+
+
+def url_ref(value):
+    """'url(#id)' -> 'id' (없으면 None)"""
+    value = (value or "").strip()
+    if value.startswith("url(") and value.endswith(")"):
+        return value[4:-1].strip().strip("'\"").lstrip("#")
+    return None
+
+
+def ring_boxes(rings, pad, out_w, out_h):
+    """픽셀 좌표 링들의 정수 bbox (x0, y0, x1, y1) - 캔버스 밖은 잘라냄"""
+    boxes = []
+    for ring in rings:
+        x0 = max(int(np.floor(ring[:, 0].min() - pad)), 0)
+        y0 = max(int(np.floor(ring[:, 1].min() - pad)), 0)
+        x1 = min(int(np.ceil(ring[:, 0].max() + pad)) + 1, out_w)
+        y1 = min(int(np.ceil(ring[:, 1].max() + pad)) + 1, out_h)
+        boxes.append((x0, y0, x1, y1))
+    return boxes
+
+
+def draw_crop(box, draw_fn):
+    """bbox 크기 이미지에 그린 bool 배열"""
+    x0, y0, x1, y1 = box
+    img = Image.new("L", (x1 - x0, y1 - y0), 0)
+    draw_fn(ImageDraw.Draw(img), x0, y0)
+    return np.asarray(img) > 0
+
+
+def fill_coverage(rings, evenodd, out_w, out_h):
+    """
+    채움 영역 (bbox 안만 계산) -> (bool 배열, bbox) 또는 None
+    - evenodd: 링마다 XOR, nonzero: 링 방향 부호를 더한 winding이 0이 아닌 곳
+    """
+    live = [(r, b) for r, b in zip(rings, ring_boxes(rings, 0, out_w, out_h)) if b[2] > b[0] and b[3] > b[1]]
+    if not live:
+        return None
+    box = (min(b[0] for _, b in live), min(b[1] for _, b in live),
+           max(b[2] for _, b in live), max(b[3] for _, b in live))
+    signs = np.where(ring_areas([r for r, _ in live]) >= 0, 1, -1)
+    acc = np.zeros((box[3] - box[1], box[2] - box[0]), dtype=np.int32)
+    for (ring, (x0, y0, x1, y1)), sign in zip(live, signs):
+        points = [(x - x0, y - y0) for x, y in ring.tolist()]
+        m = draw_crop((x0, y0, x1, y1), lambda draw, ox, oy: draw.polygon(points, fill=255))
+        sub = acc[y0 - box[1]:y1 - box[1], x0 - box[0]:x1 - box[0]]
+        if evenodd:
+            sub ^= m
+        else:
+            sub += sign * m
+    return (acc & 1 if evenodd else acc) != 0, box
+
+
+def stroke_coverage(rings, width_px, out_w, out_h):
+    """닫힌 링들의 외곽선을 width_px 폭으로 그린 영역 -> (bool 배열, bbox) 또는 None"""
+    boxes = ring_boxes(rings, width_px / 2.0 + 1.0, out_w, out_h)
+    box = (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+    if box[2] <= box[0] or box[3] <= box[1]:
+        return None
+    width = max(1, int(round(width_px)))
+
+    def draw_lines(draw, ox, oy):
+        for ring in rings:
+            points = [(x - ox, y - oy) for x, y in ring.tolist()]
+            draw.line(points + points[:1], fill=255, width=width, joint="curve")
+
+    return draw_crop(box, draw_lines), box
+
+
+def render_svg(root, canvas):
+    """
+    SVG를 브라우저처럼 합성해서 픽셀별 최종 채움 색을 계산
+    - fill / stroke / stroke-width / fill-rule (부모에서 상속), transform, use, mask(밝기 기준) 반영
+    - 반투명, 그라디언트, clipPath는 다루지 않음 (파이프라인 출력에 없음)
+
+    Returns:
+        labels: (out_h, out_w) 정수 배열 (0 = 칠해지지 않음, i = palette[i - 1])
+        palette: 색 목록
+        mask_areas: {mask id: mask에서 보이게 하는 영역} (참조된 mask만)
+    """
+    out_w, out_h, vb = canvas
+    templates = load_templates(root)
+    masks = {e.get("id"): e for e in root.iter() if strip_ns(e.tag) == "mask" and e.get("id")}
+    px_per_unit = out_w / vb[2]
+    palette = []
+    mask_cache = {}
+
+    def label_of(color):
+        if color not in palette:
+            palette.append(color)
+        return palette.index(color) + 1
+
+    def paint_into(target, coverage, color):
+        if coverage is not None:
+            hit, (x0, y0, x1, y1) = coverage
+            target[y0:y1, x0:x1][hit] = label_of(color)
+
+    def draw_shape(elem, tag, matrix, paint, target):
+        if tag == "circle":
+            r = float(elem.get("r") or 0.0)
+            if r <= 0:
+                return
+            circle = np.array([[float(elem.get("cx") or 0.0), float(elem.get("cy") or 0.0), r]])
+            rings = circles_to_rings(circle, CIRCLE_SEGMENTS)
+        else:
+            rings = element_rings(elem, tag)
+        rings = [apply_matrix(r, matrix) if matrix is not None else r for r in rings if len(r) >= 2]
+        if not rings:
+            return
+        rings = [np.stack(map_point(r[:, 0], r[:, 1], vb, out_w, out_h), axis=1) for r in rings]
+
+        fill = normalize_color(paint["fill"])
+        filled = [r for r in rings if len(r) >= 3]
+        if fill is not None and filled:
+            paint_into(target, fill_coverage(filled, paint["fill-rule"] == "evenodd", out_w, out_h), fill)
+
+        stroke = normalize_color(paint["stroke"])
+        try:
+            width = float(paint["stroke-width"].replace("px", ""))
+        except ValueError:
+            width = 1.0
+        if stroke is not None and width > 0:
+            scale = np.sqrt(abs(matrix[0] * matrix[3] - matrix[1] * matrix[2])) if matrix is not None else 1.0
+            paint_into(target, stroke_coverage(rings, width * scale * px_per_unit, out_w, out_h), stroke)
+
+    def mask_coverage(mask_id, matrix):
+        """mask 내용을 참조한 요소의 좌표계로 그린 뒤 밝은 곳만 True"""
+        key = (mask_id, matrix)
+        if key not in mask_cache:
+            layer = np.zeros((out_h, out_w), dtype=np.uint16)
+            for child in masks[mask_id]:
+                render(child, matrix, PAINT_DEFAULTS, layer)
+            visible = np.array([False] + [luminance(c) for c in palette])
+            mask_cache[key] = visible[layer]
+        return mask_cache[key]
+
+    def render_content(elem, tag, matrix, paint, target):
+        if tag in ("path", "polygon", "polyline", "rect", "circle"):
+            draw_shape(elem, tag, matrix, paint, target)
+        elif tag == "use":
+            ref = (elem.get(XLINK_HREF) or elem.get("href") or "").lstrip("#")
+            ux, uy = float(elem.get("x") or 0.0), float(elem.get("y") or 0.0)
+            if ux or uy:
+                matrix = compose(matrix, translation(ux, uy))
+            for child in templates.get(ref, []):
+                render(child, matrix, paint, target)
+        elif tag in CONTAINER_TAGS:
+            for child in elem:
+                render(child, matrix, paint, target)
+
+    def render(elem, matrix, paint, target):
+        tag = strip_ns(elem.tag)
+        if is_hidden(elem):
+            return
+        matrix = compose(matrix, parse_transform(elem.get("transform")))
+        paint = element_paint(elem, paint)
+        mask_id = url_ref(elem.get("mask"))
+        if mask_id not in masks:
+            render_content(elem, tag, matrix, paint, target)
+            return
+        # mask가 있으면 따로 그린 뒤 mask에서 밝은 곳만 덮어씀
+        layer = np.zeros_like(target)
+        render_content(elem, tag, matrix, paint, layer)
+        visible = (layer > 0) & mask_coverage(mask_id, matrix)
+        target[visible] = layer[visible]
+
+    labels = np.zeros((out_h, out_w), dtype=np.uint16)
+    render(root, None, PAINT_DEFAULTS, labels)
+    mask_areas = {}
+    for (mask_id, _), area in mask_cache.items():
+        mask_areas.setdefault(mask_id, area)
+    return labels, palette, mask_areas
+
+
+def rasterize_layers(path, canvas=None, scale=20):
+    """
+    출력 파일을 레이어별 bool 마스크로 래스터화
+    - SVG: {채움 색: 합성한 최종 화면에서 그 색인 픽셀, "mask #id": mask에서 보이게 하는 영역}
+      (최종 화면이 비어 있는 enclosed_regions.svg도 mask 내용으로 비교됨)
+    - PNG: {"alpha": 알파 > 0}
+    - canvas: (out_w, out_h, vb) - 기준 출력과 같은 캔버스에 그리도록 넘김
+
+    Returns:
+        layers, canvas
+    """
+    if path.lower().endswith(".png"):
+        return {"alpha": np.asarray(Image.open(path).convert("RGBA"))[..., 3] > 0}, canvas
+
+    root = ET.parse(path).getroot()
+    if canvas is None:
+        canvas = get_raster_canvas(root, scale)
+    labels, palette, mask_areas = render_svg(root, canvas)
+    layers = {color: labels == i for i, color in enumerate(palette, 1)}
+    layers = {color: layer for color, layer in layers.items() if layer.any()}
+    layers.update((f"mask #{mask_id}", area) for mask_id, area in mask_areas.items())
+    return layers, canvas
+
+
+def edge_band(mask, tolerance_px):
+    """마스크 경계에서 tolerance_px 이내의 픽셀"""
+    if tolerance_px <= 0:
+        return np.zeros_like(mask)
+    grown = ndimage.binary_dilation(mask, iterations=tolerance_px)
+    shrunk = ndimage.binary_erosion(mask, iterations=tolerance_px, border_value=1)
+    return grown & ~shrunk
+
+
+def compare_outputs(new_path, ref_path, scale=20, tolerance_px=1):
+    """
+    새 출력과 기준 출력의 레이어별 XOR 픽셀 수
+
+    Returns:
+        {레이어: {"xor": 전체 XOR, "beyond_tolerance": 허용 범위 밖 XOR, "ref_pixels": 기준 픽셀 수}}
+    """
+    ref_layers, canvas = rasterize_layers(ref_path, scale=scale)
+    new_layers, _ = rasterize_layers(new_path, canvas, scale=scale)
+    out = {}
+    for name in list(ref_layers) + [k for k in new_layers if k not in ref_layers]:
+        # 한쪽에만 있는 색은 다른 쪽을 빈 레이어로 보고 비교
+        ref, new = ref_layers.get(name), new_layers.get(name)
+        ref = np.zeros_like(new) if ref is None else ref
+        new = np.zeros_like(ref) if new is None else new
+        if new.shape != ref.shape:
+            out[name] = {"shape_mismatch": [list(ref.shape), list(new.shape)]}
+            continue
+        xor = new ^ ref
+        # 어느 한쪽 도형 경계 근처의 차이만 허용 (tolerance_px x 2보다 두꺼운 도형이 생기거나 사라지면 실패)
+        beyond = xor & ~(edge_band(ref, tolerance_px) | edge_band(new, tolerance_px))
+        out[name] = {
+            "xor": int(xor.sum()),
+            "beyond_tolerance": int(beyond.sum()),
+            "ref_pixels": int(ref.sum()),
+        }
+    return out
+
+
+def load_budgets(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_budget(row, budget):
+    """시간 / 메모리 예산 초과 목록"""
+    over = []
+    for key, measured in (("seconds", "seconds_min"), ("rss_mb", "rss_peak_mb"),
+                          ("tracemalloc_mb", "tracemalloc_peak_mb")):
+        if key in budget and measured in row and row[measured] > budget[key]:
+            over.append(f"{key} {row[measured]} > {budget[key]}")
+    return over
+
+
+def run_case(case, repo_dir, work_dir, repeat, scale, tolerance_px, max_diff_pixels, budget):
+    """단계 하나 실행 + 기준 출력과 비교 + 예산 검사"""
+    name, module_name, func_name, inputs, reference, kwargs = case
+    args = [os.path.join(repo_dir, f) for f in inputs]
+    ref_path = os.path.join(repo_dir, reference)
+    new_path = os.path.join(work_dir, reference)
+    row = {"stage": name, "reference": reference}
+
+    missing = [f for f in args + [ref_path] if not os.path.exists(f)]
+    if missing:
+        row.update(status="skipped", error=f"파일 없음: {', '.join(missing)}")
+        return row
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        row.update(pool.submit(run_stage, module_name, func_name, args + [new_path], kwargs, repeat, True).result())
+    if row["status"] != "ok":
+        return row
+
+    failures = []
+    row["raster"] = compare_outputs(new_path, ref_path, scale, tolerance_px)
+    for layer, r in row["raster"].items():
+        if "shape_mismatch" in r:
+            failures.append(f"{layer}: 크기 다름 {r['shape_mismatch']}")
+        elif r["beyond_tolerance"] > max_diff_pixels:
+            failures.append(f"{layer}: XOR {r['beyond_tolerance']}px > {max_diff_pixels}px")
+    failures.extend(check_budget(row, budget))
+    row["failures"] = failures
+    row["status"] = "fail" if failures else "pass"
+    return row
+
+
+def winding_numbers(points, rings):
+    """점마다 링들의 winding number 합 (넓이가 양수인 방향의 링 안쪽 = +1)"""
+    px, py = points[:, 0][:, None], points[:, 1][:, None]
+    total = np.zeros(len(points), dtype=np.int64)
+    for ring in rings:
+        a, b = ring, np.roll(ring, -1, axis=0)
+        left = (b[:, 0] - a[:, 0]) * (py - a[:, 1]) - (px - a[:, 0]) * (b[:, 1] - a[:, 1])
+        up = (a[:, 1] <= py) & (b[:, 1] > py) & (left > 0)
+        down = (a[:, 1] > py) & (b[:, 1] <= py) & (left < 0)
+        total += np.count_nonzero(up, axis=1) - np.count_nonzero(down, axis=1)
+    return total
+
+
+def check_windings():
+    """
+    normalize_windings 검사 - 정리 전후 nonzero 채움이 같고, 정리 후 winding이 0 또는 1인지
+    (다른 path와 합쳤을 때 겹친 부분이 상쇄되지 않으려면 음수 winding이 없어야 함)
+    """
+    t = np.arange(0.25, 20.0, 0.5)
+    points = np.stack(np.meshgrid(t, t), axis=-1).reshape(-1, 2)
+    failures = []
+    for name, rings in WINDING_CASES:
+        before = winding_numbers(points, rings) != 0
+        after = winding_numbers(points, normalize_windings(rings))
+        if not np.array_equal(after != 0, before):
+            failures.append(f"{name}: 채움이 달라짐 ({np.count_nonzero((after != 0) != before)}점)")
+        elif after.min() < 0 or after.max() > 1:
+            failures.append(f"{name}: winding 범위 {after.min()} ~ {after.max()}")
+    return {"stage": "normalize_windings", "status": "fail" if failures else "pass", "cases": len(WINDING_CASES),
+            "failures": failures}
+
+
+def record_budgets(rows, path, time_margin=2.0, memory_margin=1.5, min_seconds=0.1):
+    """
+    측정값 x 여유 배율을 예산으로 기록 (건너뛴 단계는 이전 값 유지)
+    - 수 ms짜리 단계가 타이머 오차로 실패하지 않도록 시간 예산은 최소 min_seconds
+    """
+    budgets = load_budgets(path)
+    for row in rows:
+        if "seconds_min" not in row:
+            continue
+        budgets[row["stage"]] = {
+            "seconds": max(round(row["seconds_min"] * time_margin, 3), min_seconds),
+            "rss_mb": round(row["rss_peak_mb"] * memory_margin, 1),
+            "tracemalloc_mb": round(row["tracemalloc_peak_mb"] * memory_margin, 2),
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(budgets, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return budgets
+
+
+def regression_check(stages=None, scale=20, tolerance_px=1, max_diff_pixels=0, repeat=3, budget_file=None,
+                     record=False, output_json=None, keep_dir=None):
+    """
+    Args:
+        stages: 검사할 단계 이름 목록 (None이면 전체)
+        scale: 래스터화 배율 (viewBox 1단위당 픽셀 수)
+        tolerance_px: 도형 경계에서 허용하는 차이 (픽셀)
+        max_diff_pixels: 허용 범위 밖 XOR 픽셀 최대 개수
+        repeat: 단계별 반복 횟수 (시간은 최솟값)
+        budget_file: 예산 JSON (None이면 저장소의 regression_budgets.json)
+        record: 예산을 검사하지 않고 현재 측정값으로 다시 기록
+        output_json: 결과 JSON (None이면 저장 안 함)
+        keep_dir: 새 출력을 남길 폴더 (None이면 임시 폴더를 지움)
+
+    Returns:
+        (통과 여부, 단계별 결과)
+    """
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    budget_file = budget_file or os.path.join(repo_dir, BUDGET_FILE)
+    budgets = {} if record else load_budgets(budget_file)
+    stages = CASE_NAMES + GEOMETRY_CHECKS if stages is None else stages
+
+    work_dir = keep_dir or tempfile.mkdtemp(prefix="emi_regression_")
+    os.makedirs(work_dir, exist_ok=True)
+    rows = []
+    try:
+        for case in CASES:
+            if case[0] not in stages:
+                continue
+            row = run_case(case, repo_dir, work_dir, repeat, scale, tolerance_px, max_diff_pixels,
+                           budgets.get(case[0], {}))
+            rows.append(row)
+            if row["status"] in ("pass", "fail"):
+                xor = ", ".join(f"{k} {v.get('beyond_tolerance', '-')}/{v.get('xor', '-')}px"
+                                for k, v in row["raster"].items())
+                print(f"- {row['stage']}: {row['status']} ({row['seconds_min']:.3f}s, RSS {row['rss_peak_mb']}MB, "
+                      f"XOR {xor})")
+                for failure in row["failures"]:
+                    print(f"    {failure}")
+            else:
+                print(f"- {row['stage']}: {row['status']} ({row['error']})")
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if "normalize_windings" in stages:
+        row = check_windings()
+        rows.append(row)
+        print(f"- {row['stage']}: {row['status']} ({row['cases']}개 경우)")
+        for failure in row["failures"]:
+            print(f"    {failure}")
+
+    if record:
+        record_budgets(rows, budget_file)
+        print(f"예산 기록: {budget_file}")
+    if output_json:
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump({"scale": scale, "tolerance_px": tolerance_px, "max_diff_pixels": max_diff_pixels,
+                       "results": rows}, f, ensure_ascii=False, indent=2)
+
+    failed = [r["stage"] for r in rows if r["status"] in ("fail", "error")]
+    passed = sum(r["status"] == "pass" for r in rows)
+    skipped = sum(r["status"] == "skipped" for r in rows)
+    print(f"\n통과 {passed}개, 실패 {len(failed)}개, 건너뜀 {skipped}개")
+    return not failed, rows
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--stages", nargs="+", choices=CASE_NAMES + GEOMETRY_CHECKS, default=None)
+    p.add_argument("--scale", type=float, default=20)
+    p.add_argument("--tolerance_px", type=int, default=1)
+    p.add_argument("--max_diff_pixels", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--budgets", default=None, help="예산 JSON (기본: regression_budgets.json)")
+    p.add_argument("--record_budgets", action="store_true", help="현재 측정값으로 예산 다시 기록")
+    p.add_argument("--json", default=None)
+    p.add_argument("--keep_dir", default=None, help="새 출력을 남길 폴더")
+    args = p.parse_args()
+
+    ok, _ = regression_check(
+        stages=args.stages,
+        scale=args.scale,
+        tolerance_px=args.tolerance_px,
+        max_diff_pixels=args.max_diff_pixels,
+        repeat=args.repeat,
+        budget_file=args.budgets,
+        record=args.record_budgets,
+        output_json=args.json,
+        keep_dir=args.keep_dir,
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,51 +4,70 @@ enclosed_regions.svg에서 표시된 영역을 inverted_output_mask.svg에서 
 
 import re
 
+from svg_writer import SvgWriter, read_svg_text
+import memory_budget
+import tracing
 
-def remove_enclosed_from_inverted(inverted_file, enclosed_file, output_file, background_color="#288f28"):
+
+@tracing.traced("remove_enclosed_from_inverted")
+def remove_enclosed_from_inverted(inverted_file, enclosed_file, output_file, background_color="#288f28",
+                                  precision=4, outline=None):
     """
     inverted_output_mask.svg에서 enclosed_regions.svg에 표시된 영역을 제거
+    precision: 출력 좌표의 소수 자리수 (None이면 원본 그대로), 출력이 .svgz면 gzip 압축
+    outline: 보드 외곽선 링 목록 (board_outline.load_board_outline) - invert / extract-enclosed와 같이
+             배경 사각형을 외곽 링으로 자르고 구멍은 마스크에서 가림 (도형을 다시 만들므로 입력의 clipPath는 남지 않음)
     """
 
-    # inverted_output_mask.svg 읽기
-    with open(inverted_file, 'r', encoding='utf-8') as f:
-        inverted_content = f.read()
-
-    # enclosed_regions.svg 읽기
-    with open(enclosed_file, 'r', encoding='utf-8') as f:
-        enclosed_content = f.read()
-
-    # viewBox와 dimensions 추출
-    viewbox_match = re.search(r'viewBox="([^"]+)"', inverted_content)
-    width_match = re.search(r'width="([^"]+)"', inverted_content)
-    height_match = re.search(r'height="([^"]+)"', inverted_content)
-
-    if viewbox_match:
-        vb_parts = viewbox_match.group(1).split()
-        vb_x, vb_y, vb_width, vb_height = float(vb_parts[0]), float(vb_parts[1]), float(vb_parts[2]), float(vb_parts[3])
-    else:
-        vb_x, vb_y, vb_width, vb_height = 0, 0, 100, 100
-
-    width = width_match.group(1) if width_match else str(vb_width)
-    height = height_match.group(1) if height_match else str(vb_height)
-
-    # inverted_output_mask.svg에서 모든 path와 circle 추출
-    paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', inverted_content)
-    circles = re.findall(r'<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>', inverted_content)
-
-    # enclosed_regions.svg에서 boundary-interior-mask의 path들 추출
-    # fill="white"인 것들이 제거해야 할 영역
-    boundary_mask_match = re.search(r'<mask id="boundary-interior-mask">(.*?)</mask>', enclosed_content, re.DOTALL)
-
-    boundary_paths = []
-    if boundary_mask_match:
-        boundary_mask_content = boundary_mask_match.group(1)
-        # 모든 path 태그를 찾아서 d 속성 추출 (fill="white"인 것만, rect 제외)
-        path_tags = re.findall(r'<path[^>]+fill="white"[^>]*/>', boundary_mask_content)
-        for tag in path_tags:
-            d_match = re.search(r'd="([^"]+)"', tag)
-            if d_match:
-                boundary_paths.append(d_match.group(1))
+    outline_clip, outline_holes, clip_attr = "", "", ""
+    if outline is not None:
+        # 외곽선 처리에만 numpy가 필요 → 외곽선이 있을 때만 불러옴 (CLI 시작 시간)
+        from board_outline import outline_svg_defs
+        outline_clip, outline_holes = outline_svg_defs(outline, precision if precision is not None else 8)
+        clip_attr = ' clip-path="url(#board-outline)"'
+
+    with tracing.span("parse"):
+        # inverted_output_mask.svg 읽기
+        inverted_content = read_svg_text(inverted_file)
+
+        # enclosed_regions.svg 읽기
+        enclosed_content = read_svg_text(enclosed_file)
+        memory_budget.buffer("svg_text", (inverted_content, enclosed_content))
+
+        # viewBox와 dimensions 추출
+        viewbox_match = re.search(r'viewBox="([^"]+)"', inverted_content)
+        width_match = re.search(r'width="([^"]+)"', inverted_content)
+        height_match = re.search(r'height="([^"]+)"', inverted_content)
+
+        if viewbox_match:
+            vb_parts = viewbox_match.group(1).split()
+            vb_x, vb_y, vb_width, vb_height = float(vb_parts[0]), float(vb_parts[1]), float(vb_parts[2]), float(vb_parts[3])
+        else:
+            vb_x, vb_y, vb_width, vb_height = 0, 0, 100, 100
+
+        width = width_match.group(1) if width_match else str(vb_width)
+        height = height_match.group(1) if height_match else str(vb_height)
+
+        # inverted_output_mask.svg에서 모든 path와 circle 추출
+        paths = re.findall(r'<path[^>]*d="([^"]+)"[^>]*/>', inverted_content)
+        circles = re.findall(r'<circle[^>]*cx="([^"]+)"[^>]*cy="([^"]+)"[^>]*r="([^"]+)"[^>]*/>', inverted_content)
+
+        # enclosed_regions.svg에서 boundary-interior-mask의 path들 추출
+        # fill="white"인 것들이 제거해야 할 영역
+        boundary_mask_match = re.search(r'<mask id="boundary-interior-mask">(.*?)</mask>', enclosed_content, re.DOTALL)
+
+        boundary_paths = []
+        if boundary_mask_match:
+            boundary_mask_content = boundary_mask_match.group(1)
+            # 모든 path 태그를 찾아서 d 속성 추출 (fill="white"인 것만, rect 제외)
+            path_tags = re.findall(r'<path[^>]+fill="white"[^>]*/>', boundary_mask_content)
+            for tag in path_tags:
+                d_match = re.search(r'd="([^"]+)"', tag)
+                if d_match:
+                    boundary_paths.append(d_match.group(1))
+
+    tracing.count("paths_in", len(paths) + len(boundary_paths), stage="remove_enclosed_from_inverted")
+    tracing.count("circles_in", len(circles), stage="remove_enclosed_from_inverted")
 
     print(f"inverted_output_mask.svg - path: {len(paths)}개, circle: {len(circles)}개")
     print(f"enclosed_regions.svg - boundary path: {len(boundary_paths)}개")
@@ -60,47 +79,55 @@ def remove_enclosed_from_inverted(inverted_file, enclosed_file, output_file, bac
 
     # 새 SVG 생성
     # 방법: inverted_output_mask와 동일하되, boundary_paths 영역을 추가로 가림
-    svg_output = f'''<?xml version="1.0" encoding="UTF-8"?>
+    with tracing.span("serialize"), SvgWriter(output_file, precision=precision) as w:
+        w.write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
      width="{width}" height="{height}" viewBox="{vb_x} {vb_y} {vb_width} {vb_height}">
 <defs>
-    <!-- 원본 도형들을 마스크로 정의 -->
+{outline_clip}    <!-- 원본 도형들을 마스크로 정의 -->
     <mask id="inverted-mask">
         <!-- 전체 영역을 흰색으로 (보이게) -->
         <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" fill="white"/>
-        
+{outline_holes}        
         <!-- 원본 도형들을 검은색으로 (안 보이게 = 마스크에서 제외) -->
-'''
+''')
 
-    for path_d in paths:
-        svg_output += f'        <path d="{path_d}" fill="black"/>\n'
+        for path_d in paths:
+            w.path(path_d, indent="        ", fill="black")
 
-    for cx, cy, r in circles:
-        svg_output += f'        <circle cx="{cx}" cy="{cy}" r="{r}" fill="black"/>\n'
+        for cx, cy, r in circles:
+            w.circle(cx, cy, r, indent="        ", fill="black")
 
-    # boundary_paths도 검은색으로 추가 (이 영역도 가림 = 제거)
-    svg_output += f'\n        <!-- enclosed_regions에서 제거할 영역 -->\n'
-    for path_d in boundary_paths:
-        svg_output += f'        <path d="{path_d}" fill="black" fill-rule="evenodd"/>' + "\n"
+        # boundary_paths도 검은색으로 추가 (이 영역도 가림 = 제거)
+        w.write(f'\n        <!-- enclosed_regions에서 제거할 영역 -->\n')
+        for path_d in boundary_paths:
+            w.path(path_d, indent="        ", fill="black", fill_rule="evenodd")
 
-    svg_output += f'''    </mask>
+        w.write(f'''    </mask>
 </defs>
 
 <!-- 마스크를 적용한 배경 사각형 - 원본 도형이 없던 부분만 보임 (enclosed 영역 제외) -->
 <rect x="{vb_x}" y="{vb_y}" width="{vb_width}" height="{vb_height}" 
-      fill="{background_color}" mask="url(#inverted-mask)"/>
-</svg>'''
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(svg_output)
+      fill="{background_color}" mask="url(#inverted-mask)"{clip_attr}/>
+</svg>''')
 
+    tracing.count("shapes_out", w.count, stage="remove_enclosed_from_inverted")
+    tracing.count_file("bytes_written", output_file, stage="remove_enclosed_from_inverted")
     print(f"완료! 출력 파일: {output_file}")
 
 
 if __name__ == "__main__":
+    import sys
+
+    # --outline <Gerber 외곽 레이어>: 반전 / 추출 단계와 같은 외곽선으로 자름
+    outline = None
+    if "--outline" in sys.argv:
+        from board_outline import load_board_outline
+        outline = load_board_outline(sys.argv[sys.argv.index("--outline") + 1])
     remove_enclosed_from_inverted(
         "inverted_output_mask.svg",
         "enclosed_regions.svg",
         "inverted_without_enclosed.svg",
-        background_color="#288f28"
+        background_color="#288f28",
+        outline=outline
     )
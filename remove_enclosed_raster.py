@@ -2,30 +2,119 @@ import cairosvg
 from PIL import Image
 import numpy as np
 import io
+import re
+
+import memory_budget
+import tracing
+from svg_writer import read_svg_text
+
+# 한 번에 처리할 때 픽셀당 bytes: 디코딩한 RGBA 2장 + numpy 사본 + 흑백 / bool 마스크들 + 결과 이미지
+RASTER_BYTES_PER_PIXEL = 20
+UNIT_PX = {'': 1.0, 'px': 1.0, 'pt': 96.0 / 72.0, 'mm': 96.0 / 25.4, 'cm': 96.0 / 2.54, 'in': 96.0}
+SVG_TAG_RE = re.compile(r'<svg\b[^>]*>', re.DOTALL)
+
 
 def svg_to_png_bytes(svg_path, scale=10):
-    with open(svg_path, 'r', encoding='utf-8') as f:
-        svg_data = f.read()
+    svg_data = read_svg_text(svg_path)
     png_bytes = cairosvg.svg2png(bytestring=svg_data.encode('utf-8'), scale=scale)
     return png_bytes
 
+
+def svg_canvas(svg_data):
+    """루트 svg 태그의 width / height (px)와 viewBox"""
+    tag = SVG_TAG_RE.search(svg_data).group(0)
+
+    def length(name):
+        m = re.search(r'\s%s="\s*([0-9]*\.?[0-9]+)\s*([a-z]*)\s*"' % name, tag)
+        return float(m.group(1)) * UNIT_PX.get(m.group(2), 1.0) if m else None
+
+    width, height = length('width'), length('height')
+    vb_match = re.search(r'\sviewBox="([^"]+)"', tag)
+    vb = tuple(float(v) for v in vb_match.group(1).replace(',', ' ').split()) if vb_match else None
+    if vb is None:
+        vb = (0.0, 0.0, width or 100.0, height or 100.0)
+    return width or vb[2], height or vb[3], vb
+
+
+def render_strip(svg_data, out_w, out_h, y0, y1):
+    """
+    (out_w, out_h) 캔버스의 y0 ~ y1 행만 렌더링한 이미지
+    - 루트 svg의 height / viewBox를 해당 행 범위로 바꿔서 cairosvg로 렌더링
+    """
+    _, _, (vb_x, vb_y, vb_w, vb_h) = svg_canvas(svg_data)
+    rows = y1 - y0
+    strip_vb = ' '.join(repr(v) for v in (vb_x, vb_y + y0 * vb_h / out_h, vb_w, rows * vb_h / out_h))
+    tag = SVG_TAG_RE.search(svg_data)
+    new_tag = re.sub(r'\s(width|height|viewBox)="[^"]*"', '', tag.group(0))
+    new_tag = new_tag[:4] + f' width="{out_w}" height="{rows}" viewBox="{strip_vb}" preserveAspectRatio="none"' + new_tag[4:]
+    strip_data = svg_data[:tag.start()] + new_tag + svg_data[tag.end():]
+    png_bytes = cairosvg.svg2png(bytestring=strip_data.encode('utf-8'), output_width=out_w, output_height=rows)
+    return Image.open(io.BytesIO(png_bytes))
+
+
+def mask_enclosed_tiled(inverted_svg, enclosed_svg, output_png, scale=10):
+    """
+    mask_enclosed의 가로 띠 버전 (메모리 예산을 넘을 때)
+    - 띠마다 두 SVG를 해당 행 범위만 렌더링해서 마스킹 → 전체 RGBA 결과 배열 1장 + 띠 버퍼만 메모리에 있음
+    - 결과 배열을 복사하지 않고 PNG로 저장 (Image.frombuffer)
+    """
+    inv_data = read_svg_text(inverted_svg)
+    enc_data = read_svg_text(enclosed_svg)
+    width, height, _ = svg_canvas(inv_data)
+    out_w = max(1, int(round(width * scale)))
+    out_h = max(1, int(round(height * scale)))
+    rows = memory_budget.tile_rows('mask_enclosed', out_h, out_w * RASTER_BYTES_PER_PIXEL,
+                                   fixed_bytes=out_w * out_h * 4)
+
+    result = np.zeros((out_h, out_w, 4), dtype=np.uint8)
+    memory_budget.buffer('result', result)
+    for y0 in range(0, out_h, rows):
+        y1 = min(y0 + rows, out_h)
+        with tracing.span('tile', row=y0, rows=y1 - y0):
+            inv_arr = np.array(render_strip(inv_data, out_w, out_h, y0, y1).convert('RGBA'))
+            enc_arr = np.array(render_strip(enc_data, out_w, out_h, y0, y1).convert('L'))
+            memory_budget.buffer('strip', inv_arr)
+            mask = enc_arr < 128
+            inv_arr[~mask] = 0
+            result[y0:y1] = inv_arr
+    tracing.count('pixels', out_w * out_h, stage='mask_enclosed')
+
+    with tracing.span('serialize'):
+        Image.frombuffer('RGBA', (out_w, out_h), result, 'raw', 'RGBA', 0, 1).save(output_png)
+
+@tracing.traced("mask_enclosed")
 def mask_enclosed(inverted_svg, enclosed_svg, output_png, output_svg=None, scale=10):
-    # SVG -> PNG 변환
-    inv_png = svg_to_png_bytes(inverted_svg, scale)
-    enc_png = svg_to_png_bytes(enclosed_svg, scale)
-    inv_img = Image.open(io.BytesIO(inv_png)).convert('RGBA')
-    enc_img = Image.open(io.BytesIO(enc_png)).convert('L')  # 흑백 마스크
-
-    inv_arr = np.array(inv_img)
-    enc_arr = np.array(enc_img)
-
-    # 마스킹: enclosed가 밝은(흰색) 부분은 완전히 투명하게
-    mask = enc_arr < 128  # enclosed가 검정(유지)인 부분만 True
-    inv_arr[~mask, :3] = 0    # RGB를 0으로 초기화 (투명화된 부분이 초록색 등으로 보이지 않게)
-    inv_arr[~mask, 3] = 0     # 알파 0으로
-
-    result_img = Image.fromarray(inv_arr)
-    result_img.save(output_png)
+    # 캔버스 크기로 메모리 예상 → 예산을 넘으면 가로 띠 단위로
+    width, height, _ = svg_canvas(read_svg_text(inverted_svg))
+    pixels = int(round(width * scale)) * int(round(height * scale))
+    if not memory_budget.fits("mask_enclosed", pixels * RASTER_BYTES_PER_PIXEL, fallback=True):
+        with tracing.span("rasterize"):
+            mask_enclosed_tiled(inverted_svg, enclosed_svg, output_png, scale)
+    else:
+        # SVG -> PNG 변환
+        with tracing.span("rasterize"):
+            inv_png = svg_to_png_bytes(inverted_svg, scale)
+            enc_png = svg_to_png_bytes(enclosed_svg, scale)
+            inv_img = Image.open(io.BytesIO(inv_png)).convert('RGBA')
+            enc_img = Image.open(io.BytesIO(enc_png)).convert('L')  # 흑백 마스크
+            memory_budget.buffer("png_bytes", inv_png)
+            memory_budget.buffer("inv_img", inv_img)
+
+        with tracing.span("compute"):
+            inv_arr = np.array(inv_img)
+            enc_arr = np.array(enc_img)
+
+            # 마스킹: enclosed가 밝은(흰색) 부분은 완전히 투명하게
+            mask = enc_arr < 128  # enclosed가 검정(유지)인 부분만 True
+            inv_arr[~mask, :3] = 0    # RGB를 0으로 초기화 (투명화된 부분이 초록색 등으로 보이지 않게)
+            inv_arr[~mask, 3] = 0     # 알파 0으로
+            memory_budget.buffer("inv_arr", inv_arr)
+        tracing.count("pixels", mask.size, stage="mask_enclosed")
+
+        with tracing.span("serialize"):
+            result_img = Image.fromarray(inv_arr)
+            result_img.save(output_png)
+    tracing.count_file("bytes_written", output_png, stage="mask_enclosed")
     print(f"PNG 저장: {output_png}")
 
     if output_svg:
@@ -33,8 +122,7 @@ def mask_enclosed(inverted_svg, enclosed_svg, output_png, output_svg=None, scale
         import base64
         with open(output_png, 'rb') as f:
             b64 = base64.b64encode(f.read()).decode('utf-8')
-        with open(inverted_svg, 'r', encoding='utf-8') as f:
-            svg_content = f.read()
+        svg_content = read_svg_text(inverted_svg)
         import re
         vb_match = re.search(r'viewBox="([^"]+)"', svg_content)
         width_match = re.search(r'width="([^"]+)"', svg_content)
@@ -38,6 +38,16 @@ def is_thin_path(d, min_dimension=0.5):
     return False
 
 
+def insert_thin_paths(inverted_content, mask_end_pos, thin_paths):
+    """얇은 path들을 마스크 끝(</mask>) 바로 앞에 검은색으로 삽입한 SVG 문자열 반환"""
+    # 얇은 요소들을 마스크에 추가할 문자열 생성
+    thin_paths_str = "\n        <!-- 얇은 요소들 (반전 결과에서 제거됨) -->\n"
+    thin_paths_str += ''.join(f'        <path d="{path_d}" fill="black"/>\n' for path_d in thin_paths)
+
+    # 마스크 끝 바로 앞에 삽입
+    return inverted_content[:mask_end_pos] + thin_paths_str + inverted_content[mask_end_pos:]
+
+
 def remove_thin_from_inverted(input_file, output_file, min_dimension=0.5):
     """
     반전된 SVG에서 얇은 선들을 제거
@@ -73,13 +83,7 @@ def remove_thin_from_inverted(input_file, output_file, min_dimension=0.5):
         print("마스크를 찾을 수 없습니다.")
         return
 
-    # 얇은 요소들을 마스크에 추가할 문자열 생성
-    thin_paths_str = "\n        <!-- 얇은 요소들 (반전 결과에서 제거됨) -->\n"
-    for path_d in thin_paths:
-        thin_paths_str += f'        <path d="{path_d}" fill="black"/>\n'
-
-    # 마스크 끝 바로 앞에 삽입
-    new_content = inverted_content[:mask_end_pos] + thin_paths_str + inverted_content[mask_end_pos:]
+    new_content = insert_thin_paths(inverted_content, mask_end_pos, thin_paths)
 
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(new_content)
@@ -34,6 +34,15 @@ def is_thin_path(d, threshold=0.5):
     return width < threshold or height < threshold
 
 
+# 마스크 안의 검은색 path
+MASK_PATH_RE = re.compile(r'<path d="([^"]+)" fill="black"/>')
+
+
+def stroked_path(d, stroke_width):
+    """stroke를 추가한 path 요소 문자열"""
+    return f'<path d="{d}" fill="black" stroke="black" stroke-width="{stroke_width}"/>'
+
+
 def add_stroke_to_thin_paths(input_file, output_file, threshold=0.5, stroke_width=0.3):
     """
     얇은 path들에만 stroke를 추가하여 틈을 메움
@@ -51,16 +60,12 @@ def add_stroke_to_thin_paths(input_file, output_file, threshold=0.5, stroke_widt
         if is_thin_path(d, threshold):
             thin_count += 1
             # 얇은 path에만 stroke 추가
-            return f'<path d="{d}" fill="black" stroke="black" stroke-width="{stroke_width}"/>'
+            return stroked_path(d, stroke_width)
         else:
             # 다른 path는 그대로
             return match.group(0)
 
-    new_content = re.sub(
-        r'<path d="([^"]+)" fill="black"/>',
-        replace_thin_path,
-        content
-    )
+    new_content = MASK_PATH_RE.sub(replace_thin_path, content)
 
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(new_content)
@@ -0,0 +1,201 @@
+"""
+그라운드 plane의 긴 slot / 좁고 긴 빈 공간 검출 스크립트
+- 빈 공간 연결 성분을 골격화(skeletonize)하여 골격 길이와 국소 폭을 비교
+- 길이/폭 비율이나 절대 길이가 기준을 넘는 성분을 좌표와 함께 리포트
+- 모든 계산은 래스터 마스크 전체에 대해 numpy 벡터 연산으로 수행
+"""
+
+import argparse
+import json
+
+import numpy as np
+from PIL import Image
+from scipy import ndimage
+
+from board_outline import load_board_outline
+from clearance_map import distance_transform_tiled
+from raster_mask import rasterize_svg, rasterize_outline, pixel_to_board
+
+
+def _build_thinning_luts():
+    """Zhang-Suen 세선화의 두 단계별 삭제 여부 lookup table (이웃 8비트 코드 -> bool)"""
+    lut1 = np.zeros(256, dtype=bool)
+    lut2 = np.zeros(256, dtype=bool)
+    for code in range(256):
+        # 비트 순서: P2, P3, P4, P5, P6, P7, P8, P9 (위에서 시계방향)
+        p = [(code >> k) & 1 for k in range(8)]
+        b = sum(p)
+        a = sum(1 for k in range(8) if p[k] == 0 and p[(k + 1) % 8] == 1)
+        if not (2 <= b <= 6 and a == 1):
+            continue
+        p2, p4, p6, p8 = p[0], p[2], p[4], p[6]
+        lut1[code] = p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0
+        lut2[code] = p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0
+    return lut1, lut2
+
+
+THINNING_LUT1, THINNING_LUT2 = _build_thinning_luts()
+
+
+def neighbor_codes(img):
+    """각 픽셀의 8이웃을 8비트 코드로 변환 (P2부터 시계방향)"""
+    p = np.pad(img.astype(np.uint8), 1)
+    shifts = [
+        p[:-2, 1:-1], p[:-2, 2:], p[1:-1, 2:], p[2:, 2:],
+        p[2:, 1:-1], p[2:, :-2], p[1:-1, :-2], p[:-2, :-2],
+    ]
+    code = np.zeros(img.shape, dtype=np.uint8)
+    for k, s in enumerate(shifts):
+        code |= s << k
+    return code
+
+
+def skeletonize(mask, max_iter=10000):
+    """Zhang-Suen 세선화 - 매 반복마다 이미지 전체를 한 번에 처리"""
+    img = mask.copy()
+    for _ in range(max_iter):
+        changed = False
+        for lut in (THINNING_LUT1, THINNING_LUT2):
+            remove = img & lut[neighbor_codes(img)]
+            if remove.any():
+                img &= ~remove
+                changed = True
+        if not changed:
+            break
+    return img
+
+
+def detect_slots(input_file, output_json, output_png=None, scale=10, max_ratio=10.0,
+                 max_length=5.0, max_width=None, min_length=0.5, outline=None):
+    """
+    빈 공간 성분 중 길고 좁은 slot 검출
+
+    Args:
+        input_file: 구리 SVG (output.svg 또는 반전 마스크 SVG)
+        output_json: slot 목록 JSON
+        output_png: 골격과 검출된 slot을 표시한 PNG (None이면 생략)
+        scale: viewBox 1단위당 픽셀 수
+        max_ratio: 골격 길이 / 폭 비율이 이 이상이면 slot
+        max_length: 골격 길이가 이 이상이면 slot
+        max_width: 지정하면 폭(중앙값)이 이보다 넓은 성분은 제외
+        min_length: 이보다 짧은 골격은 무시
+        outline: 보드 외곽선 링 목록 - 지정하면 외곽선 밖은 빈 공간에서 제외
+    """
+    copper, vb = rasterize_svg(input_file, scale)
+    free = ~copper
+    if outline is not None:
+        free &= rasterize_outline(outline, vb, copper.shape[1], copper.shape[0])
+    h, w = free.shape
+
+    labels, count = ndimage.label(free, structure=np.ones((3, 3), dtype=bool))
+    print(f"빈 공간 성분 개수: {count}")
+
+    # 국소 폭 = 골격 위에서 구리까지 거리의 2배
+    # 폭 상한이 있을 때만 타일로 계산 (halo가 상한으로 묶임), 없으면 halo가 이미지 전체라 한 번에 계산
+    if max_width is not None:
+        dist = distance_transform_tiled(free, max_width * scale)
+    else:
+        dist = ndimage.distance_transform_edt(free)
+    skeleton = skeletonize(free)
+
+    skel_labels = np.where(skeleton, labels, 0)
+    index = np.arange(1, count + 1)
+    lengths = np.bincount(skel_labels.ravel(), minlength=count + 1)[1:] / scale
+    width_mm = 2.0 * dist / scale
+    median_widths = np.zeros(count)
+    max_widths = np.zeros(count)
+    has_skel = lengths > 0
+    if has_skel.any():
+        median_widths[has_skel] = ndimage.median(width_mm, skel_labels, index[has_skel])
+        max_widths[has_skel] = ndimage.maximum(width_mm, skel_labels, index[has_skel])
+
+    # 골격의 끝점(이웃 1개) 개수 - 0이면 닫힌 고리 형태의 빈 공간
+    skel_neighbors = np.unpackbits(neighbor_codes(skeleton)[..., None], axis=-1).sum(axis=-1)
+    endpoints = np.bincount(skel_labels[skeleton & (skel_neighbors == 1)], minlength=count + 1)[1:]
+
+    ratios = np.divide(lengths, median_widths, out=np.zeros(count), where=median_widths > 0)
+    is_slot = has_skel & (lengths >= min_length) & ((ratios >= max_ratio) | (lengths >= max_length))
+    if max_width is not None:
+        is_slot &= median_widths <= max_width
+
+    objects = ndimage.find_objects(labels)
+    slots = []
+    for i in np.flatnonzero(is_slot):
+        sl = objects[i]
+        rows, cols = np.nonzero(skel_labels[sl] == i + 1)
+        rows = rows + sl[0].start
+        cols = cols + sl[1].start
+        xs, ys = pixel_to_board(cols, rows, vb, w, h)
+        x0, y0 = pixel_to_board(sl[1].start - 0.5, sl[0].start - 0.5, vb, w, h)
+        x1, y1 = pixel_to_board(sl[1].stop - 0.5, sl[0].stop - 0.5, vb, w, h)
+        slots.append({
+            "center": [round(float(xs.mean()), 4), round(float(ys.mean()), 4)],
+            "bbox": [round(float(x0), 4), round(float(y0), 4), round(float(x1), 4), round(float(y1), 4)],
+            "length": round(float(lengths[i]), 4),
+            "median_width": round(float(median_widths[i]), 4),
+            "max_width": round(float(max_widths[i]), 4),
+            "ratio": round(float(ratios[i]), 2),
+            "endpoints": int(endpoints[i]),
+            "closed": bool(endpoints[i] == 0),
+        })
+
+    slots.sort(key=lambda s: s["length"], reverse=True)
+
+    report = {
+        "input": input_file,
+        "scale": scale,
+        "viewBox": list(vb),
+        "max_ratio": max_ratio,
+        "max_length": max_length,
+        "components": int(count),
+        "slots": slots,
+    }
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if output_png:
+        rgb = np.zeros((h, w, 3), dtype=np.uint8)
+        rgb[free] = (60, 60, 60)
+        rgb[skeleton] = (0, 160, 255)
+        slot_ids = np.zeros(count + 1, dtype=bool)
+        slot_ids[1:] = is_slot
+        rgb[skeleton & slot_ids[skel_labels]] = (255, 0, 0)
+        Image.fromarray(rgb, "RGB").save(output_png)
+
+    print(f"완료!")
+    print(f"- 검출된 slot: {len(slots)}개 (닫힌 고리: {sum(1 for s in slots if s['closed'])}개)")
+    print(f"- 기준: 길이/폭 >= {max_ratio} 또는 길이 >= {max_length}")
+    print(f"- 리포트: {output_json}")
+    if output_png:
+        print(f"- 이미지: {output_png}")
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="output.svg")
+    p.add_argument("--json", default="slot_report.json")
+    p.add_argument("--png", default=None)
+    p.add_argument("--scale", type=float, default=10)
+    p.add_argument("--max_ratio", type=float, default=10.0)
+    p.add_argument("--max_length", type=float, default=5.0)
+    p.add_argument("--max_width", type=float, default=None)
+    p.add_argument("--min_length", type=float, default=0.5)
+    p.add_argument("--outline", default=None, help="보드 외곽선 Gerber (.GML 등)")
+    args = p.parse_args()
+
+    detect_slots(
+        args.svg,
+        args.json,
+        output_png=args.png,
+        scale=args.scale,
+        max_ratio=args.max_ratio,
+        max_length=args.max_length,
+        max_width=args.max_width,
+        min_length=args.min_length,
+        outline=load_board_outline(args.outline) if args.outline else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
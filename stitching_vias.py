@@ -0,0 +1,221 @@
+"""
+pour 경계를 따라 stitching via 후보 위치를 생성하는 스크립트
+- pour(반전 결과로 채워지는 빈 공간)의 경계 = 구리 도형의 외곽선 + 보드 경계
+- 경계를 pitch 간격으로 따라가며 pour 쪽으로 via 반지름 + clearance 만큼 떨어진 위치를 후보로 생성
+- 구리 / 드릴과의 clearance 위반은 KD-tree로 후보마다 O(log n)에 검사
+- 결과: Excellon 드릴 파일, SVG 오버레이
+"""
+
+import argparse
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from board_outline import load_board_outline, points_in_outline, distance_to_outline
+from excellon import read_excellon, drills_to_svg, svg_to_drills, write_excellon
+from raster_mask import get_raster_canvas, rasterize_shapes
+from svg_geometry import read_svg_shapes, circles_to_rings, ring_areas, sample_rings
+
+
+def board_ring(vb):
+    """viewBox 사각형을 보드 경계 링으로 변환"""
+    vb_x, vb_y, vb_w, vb_h = vb
+    return np.array([(vb_x, vb_y), (vb_x + vb_w, vb_y), (vb_x + vb_w, vb_y + vb_h), (vb_x, vb_y + vb_h)],
+                    dtype=np.float64)
+
+
+def offset_candidates(rings, pitch, inset, outward):
+    """
+    링 둘레를 따라 후보 생성 후 링 바깥(outward=True) 또는 안쪽으로 inset 만큼 이동
+    넓이가 0인 링(선분 형태)은 방향을 알 수 없으므로 제외
+    """
+    areas = ring_areas(rings)
+    points, tangents, ids = sample_rings(rings, pitch)
+    sign = np.sign(areas[ids])
+    # 넓이가 양수인 링은 진행 방향 왼쪽이 내부
+    left = np.stack([-tangents[:, 1], tangents[:, 0]], axis=1)
+    direction = left * sign[:, None]
+    if outward:
+        direction = -direction
+    keep = sign != 0
+    return points[keep] + direction[keep] * inset
+
+
+def remove_close_pairs(points, min_spacing):
+    """서로 min_spacing보다 가까운 후보 쌍에서 뒤쪽 후보를 제거"""
+    keep = np.ones(len(points), dtype=bool)
+    if len(points) < 2:
+        return keep
+    pairs = cKDTree(points).query_pairs(min_spacing, output_type="ndarray")
+    for i, j in pairs[np.argsort(pairs[:, 0], kind="stable")]:
+        if keep[i] and keep[j]:
+            keep[j] = False
+    return keep
+
+
+def place_stitching_vias(copper_svg, output_drl, output_svg, drill_files=(), drill_origin=(0.0, 0.0),
+                         pitch=2.0, via_drill=0.3, via_diameter=0.6, clearance=0.2,
+                         drill_clearance=0.3, edge_clearance=0.5, min_spacing=None, scale=10, outline=None):
+    """
+    stitching via 후보 생성
+
+    Args:
+        copper_svg: 구리 SVG (output.svg 또는 반전 마스크 SVG)
+        output_drl: 결과 Excellon 파일
+        output_svg: 결과 오버레이 SVG
+        drill_files: 기존 드릴 Excellon 파일 목록
+        drill_origin: SVG 원점에 해당하는 드릴 좌표 (mm)
+        pitch: 경계를 따라가는 후보 간격
+        via_drill: via 드릴 지름
+        via_diameter: via 패드 지름
+        clearance: via 패드와 구리 사이 최소 간격
+        drill_clearance: via 패드와 기존 드릴 사이 최소 간격
+        edge_clearance: via 패드와 보드 경계 사이 최소 간격
+        min_spacing: via 사이 최소 거리 (None이면 pitch)
+        scale: 구리 포함 여부 검사용 래스터의 viewBox 1단위당 픽셀 수
+        outline: 보드 외곽선 링 목록 - 지정하면 viewBox 사각형 대신 외곽선(구멍 포함)을 보드 경계로 사용
+    """
+    if min_spacing is None:
+        min_spacing = pitch
+    via_r = via_diameter / 2.0
+
+    root, polygons, circles = read_svg_shapes(copper_svg)
+    out_w, out_h, vb = get_raster_canvas(root, scale)
+    copper_rings = polygons + circles_to_rings(circles)
+    print(f"구리 링 개수: {len(copper_rings)}")
+
+    # 경계 샘플 간격 - KD-tree 최근접 거리는 실제 거리보다 최대 step/2 클 수 있으므로 그만큼 여유를 둠
+    step = max(clearance / 2.0, 0.01)
+    required = via_r + clearance + step / 2.0
+
+    # 보드 경계 후보: 외곽 링은 안쪽으로, 구멍 링은 바깥쪽으로
+    board_candidates = [offset_candidates([board_ring(vb)] if outline is None else outline[:1], pitch,
+                                          via_r + edge_clearance, outward=False)]
+    if outline is not None and len(outline) > 1:
+        board_candidates.append(offset_candidates(outline[1:], pitch, via_r + edge_clearance, outward=True))
+    candidates = np.concatenate([offset_candidates(copper_rings, pitch, required, outward=True)] + board_candidates)
+    total = len(candidates)
+    print(f"후보 개수: {total}")
+
+    # 보드 경계 안쪽인지
+    vb_x, vb_y, vb_w, vb_h = vb
+    margin = via_r + edge_clearance - 1e-9
+    if outline is not None:
+        ok = points_in_outline(candidates, outline) & (distance_to_outline(candidates, outline) >= margin)
+    else:
+        ok = ((candidates[:, 0] >= vb_x + margin) & (candidates[:, 0] <= vb_x + vb_w - margin) &
+              (candidates[:, 1] >= vb_y + margin) & (candidates[:, 1] <= vb_y + vb_h - margin))
+
+    # 구리 내부에 있는지 (래스터 조회)
+    copper = rasterize_shapes(polygons, circles, vb, out_w, out_h)
+    cols = np.clip(((candidates[:, 0] - vb_x) / vb_w * out_w).astype(np.int64), 0, out_w - 1)
+    rows = np.clip(((candidates[:, 1] - vb_y) / vb_h * out_h).astype(np.int64), 0, out_h - 1)
+    ok &= ~copper[rows, cols]
+    rejected_board = total - int(ok.sum())
+
+    # 구리 경계까지 거리 (KD-tree)
+    edge_points, _, _ = sample_rings(copper_rings, step)
+    if len(edge_points):
+        dist, _ = cKDTree(edge_points).query(candidates, distance_upper_bound=required)
+        too_close = dist < required - 1e-9
+        rejected_copper = int((ok & too_close).sum())
+        ok &= ~too_close
+    else:
+        rejected_copper = 0
+
+    # 기존 드릴까지 거리 (KD-tree 쌍 검색 후 드릴별 반지름으로 정밀 검사)
+    rejected_drill = 0
+    drills = [read_excellon(p) for p in drill_files]
+    drills = np.concatenate(drills) if drills else np.zeros((0, 3))
+    if len(drills):
+        drills = drills_to_svg(drills, drill_origin, vb_h)
+        max_r = drills[:, 2].max() / 2.0
+        cand_tree = cKDTree(candidates)
+        drill_tree = cKDTree(drills[:, :2])
+        near = cand_tree.sparse_distance_matrix(drill_tree, via_r + drill_clearance + max_r, output_type="ndarray")
+        bad = near["v"] < via_r + drill_clearance + drills[near["j"], 2] / 2.0
+        hit = np.zeros(total, dtype=bool)
+        hit[near["i"][bad]] = True
+        rejected_drill = int((ok & hit).sum())
+        ok &= ~hit
+
+    accepted = candidates[ok]
+    keep = remove_close_pairs(accepted, min_spacing)
+    vias = accepted[keep]
+
+    write_excellon(output_drl, svg_to_drills(vias, drill_origin, vb_h), via_drill)
+    write_overlay_svg(output_svg, root, vb, vias, candidates[~ok], via_r, via_drill / 2.0)
+
+    print(f"완료!")
+    print(f"- 보드 밖 / 구리 위 후보: {rejected_board}개")
+    print(f"- 구리 clearance 위반: {rejected_copper}개")
+    print(f"- 드릴 clearance 위반: {rejected_drill}개")
+    print(f"- 간격 부족으로 제거: {int((~keep).sum())}개")
+    print(f"- 배치된 via: {len(vias)}개")
+    print(f"- 드릴 파일: {output_drl}")
+    print(f"- 오버레이: {output_svg}")
+    return vias
+
+
+def write_overlay_svg(output_file, root, vb, vias, rejected, via_r, drill_r):
+    """배치된 via(빨강)와 제외된 후보(회색)를 표시하는 SVG 저장"""
+    vb_x, vb_y, vb_w, vb_h = vb
+    width = root.get("width") or str(vb_w)
+    height = root.get("height") or str(vb_h)
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="{vb_x} {vb_y} {vb_w} {vb_h}">',
+        '<!-- 제외된 후보 -->',
+        '<g fill="#888888">',
+    ]
+    lines.extend(f'  <circle cx="{x:.4f}" cy="{y:.4f}" r="0.05"/>' for x, y in rejected.tolist())
+    lines.append('</g>')
+    lines.append(f'<!-- stitching via: {len(vias)}개 -->')
+    lines.append('<g fill="none" stroke="#ff0000" stroke-width="0.05">')
+    for x, y in vias.tolist():
+        lines.append(f'  <circle cx="{x:.4f}" cy="{y:.4f}" r="{via_r:.4f}"/>')
+        lines.append(f'  <circle cx="{x:.4f}" cy="{y:.4f}" r="{drill_r:.4f}"/>')
+    lines.append('</g>')
+    lines.append('</svg>')
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="output.svg")
+    p.add_argument("--drl", default="stitching_vias.drl")
+    p.add_argument("--overlay", default="stitching_vias.svg")
+    p.add_argument("--drills", nargs="*", default=[])
+    p.add_argument("--drill_origin", type=float, nargs=2, default=[0.0, 0.0])
+    p.add_argument("--pitch", type=float, default=2.0)
+    p.add_argument("--via_drill", type=float, default=0.3)
+    p.add_argument("--via_diameter", type=float, default=0.6)
+    p.add_argument("--clearance", type=float, default=0.2)
+    p.add_argument("--drill_clearance", type=float, default=0.3)
+    p.add_argument("--edge_clearance", type=float, default=0.5)
+    p.add_argument("--min_spacing", type=float, default=None)
+    p.add_argument("--outline", default=None, help="보드 외곽선 Gerber (.GML 등)")
+    args = p.parse_args()
+
+    place_stitching_vias(
+        args.svg,
+        args.drl,
+        args.overlay,
+        drill_files=args.drills,
+        drill_origin=tuple(args.drill_origin),
+        pitch=args.pitch,
+        via_drill=args.via_drill,
+        via_diameter=args.via_diameter,
+        clearance=args.clearance,
+        drill_clearance=args.drill_clearance,
+        edge_clearance=args.edge_clearance,
+        min_spacing=args.min_spacing,
+        outline=load_board_outline(args.outline) if args.outline else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""
+SVG 도형 공통 읽기 모듈
+- path / polygon / rect / circle / use 요소를 좌표 배열로 변환
+- 분석 스크립트들이 같은 규칙으로 구리(도형) 영역을 읽도록 함
+
+구리로 보는 요소:
+- 원본 SVG (output.svg): 그려지는 모든 도형 + use로 배치된 defs 도형
+- 반전 마스크 SVG (inverted_output_mask.svg 등): 마스크 안의 검은색 도형
+흰색 채움(마스크 배경)과 mask 속성이 붙은 배경 사각형은 제외
+"""
+
+import math
+from xml.etree import ElementTree as ET
+
+import numpy as np
+
+# transform 도우미는 numpy 없는 svg_transform에 있음 (기존 import 경로 유지를 위해 다시 내보냄)
+from svg_transform import (strip_ns, parse_number_list, parse_transform, compose, translation, matrix_to_attr,
+                           apply_matrix_point, is_similarity)
+from svg_writer import PATH_TOKEN_RE, NUMBER_RE
+
+
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+# path 명령별 인자 개수 (곡선은 끝점만 사용)
+PATH_ARG_COUNT = {"M": 2, "L": 2, "H": 1, "V": 1, "Z": 0, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7}
+
+WHITE_FILLS = {"white", "#fff", "#ffffff", "#ffffffff"}
+
+
+def path_to_rings(d):
+    """
+    path d 속성을 링(점 배열) 목록으로 변환
+    - 절대/상대 M, L, H, V, Z 처리
+    - 곡선(C, S, Q, T, A)은 끝점만 사용하여 직선으로 근사
+    """
+    rings = []
+    pts = []
+    x = y = 0.0
+    start_x = start_y = 0.0
+    cmd = None
+    toks = PATH_TOKEN_RE.findall(d or "")
+    i = 0
+
+    def flush():
+        nonlocal pts
+        if len(pts) >= 2:
+            rings.append(np.array(pts, dtype=np.float64))
+        pts = []
+
+    while i < len(toks):
+        t = toks[i]
+        if t.isalpha():
+            cmd = t
+            i += 1
+            if cmd in "Zz":
+                if pts:
+                    x, y = start_x, start_y
+                flush()
+                cmd = None
+            continue
+        if cmd is None:
+            i += 1
+            continue
+
+        upper = cmd.upper()
+        n = PATH_ARG_COUNT[upper]
+        if i + n > len(toks):
+            break
+        args = [float(v) for v in toks[i:i + n]]
+        i += n
+        rel = cmd.islower()
+
+        if upper == "M":
+            flush()
+            x = args[0] + (x if rel else 0.0)
+            y = args[1] + (y if rel else 0.0)
+            start_x, start_y = x, y
+            # M 다음의 좌표들은 L로 취급
+            cmd = "l" if rel else "L"
+        elif upper == "H":
+            x = args[0] + (x if rel else 0.0)
+        elif upper == "V":
+            y = args[0] + (y if rel else 0.0)
+        else:
+            x = args[-2] + (x if rel else 0.0)
+            y = args[-1] + (y if rel else 0.0)
+        pts.append((x, y))
+
+    flush()
+    return rings
+
+
+def path_extent(d):
+    """
+    path가 그리는 범위를 넉넉하게 계산 (다시 그릴 영역 찾기용)
+    - 절대/상대 명령 모두 처리, 곡선은 제어점까지 포함
+    - 호(A)는 양 끝점에서 max(반지름, 끝점 사이 거리)의 2배까지 포함
+
+    Returns:
+        (min_x, min_y, max_x, max_y) 또는 좌표가 없으면 None
+    """
+    xs, ys = [], []
+    x = y = 0.0
+    start_x = start_y = 0.0
+    cmd = None
+    toks = PATH_TOKEN_RE.findall(d or "")
+    i = 0
+    while i < len(toks):
+        t = toks[i]
+        if t.isalpha():
+            cmd = t
+            i += 1
+            if cmd in "Zz":
+                x, y = start_x, start_y
+                cmd = None
+            continue
+        if cmd is None:
+            i += 1
+            continue
+
+        upper = cmd.upper()
+        n = PATH_ARG_COUNT[upper]
+        if i + n > len(toks):
+            break
+        args = [float(v) for v in toks[i:i + n]]
+        i += n
+        ox, oy = (x, y) if cmd.islower() else (0.0, 0.0)
+
+        if upper == "H":
+            x = args[0] + ox
+        elif upper == "V":
+            y = args[0] + oy
+        elif upper == "A":
+            nx, ny = args[5] + ox, args[6] + oy
+            r = 2 * max(abs(args[0]), abs(args[1]), math.hypot(nx - x, ny - y))
+            xs += [x - r, x + r]
+            ys += [y - r, y + r]
+            x, y = nx, ny
+        else:
+            # 곡선의 제어점 + 끝점
+            for j in range(0, n - 2, 2):
+                xs.append(args[j] + ox)
+                ys.append(args[j + 1] + oy)
+            x, y = args[-2] + ox, args[-1] + oy
+        if upper == "M":
+            start_x, start_y = x, y
+            cmd = "l" if cmd == "m" else "L"
+        xs.append(x)
+        ys.append(y)
+
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def rect_to_ring(elem):
+    x = float(elem.get("x") or 0.0)
+    y = float(elem.get("y") or 0.0)
+    w = float(elem.get("width") or 0.0)
+    h = float(elem.get("height") or 0.0)
+    return np.array([(x, y), (x + w, y), (x + w, y + h), (x, y + h)], dtype=np.float64)
+
+
+def is_background(elem):
+    """마스크 배경(흰색 채움)이나 마스크가 적용된 배경 사각형인지 확인"""
+    fill = (elem.get("fill") or "").strip().lower()
+    if fill in WHITE_FILLS:
+        return True
+    return strip_ns(elem.tag) == "rect" and elem.get("mask") is not None
+
+
+# 도형으로 읽는 요소 (나머지는 자식을 따라 내려가는 컨테이너로 취급)
+SHAPE_TAGS = ("path", "polygon", "polyline", "rect", "circle")
+
+
+def apply_matrix(points, m):
+    """(N, 2) 좌표 배열 전체에 아핀 행렬을 한 번에 적용 (행렬 곱 1번)"""
+    a, b, c, d, e, f = m
+    return points @ np.array(((a, b), (c, d))) + (e, f)
+
+
+def load_templates(root):
+    """defs 안에서 use로 참조할 수 있는 요소들 (id -> 요소 목록)"""
+    templates = {}
+    for elem in root.iter():
+        if strip_ns(elem.tag) == "defs":
+            for child in elem:
+                if strip_ns(child.tag) != "mask" and child.get("id"):
+                    templates[child.get("id")] = [child]
+    return templates
+
+
+def walk_shapes(root, templates):
+    """
+    그려지는 도형 요소와 그 요소에 적용되는 누적 행렬을 문서 순서대로 나열 -> [(요소, 태그, 행렬), ...]
+    - 그룹 transform을 아래로 누적 (행렬이 없으면 None)
+    - transform이 없는 자식들은 부모와 같은 행렬을 받으므로 호출하는 쪽에서 묶어서 처리 가능
+    - use는 use의 transform 다음에 translate(x, y)를 적용한 뒤 참조 요소를 따라감
+    - defs 안에서는 mask 내용만 도형으로 취급
+    """
+    shapes = []
+    append = shapes.append
+
+    def visit(elem, tag, matrix):
+        if tag == "defs":
+            for child in elem:
+                if strip_ns(child.tag) == "mask":
+                    visit(child, "mask", matrix)
+            return
+
+        if is_background(elem):
+            return
+
+        transform = elem.get("transform")
+        if transform is not None:
+            matrix = compose(matrix, parse_transform(transform))
+
+        if tag in SHAPE_TAGS:
+            append((elem, tag, matrix))
+            return
+
+        if tag == "use":
+            ref = (elem.get(XLINK_HREF) or elem.get("href") or "").lstrip("#")
+            if ref in templates:
+                ux = float(elem.get("x") or 0.0)
+                uy = float(elem.get("y") or 0.0)
+                if ux or uy:
+                    matrix = compose(matrix, translation(ux, uy))
+                for child in templates[ref]:
+                    visit(child, strip_ns(child.tag), matrix)
+            return
+
+        for child in elem:
+            visit(child, strip_ns(child.tag), matrix)
+
+    visit(root, strip_ns(root.tag), None)
+    return shapes
+
+
+def element_rings(elem, tag):
+    """도형 요소 하나의 로컬 좌표 링 목록 (원 제외)"""
+    if tag == "path":
+        return path_to_rings(elem.get("d"))
+    if tag in ("polygon", "polyline"):
+        nums = parse_number_list(elem.get("points"))
+        if len(nums) >= 4:
+            return [np.array(nums[:len(nums) // 2 * 2], dtype=np.float64).reshape(-1, 2)]
+        return []
+    if tag == "rect":
+        return [rect_to_ring(elem)]
+    return []
+
+
+def read_shapes(root):
+    """
+    SVG 루트에서 구리 도형들을 읽음 (그룹 / use / 요소의 transform 적용)
+    - geometry_store.GeometryStore를 만들어 링 / 원 열만 꺼냄 (링은 저장소 좌표 배열의 뷰)
+
+    Returns:
+        polygons: (N, 2) 좌표 배열 리스트 (링 하나당 배열 하나)
+        circles: (M, 3) 배열 (cx, cy, r)
+    """
+    from geometry_store import GeometryStore
+
+    shapes = GeometryStore.from_root(root, keep_source=False).view()
+    return shapes.rings(), shapes.circle_array()
+
+
+def read_svg_shapes(svg_path):
+    """SVG 파일을 읽어 (root, polygons, circles) 반환"""
+    root = ET.parse(svg_path).getroot()
+    polygons, circles = read_shapes(root)
+    return root, polygons, circles
+
+
+def circles_to_rings(circles, segments=16):
+    """원들을 정다각형 링으로 변환"""
+    t = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False)
+    unit = np.stack([np.cos(t), np.sin(t)], axis=1)
+    return [c[:2] + c[2] * unit for c in circles]
+
+
+def concat_rings(rings):
+    """
+    링 리스트를 하나의 좌표 배열로 합침
+
+    Returns:
+        points: (N, 2) 전체 좌표
+        ring_ids: (N,) 각 점이 속한 링 번호
+        nxt: (N,) 같은 링 안에서 다음 점의 인덱스 (마지막 점은 첫 점으로)
+    """
+    if not rings:
+        return np.zeros((0, 2)), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    lengths = np.array([len(r) for r in rings])
+    points = np.concatenate(rings)
+    ring_ids = np.repeat(np.arange(len(rings)), lengths)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    nxt = np.arange(len(points)) + 1
+    nxt[starts + lengths - 1] = starts
+    return points, ring_ids, nxt
+
+
+def ring_areas(rings):
+    """링별 부호 있는 넓이 (shoelace) - 모든 링을 한 번에 계산"""
+    points, ring_ids, nxt = concat_rings(rings)
+    cross = points[:, 0] * points[nxt, 1] - points[nxt, 0] * points[:, 1]
+    return 0.5 * np.bincount(ring_ids, weights=cross, minlength=len(rings))
+
+
+def sample_rings(rings, pitch):
+    """
+    모든 링의 둘레를 따라 pitch 간격으로 점을 배치 (링별 간격은 둘레를 균등 분할)
+
+    Returns:
+        points: (M, 2) 샘플 좌표
+        tangents: (M, 2) 진행 방향 단위 벡터
+        ring_ids: (M,) 샘플이 속한 링 번호
+    """
+    pts, ids, nxt = concat_rings(rings)
+    if len(pts) == 0:
+        return np.zeros((0, 2)), np.zeros((0, 2)), np.zeros(0, dtype=np.int64)
+
+    edges = pts[nxt] - pts
+    edge_len = np.hypot(edges[:, 0], edges[:, 1])
+    cum_end = np.cumsum(edge_len)
+    perimeter = np.bincount(ids, weights=edge_len, minlength=len(rings))
+    first_edge = np.searchsorted(ids, np.arange(len(rings)))
+    ring_start = cum_end[first_edge] - edge_len[first_edge]
+
+    counts = np.floor(perimeter / pitch).astype(np.int64)
+    sample_ring = np.repeat(np.arange(len(rings)), counts)
+    if len(sample_ring) == 0:
+        return np.zeros((0, 2)), np.zeros((0, 2)), sample_ring
+
+    # 링 안에서 몇 번째 샘플인지
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    k = np.arange(len(sample_ring)) - np.repeat(first, counts)
+    step = perimeter[sample_ring] / counts[sample_ring]
+    s = ring_start[sample_ring] + (k + 0.5) * step
+
+    edge = np.searchsorted(cum_end, s, side="right")
+    edge = np.minimum(edge, len(pts) - 1)
+    t = (s - (cum_end[edge] - edge_len[edge])) / np.maximum(edge_len[edge], 1e-12)
+    points = pts[edge] + edges[edge] * t[:, None]
+    tangents = edges[edge] / np.maximum(edge_len[edge], 1e-12)[:, None]
+    return points, tangents, sample_ring
+
+
+# path 명령 문자와 쉼표를 공백으로 바꾸는 변환표 ('inf'는 path 구분자로 사용)
+PATH_CMD_TABLE = str.maketrans({c: " " for c in "MmLlHhVvZzCcSsQqTtAa,"})
+
+
+def _parse_numbers(text):
+    """명령 문자를 공백으로 바꾼 뒤 np.fromstring으로 숫자 파싱 (해석 못 하는 문자가 있으면 ValueError)"""
+    text = text.translate(PATH_CMD_TABLE)
+    # '1.5-2.5'처럼 붙어 있는 음수 분리 (지수 표기 'e-'는 되돌림)
+    text = text.replace("-", " -").replace("e -", "e-").replace("E -", "E-")
+    return np.fromstring(text, sep=" ")
+
+
+def _parse_numbers_lenient(d):
+    """path 하나를 파싱하되, 실패하면 정규식으로 찾은 숫자만 사용"""
+    try:
+        return _parse_numbers(d)
+    except ValueError:
+        return np.array([float(n) for n in NUMBER_RE.findall(d)], dtype=float)
+
+
+def path_number_arrays(ds):
+    """
+    여러 path d 문자열의 숫자들을 한 번에 파싱
+
+    Returns:
+        nums: 모든 path의 숫자를 이어붙인 1차원 배열
+        counts: path별 숫자 개수
+    """
+    if not ds:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+    try:
+        raw = _parse_numbers(" inf ".join(ds))
+    except ValueError:
+        # 숫자가 아닌 문자가 섞인 d가 있으면 path별로 따로 파싱
+        nums = [_parse_numbers_lenient(d) for d in ds]
+        counts = np.array([len(n) for n in nums], dtype=np.int64)
+        return np.concatenate(nums), counts
+    sep = np.isinf(raw)
+    ids = np.cumsum(sep)[~sep]
+    nums = raw[~sep]
+    counts = np.bincount(ids, minlength=len(ds))
+    return nums, counts
+
+
+def segment_min_max(values, counts):
+    """연속된 구간별 최소/최대 (빈 구간은 0)"""
+    mins = np.zeros(len(counts))
+    maxs = np.zeros(len(counts))
+    nonempty = counts > 0
+    if values.size:
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+        mins[nonempty] = np.minimum.reduceat(values, starts)
+        maxs[nonempty] = np.maximum.reduceat(values, starts)
+    return mins, maxs
+
+
+def path_bboxes(ds):
+    """
+    path들의 bounding box를 한 번에 계산
+    - 숫자들을 순서대로 (x, y) 쌍으로 봄 (기존 parse_path_commands와 같은 방식)
+    - 좌표가 2개 미만인 path는 (0, 0, 0, 0)
+
+    Returns:
+        (N, 4) 배열 (min_x, min_y, max_x, max_y)
+    """
+    return bboxes_from_numbers(*path_number_arrays(ds))
+
+
+def bboxes_from_numbers(nums, counts):
+    """path_number_arrays 결과로 path별 bounding box 계산"""
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    local = np.arange(len(nums)) - np.repeat(starts, counts)
+    is_x = local % 2 == 0
+    min_x, max_x = segment_min_max(nums[is_x], (counts + 1) // 2)
+    min_y, max_y = segment_min_max(nums[~is_x], counts // 2)
+    bboxes = np.stack([min_x, min_y, max_x, max_y], axis=1)
+    bboxes[counts < 2] = 0.0
+    return bboxes
+
+
+def points_in_ring(points, ring):
+    """점들이 링 안에 있는지 (crossing number, 모든 점을 한 번에 검사)"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    a = ring
+    b = np.roll(ring, -1, axis=0)
+    px = points[:, 0][:, None]
+    py = points[:, 1][:, None]
+    crosses = (a[:, 1] > py) != (b[:, 1] > py)
+    dy = np.where(b[:, 1] == a[:, 1], 1e-300, b[:, 1] - a[:, 1])
+    x_at = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / dy
+    return (np.count_nonzero(crosses & (px < x_at), axis=1) % 2) == 1
+
+
+def normalize_windings(rings):
+    """
+    한 path의 링들을 nonzero 규칙으로 합쳐도 같은 모양이 되도록 방향 정리
+    - 링마다 자신을 포함하는 가장 작은 링(부모)을 찾고, 바깥에서부터 원래 방향(넓이 부호)을 더해
+      링 바로 안쪽의 원래 winding을 계산 → 0이 아니면 채워진 영역
+    - 채워진 영역의 경계는 넓이가 양수인 방향, 빈 영역(구멍)의 경계는 음수인 방향
+      → 구멍 안의 섬은 다시 양수, 정리 후 winding은 어디서나 0 또는 1
+    - 부모와 채움 상태가 같은 링(같은 방향으로 겹친 링)은 경계가 아니므로 뺌
+    - 이렇게 정리한 링들은 다른 path의 링과 한 path로 합쳐도 겹치는 부분이 상쇄되지 않음
+    """
+    if not rings:
+        return []
+    areas = ring_areas(rings)
+    sign = np.where(areas < 0, -1, 1)
+    abs_areas = np.abs(areas)
+    # 큰 링부터 → 부모의 winding이 먼저 정해짐
+    order = np.argsort(-abs_areas, kind="stable")
+    winding = np.zeros(len(rings), dtype=np.int64)
+    parent = np.full(len(rings), -1)
+    for k, i in enumerate(order):
+        # 자신보다 큰 링 중 가장 작은 것부터 검사 → 처음 포함하는 링이 부모
+        for j in order[:k][::-1]:
+            if abs_areas[j] > abs_areas[i] and points_in_ring(rings[i][:1], rings[j])[0]:
+                parent[i] = j
+                break
+        winding[i] = sign[i] + (winding[parent[i]] if parent[i] >= 0 else 0)
+
+    result = []
+    for i, ring in enumerate(rings):
+        filled = winding[i] != 0
+        parent_filled = parent[i] >= 0 and winding[parent[i]] != 0
+        if filled == parent_filled:
+            continue
+        target = 1 if filled else -1
+        result.append(ring if sign[i] == target else ring[::-1])
+    return result
@@ -0,0 +1,210 @@
+"""
+SVG 스트리밍 처리 모듈 (iterparse)
+- 입력 트리 전체를 메모리에 올리지 않고 요소를 읽는 대로 처리한 뒤 바로 지움
+- 출력도 요소 단위로 바로 파일에 씀 → 수백 MB 패널 SVG도 일정한 메모리로 처리
+- extract_paths_from_svg.py / cut_svg.py의 스트리밍 모드에서 사용
+
+출력 형식 (기존 ET.parse 방식과 같은 구성):
+- 루트 요소 (원본 속성 + 원본의 namespace 선언)
+- 루트 바로 아래의 defs / style 요소는 내용 그대로 복사
+- 그 뒤에 지정한 도형 요소들을 (그룹 안에 있던 것까지) 속성만 복사해서 평탄하게 나열
+  (상위 그룹의 transform은 누적해서 요소의 transform 속성으로 붙임)
+"""
+
+import gzip
+import shutil
+import tempfile
+from xml.etree import ElementTree as ET
+
+from svg_transform import strip_ns, compose, parse_transform, matrix_to_attr
+from svg_writer import open_svg_text
+
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# 루트 바로 아래에서 통째로 복사하는 요소
+COPY_TAGS = ("defs", "style")
+
+
+# xml.sax.saxutils의 escape / quoteattr와 같은 규칙
+# (saxutils는 urllib 등을 함께 불러와 cut 단계 시작이 수십 ms 느려짐)
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTR_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"})
+
+
+def escape(text):
+    return text.translate(TEXT_ESCAPES)
+
+
+def quoteattr(value):
+    value = value.translate(ATTR_ESCAPES)
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    return '"{}"'.format(value.replace('"', "&quot;"))
+
+
+def open_svg_binary(path):
+    """iterparse용으로 SVG(.svg / .svgz)를 바이너리로 열기"""
+    if path.endswith(".svgz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+class _Namespaces:
+    """namespace URI → 출력할 접두어 (SVG는 기본 namespace)"""
+
+    def __init__(self):
+        self.decls = []
+        self.prefixes = {SVG_NS: "", XML_NS: "xml"}
+        self.declared = set()
+
+    def add(self, prefix, uri):
+        self.decls.append((prefix, uri))
+        if uri not in self.prefixes:
+            self.prefixes[uri] = prefix or ""
+
+    def qname(self, tag):
+        if not tag.startswith("{"):
+            return tag
+        uri, local = tag[1:].split("}", 1)
+        prefix = self.prefixes.get(uri)
+        if prefix is None:
+            # 선언되지 않은 namespace는 ns0, ns1, ...로 새로 선언
+            prefix = self.prefixes[uri] = f"ns{len(self.prefixes)}"
+            self.decls.append((prefix, uri))
+        return f"{prefix}:{local}" if prefix else local
+
+    def declarations(self, root=False):
+        """아직 출력하지 않은 namespace 선언 (루트 아래에서 선언된 것은 다음에 쓰는 요소에 붙임)"""
+        out = [f' xmlns={quoteattr(SVG_NS)}'] if root else []
+        for prefix, uri in self.decls:
+            if not prefix or prefix in self.declared:
+                continue
+            self.declared.add(prefix)
+            out.append(f" xmlns:{prefix}={quoteattr(uri)}")
+        self.decls = []
+        return "".join(out)
+
+    def start_tag(self, elem, close=False, attrib=None):
+        qname = self.qname(elem.tag)
+        attrs = self.attrs(elem.attrib if attrib is None else attrib)
+        return f"<{qname}{self.declarations()}{attrs}{' />' if close else '>'}"
+
+    def attrs(self, attrib):
+        return "".join(f" {self.qname(k)}={quoteattr(v)}" for k, v in attrib.items())
+
+
+def stream_svg_shapes(input_path, output_path, shape_tags, keep=None):
+    """
+    SVG를 스트리밍으로 읽으면서 도형 요소만 평탄하게 추출
+
+    Args:
+        input_path: 입력 SVG (.svg / .svgz)
+        output_path: 출력 SVG (.svg / .svgz)
+        shape_tags: 추출할 요소 이름들 (예: ('path',))
+        keep: keep(tag, attrib) -> bool 필터 (False면 그 요소와 하위 요소를 건너뜀)
+
+    Returns:
+        출력한 도형 개수
+    """
+    shape_tags = set(shape_tags)
+    ns = _Namespaces()
+    written = 0
+
+    # 도형은 defs 복사가 끝난 뒤에 나와야 하므로, defs 안에서 찾은 도형은 임시 파일에 모아둠
+    spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+    # [요소, text 출력 여부, 마지막으로 시작한 자식, 누적 transform 행렬]
+    # iterparse는 이벤트보다 앞서 파싱하므로 부모의 자식 목록 대신 직접 기록한 마지막 자식을 사용
+    stack = []
+    copy_depth = None   # defs/style 복사 중이면 그 요소의 깊이
+    skip_depth = None   # 필터에서 제외한 도형의 깊이 (하위 요소도 건너뜀)
+
+    def release(entry):
+        """마지막 자식의 tail을 (복사 중이면) 쓰고 그 자식을 메모리에서 제거"""
+        child = entry[2]
+        if child is None:
+            return
+        if copy_depth is not None:
+            out.write(escape(child.tail or ""))
+        child.clear()
+        parent = entry[0]
+        if len(parent) and parent[0] is child:
+            del parent[0]
+        entry[2] = None
+
+    with open_svg_binary(input_path) as src, open_svg_text(output_path, "w") as out, spool:
+        for event, elem in ET.iterparse(src, events=("start-ns", "start", "end")):
+            if event == "start-ns":
+                ns.add(*elem)
+                continue
+
+            if event == "start":
+                depth = len(stack)
+                if depth == 0:
+                    stack.append([elem, False, None, None])
+                    qname = ns.qname(elem.tag)
+                    attrs = ns.attrs(elem.attrib)
+                    out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+                    out.write(f"<{qname}{ns.declarations(root=True)}{attrs}>\n")
+                    continue
+
+                parent_entry = stack[-1]
+                if copy_depth is not None and not parent_entry[1]:
+                    out.write(escape(parent_entry[0].text or ""))
+                    parent_entry[1] = True
+                release(parent_entry)
+                parent_entry[2] = elem
+                parent_matrix = parent_entry[3]
+                matrix = compose(parent_matrix, parse_transform(elem.get("transform")))
+                stack.append([elem, False, None, matrix])
+
+                if copy_depth is not None:
+                    out.write(ns.start_tag(elem))
+                elif depth == 1 and strip_ns(elem.tag) in COPY_TAGS:
+                    copy_depth = depth
+                    out.write(ns.start_tag(elem))
+
+                if skip_depth is not None:
+                    continue
+                tag = strip_ns(elem.tag)
+                if tag in shape_tags:
+                    if keep is not None and not keep(tag, elem.attrib):
+                        skip_depth = depth
+                        continue
+                    target = spool if copy_depth is not None else out
+                    attrib = None
+                    if parent_matrix is not None:
+                        attrib = dict(elem.attrib)
+                        attrib["transform"] = matrix_to_attr(matrix)
+                    target.write(ns.start_tag(elem, close=True, attrib=attrib) + "\n")
+                    written += 1
+                continue
+
+            # end
+            entry = stack.pop()
+            depth = len(stack)
+            if skip_depth == depth:
+                skip_depth = None
+
+            if copy_depth is not None:
+                if not entry[1]:
+                    out.write(escape(elem.text or ""))
+                release(entry)
+                out.write(f"</{ns.qname(elem.tag)}>")
+                if depth == copy_depth:
+                    copy_depth = None
+                    out.write("\n")
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, out)
+                    spool.seek(0)
+                    spool.truncate()
+            else:
+                release(entry)
+
+            if depth == 0:
+                out.write(f"</{ns.qname(elem.tag)}>\n")
+
+    return written
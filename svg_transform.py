@@ -0,0 +1,100 @@
+"""
+SVG 태그 / transform 도우미 (numpy 없음)
+- 태그 이름에서 namespace 제거, 숫자 목록 파싱, transform 속성 → 아핀 행렬 (a, b, c, d, e, f)
+- cut / extract-paths 등 numpy를 쓰지 않는 벡터 단계가 svg_geometry(numpy)를 불러오지 않고 쓰도록 분리
+  (svg_geometry는 이 함수들을 그대로 다시 내보냄)
+"""
+
+import math
+import re
+
+from svg_writer import PATH_TOKEN_RE
+
+
+TRANSFORM_RE = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+_local_tags = {}
+
+
+def strip_ns(tag):
+    # 태그 종류는 몇 개 안 되므로 변환 결과를 캐시
+    local = _local_tags.get(tag)
+    if local is None:
+        local = tag.split("}", 1)[1] if tag.startswith("{") else tag
+        _local_tags[tag] = local
+    return local
+
+
+def parse_number_list(s):
+    """'x1,y1 x2,y2 ...' 형태의 숫자 목록 파싱"""
+    if not s:
+        return []
+    return [float(n) for n in PATH_TOKEN_RE.findall(s.replace(",", " ")) if not n.isalpha()]
+
+
+def parse_transform(s):
+    """
+    transform 속성을 아핀 행렬 (a, b, c, d, e, f)로 변환 (없거나 비어 있으면 None)
+    - x' = a*x + c*y + e, y' = b*x + d*y + f (SVG matrix() 순서)
+    - matrix, translate, scale, rotate(각도 [cx cy]), skewX, skewY 지원
+    - 여러 개가 나열되면 왼쪽부터 곱함 (SVG 규칙)
+    """
+    if not s:
+        return None
+    m = None
+    for name, args in TRANSFORM_RE.findall(s):
+        v = parse_number_list(args)
+        if name == "matrix" and len(v) == 6:
+            t = tuple(v)
+        elif name == "translate" and v:
+            t = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale" and v:
+            t = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate" and v:
+            a = math.radians(v[0])
+            cos, sin = math.cos(a), math.sin(a)
+            t = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(v) >= 3:
+                # rotate(a, cx, cy) = translate(cx, cy) rotate(a) translate(-cx, -cy)
+                t = compose(compose(translation(v[1], v[2]), t), translation(-v[1], -v[2]))
+        elif name == "skewX" and v:
+            t = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY" and v:
+            t = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        m = compose(m, t)
+    return m
+
+
+def compose(m, n):
+    """부모 행렬 m(None = 단위 행렬) 다음에 자식 행렬 n을 적용하는 행렬"""
+    if n is None:
+        return m
+    if m is None:
+        return n
+    a, b, c, d, e, f = m
+    na, nb, nc, nd, ne, nf = n
+    return (a * na + c * nb, b * na + d * nb,
+            a * nc + c * nd, b * nc + d * nd,
+            a * ne + c * nf + e, b * ne + d * nf + f)
+
+
+def translation(dx, dy):
+    return (1.0, 0.0, 0.0, 1.0, dx, dy)
+
+
+def matrix_to_attr(m):
+    """행렬을 transform 속성 문자열 'matrix(a,b,c,d,e,f)'로 변환"""
+    return "matrix({:.10g},{:.10g},{:.10g},{:.10g},{:.10g},{:.10g})".format(*m)
+
+
+def apply_matrix_point(m, x, y):
+    a, b, c, d, e, f = m
+    return a * x + c * y + e, b * x + d * y + f
+
+
+def is_similarity(m):
+    """회전/이동/균일 배율(반사 포함)만 있는 행렬인지 - 원이 원으로 유지됨"""
+    a, b, c, d = m[:4]
+    return (abs(a - d) <= 1e-12 and abs(b + c) <= 1e-12) or (abs(a + d) <= 1e-12 and abs(b - c) <= 1e-12)
@@ -0,0 +1,226 @@
+"""
+SVG 스트리밍 출력 모듈
+- 요소를 만들 때마다 버퍼가 있는 파일 핸들에 바로 씀 (출력 전체를 문자열로 모으지 않음)
+- 좌표를 지정한 소수 자리수로 짧게 출력 (끝의 0 제거)
+- path를 상대 좌표 명령(m, l, h, v)으로 출력 가능
+- 출력 경로가 .svgz면 gzip으로 바로 압축
+- 링/원 여러 개를 하나의 compound path로 출력 가능
+"""
+
+import gzip
+import re
+
+
+# path 토큰 (명령 / 숫자) - svg_geometry도 같은 규칙을 씀
+# (svg_writer는 numpy 없이 불러올 수 있도록 여기에 둠 → 벡터 단계 CLI 시작 시간)
+PATH_TOKEN_RE = re.compile(r"[MmLlHhVvZzCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def open_svg_text(path, mode="r"):
+    """.svgz면 gzip으로, 아니면 일반 텍스트로 SVG 파일 열기"""
+    if path.endswith(".svgz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_svg_text(path):
+    """SVG(.svg / .svgz) 파일 내용을 문자열로 읽기"""
+    with open_svg_text(path) as f:
+        return f.read()
+
+
+def format_number(v, precision):
+    """소수 precision 자리로 반올림하고 끝의 0과 소수점 제거"""
+    s = f"{v:.{precision}f}"
+    if "." in s:
+        s = s.rstrip("0").rstrip(".")
+    if s in ("-0", ""):
+        s = "0"
+    return s
+
+
+NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+# 같은 숫자 문자열이 반복되는 경우가 많으므로 변환 결과를 캐시 (정밀도별)
+_number_cache = {}
+NUMBER_CACHE_LIMIT = 1 << 20
+
+
+def _number_replacer(precision):
+    cache = _number_cache.setdefault(precision, {})
+    if len(cache) > NUMBER_CACHE_LIMIT:
+        cache.clear()
+
+    def repl(m):
+        s = m.group()
+        r = cache.get(s)
+        if r is None:
+            r = cache[s] = format_number(float(s), precision)
+        return r
+    return repl
+
+
+def format_path_d(d, precision=None, relative=False):
+    """
+    path d 문자열을 다시 출력
+    - precision: 숫자 소수 자리수 (None이면 원본 숫자 그대로)
+    - relative: M/L/H/V/Z로만 된 path를 상대 명령으로 변환 (곡선이 있으면 숫자만 변환)
+    """
+    if relative:
+        toks = PATH_TOKEN_RE.findall(d)
+        if all(t in "MmLlHhVvZz" for t in toks if t.isalpha()):
+            return _relative_path_d(toks, precision if precision is not None else 8)
+    if precision is None:
+        return d
+    # 명령 문자와 구분자는 그대로 두고 숫자만 교체
+    return NUMBER_RE.sub(_number_replacer(precision), d)
+
+
+def _relative_path_d(toks, precision):
+    """
+    절대/상대 M, L, H, V, Z path를 상대 명령으로 변환
+    반올림한 절대 좌표끼리의 차이를 출력하므로 반올림 오차가 누적되지 않음
+    """
+    scale = 10 ** precision
+    out = []
+    # 정수 단위(10^-precision)로 현재 위치 관리
+    x = y = 0
+    start_x = start_y = 0
+    px = py = 0.0
+    cmd = None
+    i = 0
+    while i < len(toks):
+        t = toks[i]
+        if t.isalpha():
+            cmd = t
+            i += 1
+            if cmd in "Zz":
+                out.append("z")
+                x, y = start_x, start_y
+                px, py = x / scale, y / scale
+            continue
+        if cmd is None:
+            i += 1
+            continue
+
+        upper = cmd.upper()
+        rel = cmd.islower()
+        if upper in "ML":
+            if i + 2 > len(toks):
+                break
+            nx = float(toks[i]) + (px if rel else 0.0)
+            ny = float(toks[i + 1]) + (py if rel else 0.0)
+            i += 2
+        elif upper == "H":
+            nx = float(toks[i]) + (px if rel else 0.0)
+            ny = py
+            i += 1
+        else:
+            nx = px
+            ny = float(toks[i]) + (py if rel else 0.0)
+            i += 1
+        px, py = nx, ny
+
+        ix, iy = int(round(nx * scale)), int(round(ny * scale))
+        dx, dy = ix - x, iy - y
+        if upper == "M":
+            # 현재 위치 기준 (첫 M은 원점 기준이므로 절대 좌표와 같음)
+            out.append(f"m{format_number(dx / scale, precision)},{format_number(dy / scale, precision)}")
+            start_x, start_y = ix, iy
+            cmd = "l" if rel else "L"
+        elif dy == 0 and upper != "V":
+            out.append(f"h{format_number(dx / scale, precision)}")
+        elif dx == 0:
+            out.append(f"v{format_number(dy / scale, precision)}")
+        else:
+            out.append(f"l{format_number(dx / scale, precision)},{format_number(dy / scale, precision)}")
+        x, y = ix, iy
+
+    return " ".join(out)
+
+
+def rings_to_path_d(rings, precision=4):
+    """(N, 2) 링 배열들을 'M x,y L x,y ... Z' 서브패스들로 변환"""
+    parts = []
+    for ring in rings:
+        coords = [f"{format_number(x, precision)},{format_number(y, precision)}" for x, y in ring.tolist()]
+        parts.append("M" + " L".join(coords) + " Z")
+    return " ".join(parts)
+
+
+def circle_path_d(cx, cy, r, precision=4):
+    """원을 반원 호 두 개로 된 서브패스로 변환 (sweep-flag=1: 넓이가 양수인 방향)"""
+    x0 = format_number(cx + r, precision)
+    x1 = format_number(cx - r, precision)
+    y = format_number(cy, precision)
+    rs = format_number(r, precision)
+    return f"M{x0},{y} A{rs},{rs} 0 1 1 {x1},{y} A{rs},{rs} 0 1 1 {x0},{y} Z"
+
+
+def format_attrs(attrs):
+    """키워드 인자를 SVG 속성 문자열로 변환 (fill_rule -> fill-rule)"""
+    return "".join(f' {k.replace("_", "-")}="{v}"' for k, v in attrs.items() if v is not None)
+
+
+class SvgWriter:
+    """
+    SVG 요소를 파일에 바로 쓰는 출력기
+
+    사용 예:
+        with SvgWriter("out.svgz", precision=4) as w:
+            w.write('<svg ...>\\n')
+            w.path(d, fill="black")
+            w.write('</svg>')
+    """
+
+    def __init__(self, output_file, precision=4, relative=False, buffer_size=1 << 20):
+        self.output_file = output_file
+        self.precision = precision
+        self.relative = relative
+        self.count = 0
+        if output_file.endswith(".svgz"):
+            self._f = gzip.open(output_file, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            self._f = open(output_file, "w", encoding="utf-8", buffering=buffer_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def write(self, text):
+        self._f.write(text)
+
+    def num(self, v):
+        """좌표/길이 값 출력 문자열 (문자열로 들어온 값도 처리)"""
+        if self.precision is None:
+            return str(v)
+        return format_number(float(v), self.precision)
+
+    def path(self, d, indent="", **attrs):
+        self.count += 1
+        d = format_path_d(d, self.precision, self.relative)
+        self._f.write(f'{indent}<path d="{d}"{format_attrs(attrs)}/>\n')
+
+    def compound_path(self, rings, circles=(), indent="", **attrs):
+        """링들과 원들을 서브패스로 갖는 path 하나 출력 (방향 정리는 호출하는 쪽에서)"""
+        self.count += 1
+        precision = self.precision if self.precision is not None else 8
+        parts = [rings_to_path_d(rings, precision)] if len(rings) else []
+        parts.extend(circle_path_d(cx, cy, r, precision) for cx, cy, r in circles)
+        self._f.write(f'{indent}<path d="{" ".join(parts)}"{format_attrs(attrs)}/>\n')
+
+    def circle(self, cx, cy, r, indent="", **attrs):
+        self.count += 1
+        self._f.write(f'{indent}<circle cx="{self.num(cx)}" cy="{self.num(cy)}" r="{self.num(r)}"{format_attrs(attrs)}/>\n')
+
+    def rect(self, x, y, width, height, indent="", **attrs):
+        self.count += 1
+        self._f.write(f'{indent}<rect x="{self.num(x)}" y="{self.num(y)}" '
+                      f'width="{self.num(width)}" height="{self.num(height)}"{format_attrs(attrs)}/>\n')
@@ -0,0 +1,139 @@
+"""
+합성 보드 SVG 생성 스크립트 (벤치마크용)
+- output.svg(pygerber 출력)와 같은 구조: defs의 마스크 / flash 템플릿, mask 그룹 안의 path와 use
+- 도형 종류: trace(폭 0.4064 사각형 path), pad(8각형 path), flash(use로 찍은 원), pour(큰 다각형 path)
+- 보드 크기는 도형 수에 맞춰 output.svg와 비슷한 밀도(mm²당 약 1개)가 되도록 늘림
+- 같은 seed면 같은 보드
+"""
+
+import argparse
+
+import numpy as np
+
+from svg_writer import format_number
+
+
+FILL = "#288f28ff"
+TRACE_WIDTH = 0.4064
+# flash 템플릿 반지름 (d1: trace 끝 cap, d2: via, d3: 원형 pad)
+FLASH_RADII = (0.2032, 0.4, 0.8)
+# 도형 종류별 비율
+MIX = {"trace": 0.55, "flash": 0.30, "pad": 0.12, "pour": 0.03}
+DENSITY = 1.0
+ASPECT = 1.6
+
+
+def board_size(n_shapes, density=DENSITY, aspect=ASPECT):
+    """도형 수에 맞는 보드 크기 (폭, 높이) mm"""
+    area = max(n_shapes, 1) / density
+    height = (area / aspect) ** 0.5
+    return round(height * aspect, 4), round(height, 4)
+
+
+def shape_counts(n_shapes, mix=MIX):
+    """종류별 도형 개수 (합이 n_shapes)"""
+    counts = {k: int(n_shapes * v) for k, v in mix.items()}
+    counts["trace"] += n_shapes - sum(counts.values())
+    return counts
+
+
+def trace_rings(rng, n, width, height):
+    """임의 방향 trace 사각형 (n, 4, 2) - 45도 단위 방향 (실제 보드처럼)"""
+    start = rng.uniform((1, 1), (width - 1, height - 1), size=(n, 2))
+    angle = rng.integers(0, 8, size=n) * (np.pi / 4)
+    length = rng.uniform(0.5, 6.0, size=n)
+    u = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+    end = np.clip(start + u * length[:, None], 0.5, (width - 0.5, height - 0.5))
+    v = np.stack([-u[:, 1], u[:, 0]], axis=1) * (TRACE_WIDTH / 2)
+    return np.stack([start - v, end - v, end + v, start + v], axis=1)
+
+
+def pad_rings(rng, n, width, height):
+    """8각형 pad (n, 8, 2) - output.svg의 pad와 같은 모양 (지름 약 1.32)"""
+    center = rng.uniform((1, 1), (width - 1, height - 1), size=(n, 2))
+    th = np.pi / 8 + np.arange(8) * (np.pi / 4)
+    octagon = 0.715 * np.stack([np.cos(th), np.sin(th)], axis=1)
+    return center[:, None, :] + octagon[None]
+
+
+def pour_rings(rng, n, width, height):
+    """pour 사각형 (n, 4, 2) - 한 변 2~10mm"""
+    lo = rng.uniform((0, 0), (width - 2, height - 2), size=(n, 2))
+    hi = np.minimum(lo + rng.uniform(2.0, 10.0, size=(n, 2)), (width, height))
+    return np.stack([lo, np.stack([hi[:, 0], lo[:, 1]], axis=1), hi, np.stack([lo[:, 0], hi[:, 1]], axis=1)], axis=1)
+
+
+def ring_path_lines(rings, precision=5):
+    """(n, k, 2) 링 배열 → output.svg 형식의 path 줄 목록"""
+    out = []
+    for ring in np.round(rings, precision).tolist():
+        coords = [f"{x:.{precision}f},{y:.{precision}f}" for x, y in ring + ring[:1]]
+        out.append(f'<path d="M{coords[0]} L' + " L".join(coords[1:]) + f' Z" fill="{FILL}" />\n')
+    return out
+
+
+def generate_board(n_shapes, output_file, seed=0, mix=MIX):
+    """
+    합성 보드 SVG 생성
+
+    Args:
+        n_shapes: 도형 수 (path + use)
+        output_file: 출력 SVG
+        seed: 난수 seed
+        mix: 도형 종류별 비율
+
+    Returns:
+        dict: 보드 크기와 종류별 개수
+    """
+    rng = np.random.default_rng(seed)
+    width, height = board_size(n_shapes)
+    counts = shape_counts(n_shapes, mix)
+
+    w = format_number(width, 6)
+    h = format_number(height, 6)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"\n',
+        f'     width="{w}" height="{h}" viewBox="0 0 {w} {h}">\n',
+        "<defs>\n",
+        '<mask id="d0">\n',
+        f'<rect x="{-width / 2:.6f}" y="{-height / 2:.6f}" width="{width * 2:.6f}" height="{height * 2:.6f}" fill="white" />\n',
+        "</mask>\n",
+    ]
+    for k, r in enumerate(FLASH_RADII, start=1):
+        lines.append(f'<g id="d{k}">\n<circle cx="0" cy="0" r="{r:.5f}" fill="{FILL}" />\n</g>\n')
+    lines.append("</defs>\n")
+    lines.append('<g mask="url(#d0)">\n')
+
+    lines.extend(ring_path_lines(pour_rings(rng, counts["pour"], width, height)))
+    lines.extend(ring_path_lines(trace_rings(rng, counts["trace"], width, height)))
+    lines.extend(ring_path_lines(pad_rings(rng, counts["pad"], width, height)))
+
+    pos = rng.uniform((0.5, 0.5), (width - 0.5, height - 0.5), size=(counts["flash"], 2))
+    ref = rng.choice(len(FLASH_RADII), size=counts["flash"], p=(0.6, 0.3, 0.1)) + 1
+    lines.extend(f'<use xlink:href="#d{k}" x="{x:.6f}" y="{y:.6f}" />\n' for k, (x, y) in zip(ref.tolist(), pos.tolist()))
+
+    lines.append("</g>\n")
+    lines.append("</svg>\n")
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    return {"shapes": n_shapes, "width": width, "height": height, "counts": counts, "seed": seed}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("shapes", type=int, nargs="?", default=10000)
+    p.add_argument("--out", default=None)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    output_file = args.out or f"synthetic_{args.shapes}.svg"
+    info = generate_board(args.shapes, output_file, seed=args.seed)
+    print(f"완료! ({info['width']} x {info['height']} mm)")
+    for kind, n in info["counts"].items():
+        print(f"- {kind}: {n}개")
+    print(f"- 출력 파일: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ import re
 from xml.etree import ElementTree as ET
 from PIL import Image, ImageDraw
 
+import memory_budget
+import tracing
+
 
 SVG_NS = "{http://www.w3.org/2000/svg}"
 
@@ -226,15 +229,7 @@ def draw_path_simple(draw, el, vb, out_w, out_h, fill=255):
     flush_polygon()
 
 
-def build_mask(svg_path, out_path, width=None, height=None, stroke_width=2, invert=True):
-    data = open(svg_path, "rb").read()
-    root = ET.fromstring(data)
-
-    out_w, out_h, vb = get_canvas(root, width, height)
-
-    mask = Image.new("L", (out_w, out_h), 0)
-    draw = ImageDraw.Draw(mask)
-
+def draw_shapes(draw, root, vb, out_w, out_h, stroke_width=2):
     for el in root.iter():
         tag = strip_ns(el.tag)
 
@@ -261,10 +256,61 @@ def build_mask(svg_path, out_path, width=None, height=None, stroke_width=2, inve
         elif tag == "path":
             draw_path_simple(draw, el, vb, out_w, out_h, fill=255)
 
-    if invert:
-        mask = Image.eval(mask, lambda p: 255 - p)
 
-    mask.save(out_path)
+def build_mask_tiled(root, vb, out_w, out_h, stroke_width=2, invert=True):
+    """
+    가로 띠 단위로 그려서 전체 마스크에 붙임 (메모리 예산을 넘을 때)
+    - 메모리에는 전체 마스크 1장 + 띠 2장만 있음 (한 번에 그리면 마스크 + 반전 사본 2장)
+    - 띠의 viewBox가 해당 행 범위만 가리키므로 좌표 변환(map_point)은 그대로 사용
+    - 띠마다 모든 도형을 다시 그리므로(띠 밖은 PIL이 잘라냄) 시간은 띠 수만큼 늘어남
+    """
+    rows = memory_budget.tile_rows("build_mask", out_h, out_w * 2, fixed_bytes=out_w * out_h)
+    mask = Image.new("L", (out_w, out_h), 0)
+    vb_x, vb_y, vb_w, vb_h = vb
+
+    for y0 in range(0, out_h, rows):
+        y1 = min(y0 + rows, out_h)
+        with tracing.span("tile", row=y0, rows=y1 - y0):
+            strip_vb = (vb_x, vb_y + y0 * vb_h / out_h, vb_w, (y1 - y0) * vb_h / out_h)
+            strip = Image.new("L", (out_w, y1 - y0), 0)
+            draw_shapes(ImageDraw.Draw(strip), root, strip_vb, out_w, y1 - y0, stroke_width)
+            if invert:
+                strip = Image.eval(strip, lambda p: 255 - p)
+            memory_budget.buffer("strip", strip)
+            mask.paste(strip, (0, y0))
+    return mask
+
+
+def render_mask(root, vb, out_w, out_h, stroke_width=2, invert=True):
+    """전체 마스크 그리기 - 한 번에 그리면 마스크 + 반전 사본, 예산을 넘으면 띠 단위로"""
+    if memory_budget.fits("build_mask", out_w * out_h * 2, fallback=True):
+        with tracing.span("rasterize"):
+            mask = Image.new("L", (out_w, out_h), 0)
+            draw_shapes(ImageDraw.Draw(mask), root, vb, out_w, out_h, stroke_width)
+        if invert:
+            mask = Image.eval(mask, lambda p: 255 - p)
+    else:
+        with tracing.span("rasterize"):
+            mask = build_mask_tiled(root, vb, out_w, out_h, stroke_width, invert)
+    memory_budget.buffer("mask", mask)
+    return mask
+
+
+@tracing.traced("build_mask")
+def build_mask(svg_path, out_path, width=None, height=None, stroke_width=2, invert=True):
+    with tracing.span("parse"):
+        memory_budget.fits("build_mask.parse", memory_budget.xml_tree_bytes(svg_path))
+        data = open(svg_path, "rb").read()
+        root = ET.fromstring(data)
+        memory_budget.buffer("xml_tree", root)
+
+    out_w, out_h, vb = get_canvas(root, width, height)
+    mask = render_mask(root, vb, out_w, out_h, stroke_width, invert)
+    tracing.count("pixels", out_w * out_h, stage="build_mask")
+
+    with tracing.span("serialize"):
+        mask.save(out_path)
+    tracing.count_file("bytes_written", out_path, stage="build_mask")
 
 
 def main():
@@ -1,7 +1,8 @@
 import re
 
-with open('enclosed_regions.svg', 'r', encoding='utf-8') as f:
-    content = f.read()
+from svg_writer import SvgWriter, read_svg_text
+
+content = read_svg_text('enclosed_regions.svg')
 
 viewbox_match = re.search(r'viewBox="([^"]+)"', content)
 width_match = re.search(r'width="([^"]+)"', content)
@@ -26,14 +27,12 @@ if boundary_mask_match:
         if d_match:
             boundary_paths.append(d_match.group(1))
 
-svg = f'''<?xml version="1.0" encoding="UTF-8"?>
+with SvgWriter('test_boundary_paths.svg', precision=4) as w:
+    w.write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="{vb_x} {vb_y} {vb_width} {vb_height}">
 <g>
-'''
-for d in boundary_paths:
-    svg += f'  <path d="{d}" fill="red" fill-rule="evenodd"/>' + "\n"
-svg += '</g>\n</svg>'
-
-with open('test_boundary_paths.svg', 'w', encoding='utf-8') as f:
-    f.write(svg)
+''')
+    for d in boundary_paths:
+        w.path(d, indent="  ", fill="red", fill_rule="evenodd")
+    w.write('</g>\n</svg>')
 
@@ -0,0 +1,315 @@
+"""
+thermal relief 생성 스크립트
+- 원본 SVG (output.svg)의 pad(use로 찍은 원 + trace_classifier가 pad로 분류한 8각형 등)에
+  anti-pad 고리 + spoke N개 모양의 thermal relief를 만들어 반전 마스크 SVG에 추가
+- 같은 aperture(원 반지름 / 중심 기준 꼭짓점 배치가 같은 도형)의 pad는 템플릿 하나를 만들고
+  pad 중심 좌표만 더해서 한 번에 배치 (템플릿 (V, 2) + 중심 (P, 1, 2) → (P, V, 2))
+- 모든 relief를 마스크 끝에 그룹 하나로 한 번만 삽입 → 마스크 합성으로 pour에서 빼기 / 더하기가 한 번에 적용
+
+모드:
+- subtract: pad를 삼킨 pour에 anti-pad 고리(spoke 자리는 비움)를 검은색으로 추가 → pour에서 뺌
+- add: pad가 pour에서 떨어져 있으면 spoke를 흰색으로 추가 → pour에 더함
+- auto: pad 주변 고리의 pour 비율로 pad마다 subtract / add 선택
+
+pad는 중심에서 볼록한 도형으로 가정 (anti-pad 바깥 경계는 변을 gap만큼 평행 이동한 miter offset)
+"""
+
+import argparse
+import json
+import re
+
+import numpy as np
+
+from pour_drc import read_keepouts, ShapeIndex, board_test
+from svg_geometry import read_svg_shapes
+from svg_writer import read_svg_text, open_svg_text, rings_to_path_d
+from trace_classifier import PATH_RE, classify_paths, path_vertices
+
+
+MODES = ("subtract", "add", "auto")
+MASK_END_RE = re.compile(r"[ \t]*</mask>")
+
+
+def find_pads(copper_svg, min_pad_size=0.5, pad_max_size=3.0, precision=3):
+    """
+    원본 SVG에서 pad를 찾아 aperture별로 묶음
+
+    Args:
+        min_pad_size: 지름 / bbox 긴 변이 이보다 작은 도형은 pad로 보지 않음
+                      (output.svg의 지름 0.4064 원은 16mil trace 끝의 둥근 cap)
+        pad_max_size: trace_classifier의 pad 최대 크기
+        precision: aperture를 비교할 때 꼭짓점 좌표 반올림 자리수
+
+    Returns:
+        apertures: [{"kind": "circle"/"polygon", "radius" 또는 "ring": 중심 기준 꼭짓점, "centers": (P, 2)}, ...]
+    """
+    apertures = []
+
+    _, _, circles = read_svg_shapes(copper_svg)
+    circles = circles[circles[:, 2] * 2 >= min_pad_size]
+    radii, inverse = np.unique(np.round(circles[:, 2], precision), return_inverse=True)
+    for k, r in enumerate(radii.tolist()):
+        apertures.append({"kind": "circle", "radius": r, "centers": circles[inverse == k, :2]})
+
+    ds = PATH_RE.findall(read_svg_text(copper_svg))
+    labels, f = classify_paths(ds, pad_max_size=pad_max_size)
+    pad_idx = np.flatnonzero((labels == "pad") & (np.maximum(f["width"], f["height"]) >= min_pad_size))
+    points, counts = path_vertices([ds[i] for i in pad_idx])
+    starts = np.cumsum(counts) - counts
+    # 꼭짓점 개수가 같은 pad끼리 중심 기준 좌표를 한 줄로 펴서 같은 줄 = 같은 aperture
+    for n in np.unique(counts[counts >= 3]).tolist():
+        sel = np.flatnonzero(counts == n)
+        verts = points[starts[sel][:, None] + np.arange(n)]
+        centers = (verts.min(axis=1) + verts.max(axis=1)) / 2.0
+        rel = np.round(verts - centers[:, None], precision).reshape(len(sel), -1)
+        shapes, inverse = np.unique(rel, axis=0, return_inverse=True)
+        for k in range(len(shapes)):
+            apertures.append({"kind": "polygon", "ring": shapes[k].reshape(-1, 2), "centers": centers[inverse.ravel() == k]})
+    return apertures
+
+
+def ray_distances(ring, angles):
+    """중심(원점)에서 각도 방향으로 나간 반직선이 링 경계와 만나는 거리 (가장 먼 교점)"""
+    u = np.stack([np.cos(angles), np.sin(angles)], axis=-1)[..., None, :]
+    a = ring
+    e = np.roll(ring, -1, axis=0) - ring
+    denom = u[..., 0] * e[:, 1] - u[..., 1] * e[:, 0]
+    ok = np.abs(denom) > 1e-15
+    denom = np.where(ok, denom, 1.0)
+    s = (a[:, 0] * e[:, 1] - a[:, 1] * e[:, 0]) / denom
+    t = (a[:, 0] * u[..., 1] - a[:, 1] * u[..., 0]) / denom
+    hit = ok & (t >= -1e-12) & (t <= 1 + 1e-12) & (s > 0)
+    return np.where(hit, s, 0.0).max(axis=-1)
+
+
+def offset_ring(ring, gap):
+    """볼록 링의 변을 바깥으로 gap만큼 평행 이동한 링 (miter)"""
+    e = np.roll(ring, -1, axis=0) - ring
+    area = 0.5 * np.sum(ring[:, 0] * np.roll(ring[:, 1], -1) - np.roll(ring[:, 0], -1) * ring[:, 1])
+    n = np.stack([e[:, 1], -e[:, 0]], axis=1) / np.maximum(np.hypot(e[:, 0], e[:, 1]), 1e-15)[:, None]
+    if area < 0:
+        n = -n
+    prev = np.roll(n, 1, axis=0)
+    return ring + (prev + n) * (gap / (1.0 + (prev * n).sum(axis=1)))[:, None]
+
+
+def radius_functions(aperture, gap):
+    """
+    aperture의 안쪽(pad) / 바깥쪽(anti-pad) 경계를 각도 → 반지름 함수로 표현
+
+    Returns:
+        (inner, inner_corners), (outer, outer_corners): 반지름 함수와 꼭짓점 각도 (원이면 None)
+    """
+    if aperture["kind"] == "circle":
+        r = aperture["radius"]
+        return (lambda th: np.full(np.shape(th), r), None), (lambda th: np.full(np.shape(th), r + gap), None)
+    ring = aperture["ring"]
+    outer = offset_ring(ring, gap)
+    return ((lambda th: ray_distances(ring, th), np.arctan2(ring[:, 1], ring[:, 0])),
+            (lambda th: ray_distances(outer, th), np.arctan2(outer[:, 1], outer[:, 0])))
+
+
+def spoke_edge(rho, phi, spoke_width, half_span, sign, iterations=40):
+    """
+    spoke 축(각도 phi)에서 sign 방향으로 spoke 가장자리(축까지 거리 = spoke_width / 2)가 경계와 만나는 각도
+    - 경계 위 점의 축까지 거리 rho(θ)·sin|θ - phi|가 spoke_width / 2가 되는 θ를 이분법으로 구함
+    """
+    lo = np.zeros_like(phi)
+    hi = np.full_like(phi, half_span)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2.0
+        inside = rho(phi + sign * mid) * np.sin(mid) < spoke_width / 2.0
+        lo = np.where(inside, mid, lo)
+        hi = np.where(inside, hi, mid)
+    return phi + sign * hi
+
+
+def arc(boundary, start, stop, segments):
+    """start → stop 각도 구간의 경계 점들 (원은 segments 분할, 다각형은 양 끝 + 구간 안의 꼭짓점)"""
+    rho, corners = boundary
+    if corners is None:
+        th = np.linspace(start, stop, max(2, int(np.ceil(abs(stop - start) / (2 * np.pi) * segments)) + 1))
+    else:
+        lo, hi = min(start, stop), max(start, stop)
+        wrapped = lo + np.mod(corners - lo, 2 * np.pi)
+        th = np.unique(np.concatenate([[lo, hi], wrapped[(wrapped > lo + 1e-9) & (wrapped < hi - 1e-9)]]))
+        if stop < start:
+            th = th[::-1]
+    r = rho(th)
+    return np.stack([r * np.cos(th), r * np.sin(th)], axis=1)
+
+
+def relief_template(aperture, gap=0.3, spokes=4, spoke_width=0.3, angle=45.0, spoke_length=None, segments=64):
+    """
+    pad 중심 기준 thermal relief 템플릿
+
+    Returns:
+        antipad: anti-pad 링 목록 (spoke 사이 고리 조각, spoke가 없으면 바깥 / 안쪽 링 - evenodd로 채움)
+        spoke_rings: spoke 사각형 링 목록 (pad 경계 안쪽부터 anti-pad 바깥으로 spoke_length만큼)
+    """
+    inner, outer = radius_functions(aperture, gap)
+    spoke_length = gap if spoke_length is None else spoke_length
+
+    if spokes <= 0:
+        return [arc(outer, 0.0, 2 * np.pi, segments)[:-1], arc(inner, 2 * np.pi, 0.0, segments)[:-1]], []
+
+    span = 2 * np.pi / spokes
+    phi = np.deg2rad(angle) + span * np.arange(spokes)
+    in_start = spoke_edge(inner[0], phi, spoke_width, span / 2, +1)
+    in_stop = spoke_edge(inner[0], phi + span, spoke_width, span / 2, -1)
+    out_start = spoke_edge(outer[0], phi, spoke_width, span / 2, +1)
+    out_stop = spoke_edge(outer[0], phi + span, spoke_width, span / 2, -1)
+
+    antipad = []
+    for k in range(spokes):
+        if out_stop[k] <= out_start[k] or in_stop[k] <= in_start[k]:
+            continue
+        antipad.append(np.concatenate([arc(outer, out_start[k], out_stop[k], segments),
+                                       arc(inner, in_stop[k], in_start[k], segments)]))
+
+    u = np.stack([np.cos(phi), np.sin(phi)], axis=1)
+    v = np.stack([-u[:, 1], u[:, 0]], axis=1) * (spoke_width / 2.0)
+    s0 = (inner[0](phi) * 0.5)[:, None]
+    s1 = (outer[0](phi) + spoke_length)[:, None]
+    spoke_rings = list(np.stack([u * s0 - v, u * s1 - v, u * s1 + v, u * s0 + v], axis=1))
+    return antipad, spoke_rings
+
+
+def place_template(rings, centers):
+    """템플릿 링들을 모든 pad 중심에 한 번에 배치 → pad별 링 목록"""
+    if not rings or len(centers) == 0:
+        return [[] for _ in range(len(centers))]
+    lengths = np.array([len(r) for r in rings])
+    placed = np.concatenate(rings)[None, :, :] + centers[:, None, :]
+    cuts = np.cumsum(lengths)[:-1]
+    return [np.split(pad, cuts) for pad in placed]
+
+
+def pour_fraction(centers, aperture, gap, index, in_board, samples=16):
+    """pad 주변(anti-pad 고리 가운데) 점 중 pour에 있는 비율 - 중심이 같은 aperture의 pad를 한 번에 계산"""
+    inner, outer = radius_functions(aperture, gap)
+    th = np.linspace(0.0, 2 * np.pi, samples, endpoint=False)
+    r = (inner[0](th) + outer[0](th)) / 2.0
+    ring = np.stack([r * np.cos(th), r * np.sin(th)], axis=1)
+    pts = (ring[None] + centers[:, None]).reshape(-1, 2)
+    ok = in_board(pts)
+    idx = np.flatnonzero(ok)
+    ok[idx] = ~index.contains_any(pts[idx])
+    return ok.reshape(len(centers), samples).mean(axis=1)
+
+
+def thermal_relief(pour_svg, output_file, copper_svg="output.svg", mode="auto", gap=0.3, spokes=4,
+                   spoke_width=0.3, angle=45.0, spoke_length=None, min_pad_size=0.5, pad_max_size=3.0,
+                   connect_ratio=0.5, segments=64, precision=4, output_json=None):
+    """
+    pad에 thermal relief를 만들어 pour 마스크에 추가
+
+    Args:
+        pour_svg: 반전 마스크 SVG (inverted_output_mask.svg 등)
+        output_file: 출력 SVG
+        copper_svg: pad를 찾을 원본 SVG
+        mode: 'subtract' / 'add' / 'auto'
+        gap: pad 경계에서 anti-pad 바깥 경계까지 거리
+        spokes: spoke 개수 (0이면 spoke 없는 anti-pad 고리)
+        spoke_width: spoke 폭
+        angle: 첫 spoke 각도 (도)
+        spoke_length: add 모드에서 spoke가 anti-pad 바깥으로 나가는 길이 (None이면 gap)
+        min_pad_size, pad_max_size: find_pads 인자
+        connect_ratio: auto 모드에서 pad 주변의 pour 비율이 이 이상이면 subtract, 아니면 add
+        segments: 원 한 바퀴당 호 분할 수
+        precision: 출력 좌표 소수 자리수
+        output_json: aperture별 pad 개수 리포트 (None이면 생략)
+    """
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 모드: {mode}")
+    content = read_svg_text(pour_svg)
+    mask_end = MASK_END_RE.search(content)
+    if not mask_end:
+        raise ValueError("마스크를 찾을 수 없습니다.")
+
+    apertures = find_pads(copper_svg, min_pad_size, pad_max_size)
+    if mode == "auto":
+        keep_rings, _, keep_circles, root = read_keepouts(pour_svg)
+        index = ShapeIndex(keep_rings, keep_circles)
+        in_board = board_test(root, None)
+
+    subtract_paths, add_paths, report = [], [], []
+    for ap in apertures:
+        centers = ap["centers"]
+        antipad, spoke_rings = relief_template(ap, gap, spokes, spoke_width, angle, spoke_length, segments)
+        if mode == "auto":
+            connected = pour_fraction(centers, ap, gap, index, in_board) >= connect_ratio
+        else:
+            connected = np.full(len(centers), mode == "subtract")
+        subtract_paths.extend(rings_to_path_d(rings, precision) for rings in place_template(antipad, centers[connected]))
+        add_paths.extend(rings_to_path_d(rings, precision) for rings in place_template(spoke_rings, centers[~connected]))
+        report.append({
+            "kind": ap["kind"],
+            "size": ap["radius"] * 2 if ap["kind"] == "circle" else float(np.ptp(ap["ring"], axis=0).max()),
+            "pads": int(len(centers)),
+            "subtract": int(connected.sum()),
+            "add": int((~connected).sum()),
+        })
+
+    # 모든 relief를 마스크 끝에 한 번에 삽입 (검은색 = pour에서 뺌, 흰색 = pour에 더함)
+    indent = "        "
+    block = f"\n{indent}<!-- thermal relief -->\n"
+    if subtract_paths:
+        block += f'{indent}<g fill="black" fill-rule="evenodd">\n'
+        block += "".join(f'{indent}    <path d="{d}"/>\n' for d in subtract_paths if d)
+        block += f"{indent}</g>\n"
+    if add_paths:
+        block += f'{indent}<g fill="white">\n'
+        block += "".join(f'{indent}    <path d="{d}"/>\n' for d in add_paths if d)
+        block += f"{indent}</g>\n"
+    with open_svg_text(output_file, "w") as f:
+        f.write(content[:mask_end.start()] + block + content[mask_end.start():])
+
+    print(f"완료! (aperture {len(apertures)}개, pad {sum(r['pads'] for r in report)}개)")
+    for r in report:
+        print(f"- {r['kind']} {r['size']:.4g}: pad {r['pads']}개 (anti-pad {r['subtract']}개, spoke 연결 {r['add']}개)")
+    print(f"- 출력 파일: {output_file}")
+    if output_json:
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump({"pour": pour_svg, "copper": copper_svg, "mode": mode, "gap": gap, "spokes": spokes,
+                       "spoke_width": spoke_width, "apertures": report}, f, ensure_ascii=False, indent=2)
+        print(f"- 리포트: {output_json}")
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("pour", nargs="?", default="inverted_output_mask.svg")
+    p.add_argument("--out", default="inverted_output_thermal.svg")
+    p.add_argument("--copper", default="output.svg")
+    p.add_argument("--mode", choices=MODES, default="auto")
+    p.add_argument("--gap", type=float, default=0.3)
+    p.add_argument("--spokes", type=int, default=4)
+    p.add_argument("--spoke_width", type=float, default=0.3)
+    p.add_argument("--angle", type=float, default=45.0)
+    p.add_argument("--spoke_length", type=float, default=None)
+    p.add_argument("--min_pad_size", type=float, default=0.5)
+    p.add_argument("--pad_max_size", type=float, default=3.0)
+    p.add_argument("--connect_ratio", type=float, default=0.5)
+    p.add_argument("--json", default=None)
+    args = p.parse_args()
+
+    thermal_relief(
+        args.pour,
+        args.out,
+        copper_svg=args.copper,
+        mode=args.mode,
+        gap=args.gap,
+        spokes=args.spokes,
+        spoke_width=args.spoke_width,
+        angle=args.angle,
+        spoke_length=args.spoke_length,
+        min_pad_size=args.min_pad_size,
+        pad_max_size=args.pad_max_size,
+        connect_ratio=args.connect_ratio,
+        output_json=args.json,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+얇은 path 임계값 스윕 스크립트
+- filter_thin_paths / remove_thin_lines / remove_zero_thickness를 임계값 여러 개로 한 번에 실행
+- path마다 최소 치수 min(폭, 높이)를 한 번만 계산해서 정렬해 두고,
+  임계값마다 이진 탐색(searchsorted)으로 얇은 path(최소 치수 < 임계값) 개수를 구함
+- 임계값별 출력 파일과 임계값-제거 개수 표(CSV / JSON)를 한 번에 출력
+
+모드 (출력 내용은 각 스크립트를 그 임계값으로 실행한 결과와 같음):
+- filter: filter_thin_paths - 마스크에서 얇은 path 제거
+- remove: remove_thin_lines - 원본의 얇은 path를 마스크에 검은색으로 추가
+- stroke: remove_zero_thickness - 마스크의 얇은 path에 stroke 추가
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+from filter_thin_paths import build_filtered_content
+from remove_thin_lines import insert_thin_paths
+from remove_zero_thickness import MASK_PATH_RE, stroked_path
+from svg_geometry import path_bboxes
+from svg_writer import format_number
+
+
+# path의 d 속성 정규식 (앞에 공백을 요구해야 d 뒤의 id="path1" 값을 d로 잡지 않음)
+LEGACY_PATH_RE = re.compile(r'<path[^>]*?\sd="([^"]+)"[^>]*/>')
+MASK_RE = re.compile(r"(<mask[^>]*>)(.*?)(</mask>)", re.DOTALL)
+
+MODES = ("filter", "remove", "stroke")
+
+
+def min_dimensions(ds):
+    """path별 최소 치수 min(폭, 높이) (기존 get_path_dimensions와 같은 bbox 기준)"""
+    bboxes = path_bboxes(ds)
+    return np.minimum(bboxes[:, 2] - bboxes[:, 0], bboxes[:, 3] - bboxes[:, 1])
+
+
+class ThinIndex:
+    """
+    최소 치수를 정렬해 둔 색인
+    - count(t): 최소 치수 < t 인 path 개수 (이진 탐색)
+    - thin(t): path 순서대로 얇은지 여부
+    """
+
+    def __init__(self, dims):
+        self.dims = np.asarray(dims, dtype=np.float64)
+        self.order = np.argsort(self.dims, kind="stable")
+        self.sorted = self.dims[self.order]
+        # path별 정렬 순위 → 임계값의 제거 개수 k보다 순위가 낮으면 얇은 path
+        self.rank = np.empty(len(self.dims), dtype=np.int64)
+        self.rank[self.order] = np.arange(len(self.dims))
+
+    def __len__(self):
+        return len(self.dims)
+
+    def count(self, thresholds):
+        return np.searchsorted(self.sorted, thresholds, side="left")
+
+    def thin(self, threshold):
+        return self.rank < self.count(threshold)
+
+
+def prepare_mode(mode, input_file, original_file="output.svg", stroke_width=0.5):
+    """
+    모드별로 입력을 한 번만 읽고 파싱
+
+    Returns:
+        ds: 임계값을 적용할 path d 목록
+        render: render(thin) -> 출력 SVG 문자열 (thin: ds 순서의 얇은지 여부)
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if mode == "filter":
+        mask_match = MASK_RE.search(content)
+        if not mask_match:
+            raise ValueError("마스크를 찾을 수 없습니다.")
+        mask_content = mask_match.group(2)
+        rect_match = re.search(r"<rect[^>]*/>", mask_content)
+        rect_element = rect_match.group(0) if rect_match else ""
+        ds = LEGACY_PATH_RE.findall(mask_content)
+
+        def render(thin):
+            return build_filtered_content(content, mask_match, rect_element, ds, thin)[0]
+
+    elif mode == "remove":
+        with open(original_file, "r", encoding="utf-8") as f:
+            ds = LEGACY_PATH_RE.findall(f.read())
+        mask_end_pos = content.find("    </mask>")
+        if mask_end_pos == -1:
+            raise ValueError("마스크를 찾을 수 없습니다.")
+
+        def render(thin):
+            return insert_thin_paths(content, mask_end_pos, [d for d, t in zip(ds, thin) if t])
+
+    elif mode == "stroke":
+        # [텍스트, d, 텍스트, d, ..., 텍스트]로 나눠 두고 임계값마다 path 부분만 다시 만듦
+        parts = MASK_PATH_RE.split(content)
+        ds = parts[1::2]
+        plain = [f'<path d="{d}" fill="black"/>' for d in ds]
+        stroked = [stroked_path(d, stroke_width) for d in ds]
+
+        def render(thin):
+            out = parts[:]
+            out[1::2] = [s if t else p for s, p, t in zip(stroked, plain, thin)]
+            return "".join(out)
+
+    else:
+        raise ValueError(f"알 수 없는 모드: {mode}")
+
+    return ds, render
+
+
+def write_table(rows, table_file):
+    """임계값별 제거 개수 표 저장 (.csv면 CSV, 아니면 JSON)"""
+    if table_file.endswith(".csv"):
+        with open(table_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(table_file, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+def sweep_thresholds(mode, input_file, thresholds, out_dir=".", original_file="output.svg",
+                     stroke_width=0.5, table_file=None, write_outputs=True):
+    """
+    임계값 여러 개에 대해 얇은 path 처리를 한 번에 실행
+
+    Args:
+        mode: 'filter' / 'remove' / 'stroke'
+        input_file: 반전된 SVG (inverted_output_mask.svg)
+        thresholds: 임계값 목록 (최소 폭/높이 기준)
+        out_dir: 임계값별 출력 폴더
+        original_file: remove 모드에서 얇은 path를 찾을 원본 SVG
+        stroke_width: stroke 모드의 stroke-width
+        table_file: 임계값-제거 개수 표 (.csv / .json, None이면 저장 안 함)
+        write_outputs: False면 표만 계산
+
+    Returns:
+        표의 행 목록
+    """
+    ds, render = prepare_mode(mode, input_file, original_file, stroke_width)
+    index = ThinIndex(min_dimensions(ds))
+    thresholds = sorted(float(t) for t in thresholds)
+    counts = index.count(thresholds)
+
+    if write_outputs:
+        os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+
+    rows = []
+    prev = 0
+    for t, k in zip(thresholds, counts.tolist()):
+        row = {
+            "threshold": t,
+            "removed": k,
+            "kept": len(index) - k,
+            "ratio": round(k / len(index), 4) if len(index) else 0.0,
+            "delta": k - prev,
+        }
+        prev = k
+        if write_outputs:
+            output_file = os.path.join(out_dir, f"{stem}_{mode}_{format_number(t, 4)}.svg")
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(render(index.thin(t).tolist()))
+            row["file"] = output_file
+        rows.append(row)
+
+    print(f"완료! (path {len(index)}개, 임계값 {len(thresholds)}개)")
+    print(f"{'임계값':>10}{'제거':>8}{'유지':>8}{'증가':>8}")
+    for row in rows:
+        print(f"{row['threshold']:>10.4g}{row['removed']:>8}{row['kept']:>8}{row['delta']:>8}")
+
+    if table_file:
+        write_table(rows, table_file)
+        print(f"- 표: {table_file}")
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="inverted_output_mask.svg")
+    p.add_argument("--mode", choices=MODES, default="filter")
+    p.add_argument("--thresholds", type=float, nargs="*", default=None)
+    p.add_argument("--range", type=float, nargs=3, default=[0.1, 2.0, 20], metavar=("START", "STOP", "COUNT"),
+                   help="--thresholds가 없을 때 START~STOP을 COUNT개로 나눈 임계값 사용")
+    p.add_argument("--out_dir", default="thin_sweep")
+    p.add_argument("--original", default="output.svg")
+    p.add_argument("--stroke_width", type=float, default=0.5)
+    p.add_argument("--table", default=None, help="임계값-제거 개수 표 (.csv / .json)")
+    p.add_argument("--table_only", action="store_true", help="출력 SVG 없이 표만 계산")
+    args = p.parse_args()
+
+    if args.thresholds:
+        thresholds = args.thresholds
+    else:
+        start, stop, count = args.range
+        thresholds = np.round(np.linspace(start, stop, int(count)), 6).tolist()
+
+    sweep_thresholds(
+        args.mode,
+        args.svg,
+        thresholds,
+        out_dir=args.out_dir,
+        original_file=args.original,
+        stroke_width=args.stroke_width,
+        table_file=args.table,
+        write_outputs=not args.table_only,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+path 일괄 분류 스크립트 (trace / pad / pour)
+- cut_svg.is_thin_rectangle_path를 일반화: 폭 하나(0.4064) 대신 trace 폭 표(이름, 폭, 허용 오차)로 비교
+- 문서의 모든 path 꼭짓점을 한 배열로 모아 변 길이 / 넓이 / bbox를 한 번에 계산
+- path마다 클래스 이름을 붙이고, 제거/유지 규칙을 클래스 단위로 지정
+
+클래스:
+- 표의 trace 이름 (예: trace_16mil): 사각형 path 중 변 길이가 표의 폭과 맞는 것
+- pad: 크기가 pad_max_size 이하인 나머지 도형 (8각형 패드 등)
+- pour: 그보다 큰 도형
+- degenerate: 넓이가 0인 도형 (외곽선 등 두께 없는 선)
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+
+import numpy as np
+
+from svg_geometry import path_to_rings, path_number_arrays
+from svg_writer import read_svg_text, open_svg_text
+
+
+# (클래스 이름, 폭 mm, 허용 오차 mm) - 앞에 있는 항목이 우선
+TRACE_WIDTHS = [
+    ("trace_16mil", 0.4064, 0.01),
+    ("trace_12mil", 0.3048, 0.01),
+    ("trace_10mil", 0.254, 0.01),
+    ("trace_8mil", 0.2032, 0.01),
+    ("trace_6mil", 0.1524, 0.01),
+    ("trace_4mil", 0.1016, 0.01),
+]
+
+# d 속성만 잡도록 앞에 공백 요구 (id="..." 같은 속성의 끝 글자 d와 구분)
+PATH_RE = re.compile(r'<path[^>]*?\sd="([^"]+)"[^>]*/>')
+
+# 절대 좌표 M / L / Z만 있는 path는 숫자를 (x, y) 쌍으로 바로 읽을 수 있음
+ABSOLUTE_POLY_RE = re.compile(r"^\s*M[^MmlhvHVCcSsQqTtAa]*$")
+
+
+def path_vertices(ds):
+    """
+    모든 path의 첫 번째 링 꼭짓점을 하나의 배열로 모음 (시작점과 같은 마지막 점은 제거)
+    - 절대 좌표 M/L/Z path는 한 번에 파싱, 나머지(상대 좌표, H/V, 여러 서브패스)는 path_to_rings로 파싱
+
+    Returns:
+        points: (N, 2) 꼭짓점 (path 순서대로)
+        counts: (P,) path별 꼭짓점 개수
+    """
+    n = len(ds)
+    fast = np.array([bool(ABSOLUTE_POLY_RE.match(d)) for d in ds], dtype=bool)
+    fast_idx = np.flatnonzero(fast)
+
+    nums, num_counts = path_number_arrays([ds[i] for i in fast_idx])
+    pair_counts = num_counts // 2
+    # 숫자 개수가 홀수인 path는 남는 숫자를 버림
+    starts = np.cumsum(num_counts) - num_counts
+    local = np.arange(len(nums)) - np.repeat(starts, num_counts)
+    pts = nums[local < np.repeat(pair_counts * 2, num_counts)].reshape(-1, 2)
+    ids = np.repeat(fast_idx, pair_counts)
+
+    slow_pts = [pts]
+    slow_ids = [ids]
+    for i in np.flatnonzero(~fast):
+        rings = path_to_rings(ds[i])
+        if rings:
+            slow_pts.append(rings[0])
+            slow_ids.append(np.full(len(rings[0]), i))
+    if len(slow_pts) > 1:
+        ids = np.concatenate(slow_ids)
+        order = np.argsort(ids, kind="stable")
+        pts = np.concatenate(slow_pts)[order]
+        ids = ids[order]
+
+    # 닫는 점(시작점과 같은 마지막 점) 제거
+    counts = np.bincount(ids, minlength=n)
+    nonempty = counts >= 2
+    first = (np.cumsum(counts) - counts)[nonempty]
+    last = first + counts[nonempty] - 1
+    closing = np.all(pts[first] == pts[last], axis=1)
+    keep = np.ones(len(pts), dtype=bool)
+    keep[last[closing]] = False
+    counts[np.flatnonzero(nonempty)[closing]] -= 1
+    return pts[keep], counts
+
+
+def polygon_features(points, counts):
+    """
+    path별 도형 특징을 한 번에 계산
+
+    Returns:
+        dict: n_vertices, edge_lengths(꼭짓점별 다음 변 길이), min_edge, max_edge, area, width, height
+    """
+    n = len(counts)
+    ids = np.repeat(np.arange(n), counts)
+    starts = np.cumsum(counts) - counts
+    nxt = np.arange(len(points)) + 1
+    nonempty = counts > 0
+    nxt[(starts + counts - 1)[nonempty]] = starts[nonempty]
+
+    edges = points[nxt] - points
+    edge_lengths = np.hypot(edges[:, 0], edges[:, 1])
+    cross = points[:, 0] * points[nxt, 1] - points[nxt, 0] * points[:, 1]
+    area = 0.5 * np.abs(np.bincount(ids, weights=cross, minlength=n))
+
+    min_edge = np.zeros(n)
+    max_edge = np.zeros(n)
+    bbox = np.zeros((n, 4))
+    if len(points):
+        s = starts[nonempty]
+        min_edge[nonempty] = np.minimum.reduceat(edge_lengths, s)
+        max_edge[nonempty] = np.maximum.reduceat(edge_lengths, s)
+        bbox[nonempty, :2] = np.minimum.reduceat(points, s)
+        bbox[nonempty, 2:] = np.maximum.reduceat(points, s)
+
+    return {
+        "n_vertices": counts,
+        "edge_lengths": edge_lengths,
+        "edge_ids": ids,
+        "min_edge": min_edge,
+        "max_edge": max_edge,
+        "area": area,
+        "width": bbox[:, 2] - bbox[:, 0],
+        "height": bbox[:, 3] - bbox[:, 1],
+    }
+
+
+def classify_paths(ds, widths=TRACE_WIDTHS, edge_match="min", pad_max_size=3.0, min_area=1e-9):
+    """
+    path d 문자열 목록을 한 번에 분류
+
+    Args:
+        ds: path d 문자열 목록
+        widths: (클래스 이름, 폭, 허용 오차) 표
+        edge_match: 'min'이면 가장 짧은 변(=trace 폭), 'any'면 변 하나라도 표의 폭과 맞으면 trace
+                    ('any'는 넓이가 있는 사각형에 대해 기존 is_thin_rectangle_path와 같은 규칙)
+        pad_max_size: trace가 아닌 도형 중 bbox의 긴 변이 이 이하면 pad, 넘으면 pour
+        min_area: 넓이가 이보다 작으면 degenerate
+
+    Returns:
+        labels: (P,) 클래스 이름 배열
+        features: polygon_features 결과 + trace_width (trace가 아니면 nan)
+    """
+    points, counts = path_vertices(ds)
+    f = polygon_features(points, counts)
+    n = len(ds)
+
+    labels = np.full(n, "other", dtype=object)
+    trace_width = np.full(n, np.nan)
+    degenerate = (counts < 3) | (f["area"] < min_area)
+    quad = (counts == 4) & ~degenerate
+    unmatched = quad.copy()
+
+    quad_edges = quad[f["edge_ids"]]
+    for name, width, tol in widths:
+        if edge_match == "any":
+            hit_edge = quad_edges & (np.abs(f["edge_lengths"] - width) < tol)
+            hit = np.bincount(f["edge_ids"][hit_edge], minlength=n) > 0
+        else:
+            hit = np.abs(f["min_edge"] - width) < tol
+        hit &= unmatched
+        labels[hit] = name
+        trace_width[hit] = width
+        unmatched &= ~hit
+
+    size = np.maximum(f["width"], f["height"])
+    rest = ~degenerate & ~np.isfinite(trace_width)
+    labels[rest & (size <= pad_max_size)] = "pad"
+    labels[rest & (size > pad_max_size)] = "pour"
+    labels[degenerate] = "degenerate"
+
+    f["trace_width"] = trace_width
+    return labels, f
+
+
+def keep_mask(labels, remove=(), keep=None):
+    """
+    클래스 규칙으로 남길 path 선택
+    - remove: 제거할 클래스 이름들
+    - keep: 지정하면 이 클래스들만 남김 (remove보다 먼저 적용)
+    """
+    mask = np.ones(len(labels), dtype=bool)
+    if keep is not None:
+        mask &= np.isin(labels, list(keep))
+    if remove:
+        mask &= ~np.isin(labels, list(remove))
+    return mask
+
+
+def load_width_table(path):
+    """JSON 폭 표 읽기: [{"name": ..., "width": ..., "tol": ...}, ...]"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [(e["name"], float(e["width"]), float(e.get("tol", 0.01))) for e in json.load(f)]
+
+
+def classify_svg(input_file, output_json=None, output_svg=None, widths=TRACE_WIDTHS, edge_match="min",
+                 pad_max_size=3.0, remove=(), keep=None):
+    """
+    SVG의 모든 path를 분류하고 클래스별 개수 출력
+
+    Args:
+        input_file: 입력 SVG
+        output_json: path별 클래스 / 특징 JSON (None이면 생략)
+        output_svg: 규칙을 적용한 SVG (None이면 생략) - 제거된 path만 빠지고 나머지 내용은 그대로
+        widths, edge_match, pad_max_size: classify_paths 인자
+        remove, keep: keep_mask 인자
+    """
+    content = read_svg_text(input_file)
+    ds = PATH_RE.findall(content)
+    labels, f = classify_paths(ds, widths, edge_match, pad_max_size)
+    mask = keep_mask(labels, remove, keep)
+
+    counts = Counter(labels.tolist())
+    print(f"path 개수: {len(ds)}")
+    for name in [w[0] for w in widths] + ["pad", "pour", "degenerate", "other"]:
+        if counts.get(name):
+            print(f"- {name}: {counts[name]}개")
+    if remove or keep is not None:
+        print(f"- 규칙 적용 후 남은 path: {int(mask.sum())}개 (제거 {int((~mask).sum())}개)")
+
+    if output_json:
+        report = {
+            "input": input_file,
+            "widths": [{"name": n, "width": w, "tol": t} for n, w, t in widths],
+            "edge_match": edge_match,
+            "pad_max_size": pad_max_size,
+            "counts": dict(counts),
+            "paths": [
+                {
+                    "index": i,
+                    "class": labels[i],
+                    "vertices": int(f["n_vertices"][i]),
+                    "min_edge": round(float(f["min_edge"][i]), 5),
+                    "max_edge": round(float(f["max_edge"][i]), 5),
+                    "area": round(float(f["area"][i]), 6),
+                    "keep": bool(mask[i]),
+                }
+                for i in range(len(ds))
+            ],
+        }
+        with open(output_json, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, ensure_ascii=False, indent=2)
+        print(f"- 리포트: {output_json}")
+
+    if output_svg:
+        # 분류할 때와 같은 정규식 순서로 path를 하나씩 넘기며 제거 대상만 삭제
+        it = iter(mask.tolist())
+        filtered = PATH_RE.sub(lambda m: m.group(0) if next(it) else "", content)
+        with open_svg_text(output_svg, "w") as fp:
+            fp.write(filtered)
+        print(f"- 출력 파일: {output_svg}")
+
+    return labels, f
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("svg", nargs="?", default="output.svg")
+    p.add_argument("--json", default=None)
+    p.add_argument("--out", default=None)
+    p.add_argument("--widths", default=None, help="폭 표 JSON 파일")
+    p.add_argument("--edge_match", choices=["min", "any"], default="min")
+    p.add_argument("--pad_max_size", type=float, default=3.0)
+    p.add_argument("--remove", nargs="*", default=[])
+    p.add_argument("--keep", nargs="*", default=None)
+    args = p.parse_args()
+
+    widths = load_width_table(args.widths) if args.widths else TRACE_WIDTHS
+    classify_svg(
+        args.svg,
+        output_json=args.json,
+        output_svg=args.out,
+        widths=widths,
+        edge_match=args.edge_match,
+        pad_max_size=args.pad_max_size,
+        remove=args.remove,
+        keep=args.keep,
+    )
+
+
+if __name__ == "__main__":
+    main()
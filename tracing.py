@@ -0,0 +1,302 @@
+"""
+단계별 실행 추적 모듈
+- span(name): 구간 시간을 재는 context manager (parse / compute / rasterize / serialize 등, 중첩 가능)
+- traced(name): 함수 전체를 span으로 감싸는 decorator (단계 함수에 사용)
+- count(name, value, **labels): 카운터 (입력 / 출력 path 개수, 픽셀 수, 쓴 bytes 등)
+- 결과: Chrome trace-event JSON (chrome://tracing, Perfetto에서 열기) + Prometheus 텍스트 형식 metrics 파일
+- 선택: 샘플링 프로파일러 - 일정 간격으로 메인 스레드 스택을 모아 folded stack 파일로 저장 (flamegraph.pl 등)
+- 꺼져 있으면(기본) span은 아무것도 하지 않는 공용 객체를 돌려주고 count는 바로 반환 → 오버헤드 거의 없음
+- listener: span 시작 / 끝마다 호출되는 객체 (memory_budget의 단계별 메모리 측정이 사용)
+
+기존 스크립트를 그대로 실행하면서 켜기 (환경 변수):
+    EMI_TRACE=trace.json EMI_METRICS=metrics.prom python invert_svg.py
+    EMI_PROFILE=profile.folded EMI_PROFILE_INTERVAL=0.005 python extract_enclosed.py
+    (여러 프로세스가 같은 파일을 덮어쓰지 않도록 경로에 {pid}를 쓰면 프로세스 번호로 바뀜)
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+
+METRIC_PREFIX = "emi"
+
+_tracer = None
+
+
+class _NullSpan:
+    """추적이 꺼져 있을 때 쓰는 아무것도 하지 않는 span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "path")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = self.tracer.stack()
+        stack.append(self.name)
+        self.path = ".".join(stack)
+        for listener in self.tracer.listeners:
+            listener.enter(self.path, self.args)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.tracer.stack().pop()
+        for listener in reversed(self.tracer.listeners):
+            listener.exit(self.path, exc_type)
+        self.tracer.finish(self, end, exc_type)
+        return False
+
+
+class Tracer:
+    """span / 카운터 기록과 파일 출력"""
+
+    def __init__(self, trace_file=None, metrics_file=None, profile_file=None, profile_interval=0.005):
+        self.trace_file = trace_file
+        self.metrics_file = metrics_file
+        self.profile_file = profile_file
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.events = []
+        self.span_seconds = defaultdict(float)
+        self.span_calls = defaultdict(int)
+        self.span_errors = defaultdict(int)
+        self.counters = defaultdict(float)
+        self.listeners = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self._main_ident = threading.main_thread().ident
+        self._main_stack = None
+        self.samples = defaultdict(int)
+        self._profiler = None
+        self._stop = threading.Event()
+        if profile_file:
+            self._profiler = threading.Thread(target=self._sample_loop, args=(profile_interval,), daemon=True)
+            self._profiler.start()
+
+    def stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            if threading.get_ident() == self._main_ident:
+                self._main_stack = stack
+        return stack
+
+    def finish(self, span, end, exc_type):
+        dur = end - span.start
+        event = {
+            "name": span.name,
+            "cat": span.path.split(".", 1)[0],
+            "ph": "X",
+            "ts": (span.start - self.origin) / 1000.0,
+            "dur": dur / 1000.0,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if span.args:
+            event["args"] = span.args
+        with self._lock:
+            self.events.append(event)
+            self.span_seconds[span.path] += dur / 1e9
+            self.span_calls[span.path] += 1
+            if exc_type is not None:
+                self.span_errors[span.path] += 1
+
+    def count(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+            self.events.append({
+                "name": name,
+                "ph": "C",
+                "ts": (time.perf_counter_ns() - self.origin) / 1000.0,
+                "pid": self.pid,
+                "args": {(",".join(f"{k}={v}" for k, v in key[1]) or name): self.counters[key]},
+            })
+
+    def _sample_loop(self, interval):
+        """메인 스레드 스택을 interval마다 기록 (현재 span 경로를 스택 맨 앞에 붙임)"""
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(self._main_ident)
+            if frame is None:
+                continue
+            funcs = []
+            while frame is not None:
+                code = frame.f_code
+                funcs.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            spans = list(self._main_stack or ())
+            self.samples[";".join(spans + funcs[::-1])] += 1
+
+    def stop(self):
+        if self._profiler is not None:
+            self._stop.set()
+            self._profiler.join()
+            self._profiler = None
+
+    def metrics_text(self):
+        """Prometheus 텍스트 형식"""
+        lines = []
+
+        def family(name, help_text, rows):
+            if not rows:
+                return
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in rows:
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{metric}{{{label_str}}} {value:g}" if label_str else f"{metric} {value:g}")
+
+        family("span_seconds_total", "Total time spent in span", [((("span", p),), v) for p, v in sorted(self.span_seconds.items())])
+        family("span_calls_total", "Number of times the span ran", [((("span", p),), v) for p, v in sorted(self.span_calls.items())])
+        family("span_errors_total", "Number of spans that raised", [((("span", p),), v) for p, v in sorted(self.span_errors.items())])
+        by_name = defaultdict(list)
+        for (name, labels), value in sorted(self.counters.items()):
+            by_name[name].append((labels, value))
+        for name, rows in by_name.items():
+            family(f"{name}_total", name.replace("_", " "), rows)
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """파일 출력 (이미 있던 파일은 덮어씀)"""
+        if self.trace_file:
+            with open(self.trace_file, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        if self.metrics_file:
+            with open(self.metrics_file, "w", encoding="utf-8") as f:
+                f.write(self.metrics_text())
+        if self.profile_file:
+            with open(self.profile_file, "w", encoding="utf-8") as f:
+                for stack, n in sorted(self.samples.items()):
+                    f.write(f"{stack} {n}\n")
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **args):
+    """구간 시간 측정 context manager (꺼져 있으면 공용 no-op 객체)"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, args)
+
+
+def traced(name=None):
+    """함수 전체를 span으로 감싸는 decorator (꺼져 있으면 함수를 바로 호출)"""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _Span(_tracer, span_name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1, **labels):
+    """카운터 증가 (Prometheus 이름은 emi_<name>_total)"""
+    if _tracer is None:
+        return
+    _tracer.count(name, value, labels)
+
+
+def count_file(name, path, **labels):
+    """파일 크기를 카운터에 더함 (쓴 bytes 등)"""
+    if _tracer is None:
+        return
+    try:
+        _tracer.count(name, os.path.getsize(path), labels)
+    except OSError:
+        pass
+
+
+def enable(trace_file=None, metrics_file=None, profile_file=None, profile_interval=0.005):
+    """
+    추적 켜기 - 프로그램이 끝날 때(또는 disable) 파일 출력
+
+    Args:
+        trace_file: Chrome trace-event JSON 경로
+        metrics_file: Prometheus 텍스트 형식 metrics 경로
+        profile_file: 샘플링 프로파일러 folded stack 경로 (None이면 프로파일러 안 씀)
+        profile_interval: 샘플링 간격 (초)
+    """
+    global _tracer
+    if _tracer is not None:
+        disable()
+    _tracer = Tracer(trace_file, metrics_file, profile_file, profile_interval)
+    return _tracer
+
+
+def disable():
+    """추적 끄고 파일 출력"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.stop()
+        tracer.flush()
+    return tracer
+
+
+def add_listener(listener):
+    """
+    span 시작 / 끝 listener 등록 (listener.enter(path, args), listener.exit(path, exc_type))
+    - 추적이 꺼져 있으면 출력 파일 없이 켬 (span이 동작하도록)
+    """
+    tracer = _tracer if _tracer is not None else enable()
+    tracer.listeners.append(listener)
+    return tracer
+
+
+def remove_listener(listener):
+    if _tracer is not None and listener in _tracer.listeners:
+        _tracer.listeners.remove(listener)
+
+
+def enable_from_env():
+    """EMI_TRACE / EMI_METRICS / EMI_PROFILE 환경 변수가 있으면 추적을 켜고 종료할 때 출력"""
+    pid = str(os.getpid())
+    trace_file, metrics_file, profile_file = (
+        os.environ[k].replace("{pid}", pid) if os.environ.get(k) else None
+        for k in ("EMI_TRACE", "EMI_METRICS", "EMI_PROFILE")
+    )
+    if not (trace_file or metrics_file or profile_file):
+        return None
+    interval = float(os.environ.get("EMI_PROFILE_INTERVAL", "0.005"))
+    tracer = enable(trace_file, metrics_file, profile_file, interval)
+    atexit.register(disable)
+    return tracer
+
+
+enable_from_env()